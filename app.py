@@ -1,6 +1,3 @@
-import tomllib
-from pathlib import Path
-
 from flask import Flask
 
 import utils
@@ -11,20 +8,8 @@ from storages.factory import StorageFactory
 # 验证配置
 Config.validate()
 
-
 # 从 pyproject.toml 读取版本号
-def get_version() -> str:
-    """从 pyproject.toml 读取项目版本号"""
-    try:
-        pyproject_path = Path(__file__).parent / "pyproject.toml"
-        with open(pyproject_path, "rb") as f:
-            pyproject_data = tomllib.load(f)
-        return pyproject_data.get("project", {}).get("version", "0.0.0")
-    except Exception:
-        return "0.0.0"
-
-
-__version__ = get_version()
+__version__ = utils.get_version()
 
 app = Flask(__name__)
 
@@ -0,0 +1,428 @@
+"""
+压缩包的打包下载和解压上传
+
+- 打包：边从存储后端并发读取对象边写出 ZIP 数据，不在内存或磁盘上生成完整的压缩包
+- 解压：逐个读取上传的 ZIP/tar 中的文件，分批通过 upload_many 写入存储后端
+"""
+
+import contextvars
+import mimetypes
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from config import Config
+from storages.base import BaseStorage
+
+# 打包过程中读取失败的文件列在压缩包末尾的这个文件中
+ERRORS_FILENAME = "_errors.txt"
+
+# 支持解压上传的压缩包扩展名
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+# 解压时跳过的系统生成文件
+IGNORED_MEMBERS = ("__MACOSX/", ".DS_Store", "Thumbs.db")
+
+
+class ArchiveError(ValueError):
+    """压缩包无效或超出解压限制"""
+
+
+class SelectionNotFoundError(LookupError):
+    """选中的键名既不是文件也不是文件夹"""
+
+    def __init__(self, keys: List[str]):
+        super().__init__(f"Selected files not found: {', '.join(keys)}")
+        self.keys = keys
+
+
+class ArchiveEntry(NamedTuple):
+    """压缩包中的一个条目，key 以 / 结尾表示文件夹"""
+
+    key: str
+    name: str
+    size: int
+    modified: Any
+
+
+class _ChunkSink:
+    """ZipFile 写入的目标：只支持追加写入的缓冲区，由生成器定期取出已写入的数据"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.buffered = 0
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self.buffered += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.buffered = 0
+        return data
+
+
+def _relative_name(key: str, base: str) -> str:
+    return key[len(base) :] if base and key.startswith(base) else key
+
+
+def walk_folder(storage: BaseStorage, prefix: str, base: str) -> Iterator[ArchiveEntry]:
+    """
+    深度优先遍历文件夹，依次返回文件夹本身和其中的文件
+
+    使用 list_objects 而不是 iter_keys，以便获得文件大小和修改时间（并命中目录列表缓存）。
+    文件夹不存在（列表为空）时不产生任何条目
+
+    Args:
+        storage: 存储实例
+        prefix: 文件夹前缀（以 / 结尾）
+        base: 条目名称相对的前缀
+    """
+    pending = [prefix]
+    while pending:
+        folder = pending.pop()
+        listing = storage.list_objects(folder)
+        if folder == prefix and not listing.get("Contents") and not listing.get("CommonPrefixes"):
+            return
+        yield ArchiveEntry(folder, _relative_name(folder, base), 0, None)
+        for obj in sorted(listing.get("Contents", []), key=lambda item: item["Key"]):
+            key = obj["Key"]
+            if key == folder or key.endswith("/"):
+                continue
+            yield ArchiveEntry(key, _relative_name(key, base), obj.get("Size") or 0, obj.get("LastModified"))
+        subfolders = sorted((item["Prefix"] for item in listing.get("CommonPrefixes", [])), reverse=True)
+        pending.extend(subfolders)
+
+
+def collect_entries(storage: BaseStorage, keys: List[str], base: str) -> Iterator[ArchiveEntry]:
+    """
+    将选中的文件和文件夹展开为压缩包条目
+
+    文件的大小和修改时间在调用时通过一次 head_many 批量获取；不以 / 结尾但不是文件的键名，
+    其下有对象时按文件夹处理。文件夹在打包时逐层展开。
+
+    Args:
+        storage: 存储实例
+        keys: 选中的对象键名，以 / 结尾的为文件夹
+        base: 条目名称相对的前缀（通常为当前目录）
+
+    Raises:
+        SelectionNotFoundError: 有键名既不是文件也不是文件夹时，而不是打包时静默跳过
+    """
+    files = [key for key in keys if not key.endswith("/")]
+    infos = storage.head_many(files) if files else {}
+    resolved = []
+    missing = []
+    for key in keys:
+        if key.endswith("/") or infos.get(key) is not None:
+            resolved.append(key)
+        elif _is_folder(storage, key + "/"):
+            resolved.append(key + "/")
+        else:
+            missing.append(key)
+    if missing:
+        raise SelectionNotFoundError(missing)
+    return _expand_selection(storage, resolved, infos, base)
+
+
+def _is_folder(storage: BaseStorage, prefix: str) -> bool:
+    listing = storage.list_objects(prefix)
+    return bool(listing.get("Contents") or listing.get("CommonPrefixes"))
+
+
+def _expand_selection(storage: BaseStorage, keys: List[str], infos: dict, base: str) -> Iterator[ArchiveEntry]:
+    for key in keys:
+        if key.endswith("/"):
+            yield from walk_folder(storage, key, base)
+            continue
+        info = infos.get(key)
+        if info is not None:
+            size = info.get("ContentLength", info.get("Size")) or 0
+            yield ArchiveEntry(key, _relative_name(key, base), size, info.get("LastModified"))
+
+
+def _date_time(modified: Any) -> Tuple[int, int, int, int, int, int]:
+    """ZIP 条目的修改时间（ZIP 格式不支持 1980 年之前的时间）"""
+    if isinstance(modified, datetime):
+        value = modified.timetuple()[:6]
+    else:
+        value = time.localtime()[:6]
+    return max(value, (1980, 1, 1, 0, 0, 0))
+
+
+def _close_body(body: Any) -> None:
+    close = getattr(body, "close", None)
+    if close:
+        close()
+
+
+class ZipStreamer:
+    """将一组条目写成 ZIP 数据流
+
+    以 STORED 方式写入（图片、视频等已压缩的内容无需再压缩），并使用数据描述符，
+    因此无需预先知道 CRC 即可逐块写出。最多同时读取 ZIP_PREFETCH_WINDOW 个后续文件：
+    不超过 ZIP_PREFETCH_MAX_BYTES 的文件完整预读到内存，更大的文件只提前建立连接，
+    写入时再逐块读取，因此内存占用不超过 窗口大小 × 预读上限。
+    """
+
+    def __init__(self, storage: BaseStorage, entries: Iterable[ArchiveEntry], window: int = None):
+        """
+        初始化打包器
+
+        Args:
+            storage: 存储实例
+            entries: 压缩包条目，按写入顺序
+            window: 同时读取的文件数
+        """
+        self.storage = storage
+        self.entries = iter(entries)
+        self.window = max(1, window or Config.ZIP_PREFETCH_WINDOW)
+        self.failed: List[str] = []
+        # 工作线程沿用创建打包器时的上下文（路由标记、耗时明细和录像）
+        self.context = contextvars.copy_context()
+
+    def _fetch(self, entry: ArchiveEntry) -> Tuple[str, Any]:
+        """读取一个文件，小文件返回 ("data", bytes)，大文件返回 ("body", 流式响应体)"""
+        obj = self.storage.get_object(entry.key)
+        body = obj["Body"]
+        if isinstance(body, (bytes, bytearray)):
+            return "data", bytes(body)
+        if entry.size <= Config.ZIP_PREFETCH_MAX_BYTES:
+            try:
+                return "data", body.read()
+            finally:
+                _close_body(body)
+        return "body", body
+
+    @staticmethod
+    def _discard(future: Future) -> None:
+        """丢弃已读取但不再写入的结果，关闭其连接"""
+        if not future.cancelled() and future.exception() is None:
+            kind, value = future.result()
+            if kind == "body":
+                _close_body(value)
+
+    def _submit(self, executor: ThreadPoolExecutor, pending: Deque) -> bool:
+        """提交下一个条目的读取任务，条目已全部提交时返回 False"""
+        try:
+            entry = next(self.entries, None)
+        except Exception as e:
+            # 展开文件夹时列举失败：已写入的条目保留，其余条目跳过
+            print(f"Archive listing failed: {str(e)}")
+            self.failed.append(f"(listing) {str(e)}")
+            return False
+        if entry is None:
+            return False
+        future = None
+        if not entry.key.endswith("/"):
+            future = executor.submit(self.context.copy().run, self._fetch, entry)
+        pending.append((entry, future))
+        return True
+
+    def _write_entry(self, archive: zipfile.ZipFile, sink: _ChunkSink, entry: ArchiveEntry, future) -> Iterator[bytes]:
+        """写入一个条目，缓冲的数据达到一个数据块时输出"""
+        if future is None:
+            if entry.name:
+                archive.writestr(zipfile.ZipInfo(entry.name, _date_time(None)), b"")
+            return
+        kind, value = future.result()
+        info = zipfile.ZipInfo(entry.name, _date_time(entry.modified))
+        info.compress_type = zipfile.ZIP_STORED
+        info.file_size = entry.size
+        with archive.open(info, "w") as dest:
+            if kind == "data":
+                dest.write(value)
+                return
+            try:
+                for chunk in value.iter_chunks(Config.STREAM_CHUNK_SIZE):
+                    dest.write(chunk)
+                    if sink.buffered >= Config.STREAM_CHUNK_SIZE:
+                        yield sink.drain()
+            finally:
+                _close_body(value)
+
+    def __iter__(self) -> Iterator[bytes]:
+        sink = _ChunkSink()
+        archive = zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED, allowZip64=True)
+        executor = ThreadPoolExecutor(max_workers=self.window, thread_name_prefix="zip-fetch")
+        pending: Deque[Tuple[ArchiveEntry, Optional[Future]]] = deque()
+        try:
+            while len(pending) < self.window and self._submit(executor, pending):
+                pass
+            while pending:
+                entry, future = pending.popleft()
+                self._submit(executor, pending)
+                try:
+                    yield from self._write_entry(archive, sink, entry, future)
+                except Exception as e:
+                    print(f"Archive entry failed for {entry.key}: {str(e)}")
+                    self.failed.append(entry.key)
+                if sink.buffered:
+                    yield sink.drain()
+
+            if self.failed:
+                archive.writestr(ERRORS_FILENAME, "\n".join(self.failed) + "\n")
+            archive.close()
+            yield sink.drain()
+        finally:
+            # 客户端断开时取消尚未开始的读取，关闭已打开的连接
+            for _, future in pending:
+                if future is not None:
+                    future.cancel()
+                    future.add_done_callback(self._discard)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def is_archive(filename: str) -> bool:
+    """根据扩展名判断是否为支持解压的压缩包"""
+    return (filename or "").lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def member_path(name: str) -> Optional[str]:
+    """
+    规范化压缩包成员路径
+
+    Returns:
+        相对路径；绝对路径、包含 .. 的路径和需要跳过的系统文件返回 None
+    """
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or ":" in parts[0]:
+        return None
+    path = "/".join(parts)
+    if path.startswith(IGNORED_MEMBERS[0]) or parts[-1] in IGNORED_MEMBERS[1:]:
+        return None
+    return path
+
+
+def _iter_zip(stream: IO[bytes]) -> Iterator[Tuple[str, bytes]]:
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Invalid zip archive: {str(e)}") from None
+    with archive:
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        # 中央目录在文件末尾，可在上传任何文件之前检查解压限制
+        _check_limits(len(members), sum(info.file_size for info in members))
+        for info in members:
+            path = member_path(info.filename)
+            if path is not None:
+                yield path, archive.read(info)
+
+
+def _iter_tar(stream: IO[bytes]) -> Iterator[Tuple[str, bytes]]:
+    try:
+        # 流式模式：按顺序读取成员，不需要回退
+        archive = tarfile.open(fileobj=stream, mode="r|*")
+    except tarfile.TarError as e:
+        raise ArchiveError(f"Invalid tar archive: {str(e)}") from None
+    with archive:
+        count = total = 0
+        for member in archive:
+            # 只解压普通文件，忽略目录、链接和设备文件
+            if not member.isfile():
+                continue
+            count += 1
+            total += member.size
+            _check_limits(count, total)
+            path = member_path(member.name)
+            source = archive.extractfile(member)
+            if path is not None and source is not None:
+                yield path, source.read()
+
+
+def _check_limits(count: int, total: int) -> None:
+    if count > Config.EXTRACT_MAX_FILES:
+        raise ArchiveError(f"Archive contains more than {Config.EXTRACT_MAX_FILES} files")
+    if total > Config.EXTRACT_MAX_BYTES:
+        raise ArchiveError(f"Archive expands to more than {Config.EXTRACT_MAX_BYTES} bytes")
+
+
+def iter_members(stream: IO[bytes], filename: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    依次返回压缩包中的文件
+
+    ZIP 需要可随机访问的文件对象（上传的文件由 Werkzeug 暂存，满足要求），tar 按顺序流式读取。
+
+    Args:
+        stream: 压缩包文件对象
+        filename: 压缩包文件名，用于判断格式
+
+    Returns:
+        (规范化后的相对路径, 文件内容) 的迭代器
+
+    Raises:
+        ArchiveError: 压缩包无效或超出 EXTRACT_MAX_FILES / EXTRACT_MAX_BYTES
+    """
+    if filename.lower().endswith(".zip"):
+        return _iter_zip(stream)
+    return _iter_tar(stream)
+
+
+def _upload_batch(storage: BaseStorage, batch: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+    try:
+        return storage.upload_many(batch)
+    except Exception as e:
+        print(f"Batch upload failed: {str(e)}")
+        return {key: False for key, _, _ in batch}
+
+
+def extract_archive(storage: BaseStorage, stream: IO[bytes], filename: str, prefix: str = "") -> Dict[str, Any]:
+    """
+    将压缩包解压到存储中的指定前缀下
+
+    文件按 EXTRACT_BATCH_FILES 个或 EXTRACT_BATCH_BYTES 字节分批，通过 upload_many 写入
+    （各后端使用各自的批量或并发上传方式）。上传一批的同时读取下一批，
+    内存中最多保留两批文件内容。
+
+    Args:
+        storage: 存储实例
+        stream: 压缩包文件对象
+        filename: 压缩包文件名
+        prefix: 目标前缀（以 / 结尾，根目录为空字符串）
+
+    Returns:
+        包含 uploaded（成功的文件数）、failed（失败的键名）、bytes（解压的总字节数）的字典
+
+    Raises:
+        ArchiveError: 压缩包无效或超出解压限制
+    """
+    results: Dict[str, bool] = {}
+    total = 0
+    batch: List[Tuple[str, bytes, Optional[str]]] = []
+    batch_bytes = 0
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="extract-upload") as executor:
+        in_flight: Optional[Future] = None
+        try:
+            for path, data in iter_members(stream, filename):
+                batch.append((prefix + path, data, mimetypes.guess_type(path)[0]))
+                batch_bytes += len(data)
+                total += len(data)
+                if len(batch) >= Config.EXTRACT_BATCH_FILES or batch_bytes >= Config.EXTRACT_BATCH_BYTES:
+                    if in_flight is not None:
+                        results.update(in_flight.result())
+                    in_flight = executor.submit(context.copy().run, _upload_batch, storage, batch)
+                    batch, batch_bytes = [], 0
+            if batch:
+                if in_flight is not None:
+                    results.update(in_flight.result())
+                in_flight = executor.submit(context.copy().run, _upload_batch, storage, batch)
+        finally:
+            # 读取中途出错时也等待已提交的一批完成，使返回前存储状态确定
+            if in_flight is not None:
+                results.update(in_flight.result())
+    return {
+        "uploaded": sum(1 for ok in results.values() if ok),
+        "failed": [key for key, ok in results.items() if not ok],
+        "bytes": total,
+    }
@@ -0,0 +1,65 @@
+"""
+ASGI 入口
+
+与 app.py 提供相同的页面和文件操作，存储访问使用异步后端，
+大量慢速的后端请求可以在同一个进程的事件循环中并发等待。
+搜索、文件夹用量、目录树和 ZIP 打包不可用（返回 501），见 README。
+
+运行方式：uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+from quart import Quart
+
+import utils
+from config import Config
+from handlers.async_routes import async_route
+from storages.async_factory import AsyncStorageFactory
+
+# 验证配置
+Config.validate()
+
+# 从 pyproject.toml 读取版本号
+__version__ = utils.get_version()
+
+app = Quart(__name__)
+
+# 注册蓝图
+app.register_blueprint(async_route)
+
+
+@app.before_serving
+async def init_storage():
+    """在事件循环中初始化异步存储实例"""
+    AsyncStorageFactory.get_storage()
+
+
+@app.after_serving
+async def close_storage():
+    """关闭存储客户端和连接池"""
+    await AsyncStorageFactory.close()
+
+
+# 注册模板过滤器
+@app.template_filter("filesizeformat")
+def filesizeformat_filter(value):
+    """格式化文件大小"""
+    return utils.format_file_size(value)
+
+
+@app.template_filter("fileicon")
+def fileicon_filter(filename):
+    """获取文件图标"""
+    return utils.get_file_icon(filename)
+
+
+# 注册全局模板变量
+@app.context_processor
+async def inject_version():
+    """向所有模板注入版本号"""
+    return {"app_version": __version__}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=Config.HOST, port=Config.PORT)
@@ -0,0 +1,12 @@
+"""
+性能测试工具
+在进程内运行 S3、GitHub、Microsoft Graph 的模拟服务（本地存储使用临时目录），离线测量各存储后端的性能
+"""
+
+from .dataset import Dataset
+from .github import FakeGitHubServer
+from .graph import FakeGraphServer
+from .local import LocalDirectory
+from .s3 import FakeS3Server
+
+__all__ = ["Dataset", "FakeS3Server", "FakeGitHubServer", "FakeGraphServer", "LocalDirectory"]
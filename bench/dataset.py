@@ -0,0 +1,213 @@
+"""
+模拟数据集
+各模拟服务共享的内存对象集合，可按目录宽度、深度和文件数生成
+"""
+
+import hashlib
+import random
+import threading
+import time
+from io import BytesIO
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+
+class StoredObject:
+    """数据集中的一个对象"""
+
+    __slots__ = ("data", "content_type", "modified", "_etag", "_blob_sha")
+
+    def __init__(self, data: bytes, content_type: str, modified: float):
+        self.data = data
+        self.content_type = content_type
+        self.modified = modified
+        self._etag: Optional[str] = None
+        self._blob_sha: Optional[str] = None
+
+    @property
+    def etag(self) -> str:
+        """S3 风格的 ETag（内容的 MD5）"""
+        if self._etag is None:
+            self._etag = hashlib.md5(self.data).hexdigest()
+        return self._etag
+
+    @property
+    def blob_sha(self) -> str:
+        """Git blob 的 SHA-1"""
+        if self._blob_sha is None:
+            self._blob_sha = hashlib.sha1(b"blob %d\0" % len(self.data) + self.data).hexdigest()
+        return self._blob_sha
+
+
+def make_image(size: int = 256, seed: int = 0) -> bytes:
+    """生成一张 PNG 图片，用于缩略图测试"""
+    rng = random.Random(seed)
+    img = Image.new("RGB", (size, size), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    for _ in range(16):
+        x, y = rng.randrange(size), rng.randrange(size)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        img.paste(color, (x, y, min(size, x + size // 4), min(size, y + size // 4)))
+    buf = BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+class Dataset:
+    """线程安全的内存对象集合
+
+    键为不以 / 开头的对象路径；文件夹由对象路径隐式确定，
+    也可以显式创建空文件夹（对应 R2 的目录占位对象和 OneDrive 的文件夹项）。
+    """
+
+    def __init__(self):
+        self.objects: Dict[str, StoredObject] = {}
+        self.folders: set = set()
+        self.version = 0
+        self.lock = threading.RLock()
+
+    @classmethod
+    def generate(
+        cls,
+        width: int = 4,
+        depth: int = 2,
+        files: int = 20,
+        image_every: int = 4,
+        file_size: int = 4096,
+        seed: int = 0,
+    ) -> "Dataset":
+        """
+        生成测试数据集
+
+        Args:
+            width: 每层的子文件夹数
+            depth: 文件夹层数
+            files: 每个文件夹（含根目录）中的文件数
+            image_every: 每隔多少个文件放一张 PNG 图片，0 表示不放图片
+            file_size: 普通文件的大小（字节）
+            seed: 随机种子
+
+        Returns:
+            生成的数据集
+        """
+        dataset = cls()
+        rng = random.Random(seed)
+        image = make_image(seed=seed)
+        now = time.time()
+
+        prefixes = [""]
+        level = [""]
+        for _ in range(depth):
+            level = [f"{parent}dir-{i:02d}/" for parent in level for i in range(width)]
+            prefixes.extend(level)
+
+        for prefix in prefixes:
+            if prefix:
+                dataset.folders.add(prefix)
+            for i in range(files):
+                if image_every and i % image_every == 0:
+                    key, data, content_type = f"{prefix}img-{i:04d}.png", image, "image/png"
+                else:
+                    key, data, content_type = f"{prefix}file-{i:04d}.txt", rng.randbytes(file_size), "text/plain"
+                dataset.objects[key] = StoredObject(data, content_type, now - rng.randrange(86400 * 30))
+        return dataset
+
+    def get(self, key: str) -> Optional[StoredObject]:
+        with self.lock:
+            return self.objects.get(key)
+
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> StoredObject:
+        with self.lock:
+            obj = StoredObject(data, content_type, time.time())
+            self.objects[key] = obj
+            self.version += 1
+            return obj
+
+    def delete(self, key: str) -> bool:
+        with self.lock:
+            self.version += 1
+            return self.objects.pop(key, None) is not None
+
+    def copy(self, source: str, dest: str) -> bool:
+        with self.lock:
+            obj = self.objects.get(source)
+            if obj is None:
+                return False
+            self.put(dest, obj.data, obj.content_type)
+            return True
+
+    def add_folder(self, prefix: str) -> None:
+        with self.lock:
+            self.folders.add(prefix.rstrip("/") + "/")
+            self.version += 1
+
+    def is_folder(self, prefix: str) -> bool:
+        """前缀是否为已存在的文件夹（显式创建或包含对象）"""
+        prefix = prefix.rstrip("/") + "/"
+        if prefix == "/":
+            return True
+        with self.lock:
+            return prefix in self.folders or any(key.startswith(prefix) for key in self.objects)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """删除前缀下的所有对象和文件夹，返回删除的对象数"""
+        prefix = prefix.rstrip("/") + "/"
+        with self.lock:
+            keys = [key for key in self.objects if key.startswith(prefix)]
+            for key in keys:
+                del self.objects[key]
+            self.folders = {folder for folder in self.folders if not folder.startswith(prefix)}
+            self.version += 1
+            return len(keys)
+
+    def move_prefix(self, source: str, dest: str) -> int:
+        """将前缀下的所有对象和文件夹移动到新前缀，返回移动的对象数"""
+        source, dest = source.rstrip("/") + "/", dest.rstrip("/") + "/"
+        with self.lock:
+            keys = [key for key in self.objects if key.startswith(source)]
+            for key in keys:
+                self.objects[dest + key[len(source) :]] = self.objects.pop(key)
+            self.folders = {
+                dest + folder[len(source) :] if folder.startswith(source) else folder for folder in self.folders
+            }
+            self.folders.add(dest)
+            self.version += 1
+            return len(keys)
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        """按字典序返回前缀下的所有对象键"""
+        with self.lock:
+            return iter(sorted(key for key in self.objects if key.startswith(prefix)))
+
+    def list_dir(self, prefix: str) -> Tuple[List[str], List[str]]:
+        """
+        列出一层目录
+
+        Returns:
+            (直接位于该目录下的对象键, 子文件夹前缀)，均按字典序排列
+        """
+        prefix = prefix.rstrip("/") + "/" if prefix.strip("/") else ""
+        files, folders = [], set()
+        with self.lock:
+            for key in self.objects:
+                if not key.startswith(prefix):
+                    continue
+                rest = key[len(prefix) :]
+                if "/" in rest:
+                    folders.add(prefix + rest.split("/", 1)[0] + "/")
+                elif rest:
+                    files.append(key)
+            for folder in self.folders:
+                if folder.startswith(prefix) and folder != prefix:
+                    folders.add(prefix + folder[len(prefix) :].split("/", 1)[0] + "/")
+        return sorted(files), sorted(folders)
+
+    def folder_prefixes(self) -> List[str]:
+        """返回所有文件夹前缀（含根目录）"""
+        with self.lock:
+            folders = set(self.folders)
+            for key in self.objects:
+                parts = key.split("/")[:-1]
+                for i in range(1, len(parts) + 1):
+                    folders.add("/".join(parts[:i]) + "/")
+        return [""] + sorted(folders)
@@ -0,0 +1,210 @@
+"""
+GitHub 接口模拟服务
+实现 GitHubStorage 使用的 contents、commits、git 数据（ref/commit/tree/blob）接口和 raw 文件下载
+"""
+
+import base64
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from .dataset import Dataset
+from .server import FakeRequest, FakeServer, Reply, json_reply, range_reply
+
+REPO = r"^/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)"
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _sha(payload: object) -> str:
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class FakeGitHubServer(FakeServer):
+    """GitHub REST 接口的模拟服务，忽略认证，仓库和分支名任意
+
+    数据集是唯一的数据来源：分支最新提交按数据集版本生成快照，
+    通过 git 数据接口创建的提交在更新分支引用时写回数据集。
+    raw 文件位于 /raw/<owner>/<repo>/<branch>/<path>，对应 GITHUB_RAW_URL = url + "/raw"。
+    """
+
+    routes = [
+        ("GET", REPO + r"/contents/?(?P<path>.*)$", "get_contents"),
+        ("PUT", REPO + r"/contents/(?P<path>.+)$", "put_contents"),
+        ("DELETE", REPO + r"/contents/(?P<path>.+)$", "delete_contents"),
+        ("GET", REPO + r"/commits$", "list_commits"),
+        ("GET", REPO + r"/git/ref/heads/(?P<branch>.+)$", "get_ref"),
+        ("PATCH", REPO + r"/git/refs/heads/(?P<branch>.+)$", "update_ref"),
+        ("GET", REPO + r"/git/commits/(?P<sha>\w+)$", "get_commit"),
+        ("POST", REPO + r"/git/commits$", "create_commit"),
+        ("GET", REPO + r"/git/trees/(?P<sha>\w+)$", "get_tree"),
+        ("POST", REPO + r"/git/trees$", "create_tree"),
+        ("POST", REPO + r"/git/blobs$", "create_blob"),
+        ("GET", r"^/raw/(?P<owner>[^/]+)/(?P<repo>[^/]+)/(?P<branch>[^/]+)/(?P<path>.+)$", "get_raw"),
+    ]
+
+    def __init__(self, dataset: Dataset, **kwargs):
+        super().__init__(dataset, **kwargs)
+        self.blobs: Dict[str, bytes] = {}
+        self.trees: Dict[str, Dict[str, str]] = {}
+        self.commits: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._head: Optional[str] = None
+        self._head_version = -1
+
+    def head(self) -> str:
+        """返回分支最新提交；数据集在提交之外被修改时生成新的快照提交"""
+        with self.dataset.lock:
+            if self._head_version != self.dataset.version:
+                tree = {}
+                for key, obj in self.dataset.objects.items():
+                    self.blobs.setdefault(obj.blob_sha, obj.data)
+                    tree[key] = obj.blob_sha
+                tree_sha = _sha(tree)
+                self.trees[tree_sha] = tree
+                commit_sha = _sha([tree_sha, self._head])
+                self.commits[commit_sha] = (tree_sha, self._head)
+                self._head, self._head_version = commit_sha, self.dataset.version
+            return self._head
+
+    # ---- contents ----
+
+    def _file_json(self, path: str, include_content: bool = True) -> Dict[str, object]:
+        obj = self.dataset.get(path)
+        item = {
+            "type": "file",
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "sha": obj.blob_sha,
+            "size": len(obj.data),
+        }
+        if include_content:
+            item["encoding"] = "base64"
+            item["content"] = base64.b64encode(obj.data).decode()
+        return item
+
+    def get_contents(self, request: FakeRequest, owner: str, repo: str, path: str) -> Reply:
+        path = path.strip("/")
+        if path and self.dataset.get(path) is not None:
+            return json_reply(200, self._file_json(path))
+        if not self.dataset.is_folder(path):
+            return self.not_found()
+
+        files, folders = self.dataset.list_dir(path)
+        items = [
+            {"type": "dir", "name": folder.rstrip("/").rsplit("/", 1)[-1], "path": folder.rstrip("/"), "size": 0}
+            for folder in folders
+        ]
+        items.extend(self._file_json(key, include_content=False) for key in files)
+        items.sort(key=lambda item: item["name"])
+        return json_reply(200, items)
+
+    def put_contents(self, request: FakeRequest, owner: str, repo: str, path: str) -> Reply:
+        payload = request.json()
+        existing = self.dataset.get(path)
+        if existing is not None and payload.get("sha") != existing.blob_sha:
+            return json_reply(409 if payload.get("sha") else 422, {"message": "sha does not match"})
+        obj = self.dataset.put(path, base64.b64decode(payload["content"]))
+        return json_reply(200 if existing else 201, {"content": {"path": path, "sha": obj.blob_sha}})
+
+    def delete_contents(self, request: FakeRequest, owner: str, repo: str, path: str) -> Reply:
+        existing = self.dataset.get(path)
+        if existing is None:
+            return self.not_found()
+        if request.json().get("sha") != existing.blob_sha:
+            return json_reply(409, {"message": "sha does not match"})
+        self.dataset.delete(path)
+        return json_reply(200, {"content": None})
+
+    def list_commits(self, request: FakeRequest, owner: str, repo: str) -> Reply:
+        obj = self.dataset.get(request.query.get("path", ""))
+        if obj is None:
+            return json_reply(200, [])
+        return json_reply(200, [{"sha": self.head(), "commit": {"author": {"date": _iso(obj.modified)}}}])
+
+    def get_raw(self, request: FakeRequest, owner: str, repo: str, branch: str, path: str) -> Reply:
+        obj = self.dataset.get(path)
+        if obj is None:
+            return 404, {"Content-Type": "text/plain"}, b"404: Not Found"
+        return range_reply(obj.data, request.headers.get("Range"), {"Content-Type": obj.content_type})
+
+    # ---- git data ----
+
+    def get_ref(self, request: FakeRequest, owner: str, repo: str, branch: str) -> Reply:
+        return json_reply(200, {"ref": f"refs/heads/{branch}", "object": {"type": "commit", "sha": self.head()}})
+
+    def get_commit(self, request: FakeRequest, owner: str, repo: str, sha: str) -> Reply:
+        self.head()
+        commit = self.commits.get(sha)
+        if commit is None:
+            return self.not_found()
+        parents = [{"sha": commit[1]}] if commit[1] else []
+        return json_reply(200, {"sha": sha, "tree": {"sha": commit[0]}, "parents": parents})
+
+    def get_tree(self, request: FakeRequest, owner: str, repo: str, sha: str) -> Reply:
+        self.head()
+        tree = self.trees.get(sha)
+        if tree is None:
+            return self.not_found()
+        entries = [
+            {"path": path, "mode": "100644", "type": "blob", "sha": blob, "size": len(self.blobs[blob])}
+            for path, blob in sorted(tree.items())
+        ]
+        return json_reply(200, {"sha": sha, "tree": entries, "truncated": False})
+
+    def create_tree(self, request: FakeRequest, owner: str, repo: str) -> Reply:
+        payload = request.json()
+        with self.dataset.lock:
+            base = self.trees.get(payload.get("base_tree") or "")
+            if payload.get("base_tree") and base is None:
+                return json_reply(422, {"message": "base_tree not found"})
+            tree = dict(base or {})
+            for entry in payload.get("tree", []):
+                if entry.get("sha") is None:
+                    tree.pop(entry["path"], None)
+                elif entry["sha"] in self.blobs:
+                    tree[entry["path"]] = entry["sha"]
+                else:
+                    return json_reply(422, {"message": f"blob {entry['sha']} not found"})
+            tree_sha = _sha(tree)
+            self.trees[tree_sha] = tree
+        return json_reply(201, {"sha": tree_sha})
+
+    def create_blob(self, request: FakeRequest, owner: str, repo: str) -> Reply:
+        payload = request.json()
+        data = (
+            base64.b64decode(payload["content"]) if payload.get("encoding") == "base64" else payload["content"].encode()
+        )
+        sha = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+        with self.dataset.lock:
+            self.blobs.setdefault(sha, data)
+        return json_reply(201, {"sha": sha})
+
+    def create_commit(self, request: FakeRequest, owner: str, repo: str) -> Reply:
+        payload = request.json()
+        parents = payload.get("parents") or [None]
+        if payload["tree"] not in self.trees:
+            return json_reply(422, {"message": "tree not found"})
+        commit_sha = _sha([payload["tree"], parents[0], payload.get("message"), time.time()])
+        self.commits[commit_sha] = (payload["tree"], parents[0])
+        return json_reply(201, {"sha": commit_sha, "tree": {"sha": payload["tree"]}})
+
+    def update_ref(self, request: FakeRequest, owner: str, repo: str, branch: str) -> Reply:
+        commit_sha = request.json()["sha"]
+        with self.dataset.lock:
+            commit = self.commits.get(commit_sha)
+            if commit is None or commit[1] != self.head():
+                return json_reply(422, {"message": "Update is not a fast forward"})
+
+            current = self.trees[self.commits[self._head][0]]
+            target = self.trees[commit[0]]
+            for path in current.keys() - target.keys():
+                self.dataset.delete(path)
+            for path, blob in target.items():
+                if current.get(path) != blob:
+                    self.dataset.put(path, self.blobs[blob])
+            self._head, self._head_version = commit_sha, self.dataset.version
+        return json_reply(200, {"ref": f"refs/heads/{branch}", "object": {"type": "commit", "sha": commit_sha}})
@@ -0,0 +1,250 @@
+"""
+Microsoft Graph 接口模拟服务
+实现 OnedriveStorage 使用的令牌刷新、DriveItem 路径寻址、子项列举、内容读写、缩略图、
+分享链接、复制、重命名、删除和 JSON 批量请求
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Any, Dict, Optional
+from urllib.parse import unquote, urlsplit
+
+from PIL import Image
+
+from storages.dedup import quick_xor_hash
+
+from .dataset import Dataset
+from .server import FakeRequest, FakeServer, Reply, json_reply, range_reply
+
+# /me/drive/ 之后的 DriveItem 地址: root 或 items/{id}，可带 :/{相对路径}: 和 /{动作}
+ITEM_PATTERN = r"(?:root|items/(?P<item_id>[^/:]+))(?::/(?P<rel>.*?):)?(?:/(?P<action>[^/:]+))?"
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}/{name}" if parent else name
+
+
+class FakeGraphServer(FakeServer):
+    """OneDrive（Graph v1.0）接口的模拟服务，忽略认证，驱动器根目录对应数据集根目录
+
+    对应配置 ONEDRIVE_GRAPH_URL = url + "/v1.0"，ONEDRIVE_TOKEN_URL = url + "/token"。
+    """
+
+    routes = [
+        ("POST", r"^/token$", "token"),
+        ("GET", r"^/v1\.0/me/drive/?$", "drive"),
+        ("POST", r"^/v1\.0/\$batch$", "batch"),
+        ("GET", r"^/thumbnails/(?P<item_id>[^/]+)$", "thumbnail"),
+        ("GET", r"^/download/(?P<item_id>[^/]+)$", "download"),
+    ] + [(method, rf"^/v1\.0/me/drive/{ITEM_PATTERN}$", "item") for method in ("GET", "PUT", "POST", "PATCH", "DELETE")]
+
+    # (方法, 动作) 到处理函数的映射
+    actions = {
+        ("GET", None): "get_item",
+        ("GET", "children"): "list_children",
+        ("GET", "content"): "get_content",
+        ("GET", "thumbnails"): "list_thumbnails",
+        ("PUT", "content"): "put_content",
+        ("POST", "children"): "create_folder",
+        ("POST", "createLink"): "create_link",
+        ("POST", "copy"): "copy_item",
+        ("PATCH", None): "update_item",
+        ("DELETE", None): "delete_item",
+    }
+
+    def __init__(self, dataset: Dataset, **kwargs):
+        super().__init__(dataset, **kwargs)
+        self._paths: Dict[str, str] = {"root": ""}
+        self._thumbnails: Dict[str, bytes] = {}
+        self._hashes: Dict[str, str] = {}
+
+    # ---- 条目 ----
+
+    def item_id(self, path: str) -> str:
+        if not path:
+            return "root"
+        item_id = "item-" + hashlib.sha1(path.encode()).hexdigest()[:16]
+        self._paths[item_id] = path
+        return item_id
+
+    def _quick_xor(self, obj) -> str:
+        """按内容缓存的 quickXorHash（Graph 在 file.hashes 中返回）"""
+        digest = self._hashes.get(obj.etag)
+        if digest is None:
+            digest = self._hashes[obj.etag] = quick_xor_hash(obj.data)
+        return digest
+
+    def _resolve(self, item_id: Optional[str], rel: Optional[str]) -> Optional[str]:
+        """将 DriveItem 地址解析为数据集路径（不含首尾 /），条目 ID 未知时返回 None"""
+        base = self._paths.get(item_id or "root")
+        if base is None:
+            return None
+        return _join(base, (rel or "").strip("/")).strip("/")
+
+    def _item_json(self, path: str) -> Optional[Dict[str, Any]]:
+        obj = self.dataset.get(path) if path else None
+        item_id = self.item_id(path)
+        item: Dict[str, Any] = {
+            "id": item_id,
+            "name": path.rsplit("/", 1)[-1] or "root",
+            "webUrl": f"{self.url}/web/{path}",
+        }
+        if obj is not None:
+            item.update(
+                {
+                    "size": len(obj.data),
+                    "lastModifiedDateTime": _iso(obj.modified),
+                    "file": {"mimeType": obj.content_type, "hashes": {"quickXorHash": self._quick_xor(obj)}},
+                    "@microsoft.graph.downloadUrl": f"{self.url}/download/{item_id}",
+                }
+            )
+            return item
+        if not self.dataset.is_folder(path):
+            return None
+        files, folders = self.dataset.list_dir(path)
+        item.update({"size": 0, "lastModifiedDateTime": _iso(0), "folder": {"childCount": len(files) + len(folders)}})
+        return item
+
+    # ---- 路由 ----
+
+    def token(self, request: FakeRequest) -> Reply:
+        return json_reply(
+            200, {"access_token": "bench-access-token", "refresh_token": "bench-refresh-token", "expires_in": 3600}
+        )
+
+    def drive(self, request: FakeRequest) -> Reply:
+        return json_reply(200, {"id": "bench-drive", "driveType": "personal"})
+
+    def item(self, request: FakeRequest, item_id: Optional[str], rel: Optional[str], action: Optional[str]) -> Reply:
+        name = self.actions.get((request.method, action))
+        path = self._resolve(item_id, rel)
+        if name is None:
+            return json_reply(400, {"error": {"code": "invalidRequest", "message": f"Unsupported {action}"}})
+        if path is None:
+            return self._item_not_found()
+        return getattr(self, name)(request, path)
+
+    def batch(self, request: FakeRequest) -> Reply:
+        responses = []
+        for sub in request.json().get("requests", []):
+            parts = urlsplit(sub["url"])
+            body = json.dumps(sub["body"]).encode() if sub.get("body") is not None else b""
+            sub_request = FakeRequest(sub["method"], "/v1.0" + unquote(parts.path), {}, sub.get("headers") or {}, body)
+            # 子请求在服务内部分发，不重复计算延迟，但各自可能被限流
+            status, headers, payload = self.dispatch(sub_request)
+            content = json.loads(payload) if payload and headers.get("Content-Type") == "application/json" else None
+            responses.append({"id": sub["id"], "status": status, "headers": headers, "body": content})
+        return json_reply(200, {"responses": responses})
+
+    def _item_not_found(self) -> Reply:
+        return json_reply(404, {"error": {"code": "itemNotFound", "message": "The resource could not be found."}})
+
+    # ---- 动作 ----
+
+    def get_item(self, request: FakeRequest, path: str) -> Reply:
+        item = self._item_json(path)
+        return json_reply(200, item) if item else self._item_not_found()
+
+    def list_children(self, request: FakeRequest, path: str) -> Reply:
+        if self.dataset.get(path) is not None or not self.dataset.is_folder(path):
+            return self._item_not_found()
+        files, folders = self.dataset.list_dir(path)
+        items = [self._item_json(folder.rstrip("/")) for folder in folders]
+        items.extend(self._item_json(key) for key in files)
+        return json_reply(200, {"value": [item for item in items if item]})
+
+    def get_content(self, request: FakeRequest, path: str) -> Reply:
+        obj = self.dataset.get(path)
+        if obj is None:
+            return self._item_not_found()
+        return range_reply(obj.data, request.headers.get("Range"), {"Content-Type": obj.content_type})
+
+    def download(self, request: FakeRequest, item_id: str) -> Reply:
+        path = self._paths.get(item_id)
+        return self.get_content(request, path) if path is not None else self._item_not_found()
+
+    def list_thumbnails(self, request: FakeRequest, path: str) -> Reply:
+        obj = self.dataset.get(path)
+        if obj is None:
+            return self._item_not_found()
+        if not obj.content_type.startswith("image/"):
+            return json_reply(200, {"value": []})
+        url = f"{self.url}/thumbnails/{self.item_id(path)}"
+        return json_reply(200, {"value": [{"id": "0", "c": {"url": url, "width": 200, "height": 200}}]})
+
+    def thumbnail(self, request: FakeRequest, item_id: str) -> Reply:
+        obj = self.dataset.get(self._paths.get(item_id, ""))
+        if obj is None:
+            return self._item_not_found()
+        # 与真实服务一样预先生成：同一内容只渲染一次
+        data = self._thumbnails.get(obj.etag)
+        if data is None:
+            img = Image.open(BytesIO(obj.data)).convert("RGB")
+            img.thumbnail((200, 200))
+            buf = BytesIO()
+            img.save(buf, "JPEG")
+            data = self._thumbnails[obj.etag] = buf.getvalue()
+        return 200, {"Content-Type": "image/jpeg"}, data
+
+    def put_content(self, request: FakeRequest, path: str) -> Reply:
+        existed = self.dataset.get(path) is not None
+        self.dataset.put(path, request.body, request.headers.get("Content-Type", "application/octet-stream"))
+        return json_reply(200 if existed else 201, self._item_json(path))
+
+    def create_folder(self, request: FakeRequest, path: str) -> Reply:
+        if not self.dataset.is_folder(path):
+            return self._item_not_found()
+        folder = _join(path, request.json()["name"])
+        if self.dataset.get(folder) is not None or self.dataset.is_folder(folder):
+            return json_reply(409, {"error": {"code": "nameAlreadyExists", "message": "Name already exists"}})
+        self.dataset.add_folder(folder)
+        return json_reply(201, self._item_json(folder))
+
+    def create_link(self, request: FakeRequest, path: str) -> Reply:
+        if self._item_json(path) is None:
+            return self._item_not_found()
+        return json_reply(201, {"link": {"type": "view", "webUrl": f"{self.url}/share/{self.item_id(path)}"}})
+
+    def copy_item(self, request: FakeRequest, path: str) -> Reply:
+        payload = request.json()
+        parent = self._resolve((payload.get("parentReference") or {}).get("id"), None)
+        if parent is None or not self.dataset.is_folder(parent):
+            return self._item_not_found()
+        dest = _join(parent, payload.get("name") or path.rsplit("/", 1)[-1])
+        if not self.dataset.copy(path, dest):
+            return self._item_not_found()
+        return 202, {"Location": f"{self.url}/monitor/{self.item_id(dest)}"}, b""
+
+    def update_item(self, request: FakeRequest, path: str) -> Reply:
+        payload = request.json()
+        parent = path.rpartition("/")[0]
+        if payload.get("parentReference"):
+            parent = self._resolve(payload["parentReference"].get("id"), None)
+            if parent is None:
+                return self._item_not_found()
+        dest = _join(parent, payload.get("name") or path.rsplit("/", 1)[-1])
+
+        obj = self.dataset.get(path)
+        if obj is not None:
+            with self.dataset.lock:
+                self.dataset.put(dest, obj.data, obj.content_type)
+                self.dataset.delete(path)
+        elif path and self.dataset.is_folder(path):
+            self.dataset.move_prefix(path, dest)
+        else:
+            return self._item_not_found()
+        return json_reply(200, self._item_json(dest))
+
+    def delete_item(self, request: FakeRequest, path: str) -> Reply:
+        if path and self.dataset.delete(path):
+            return 204, {}, b""
+        if path and self.dataset.is_folder(path):
+            self.dataset.delete_prefix(path)
+            return 204, {}, b""
+        return self._item_not_found()
@@ -0,0 +1,252 @@
+"""
+端到端 HTTP 负载测试
+
+在子进程中启动真实的 Flask 应用（app.py），连接到进程内的模拟后端，
+按浏览深层目录、滚动缩略图网格、下载和批量移动等场景并发发起 HTTP 请求，
+报告每个场景的 p50/p95/p99 延迟、吞吐量和应用进程的峰值 RSS，并可保存结果或与基线比较。
+
+用法:
+    python -m bench.load_test --backends r2 --concurrency 8 --save bench-load-baseline.json
+    python -m bench.load_test --backends r2 --concurrency 8 --compare bench-load-baseline.json
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote
+
+import requests
+
+from . import Dataset
+from .report import build_report, compare_reports, format_table, load_report, save_report, summarize
+from .storage_bench import BACKENDS, run_ops, start_server
+
+SCENARIOS = ["browse", "thumbnails", "download", "bulk_move"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """读取进程当前的常驻内存（MB），不支持 /proc 的平台返回 None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler:
+    """在后台线程中定期采样进程 RSS，记录采样期间的峰值"""
+
+    def __init__(self, pid: int, interval: float = 0.02):
+        self.pid = pid
+        self.interval = interval
+        self.peak: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="rss-sampler")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            rss = read_rss_mb(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0.0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class AppProcess:
+    """在子进程中运行 app.py，环境变量指向模拟后端"""
+
+    def __init__(self, env: Dict[str, str], verbose: bool = False):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = {**os.environ, **env, "HOST": "127.0.0.1", "PORT": str(self.port), "DEBUG": "false"}
+        self.verbose = verbose
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, timeout: float = 30.0) -> "AppProcess":
+        output = None if self.verbose else subprocess.DEVNULL
+        self.process = subprocess.Popen(
+            [sys.executable, "app.py"], cwd=ROOT, env=self.env, stdout=output, stderr=output
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"App exited with code {self.process.returncode}")
+            try:
+                requests.get(self.url + "/", timeout=5)
+                return self
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError("App did not start in time")
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def __enter__(self) -> "AppProcess":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def build_scenarios(base_url: str, dataset: Dataset, args: argparse.Namespace) -> Dict[str, List[Callable]]:
+    """
+    按数据集构造各场景的 HTTP 请求列表
+
+    每个请求在调用线程自己的会话中发出（保持连接复用，如同浏览器），返回是否成功
+    """
+    local = threading.local()
+
+    def _request(method: str, path: str, **kwargs) -> Callable[[], bool]:
+        def _op() -> bool:
+            session = getattr(local, "session", None)
+            if session is None:
+                session = local.session = requests.Session()
+            response = session.request(method, base_url + path, timeout=60, **kwargs)
+            # 读取完整响应体，下载场景包含数据传输时间
+            _ = response.content
+            return response.ok
+
+        return _op
+
+    folders = dataset.folder_prefixes()
+    # 深度优先遍历目录树
+    browse = [_request("GET", "/" + quote(prefix)) for prefix in sorted(folders)]
+
+    thumbnails = []
+    for prefix in folders:
+        files, _ = dataset.list_dir(prefix)
+        grid = [key for key in files if key.endswith(".png")]
+        if grid:
+            thumbnails.append(_request("GET", "/" + quote(prefix)))
+            thumbnails.extend(_request("GET", "/thumb/" + quote(key)) for key in grid)
+
+    keys = list(dataset.keys())
+    downloads = [_request("GET", "/download/" + quote(key)) for key in keys[:: max(1, len(keys) // args.downloads)]]
+
+    top_level = [prefix for prefix in folders if prefix.count("/") == 1]
+    bulk_move = [
+        _request("POST", "/move", json={"source": prefix, "destination": f"moved-{prefix}", "is_folder": True})
+        for prefix in top_level
+    ]
+
+    return {
+        "browse": browse * args.repeat,
+        "thumbnails": thumbnails * args.repeat,
+        "download": downloads * args.repeat,
+        # 移动会改变数据集，每个文件夹只移动一次
+        "bulk_move": bulk_move,
+    }
+
+
+def run_backend(name: str, args: argparse.Namespace) -> Dict[str, Dict[str, object]]:
+    """在新的数据集上启动模拟后端和应用，依次运行选定场景"""
+    dataset = Dataset.generate(width=args.width, depth=args.depth, files=args.files, seed=args.seed)
+    server, env = start_server(name, dataset, args.latency, args.throttle)
+    results = {}
+    try:
+        with AppProcess(env, verbose=args.verbose) as app:
+            scenarios = build_scenarios(app.url, dataset, args)
+            for scenario in args.scenarios:
+                ops = scenarios[scenario]
+                if not ops:
+                    continue
+                server.reset_stats()
+                with RssSampler(app.process.pid) as sampler:
+                    latencies, errors, elapsed = run_ops(ops, args.concurrency)
+                results[scenario] = summarize(
+                    latencies,
+                    elapsed,
+                    errors,
+                    peak_rss_mb=round(sampler.peak, 1) if sampler.peak is not None else None,
+                    requests=server.total_requests(),
+                    throttled=server.stats.get("throttled", 0),
+                )
+    finally:
+        server.stop()
+    return results
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end HTTP load test of app.py against fake backends")
+    parser.add_argument("--backends", default="r2", help="comma-separated backends to run")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenarios to run")
+    parser.add_argument("--width", type=int, default=4, help="sub-folders per folder")
+    parser.add_argument("--depth", type=int, default=3, help="folder depth")
+    parser.add_argument("--files", type=int, default=24, help="files per folder")
+    parser.add_argument("--seed", type=int, default=0, help="dataset seed")
+    parser.add_argument("--downloads", type=int, default=50, help="distinct files in the download scenario")
+    parser.add_argument("--repeat", type=int, default=2, help="passes over the read-only scenarios")
+    parser.add_argument("--latency", type=float, default=0.02, help="injected latency per backend request (s)")
+    parser.add_argument("--throttle", type=float, default=0.0, help="probability of a throttled response")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--verbose", action="store_true", help="show the app's output")
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    args.backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    for name in args.backends:
+        if name not in BACKENDS:
+            parser.error(f"unknown backend: {name}")
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario: {name}")
+    return args
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    results = {name: run_backend(name, args) for name in args.backends}
+    params = {key: value for key, value in vars(args).items() if key not in ("save", "compare", "verbose")}
+    report = build_report(results, params)
+    print(
+        format_table(results, ["ops", "errors", "ops_per_s", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb", "requests"])
+    )
+
+    if args.save:
+        save_report(report, args.save)
+        print(f"Results saved to {args.save}")
+    if args.compare:
+        regressions = compare_reports(load_report(args.compare), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+本地目录数据源
+把数据集写入临时目录供 LocalStorage 使用，接口与模拟服务一致
+"""
+
+import os
+import shutil
+import tempfile
+from collections import Counter
+
+from .dataset import Dataset
+
+
+class LocalDirectory:
+    """数据集在临时目录中的副本
+
+    本地存储没有网络请求，latency 和限流不适用，请求计数恒为 0。
+    之后对目录的修改不会写回数据集。
+    """
+
+    def __init__(self, dataset: Dataset):
+        self.dataset = dataset
+        self.path = tempfile.mkdtemp(prefix="cloud-index-bench-")
+        self.stats: Counter = Counter()
+
+    def start(self) -> "LocalDirectory":
+        with self.dataset.lock:
+            for folder in self.dataset.folders:
+                os.makedirs(os.path.join(self.path, folder), exist_ok=True)
+            for key, obj in self.dataset.objects.items():
+                path = os.path.join(self.path, key)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(obj.data)
+                os.utime(path, (obj.modified, obj.modified))
+        return self
+
+    def stop(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def reset_stats(self) -> None:
+        self.stats.clear()
+
+    def total_requests(self) -> int:
+        return 0
@@ -0,0 +1,159 @@
+"""
+录像回放
+
+加载 RECORD_MODE=record 时保存的录像，在本地用录像应答所有上游调用，
+重新发起录像中的应用请求，对比录制时和回放时的状态码、上游调用次数和耗时。
+修改代码后回放同一录像，即可验证改动是否减少了调用次数和总耗时。
+
+用法:
+    python -m bench.replay /tmp/cloud-index-cassettes/20250101-120000-index-1a2b3c4d.json
+    python -m bench.replay cassette.json --time-scale 0 --strict
+    python -m bench.replay cassette.json --context /tmp/cloud-index-cassettes
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from recording import CASSETTE_NAME_PATTERN, CASSETTE_VERSION, ReplaySource, load_cassette, set_replay_source
+
+# 回放时需要非空的配置，值不会发送到任何服务
+REQUIRED_SETTINGS = {
+    "r2": ["R2_ACCOUNT_ID", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY", "R2_BUCKET_NAME"],
+    "github": ["GITHUB_TOKEN"],
+    "onedrive": ["ONEDRIVE_CLIENT_ID", "ONEDRIVE_CLIENT_SECRET", "ONEDRIVE_REFRESH_TOKEN"],
+}
+
+
+def configure(cassette: Dict[str, Any]) -> None:
+    """
+    按录像设置后端类型和占位配置，并切换到回放模式
+
+    录像中以占位符记录的配置项在当前环境未设置时填入虚拟值，URL 在回放时还原为这些值
+    """
+    Config.STORAGE_TYPE = cassette["backend"]
+    for name in cassette.get("placeholders", []):
+        if getattr(Config, name, None):
+            continue
+        if name.endswith("_URL"):
+            value = f"https://{name.lower().replace('_', '-')}.replay.invalid"
+        elif name == "GITHUB_REPO":
+            value = "replay/repo"
+        else:
+            value = f"replay-{name.lower().replace('_', '-')}"
+        setattr(Config, name, value)
+    for name in REQUIRED_SETTINGS.get(Config.STORAGE_TYPE, []):
+        if not getattr(Config, name, None):
+            setattr(Config, name, "replay")
+    Config.RECORD_MODE = "replay"
+
+
+def load_context(context: str, path: str) -> List[Dict[str, Any]]:
+    """加载上下文录像：目录中早于目标录像保存的录像（按保存顺序），或单个录像文件"""
+    if not os.path.isdir(context):
+        return [load_cassette(context)]
+    saved_at = os.path.getmtime(path)
+    paths = [os.path.join(context, name) for name in os.listdir(context) if CASSETTE_NAME_PATTERN.match(name)]
+    paths = sorted((p for p in paths if os.path.getmtime(p) < saved_at), key=os.path.getmtime)
+    return [load_cassette(p) for p in paths]
+
+
+def send(client, recorded: Dict[str, Any]):
+    """通过测试客户端重新发起录像中的应用请求，读取完整响应体"""
+    kwargs = {"json": recorded["body"]} if recorded.get("body") is not None else {}
+    response = client.open(recorded["path"], method=recorded["method"], **kwargs)
+    _ = response.get_data()
+    return response
+
+
+def replay(path: str, time_scale: float = 1.0, context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    回放一个录像
+
+    录制时命中缓存的调用不在录像中，而回放进程从空缓存开始。指定 context 时先不等待地
+    依次回放之前录制的请求以重建缓存状态，再回放目标录像；仍缺少的调用由上下文录像应答（记为借用）。
+
+    Args:
+        path: 要回放的录像文件
+        time_scale: 录制耗时的倍数，0 表示不等待
+        context: 上下文录像文件或录像目录
+
+    Returns:
+        包含录制时和回放时状态码、调用次数、耗时以及借用和未命中调用的字典
+    """
+    cassette = load_cassette(path)
+    if cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version: {cassette.get('version')}")
+    configure(cassette)
+    previous = load_context(context, path) if context else []
+
+    from storages.factory import StorageFactory
+
+    StorageFactory.reset()
+    from app import app
+
+    with app.test_client() as client:
+        for earlier in previous:
+            set_replay_source(ReplaySource([earlier], 0, previous))
+            send(client, earlier["request"])
+
+        source = ReplaySource([cassette], time_scale, previous)
+        set_replay_source(source)
+        started = time.perf_counter()
+        response = send(client, cassette["request"])
+        elapsed = time.perf_counter() - started
+
+    recorded = cassette["request"]
+    return {
+        "request": f"{recorded['method']} {recorded['path']}",
+        "recorded_status": recorded.get("status"),
+        "replayed_status": response.status_code,
+        "recorded_calls": cassette.get("call_count", len(cassette.get("interactions", []))),
+        "replayed_calls": source.served + len(source.borrowed) + len(source.misses),
+        "recorded_ms": cassette.get("elapsed_ms"),
+        "replayed_ms": round(elapsed * 1000, 2),
+        "unused": source.unused(),
+        "borrowed": source.borrowed,
+        "misses": source.misses,
+    }
+
+
+def format_result(result: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"request   {result['request']}",
+        f"status    recorded {result['recorded_status']}  replayed {result['replayed_status']}",
+        f"calls     recorded {result['recorded_calls']}  replayed {result['replayed_calls']}",
+        f"time_ms   recorded {result['recorded_ms']}  replayed {result['replayed_ms']}",
+        f"unused    {result['unused']} recorded calls were not made",
+    ]
+    lines.extend(f"BORROWED {call}" for call in result["borrowed"])
+    lines.extend(f"MISS {miss}" for miss in result["misses"])
+    return lines
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded request against its recorded backend traffic")
+    parser.add_argument("cassette", help="cassette file saved with RECORD_MODE=record")
+    parser.add_argument(
+        "--time-scale", type=float, default=1.0, help="multiplier for recorded call durations (0 disables waiting)"
+    )
+    parser.add_argument(
+        "--context",
+        metavar="PATH",
+        help="cassette directory (or file) recorded earlier, replayed first to rebuild cache state",
+    )
+    parser.add_argument("--strict", action="store_true", help="exit with 1 if a call has no recorded response")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    result = replay(args.cassette, args.time_scale, args.context)
+    print("\n".join(format_result(result)))
+    if args.strict and result["misses"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+性能测试结果汇总、保存与回归比较
+"""
+
+import json
+import platform
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# 比较时检查的指标: (指标名, 数值越大越好)
+COMPARED_METRICS = [
+    ("ops_per_s", True),
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("p99_ms", False),
+    ("peak_rss_mb", False),
+]
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """线性插值计算百分位数，values 需已排序"""
+    if not values:
+        return 0.0
+    rank = (len(values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def summarize(latencies: Iterable[float], elapsed: float, errors: int = 0, **extra: Any) -> Dict[str, Any]:
+    """
+    汇总一组操作的耗时
+
+    Args:
+        latencies: 每个操作的耗时（秒）
+        elapsed: 整组操作的总耗时（秒）
+        errors: 失败的操作数
+        **extra: 附加到结果中的其他字段
+
+    Returns:
+        包含操作数、吞吐量和 p50/p95/p99 延迟（毫秒）的字典
+    """
+    values = sorted(latencies)
+    result = {
+        "ops": len(values),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "ops_per_s": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+    }
+    result.update(extra)
+    return result
+
+
+def build_report(results: Dict[str, Dict[str, Dict[str, Any]]], params: Dict[str, Any]) -> Dict[str, Any]:
+    """将 {分组: {场景: 汇总}} 形式的结果和运行参数组装为报告"""
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_table(results: Dict[str, Dict[str, Dict[str, Any]]], columns: Optional[List[str]] = None) -> str:
+    """将结果格式化为文本表格"""
+    columns = columns or ["ops", "errors", "ops_per_s", "p50_ms", "p95_ms", "p99_ms", "requests"]
+    header = ["group", "scenario"] + columns
+    rows = [header]
+    for group, scenarios in results.items():
+        for scenario, summary in scenarios.items():
+            rows.append([group, scenario] + [str(summary.get(column, "")) for column in columns])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths, strict=True)) for row in rows)
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """
+    与基线报告比较，找出超出容差的退化
+
+    Args:
+        baseline: 基线报告
+        current: 本次报告
+        tolerance: 允许的相对变化（0.2 表示吞吐量下降或延迟上升不超过 20%）
+
+    Returns:
+        退化描述列表，为空表示没有退化
+    """
+    regressions = []
+    for group, scenarios in current.get("results", {}).items():
+        for scenario, summary in scenarios.items():
+            base = baseline.get("results", {}).get(group, {}).get(scenario)
+            if not base:
+                continue
+            for metric, higher_is_better in COMPARED_METRICS:
+                old, new = base.get(metric), summary.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                    regressions.append(f"{group}/{scenario} {metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
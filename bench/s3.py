@@ -0,0 +1,170 @@
+"""
+S3 接口模拟服务
+实现 R2Storage 使用的 ListObjectsV2、HeadObject、GetObject、PutObject、CopyObject、
+DeleteObject 和 DeleteObjects（路径风格寻址）
+"""
+
+import base64
+import re
+from datetime import datetime, timezone
+from email.utils import formatdate
+from typing import Dict, List
+from urllib.parse import unquote
+from xml.sax.saxutils import escape
+
+from .dataset import StoredObject
+from .server import FakeRequest, FakeServer, Reply, range_reply
+
+XML_HEADERS = {"Content-Type": "application/xml"}
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _object_headers(obj: StoredObject) -> Dict[str, str]:
+    return {
+        "Content-Type": obj.content_type,
+        "ETag": f'"{obj.etag}"',
+        "Last-Modified": formatdate(obj.modified, usegmt=True),
+    }
+
+
+def _error(status: int, code: str, message: str = "") -> Reply:
+    body = (
+        f"<?xml version='1.0' encoding='UTF-8'?><Error><Code>{code}</Code><Message>{escape(message)}</Message></Error>"
+    )
+    return status, XML_HEADERS, body.encode()
+
+
+class FakeS3Server(FakeServer):
+    """S3 兼容接口的模拟服务，忽略请求签名，只有一个存储桶"""
+
+    routes = [
+        ("GET", r"^/(?P<bucket>[^/]+)/?$", "list_objects"),
+        ("POST", r"^/(?P<bucket>[^/]+)/?$", "delete_objects"),
+        ("HEAD", r"^/(?P<bucket>[^/]+)/(?P<key>.+)$", "head_object"),
+        ("GET", r"^/(?P<bucket>[^/]+)/(?P<key>.+)$", "get_object"),
+        ("PUT", r"^/(?P<bucket>[^/]+)/(?P<key>.+)$", "put_object"),
+        ("DELETE", r"^/(?P<bucket>[^/]+)/(?P<key>.+)$", "delete_object"),
+    ]
+
+    def throttled_reply(self) -> Reply:
+        return _error(503, "SlowDown", "Please reduce your request rate.")
+
+    def not_found(self) -> Reply:
+        return _error(404, "NoSuchKey", "The specified key does not exist.")
+
+    def _list_page(self, prefix: str, delimiter: str, max_keys: int, start_after: str):
+        """
+        按 ListObjectsV2 语义列出一页
+
+        Returns:
+            (对象键列表, 公共前缀列表, 是否截断, 续页标记)
+        """
+        contents: List[str] = []
+        common_prefixes: List[str] = []
+        last = ""
+        for key in self.dataset.keys(prefix):
+            if key <= start_after:
+                continue
+            rest = key[len(prefix) :]
+            common = prefix + rest.split(delimiter, 1)[0] + delimiter if delimiter and delimiter in rest else None
+            if common is not None and (common <= start_after or common_prefixes[-1:] == [common]):
+                continue
+            if len(contents) + len(common_prefixes) >= max_keys:
+                return contents, common_prefixes, True, last
+            if common is not None:
+                common_prefixes.append(common)
+                # 续页标记排在该公共前缀下的所有对象之后
+                last = common + "\uffff"
+            else:
+                contents.append(key)
+                last = key
+        return contents, common_prefixes, False, last
+
+    def list_objects(self, request: FakeRequest, bucket: str) -> Reply:
+        prefix = request.query.get("prefix", "")
+        delimiter = request.query.get("delimiter", "")
+        max_keys = int(request.query.get("max-keys", "1000"))
+        token = request.query.get("continuation-token")
+        start_after = base64.urlsafe_b64decode(token).decode() if token else request.query.get("start-after", "")
+        contents, common_prefixes, truncated, last = self._list_page(prefix, delimiter, max_keys, start_after)
+
+        parts = [
+            "<?xml version='1.0' encoding='UTF-8'?>",
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">',
+            f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>",
+            f"<KeyCount>{len(contents) + len(common_prefixes)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>",
+        ]
+        if delimiter:
+            parts.append(f"<Delimiter>{escape(delimiter)}</Delimiter>")
+        parts.append(f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>")
+        if truncated:
+            # 续页标记可能含 XML 不允许的字符，与真实服务一样编码为不透明令牌
+            token = base64.urlsafe_b64encode(last.encode()).decode()
+            parts.append(f"<NextContinuationToken>{token}</NextContinuationToken>")
+        for key in contents:
+            obj = self.dataset.get(key)
+            if obj is None:
+                continue
+            parts.append(
+                f"<Contents><Key>{escape(key)}</Key><LastModified>{_iso(obj.modified)}</LastModified>"
+                f"<ETag>&quot;{obj.etag}&quot;</ETag><Size>{len(obj.data)}</Size>"
+                "<StorageClass>STANDARD</StorageClass></Contents>"
+            )
+        for common in common_prefixes:
+            parts.append(f"<CommonPrefixes><Prefix>{escape(common)}</Prefix></CommonPrefixes>")
+        parts.append("</ListBucketResult>")
+        return 200, XML_HEADERS, "".join(parts).encode()
+
+    def head_object(self, request: FakeRequest, bucket: str, key: str) -> Reply:
+        obj = self.dataset.get(key)
+        if obj is None:
+            return 404, {}, b""
+        return 200, _object_headers(obj), obj.data
+
+    def get_object(self, request: FakeRequest, bucket: str, key: str) -> Reply:
+        obj = self.dataset.get(key)
+        if obj is None:
+            return self.not_found()
+        return range_reply(obj.data, request.headers.get("Range"), _object_headers(obj))
+
+    def put_object(self, request: FakeRequest, bucket: str, key: str) -> Reply:
+        source = request.headers.get("x-amz-copy-source")
+        if source:
+            source_key = unquote(source).lstrip("/").split("/", 1)[1]
+            obj = self.dataset.get(source_key)
+            if obj is None:
+                return self.not_found()
+            copied = self.dataset.put(key, obj.data, obj.content_type)
+            body = (
+                "<?xml version='1.0' encoding='UTF-8'?><CopyObjectResult>"
+                f"<LastModified>{_iso(copied.modified)}</LastModified><ETag>&quot;{copied.etag}&quot;</ETag>"
+                "</CopyObjectResult>"
+            )
+            return 200, XML_HEADERS, body.encode()
+
+        obj = self.dataset.put(key, request.body, request.headers.get("Content-Type", "application/octet-stream"))
+        return 200, {"ETag": f'"{obj.etag}"'}, b""
+
+    def delete_object(self, request: FakeRequest, bucket: str, key: str) -> Reply:
+        self.dataset.delete(key)
+        return 204, {}, b""
+
+    def delete_objects(self, request: FakeRequest, bucket: str) -> Reply:
+        if "delete" not in request.query:
+            return _error(400, "InvalidRequest", "Unsupported bucket operation")
+        body = request.body.decode()
+        quiet = re.search(r"<Quiet>\s*true\s*</Quiet>", body) is not None
+        deleted = []
+        for match in re.finditer(r"<Key>(.*?)</Key>", body, re.S):
+            key = match.group(1).replace("&amp;", "&").replace("&lt;", "<").replace("&gt;", ">")
+            self.dataset.delete(key)
+            deleted.append(key)
+
+        parts = ["<?xml version='1.0' encoding='UTF-8'?><DeleteResult>"]
+        if not quiet:
+            parts.extend(f"<Deleted><Key>{escape(key)}</Key></Deleted>" for key in deleted)
+        parts.append("</DeleteResult>")
+        return 200, XML_HEADERS, "".join(parts).encode()
@@ -0,0 +1,191 @@
+"""
+模拟服务基础设施
+基于标准库 http.server，在后台线程中运行，支持注入延迟和限流
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .dataset import Dataset
+
+# 处理函数的返回值: (状态码, 响应头, 响应体)
+Reply = Tuple[int, Dict[str, str], bytes]
+
+
+class FakeRequest:
+    """解析后的请求"""
+
+    __slots__ = ("method", "path", "query", "headers", "body")
+
+    def __init__(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body or b"null")
+
+
+def json_reply(status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> Reply:
+    """构造 JSON 响应"""
+    return status, {"Content-Type": "application/json", **(headers or {})}, json.dumps(payload).encode()
+
+
+def range_reply(data: bytes, range_header: Optional[str], headers: Dict[str, str]) -> Reply:
+    """按 Range 请求头返回完整内容或 206 部分内容（只支持单个范围）"""
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header or "")
+    if not match or not (match.group(1) or match.group(2)):
+        return 200, {**headers, "Accept-Ranges": "bytes"}, data
+    start, end = match.groups()
+    if start:
+        first, last = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+    else:
+        first, last = max(0, len(data) - int(end)), len(data) - 1
+    if first >= len(data) or first > last:
+        return 416, {"Content-Range": f"bytes */{len(data)}"}, b""
+    part_headers = {**headers, "Accept-Ranges": "bytes", "Content-Range": f"bytes {first}-{last}/{len(data)}"}
+    return 206, part_headers, data[first : last + 1]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分开写出，关闭 Nagle 算法避免与延迟确认叠加产生 40ms 停顿
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        parts = urlsplit(self.path)
+        query = {name: values[0] for name, values in parse_qs(parts.query, keep_blank_values=True).items()}
+        request = FakeRequest(self.command, unquote(parts.path), query, dict(self.headers.items()), body)
+
+        status, headers, payload = self.server.fake.handle(request)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_HEAD = do_PUT = do_POST = do_DELETE = do_PATCH = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeServer:
+    """模拟服务基类
+
+    子类在 routes 中声明 (方法, 路径正则, 处理函数名)，处理函数接收请求和正则的命名分组，
+    返回 (状态码, 响应头, 响应体)。每个请求在处理前等待 latency 秒，
+    并以 throttle_rate 的概率返回限流响应。
+    """
+
+    routes: List[Tuple[str, str, str]] = []
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.1,
+        seed: Optional[int] = None,
+    ):
+        """
+        初始化模拟服务
+
+        Args:
+            dataset: 服务使用的数据集
+            latency: 每个请求的附加延迟（秒）
+            throttle_rate: 返回限流响应的概率（0 ~ 1）
+            retry_after: 限流响应中 Retry-After 的秒数
+            seed: 限流随机数种子
+        """
+        self.dataset = dataset
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._compiled = [(method, re.compile(pattern), name) for method, pattern, name in self.routes]
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServer":
+        """在随机端口启动服务"""
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True, name=type(self).__name__)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.stats.clear()
+
+    def total_requests(self) -> int:
+        with self._stats_lock:
+            return sum(self.stats.values())
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def throttled_reply(self) -> Reply:
+        """限流响应，子类可按各服务的格式覆盖"""
+        return json_reply(429, {"error": "throttled"}, {"Retry-After": str(self.retry_after)})
+
+    def not_found(self) -> Reply:
+        return json_reply(404, {"error": "not found"})
+
+    def handle(self, request: FakeRequest) -> Reply:
+        """处理请求：等待注入的延迟后分发"""
+        if self.latency:
+            time.sleep(self.latency)
+        return self.dispatch(request)
+
+    def dispatch(self, request: FakeRequest) -> Reply:
+        """按路由表分发请求，按概率返回限流响应"""
+        for method, pattern, name in self._compiled:
+            match = pattern.match(request.path)
+            if method == request.method and match:
+                self._count(name)
+                if self.throttle_rate and self._rng.random() < self.throttle_rate:
+                    self._count("throttled")
+                    return self.throttled_reply()
+                handler: Callable[..., Reply] = getattr(self, name)
+                try:
+                    return handler(request, **match.groupdict())
+                except Exception as e:
+                    return json_reply(500, {"error": str(e)})
+        self._count("unmatched")
+        return self.not_found()
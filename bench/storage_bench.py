@@ -0,0 +1,224 @@
+"""
+存储后端微基准测试
+
+在模拟服务上运行 R2Storage、GitHubStorage 和 OnedriveStorage（LocalStorage 使用临时目录），测量列举、元数据、缩略图、
+上传和文件夹操作的吞吐量与延迟，并可保存结果或与基线比较。
+
+用法:
+    python -m bench.storage_bench --backends r2,github --latency 0.02 --save bench/baseline.json
+    python -m bench.storage_bench --compare bench/baseline.json --tolerance 0.25
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from config import Config
+from storages.base import BaseStorage
+
+from . import Dataset, FakeGitHubServer, FakeGraphServer, FakeS3Server, LocalDirectory
+from .report import build_report, compare_reports, format_table, load_report, save_report, summarize
+from .server import FakeServer
+
+BACKENDS = ["r2", "github", "onedrive", "local"]
+SCENARIOS = ["list", "metadata", "thumbnail", "upload", "folder_ops"]
+
+
+def start_server(name: str, dataset: Dataset, latency: float, throttle: float) -> Tuple[FakeServer, Dict[str, str]]:
+    """
+    启动指定后端的模拟服务
+
+    Returns:
+        (模拟服务, 让应用连接到该服务的配置项)
+    """
+    if name == "r2":
+        server = FakeS3Server(dataset, latency=latency, throttle_rate=throttle, seed=0).start()
+        env = {
+            "R2_ACCOUNT_ID": "bench",
+            "R2_ACCESS_KEY_ID": "bench",
+            "R2_SECRET_ACCESS_KEY": "bench",
+            "R2_BUCKET_NAME": "bench",
+            "R2_ENDPOINT_URL": server.url,
+        }
+    elif name == "github":
+        server = FakeGitHubServer(dataset, latency=latency, throttle_rate=throttle, seed=0).start()
+        env = {
+            "GITHUB_TOKEN": "bench",
+            "GITHUB_REPO": "bench/repo",
+            "GITHUB_API_URL": server.url,
+            "GITHUB_RAW_URL": server.url + "/raw",
+        }
+    elif name == "onedrive":
+        server = FakeGraphServer(dataset, latency=latency, throttle_rate=throttle, seed=0).start()
+        env = {
+            "ONEDRIVE_CLIENT_ID": "bench",
+            "ONEDRIVE_CLIENT_SECRET": "bench",
+            "ONEDRIVE_REFRESH_TOKEN": "bench",
+            "ONEDRIVE_FOLDER_ID": "",
+            "ONEDRIVE_GRAPH_URL": server.url + "/v1.0",
+            "ONEDRIVE_TOKEN_URL": server.url + "/token",
+        }
+    elif name == "local":
+        server = LocalDirectory(dataset).start()
+        env = {"LOCAL_STORAGE_ROOT": server.path}
+    else:
+        raise ValueError(f"Unknown backend: {name}")
+    return server, {"STORAGE_TYPE": name, **env}
+
+
+def start_backend(name: str, dataset: Dataset, latency: float, throttle: float) -> Tuple[FakeServer, BaseStorage]:
+    """
+    启动指定后端的模拟服务，并创建指向它的存储实例
+
+    Returns:
+        (模拟服务, 存储实例)
+    """
+    server, env = start_server(name, dataset, latency, throttle)
+    for key, value in env.items():
+        setattr(Config, key, value)
+
+    from storages.github import GitHubStorage
+    from storages.local import LocalStorage
+    from storages.onedrive import OnedriveStorage
+    from storages.r2 import R2Storage
+
+    storage_class = {"r2": R2Storage, "github": GitHubStorage, "onedrive": OnedriveStorage, "local": LocalStorage}[name]
+    return server, storage_class()
+
+
+def run_ops(ops: List[Callable[[], Any]], concurrency: int) -> Tuple[List[float], int, float]:
+    """
+    并发执行一组操作
+
+    返回 False 或 None、或抛出异常的操作计为失败
+
+    Returns:
+        (每个操作的耗时, 失败数, 总耗时)
+    """
+
+    def _timed(op: Callable[[], Any]) -> Tuple[float, bool]:
+        start = time.perf_counter()
+        try:
+            ok = op() not in (False, None)
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        outcomes = list(pool.map(_timed, ops))
+    elapsed = time.perf_counter() - start
+    return [duration for duration, _ in outcomes], sum(1 for _, ok in outcomes if not ok), elapsed
+
+
+def build_scenarios(storage: BaseStorage, dataset: Dataset, args: argparse.Namespace) -> Dict[str, List[Callable]]:
+    """按数据集构造各场景的操作列表"""
+    keys = list(dataset.keys())
+    images = [key for key in keys if key.endswith(".png")]
+    folders = [prefix for prefix in dataset.folder_prefixes() if prefix.count("/") == 1]
+    sample = keys[:: max(1, len(keys) // args.ops)][: args.ops]
+    payload = b"x" * args.upload_size
+
+    def _folder_op(source: str, i: int) -> Callable[[], bool]:
+        dest = f"bench-copy-{i:03d}/"
+        return lambda: storage.copy_folder(source, dest) and storage.delete_folder(dest)
+
+    return {
+        "list": [lambda prefix=prefix: storage.list_objects(prefix) for prefix in dataset.folder_prefixes()],
+        "metadata": [lambda key=key: storage.get_object_info(key) for key in sample],
+        "thumbnail": [lambda key=key: storage.generate_thumbnail(key) for key in images[: args.ops]],
+        "upload": [
+            lambda i=i: storage.upload_file(f"bench-upload/{i:04d}.bin", payload, "application/octet-stream")
+            for i in range(args.ops)
+        ],
+        "folder_ops": [_folder_op(folder, i) for i, folder in enumerate(folders[: args.folder_ops])],
+    }
+
+
+def bench_backend(name: str, args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """在新的数据集上运行一个后端的所有选定场景"""
+    dataset = Dataset.generate(width=args.width, depth=args.depth, files=args.files, seed=args.seed)
+    server, storage = start_backend(name, dataset, args.latency, args.throttle)
+    if args.stack:
+        from storages.factory import StorageFactory
+
+        storage = StorageFactory._wrap(storage)
+
+    results = {}
+    try:
+        # 预热：建立客户端和连接池，不计入结果
+        storage.list_objects("")
+        scenarios = build_scenarios(storage, dataset, args)
+        for scenario in args.scenarios:
+            ops = scenarios[scenario]
+            if not ops:
+                continue
+            server.reset_stats()
+            latencies, errors, elapsed = run_ops(ops, args.concurrency)
+            results[scenario] = summarize(
+                latencies,
+                elapsed,
+                errors,
+                requests=server.total_requests(),
+                throttled=server.stats.get("throttled", 0),
+            )
+    finally:
+        server.stop()
+    return results
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Storage backend micro-benchmarks against in-process fake services")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma-separated backends to run")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenarios to run")
+    parser.add_argument("--width", type=int, default=4, help="sub-folders per folder")
+    parser.add_argument("--depth", type=int, default=2, help="folder depth")
+    parser.add_argument("--files", type=int, default=20, help="files per folder")
+    parser.add_argument("--seed", type=int, default=0, help="dataset seed")
+    parser.add_argument("--ops", type=int, default=40, help="operations per metadata/thumbnail/upload scenario")
+    parser.add_argument("--folder-ops", type=int, default=4, help="copy+delete folder operations")
+    parser.add_argument("--upload-size", type=int, default=16384, help="upload payload size in bytes")
+    parser.add_argument("--latency", type=float, default=0.0, help="injected latency per backend request (s)")
+    parser.add_argument("--throttle", type=float, default=0.0, help="probability of a throttled response")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent operations")
+    parser.add_argument("--stack", action="store_true", help="wrap storages with the configured cache layers")
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    args.backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    for name in args.backends:
+        if name not in BACKENDS:
+            parser.error(f"unknown backend: {name}")
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario: {name}")
+    return args
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    results = {name: bench_backend(name, args) for name in args.backends}
+    params = {key: value for key, value in vars(args).items() if key not in ("save", "compare")}
+    report = build_report(results, params)
+    print(format_table(results))
+
+    if args.save:
+        save_report(report, args.save)
+        print(f"Results saved to {args.save}")
+    if args.compare:
+        regressions = compare_reports(load_report(args.compare), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
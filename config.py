@@ -24,11 +24,16 @@ class Config:
     R2_SECRET_ACCESS_KEY: Optional[str] = os.getenv("R2_SECRET_ACCESS_KEY")
     R2_BUCKET_NAME: Optional[str] = os.getenv("R2_BUCKET_NAME")
     R2_PUBLIC_DOMAIN: Optional[str] = os.getenv("R2_PUBLIC_DOMAIN")
+    # 可选，覆盖默认的 https://<account_id>.r2.cloudflarestorage.com（如本地模拟服务）
+    R2_ENDPOINT_URL: Optional[str] = os.getenv("R2_ENDPOINT_URL")
 
     # GitHub 配置
     GITHUB_TOKEN: Optional[str] = os.getenv("GITHUB_TOKEN")
     GITHUB_REPO: Optional[str] = os.getenv("GITHUB_REPO")  # 格式: owner/repo
     GITHUB_BRANCH: str = os.getenv("GITHUB_BRANCH", "main")
+    # 可选，覆盖 API 和原始文件的地址（如 GitHub Enterprise 或本地模拟服务）
+    GITHUB_API_URL: str = os.getenv("GITHUB_API_URL", "https://api.github.com")
+    GITHUB_RAW_URL: str = os.getenv("GITHUB_RAW_URL", "https://raw.githubusercontent.com")
 
     # OneDrive 配置
     ONEDRIVE_REFRESH_TOKEN: Optional[str] = os.getenv("ONEDRIVE_REFRESH_TOKEN")
@@ -36,6 +41,14 @@ class Config:
     ONEDRIVE_CLIENT_SECRET: Optional[str] = os.getenv("ONEDRIVE_CLIENT_SECRET")
     ONEDRIVE_FOLDER_ID: Optional[str] = os.getenv("ONEDRIVE_FOLDER_ID")  # 可选，默认使用 /me/drive/root
     ONEDRIVE_REDIRECT_URI: Optional[str] = os.getenv("ONEDRIVE_REDIRECT_URI")  # 可选，刷新令牌时某些应用需要
+    # 可选，覆盖 Graph API 和令牌端点的地址（如国际版以外的云或本地模拟服务）
+    ONEDRIVE_GRAPH_URL: str = os.getenv("ONEDRIVE_GRAPH_URL", "https://graph.microsoft.com/v1.0")
+    ONEDRIVE_TOKEN_URL: str = os.getenv(
+        "ONEDRIVE_TOKEN_URL", "https://login.microsoftonline.com/common/oauth2/v2.0/token"
+    )
+
+    # 本地存储配置
+    LOCAL_STORAGE_ROOT: Optional[str] = os.getenv("LOCAL_STORAGE_ROOT")  # 作为存储根目录的本地目录
 
     # 应用配置
     HOST: str = os.getenv("HOST", "0.0.0.0")
@@ -48,33 +61,147 @@ class Config:
 
     # URL过期时间配置
     PRESIGNED_URL_EXPIRES: int = int(os.getenv("PRESIGNED_URL_EXPIRES", "3600"))
+    # 预签名 URL 时间桶长度（秒），同一时间桶内同一对象复用同一个 URL，0 表示禁用
+    PRESIGNED_URL_BUCKET_SECONDS: int = int(os.getenv("PRESIGNED_URL_BUCKET_SECONDS", "900"))
+    PRESIGNED_URL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRESIGNED_URL_CACHE_MAX_ENTRIES", "10000"))
+
+    # 对象元数据缓存配置
+    METADATA_CACHE_ENABLED: bool = os.getenv("METADATA_CACHE_ENABLED", "true").lower() == "true"
+    METADATA_CACHE_TTL_SECONDS: int = int(os.getenv("METADATA_CACHE_TTL_SECONDS", "300"))
+    METADATA_CACHE_MAX_ENTRIES: int = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "10000"))
+    # 不存在对象的负缓存过期时间（秒）
+    NEGATIVE_CACHE_TTL_SECONDS: int = int(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "30"))
+
+    # 基于布隆过滤器的对象存在性索引（由列表结果和写操作构建）
+    EXISTENCE_FILTER_ENABLED: bool = os.getenv("EXISTENCE_FILTER_ENABLED", "false").lower() == "true"
+    EXISTENCE_FILTER_CAPACITY: int = int(os.getenv("EXISTENCE_FILTER_CAPACITY", "200000"))
+    EXISTENCE_FILTER_ERROR_RATE: float = float(os.getenv("EXISTENCE_FILTER_ERROR_RATE", "0.01"))
+
+    # 目录列表缓存配置
+    LISTING_CACHE_TTL_SECONDS: int = int(os.getenv("LISTING_CACHE_TTL_SECONDS", "30"))
+    LISTING_CACHE_MAX_ENTRIES: int = int(os.getenv("LISTING_CACHE_MAX_ENTRIES", "1000"))
+
+    # stale-while-revalidate：缓存过期后仍可返回旧数据并在后台刷新的时间（秒）
+    STALE_CACHE_TTL_SECONDS: int = int(os.getenv("STALE_CACHE_TTL_SECONDS", "86400"))
+    SWR_REFRESH_WORKERS: int = int(os.getenv("SWR_REFRESH_WORKERS", "4"))
+
+    # 对象内容磁盘缓存（经由服务器中继的小文件）
+    BODY_CACHE_ENABLED: bool = os.getenv("BODY_CACHE_ENABLED", "false").lower() == "true"
+    BODY_CACHE_DIR: str = os.getenv("BODY_CACHE_DIR", "")
+    BODY_CACHE_MAX_BYTES: int = int(os.getenv("BODY_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    BODY_CACHE_MAX_OBJECT_BYTES: int = int(os.getenv("BODY_CACHE_MAX_OBJECT_BYTES", str(16 * 1024 * 1024)))
+
+    # 对象元数据索引（本地 SQLite + 内存前缀树，由后台全量遍历填充）
+    METADATA_INDEX_ENABLED: bool = os.getenv("METADATA_INDEX_ENABLED", "false").lower() == "true"
+    METADATA_INDEX_PATH: str = os.getenv("METADATA_INDEX_PATH", "")
+    METADATA_INDEX_REFRESH_SECONDS: int = int(os.getenv("METADATA_INDEX_REFRESH_SECONDS", "600"))
+    METADATA_INDEX_MAX_AGE: int = int(os.getenv("METADATA_INDEX_MAX_AGE", "1800"))
+
+    # 经由服务器中继的下载：数据块大小和每个下载预读的最大数据块数
+    STREAM_CHUNK_SIZE: int = int(os.getenv("STREAM_CHUNK_SIZE", str(64 * 1024)))
+    STREAM_READ_AHEAD_CHUNKS: int = int(os.getenv("STREAM_READ_AHEAD_CHUNKS", "16"))
+
+    # ZIP 打包下载：同时读取的文件数，以及完整预读到内存的单个文件大小上限
+    ZIP_PREFETCH_WINDOW: int = int(os.getenv("ZIP_PREFETCH_WINDOW", "4"))
+    ZIP_PREFETCH_MAX_BYTES: int = int(os.getenv("ZIP_PREFETCH_MAX_BYTES", str(8 * 1024 * 1024)))
+
+    # 上传去重：与后端已有对象的内容哈希比较，内容未变化时跳过上传
+    UPLOAD_DEDUP: bool = os.getenv("UPLOAD_DEDUP", "true").lower() == "true"
+
+    # 解压上传：每批上传的文件数和字节数，以及单个压缩包允许的文件数和解压后总大小
+    EXTRACT_BATCH_FILES: int = int(os.getenv("EXTRACT_BATCH_FILES", "100"))
+    EXTRACT_BATCH_BYTES: int = int(os.getenv("EXTRACT_BATCH_BYTES", str(32 * 1024 * 1024)))
+    EXTRACT_MAX_FILES: int = int(os.getenv("EXTRACT_MAX_FILES", "10000"))
+    EXTRACT_MAX_BYTES: int = int(os.getenv("EXTRACT_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+    # 后端熔断器配置
+    CIRCUIT_BREAKER_WINDOW: int = int(os.getenv("CIRCUIT_BREAKER_WINDOW", "20"))
+    CIRCUIT_BREAKER_MIN_CALLS: int = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+    CIRCUIT_BREAKER_ERROR_THRESHOLD: float = float(os.getenv("CIRCUIT_BREAKER_ERROR_THRESHOLD", "0.5"))
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "5"))
+    CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD", "0.8"))
+    CIRCUIT_BREAKER_COOLDOWN_SECONDS: float = float(os.getenv("CIRCUIT_BREAKER_COOLDOWN_SECONDS", "30"))
+
+    # 合并并发的相同读请求（目录列表、对象信息、缩略图）
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+    # 记录存储调用和 HTTP 请求指标，通过 /metrics 输出
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # 抓取 /metrics 使用的令牌（Authorization: Bearer），未设置时只有管理员令牌可以访问
+    METRICS_TOKEN: Optional[str] = os.getenv("METRICS_TOKEN")
+
+    # 在 Server-Timing 响应头中输出每个请求的存储调用、缓存和渲染耗时
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    # 超过该耗时（毫秒）的请求输出一行 JSON 格式的慢请求日志，0 表示不记录
+    SLOW_REQUEST_THRESHOLD_MS: int = int(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "1000"))
+
+    # 管理员令牌，用于触发请求性能分析和访问 /admin 接口；未设置时管理接口不可用
+    ADMIN_TOKEN: Optional[str] = os.getenv("ADMIN_TOKEN")
+    # 随机分析的请求比例（0 ~ 1），0 表示只分析带管理员请求头的请求
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    # 分析结果保存目录，默认位于系统临时目录
+    PROFILE_DIR: Optional[str] = os.getenv("PROFILE_DIR")
+    # 最多保留的分析结果数
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+    # 后端流量录制/回放: off 关闭，record 把每个请求的上游调用保存为录像，replay 由录像应答上游调用
+    RECORD_MODE: str = os.getenv("RECORD_MODE", "off").lower()
+    # 录像保存目录，默认位于系统临时目录
+    CASSETTE_DIR: Optional[str] = os.getenv("CASSETTE_DIR")
+    # 最多保留的录像数
+    CASSETTE_MAX_FILES: int = int(os.getenv("CASSETTE_MAX_FILES", "200"))
+    # 回放使用的录像文件或目录，默认为 CASSETTE_DIR
+    REPLAY_CASSETTES: Optional[str] = os.getenv("REPLAY_CASSETTES")
+    # 回放时按录制耗时乘以该系数等待，0 表示立即应答
+    REPLAY_TIME_SCALE: float = float(os.getenv("REPLAY_TIME_SCALE", "1"))
+
+    # 后端请求调度配置（并发上限会在该范围内自适应调整）
+    BACKEND_INITIAL_CONCURRENCY: int = int(os.getenv("BACKEND_INITIAL_CONCURRENCY", "8"))
+    BACKEND_MAX_CONCURRENCY: int = int(os.getenv("BACKEND_MAX_CONCURRENCY", "32"))
+    BACKEND_MAX_RETRIES: int = int(os.getenv("BACKEND_MAX_RETRIES", "4"))
+    BACKEND_RETRY_MAX_DELAY: float = float(os.getenv("BACKEND_RETRY_MAX_DELAY", "30"))
+    BACKEND_REQUEST_TIMEOUT: float = float(os.getenv("BACKEND_REQUEST_TIMEOUT", "30"))
+
+    # /batch 单次请求允许的最大操作数
+    BATCH_MAX_OPERATIONS: int = int(os.getenv("BATCH_MAX_OPERATIONS", "1000"))
+
+    # 后台任务配置（文件夹复制/移动/删除）
+    # 任务存储的 SQLite 文件路径，默认位于系统临时目录
+    JOBS_DB_PATH: Optional[str] = os.getenv("JOBS_DB_PATH")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    # 每处理多少个对象写入一次检查点
+    JOB_CHUNK_SIZE: int = int(os.getenv("JOB_CHUNK_SIZE", "100"))
+    # 执行者租约时长（秒），超时未续约的任务会被重新调度
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+    # 任务失败后的重试间隔（秒），每次失败翻倍，不超过最大值
+    JOB_RETRY_BASE_DELAY: float = float(os.getenv("JOB_RETRY_BASE_DELAY", "5"))
+    JOB_RETRY_MAX_DELAY: float = float(os.getenv("JOB_RETRY_MAX_DELAY", "300"))
 
     @classmethod
     def validate(cls) -> None:
         """验证必需的配置项是否已设置"""
         if not cls.STORAGE_TYPE:
-            raise ValueError("STORAGE_TYPE environment variable is not set. Supported types: r2, github, onedrive")
-
-        if cls.STORAGE_TYPE == "r2":
-            required = ["R2_ACCOUNT_ID", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY", "R2_BUCKET_NAME"]
-            missing = [key for key in required if not getattr(cls, key)]
-            if missing:
-                raise ValueError(f"Missing required R2 configuration: {', '.join(missing)}")
-
-        elif cls.STORAGE_TYPE == "github":
-            required = ["GITHUB_TOKEN", "GITHUB_REPO"]
-            missing = [key for key in required if not getattr(cls, key)]
-            if missing:
-                raise ValueError(f"Missing required GitHub configuration: {', '.join(missing)}")
-
-        elif cls.STORAGE_TYPE == "onedrive":
-            required = ["ONEDRIVE_REFRESH_TOKEN", "ONEDRIVE_CLIENT_ID", "ONEDRIVE_CLIENT_SECRET"]
-            missing = [key for key in required if not getattr(cls, key)]
-            if missing:
-                raise ValueError(f"Missing required OneDrive configuration: {', '.join(missing)}")
-
-        elif cls.STORAGE_TYPE not in ["r2", "github", "onedrive"]:
-            raise ValueError(f"Unsupported storage type: {cls.STORAGE_TYPE}. Supported types: r2, github, onedrive")
+            raise ValueError(
+                "STORAGE_TYPE environment variable is not set. Supported types: r2, github, onedrive, local"
+            )
+
+        # 各存储类型: (错误信息中的名称, 必需的配置项)
+        required_settings = {
+            "r2": ("R2", ["R2_ACCOUNT_ID", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY", "R2_BUCKET_NAME"]),
+            "github": ("GitHub", ["GITHUB_TOKEN", "GITHUB_REPO"]),
+            "onedrive": ("OneDrive", ["ONEDRIVE_REFRESH_TOKEN", "ONEDRIVE_CLIENT_ID", "ONEDRIVE_CLIENT_SECRET"]),
+            "local": ("local storage", ["LOCAL_STORAGE_ROOT"]),
+        }
+        if cls.STORAGE_TYPE not in required_settings:
+            raise ValueError(
+                f"Unsupported storage type: {cls.STORAGE_TYPE}. Supported types: r2, github, onedrive, local"
+            )
+
+        label, required = required_settings[cls.STORAGE_TYPE]
+        missing = [key for key in required if not getattr(cls, key)]
+        if missing:
+            raise ValueError(f"Missing required {label} configuration: {', '.join(missing)}")
 
     @classmethod
     def get_storage_config(cls) -> dict:
@@ -101,4 +228,6 @@ class Config:
                 "folder_id": cls.ONEDRIVE_FOLDER_ID,
                 "redirect_uri": cls.ONEDRIVE_REDIRECT_URI,
             }
+        elif cls.STORAGE_TYPE == "local":
+            return {"root": cls.LOCAL_STORAGE_ROOT}
         return {}
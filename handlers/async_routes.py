@@ -0,0 +1,594 @@
+"""
+ASGI 模式下的路由
+与 handlers/routes.py 使用相同的响应格式，存储调用均为协程。
+依赖元数据索引或同步打包的 /search、/du、/tree、/zip 以及解压上传在此模式下返回 501。
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+from quart import Blueprint, Response, abort, g, jsonify, redirect, render_template, request, send_file
+from werkzeug.exceptions import HTTPException
+
+from config import Config
+from jobs import FINISHED_STATUSES, JobRunner
+from metrics import REGISTRY
+from profiling import (
+    RequestProfiler,
+    can_read_metrics,
+    format_profile,
+    get_profile_path,
+    is_admin,
+    list_profiles,
+    should_profile,
+)
+from storages.async_factory import AsyncStorageFactory
+from storages.base import ObjectNotFoundError
+from storages.resilience import CircuitOpenError
+from tracing import span
+
+from .routes import (
+    JOB_EVENTS_KEEPALIVE_SECONDS,
+    JOB_EVENTS_POLL_SECONDS,
+    BatchResults,
+    begin_request,
+    build_crumbs,
+    build_entries,
+    end_request,
+    parse_batch_operations,
+    parse_job_request,
+    record_deletes,
+    record_heads,
+    record_transfers,
+    route_name,
+    split_batch,
+)
+
+async_route = Blueprint("main", __name__)
+
+
+def get_storage():
+    """获取异步存储实例（延迟初始化）"""
+    return AsyncStorageFactory.get_storage()
+
+
+@async_route.before_app_request
+async def start_request_metrics():
+    """记录请求开始时间，并标记之后的存储调用所属的路由"""
+    g.request_started = begin_request(request.endpoint)
+    g.profiler = RequestProfiler.start() if should_profile(request.headers) else None
+
+
+@async_route.after_app_request
+async def finish_request_metrics(response):
+    """记录请求的状态码、耗时和耗时明细，保存请求的性能分析结果"""
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        name = profiler.stop(route_name(request.endpoint))
+        if name:
+            response.headers["X-Profile-Id"] = name
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    return end_request(response, request.endpoint, request.method, request.path, started)
+
+
+@async_route.teardown_app_request
+async def stop_request_profiler(_error=None):
+    """请求异常结束时 after_request 不会执行，在这里停止分析"""
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.stop()
+
+
+async def render_listing(prefix: str):
+    """渲染目录列表页面"""
+    storage = get_storage()
+    with span("storage.list_objects"):
+        response = await storage.list_objects(prefix)
+    with span("entries"):
+        entries = build_entries(response, prefix, storage)
+    with span("render"):
+        return await render_template(
+            "index.html",
+            entries=entries,
+            current_prefix=prefix,
+            crumbs=build_crumbs(prefix),
+            current_year=datetime.now().year,
+        )
+
+
+@async_route.route("/")
+async def index():
+    """返回文件和目录列表的 HTML 页面。"""
+    try:
+        return await render_listing(request.args.get("prefix", "") or "")
+    except CircuitOpenError:
+        abort(503)
+    except Exception:
+        abort(500)
+
+
+@async_route.route("/<path:prefix_path>")
+async def browse(prefix_path):
+    """目录路由。将 URL /a/b 映射为 prefix 'a/b/' 并重用 index 的逻辑。"""
+    try:
+        prefix = prefix_path or ""
+        if prefix and not prefix.endswith("/"):
+            prefix = prefix + "/"
+        return await render_listing(prefix)
+    except CircuitOpenError:
+        abort(503)
+    except Exception:
+        abort(500)
+
+
+async def send_storage_object(download_response: Dict[str, Any], as_attachment: bool):
+    """
+    发送 "file" 或 "stream" 类型的下载响应
+
+    "file" 交给 Quart 发送本地文件（支持 Range 和条件请求）。异步后端没有分块读取和范围读取的接口，
+    "stream" 返回 501，而不是把整个对象读入内存后再发送
+    """
+    if download_response["type"] == "stream":
+        return jsonify({"success": False, "error": "Streaming downloads are not supported in ASGI mode"}), 501
+    return await send_file(
+        download_response["path"],
+        mimetype=download_response["mimetype"],
+        as_attachment=as_attachment,
+        attachment_filename=download_response["filename"],
+        conditional=True,
+    )
+
+
+@async_route.route("/file/<path:file_path>")
+async def serve_file(file_path):
+    """重定向到原始存储 URL，节省服务器资源"""
+    try:
+        storage = get_storage()
+        try:
+            await storage.get_object_info(file_path)
+        except ObjectNotFoundError:
+            abort(404)
+
+        presigned = await storage.generate_presigned_url(file_path)
+        if presigned:
+            response = redirect(presigned)
+            max_age = storage.get_presigned_url_max_age()
+            if max_age > 0:
+                response.headers["Cache-Control"] = f"public, max-age={max_age}, s-maxage={max_age}"
+            return response
+
+        public_url = await storage.get_public_url(file_path)
+        if public_url:
+            return redirect(public_url)
+
+        # 本地存储没有 URL，由服务器直接发送文件
+        download_response = await storage.generate_download_response(file_path)
+        if download_response and download_response["type"] in ("file", "stream"):
+            return await send_storage_object(download_response, as_attachment=False)
+
+        abort(403)
+
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        abort(503)
+    except Exception:
+        abort(500)
+
+
+@async_route.route("/download/<path:file_path>")
+async def download_file(file_path):
+    """下载文件，支持所有存储类型"""
+    try:
+        storage = get_storage()
+        try:
+            await storage.get_object_info(file_path)
+        except ObjectNotFoundError:
+            abort(404)
+
+        download_response = await storage.generate_download_response(file_path)
+
+        if not download_response:
+            abort(403)
+
+        if download_response["type"] == "redirect":
+            return redirect(download_response["url"])
+        elif download_response["type"] == "content":
+            return Response(
+                download_response["content"],
+                headers=download_response["headers"],
+                mimetype=download_response["mimetype"],
+            )
+        elif download_response["type"] in ("file", "stream"):
+            return await send_storage_object(download_response, as_attachment=True)
+        else:
+            abort(500)
+
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        abort(503)
+    except Exception as e:
+        print(f"Download error: {e}")
+        abort(500)
+
+
+@async_route.route("/search")
+@async_route.route("/du", defaults={"prefix": ""})
+@async_route.route("/du/<path:prefix>")
+@async_route.route("/tree", defaults={"prefix": ""})
+@async_route.route("/tree/<path:prefix>")
+@async_route.route("/zip/<path:prefix>")
+@async_route.route("/zip", methods=["POST"])
+async def unsupported_route(prefix=None):
+    """
+    搜索、文件夹用量和目录树依赖元数据索引，ZIP 打包依赖同步存储后端，ASGI 模式下均不可用
+
+    显式返回 501，而不是落入目录路由返回 HTML 页面
+    """
+    return jsonify({"success": False, "error": "Not supported in ASGI mode"}), 501
+
+
+@async_route.route("/thumb/<path:file_path>")
+async def thumb(file_path):
+    """返回图片的缩略图"""
+    storage = get_storage()
+    cache_headers = {
+        "Cache-Control": f"public, max-age={Config.THUMB_TTL_SECONDS}",
+        "ETag": f'W/"{hashlib.md5(file_path.encode("utf-8")).hexdigest()}"',
+    }
+
+    etag = request.headers.get("If-None-Match")
+    if etag and etag == cache_headers["ETag"]:
+        return Response(status=304, headers=cache_headers)
+
+    try:
+        try:
+            info = await storage.get_object_info(file_path)
+        except ObjectNotFoundError:
+            abort(404)
+
+        size = int(info.get("ContentLength", 0) or 0)
+        limit = 6 * 1024 * 1024
+        if size > limit:
+            presigned = await storage.generate_presigned_url(file_path)
+            if presigned:
+                return redirect(presigned)
+            abort(413)
+
+        thumb_bytes = await storage.generate_thumbnail(file_path)
+        response = Response(thumb_bytes, mimetype="image/jpeg")
+        response.headers.update(cache_headers)
+        return response
+    except CircuitOpenError:
+        abort(503)
+    except Exception:
+        abort(404)
+
+
+@async_route.route("/upload", methods=["POST"])
+async def upload():
+    """上传文件到存储"""
+    try:
+        storage = get_storage()
+        files = await request.files
+        if "file" not in files:
+            return jsonify({"success": False, "error": "No file provided"}), 400
+
+        file = files["file"]
+        if file.filename == "":
+            return jsonify({"success": False, "error": "No file selected"}), 400
+
+        form = await request.form
+        prefix = form.get("prefix", "")
+        if prefix and not prefix.endswith("/"):
+            prefix = prefix + "/"
+
+        # 解压上传依赖同步存储后端，不能静默地把压缩包作为单个文件保存
+        if form.get("extract") in ("1", "true"):
+            return jsonify({"success": False, "error": "Archive extraction is not supported in ASGI mode"}), 501
+
+        file_path = prefix + file.filename
+        success = await storage.upload_file(file_path, file.read(), file.content_type)
+
+        if success:
+            return jsonify({"success": True, "message": "File uploaded successfully", "path": file_path})
+        else:
+            return jsonify({"success": False, "error": "Upload failed"}), 500
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@async_route.route("/delete/<path:file_path>", methods=["DELETE", "POST"])
+async def delete(file_path):
+    """删除存储中的文件"""
+    try:
+        success = await get_storage().delete_file(file_path)
+        if success:
+            return jsonify({"success": True, "message": "File deleted successfully"})
+        else:
+            return jsonify({"success": False, "error": "Delete failed"}), 500
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@async_route.route("/rename/<path:old_key>", methods=["POST"])
+async def rename(old_key):
+    """重命名存储中的文件"""
+    try:
+        data = await request.get_json()
+        new_name = data.get("newName")
+        if not new_name:
+            return jsonify({"success": False, "error": "New name not provided"}), 400
+
+        old_key_parts = old_key.rsplit("/", 1)
+        new_key = f"{old_key_parts[0]}/{new_name}" if len(old_key_parts) > 1 else new_name
+
+        success = await get_storage().rename_file(old_key, new_key)
+        if success:
+            return jsonify({"success": True, "message": "File renamed successfully", "newKey": new_key})
+        else:
+            return jsonify({"success": False, "error": "Rename failed"}), 500
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@async_route.route("/delete_folder/<path:prefix>", methods=["DELETE"])
+async def delete_folder_route(prefix):
+    """删除存储中的文件夹"""
+    try:
+        if not prefix.endswith("/"):
+            prefix += "/"
+        success = await get_storage().delete_folder(prefix)
+        if success:
+            return jsonify({"success": True, "message": "Folder deleted successfully"})
+        else:
+            return jsonify({"success": False, "error": "Folder delete failed"}), 500
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@async_route.route("/rename_folder/<path:old_prefix>", methods=["POST"])
+async def rename_folder_route(old_prefix):
+    """重命名存储中的文件夹"""
+    try:
+        data = await request.get_json()
+        new_name = data.get("newName")
+        if not new_name:
+            return jsonify({"success": False, "error": "New name not provided"}), 400
+
+        if not old_prefix.endswith("/"):
+            old_prefix += "/"
+
+        prefix_parts = old_prefix.rstrip("/").rsplit("/", 1)
+        new_prefix = f"{prefix_parts[0]}/{new_name}/" if len(prefix_parts) > 1 else f"{new_name}/"
+
+        success = await get_storage().rename_folder(old_prefix, new_prefix)
+        if success:
+            return jsonify({"success": True, "message": "Folder renamed successfully", "newPrefix": new_prefix})
+        else:
+            return jsonify({"success": False, "error": "Folder rename failed"}), 500
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+async def _transfer(copy: bool):
+    """复制或移动文件/文件夹的公共逻辑"""
+    storage = get_storage()
+    data = await request.get_json()
+    source = data.get("source")
+    destination = data.get("destination")
+    is_folder = data.get("is_folder", False)
+
+    if not source or not destination:
+        return jsonify({"success": False, "error": "Source or destination not provided"}), 400
+
+    if is_folder:
+        if not source.endswith("/"):
+            source += "/"
+        if not destination.endswith("/"):
+            destination += "/"
+        func = storage.copy_folder if copy else storage.rename_folder
+    else:
+        func = storage.copy_file if copy else storage.rename_file
+
+    if await func(source, destination):
+        return jsonify({"success": True, "message": f"Item {'copied' if copy else 'moved'} successfully"})
+    return jsonify({"success": False, "error": "Copy failed" if copy else "Move failed"}), 500
+
+
+@async_route.route("/copy", methods=["POST"])
+async def copy_item():
+    """复制文件或文件夹"""
+    try:
+        return await _transfer(copy=True)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@async_route.route("/move", methods=["POST"])
+async def move_item():
+    """移动文件或文件夹"""
+    try:
+        return await _transfer(copy=False)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@async_route.route("/create_folder", methods=["POST"])
+async def create_folder_route():
+    """创建文件夹"""
+    try:
+        data = await request.get_json()
+        path = data.get("path")
+        if not path:
+            return jsonify({"success": False, "error": "Path not provided"}), 400
+
+        if not path.endswith("/"):
+            path += "/"
+
+        success = await get_storage().create_folder(path)
+        if success:
+            return jsonify({"success": True, "message": "Folder created successfully"})
+        else:
+            return jsonify({"success": False, "error": "Folder creation failed"}), 500
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+async def execute_batch(storage, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """执行批量操作，分组和结果记录与 handlers.routes.execute_batch 相同"""
+    results = BatchResults()
+    groups = split_batch(operations)
+
+    if groups["head"]:
+        infos = await storage.head_many([op["key"] for op in groups["head"]])
+        record_heads(storage, groups["head"], infos, results)
+
+    if groups["transfer"]:
+        copied = await storage.copy_many([(op["source"], op["destination"]) for op in groups["transfer"]])
+        moved = record_transfers(groups["transfer"], copied, results)
+        if moved:
+            deleted = await storage.delete_many([op["source"] for op in moved])
+            record_deletes(moved, deleted, results, key="source", error="Copied but failed to delete source")
+
+    if groups["delete"]:
+        record_deletes(groups["delete"], await storage.delete_many([op["key"] for op in groups["delete"]]), results)
+
+    for op in groups["folder"]:
+        try:
+            if op["op"] == "delete":
+                success = await storage.delete_folder(op["key"])
+            elif op["op"] == "copy":
+                success = await storage.copy_folder(op["source"], op["destination"])
+            else:
+                success = await storage.rename_folder(op["source"], op["destination"])
+            results.add(op, bool(success), **({} if success else {"error": "Folder operation failed"}))
+        except Exception as e:
+            results.add(op, False, error=str(e))
+
+    return results.ordered()
+
+
+@async_route.route("/batch", methods=["POST"])
+async def batch():
+    """在一个请求中执行多个文件操作，并返回逐项结果"""
+    try:
+        operations, error = parse_batch_operations(await request.get_json(silent=True))
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        results = await execute_batch(get_storage(), operations)
+        failed = sum(1 for result in results if not result["success"])
+        return jsonify(
+            {
+                "success": failed == 0,
+                "succeeded": len(results) - failed,
+                "failed": failed,
+                "results": results,
+            }
+        )
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@async_route.route("/jobs", methods=["POST"])
+async def create_job():
+    """提交文件夹复制/移动/删除的后台任务（任务在线程池中使用同步存储后端执行）"""
+    try:
+        params, error = parse_job_request(await request.get_json(silent=True))
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        job = JobRunner.get_runner().submit(params["op"], params["source"], params["destination"])
+        return jsonify({"success": True, "job": job}), 202
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@async_route.route("/jobs/<job_id>")
+async def get_job(job_id):
+    """查询后台任务的状态和进度"""
+    job = JobRunner.get_runner().get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, "job": job})
+
+
+@async_route.route("/jobs/<job_id>/events")
+async def job_events(job_id):
+    """以 Server-Sent Events 推送后台任务的进度，任务结束后关闭连接"""
+    runner = JobRunner.get_runner()
+    if runner.get(job_id) is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+
+    async def _stream():
+        last_update = None
+        idle = 0.0
+        while True:
+            job = runner.get(job_id)
+            if job["updated_at"] != last_update:
+                last_update = job["updated_at"]
+                idle = 0.0
+                yield f"data: {json.dumps(job)}\n\n".encode()
+                if job["status"] in FINISHED_STATUSES:
+                    return
+            elif idle >= JOB_EVENTS_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield b": keepalive\n\n"
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+            idle += JOB_EVENTS_POLL_SECONDS
+
+    response = Response(_stream(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    response.timeout = None
+    return response
+
+
+@async_route.route("/metrics")
+async def metrics():
+    """以 Prometheus 文本格式输出进程内的指标（需要指标令牌或管理员令牌）"""
+    if not Config.METRICS_ENABLED:
+        return jsonify({"success": False, "error": "Metrics are disabled"}), 404
+    if not can_read_metrics(request.headers):
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@async_route.route("/admin/profiles")
+async def admin_profiles():
+    """列出已保存的请求性能分析结果（需要管理员令牌）"""
+    if not is_admin(request.headers):
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+    return jsonify({"success": True, "profiles": list_profiles()})
+
+
+@async_route.route("/admin/profiles/<name>")
+async def admin_profile(name):
+    """下载 pstats 分析结果，format=text 时返回按 sort 排序的文本摘要（需要管理员令牌）"""
+    if not is_admin(request.headers):
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+    path = get_profile_path(name)
+    if path is None:
+        return jsonify({"success": False, "error": "Profile not found"}), 404
+
+    if request.args.get("format") == "text":
+        try:
+            text = format_profile(path, request.args.get("sort", "cumulative"))
+        except KeyError:
+            return jsonify({"success": False, "error": "Invalid sort key"}), 400
+        return Response(text, mimetype="text/plain")
+    with open(path, "rb") as f:
+        data = f.read()
+    return Response(
+        data,
+        mimetype="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{name}"'},
+    )
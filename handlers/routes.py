@@ -1,14 +1,67 @@
 import hashlib
+import itertools
+import json
+import time
 from datetime import datetime
-from typing import Any, Dict, List
-
-from flask import Blueprint, Response, abort, jsonify, redirect, render_template, request
-
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    g,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    stream_with_context,
+)
+from werkzeug.exceptions import HTTPException
+
+from archive import (
+    ArchiveError,
+    SelectionNotFoundError,
+    ZipStreamer,
+    collect_entries,
+    extract_archive,
+    is_archive,
+    walk_folder,
+)
 from config import Config
+from jobs import FINISHED_STATUSES, JOB_OPERATIONS, JobRunner
+from metrics import REGISTRY, current_route
+from profiling import (
+    RequestProfiler,
+    can_read_metrics,
+    format_profile,
+    get_profile_path,
+    is_admin,
+    list_profiles,
+    should_profile,
+)
+from recording import current_cassette, save_cassette, start_recording
+from storages.base import IndexUnavailableError, ObjectNotFoundError, object_version
 from storages.factory import StorageFactory
+from storages.resilience import CircuitOpenError
+from storages.search import SearchQuery
+from tracing import RequestTrace, current_trace, span
+from utils import get_file_icon
 
 main_route = Blueprint("main", __name__)
 
+# 任务进度推送的轮询间隔和保活间隔（秒）
+JOB_EVENTS_POLL_SECONDS = 0.5
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+
+# /search 单次返回的最大结果数
+SEARCH_MAX_LIMIT = 500
+# /du 最多返回的子文件夹层数
+DU_MAX_DEPTH = 5
+# /tree 最多返回的层数（省略 depth 时返回整棵子树）
+TREE_MAX_DEPTH = 64
+
 # 延迟初始化的存储实例
 _storage = None
 
@@ -21,14 +74,187 @@ def get_storage():
     return _storage
 
 
+def route_name(endpoint: Optional[str]) -> str:
+    """指标中使用的路由名称（去掉蓝图前缀，未匹配的请求记为 unmatched）"""
+    return endpoint.rsplit(".", 1)[-1] if endpoint else "unmatched"
+
+
+def record_request(route: str, method: str, status: int, elapsed: float) -> None:
+    """记录一次 HTTP 请求的计数和延迟"""
+    if not Config.METRICS_ENABLED:
+        return
+    REGISTRY.inc("cloudindex_http_requests_total", route=route, method=method, status=status)
+    REGISTRY.observe("cloudindex_http_request_duration_seconds", elapsed, route=route)
+
+
+def begin_request(endpoint: Optional[str]) -> float:
+    """
+    标记之后的存储调用所属的路由，并按配置开始记录请求耗时明细
+
+    Returns:
+        请求开始时间
+    """
+    current_route.set(route_name(endpoint))
+    current_trace.set(RequestTrace() if Config.TRACING_ENABLED else None)
+    return time.perf_counter()
+
+
+def end_request(response, endpoint: Optional[str], method: str, path: str, started: float):
+    """
+    记录请求指标，输出 Server-Timing 响应头，超过阈值时输出慢请求日志
+    （流式响应只统计到开始发送为止）
+    """
+    route = route_name(endpoint)
+    elapsed = time.perf_counter() - started
+    record_request(route, method, response.status_code, elapsed)
+
+    trace = current_trace.get()
+    if trace is None:
+        return response
+    response.headers["Server-Timing"] = trace.server_timing()
+    if Config.SLOW_REQUEST_THRESHOLD_MS and elapsed * 1000 >= Config.SLOW_REQUEST_THRESHOLD_MS:
+        record = {
+            "event": "slow_request",
+            "route": route,
+            "method": method,
+            "path": path,
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 1),
+            "spans": trace.spans(),
+        }
+        print(json.dumps(record, ensure_ascii=False))
+    return response
+
+
+@main_route.before_app_request
+def start_request_metrics():
+    """记录请求开始时间，并标记之后的存储调用所属的路由"""
+    g.request_started = begin_request(request.endpoint)
+    g.profiler = RequestProfiler.start() if should_profile(request.headers) else None
+    g.cassette = start_recording(
+        request.method, request.full_path.rstrip("?"), request.get_json(silent=True) if request.is_json else None
+    )
+
+
+@main_route.after_app_request
+def finish_request_metrics(response):
+    """记录请求的状态码、耗时和耗时明细，保存请求的性能分析结果和上游调用录像"""
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        name = profiler.stop(route_name(request.endpoint))
+        if name:
+            response.headers["X-Profile-Id"] = name
+    cassette = g.pop("cassette", None)
+    if cassette is not None:
+        name = save_cassette(cassette, route_name(request.endpoint), response.status_code)
+        if name:
+            response.headers["X-Cassette-Id"] = name
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    return end_request(response, request.endpoint, request.method, request.path, started)
+
+
+@main_route.teardown_app_request
+def clear_request_route(_error=None):
+    """请求结束后恢复默认路由标记，避免复用的工作线程把后续调用记到上一个请求"""
+    current_route.set("background")
+    current_trace.set(None)
+    current_cassette.set(None)
+    # 请求异常结束时 after_request 不会执行，在这里停止分析
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.stop()
+
+
 def get_file_url(key: str) -> str:
     """生成通过服务器访问文件的 URL"""
     return f"/file/{key}"
 
 
-def build_file_entry(obj: Dict[str, Any], prefix: str) -> Dict[str, Any] | None:
+def send_storage_file(download_response: Dict[str, Any], as_attachment: bool):
+    """
+    发送 "file" 类型下载响应指向的本地文件
+
+    支持 Range 和条件请求；WSGI 服务器提供 wsgi.file_wrapper 时（如 gunicorn）由其用 sendfile 发送
+    """
+    return send_file(
+        download_response["path"],
+        mimetype=download_response["mimetype"],
+        as_attachment=as_attachment,
+        download_name=download_response["filename"],
+        conditional=True,
+        max_age=0,
+    )
+
+
+def content_disposition(filename: str, as_attachment: bool) -> str:
+    """构造 Content-Disposition 头，使用 RFC 5987 编码处理文件名中的特殊字符"""
+    disposition = "attachment" if as_attachment else "inline"
+    ascii_name = filename.encode("ascii", "replace").decode().replace('"', "")
+    return f"{disposition}; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def stream_storage_object(
+    storage, key: str, download_response: Dict[str, Any], info: Dict[str, Any], as_attachment: bool
+) -> Response:
+    """
+    逐块转发 "stream" 类型下载响应对应的对象内容
+
+    支持单个字节范围的 Range 请求（206，用于断点续传和媒体拖动）和 If-None-Match 条件请求；
+    上游连接在发送完毕或客户端断开时关闭，每个下载占用的内存不随文件大小增长。
+
+    Args:
+        storage: 存储实例
+        key: 对象键名
+        download_response: generate_download_response 返回的 "stream" 类型字典
+        info: 对象信息，提供大小和用作 ETag 的内容版本
+        as_attachment: 是否作为附件下载
+    """
+    size = info.get("ContentLength", info.get("Size"))
+    etag = object_version(info)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(download_response["filename"], as_attachment),
+        **download_response.get("headers", {}),
+    }
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+
+    byte_range = request.range
+    if byte_range is not None and request.if_range.etag and request.if_range.etag != etag:
+        # If-Range 不匹配时（文件已变化）返回完整内容
+        byte_range = None
+    if byte_range is not None and size is not None and len(byte_range.ranges) == 1:
+        bounds = byte_range.range_for_length(size)
+        if bounds is None:
+            return Response(status=416, headers={"Content-Range": f"bytes */{size}"})
+        start, stop = bounds
+        obj = storage.get_object_range(key, start, stop - 1)
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+        headers["Content-Length"] = str(stop - start)
+        status = 206
+    else:
+        obj = storage.get_object(key)
+        length = obj.get("ContentLength")
+        if length is not None:
+            headers["Content-Length"] = str(length)
+        status = 200
+
+    return Response(
+        obj["Body"].iter_chunks(Config.STREAM_CHUNK_SIZE),
+        status=status,
+        headers=headers,
+        mimetype=download_response["mimetype"],
+        direct_passthrough=True,
+    )
+
+
+def build_file_entry(obj: Dict[str, Any], prefix: str, storage=None) -> Dict[str, Any] | None:
     """根据对象信息构建文件条目。"""
-    storage = get_storage()
+    storage = storage or get_storage()
     key = obj.get("Key", "")
     if not key:
         return None
@@ -56,27 +282,29 @@ def build_file_entry(obj: Dict[str, Any], prefix: str) -> Dict[str, Any] | None:
     return entry
 
 
-def build_directory_entry(prefix_value: str | None, current_prefix: str) -> Dict[str, Any] | None:
-    """根据前缀构建目录条目。"""
+def build_directory_entry(
+    prefix_value: str | None, current_prefix: str, size: int | None = None, count: int | None = None
+) -> Dict[str, Any] | None:
+    """根据前缀构建目录条目，size 和 count 为文件夹下所有文件的总大小和文件数（元数据索引提供时）。"""
     if not prefix_value:
         return None
 
     rel = prefix_value[len(current_prefix) :].rstrip("/") if current_prefix else prefix_value.rstrip("/")
 
-    return {"name": rel, "key": prefix_value, "is_dir": True}
+    return {"name": rel, "key": prefix_value, "is_dir": True, "size": size, "count": count}
 
 
-def build_entries(response: Dict[str, Any], prefix: str) -> List[Dict[str, Any]]:
-    """将存储响应转换为用于模板渲染的条目列表。"""
+def build_entries(response: Dict[str, Any], prefix: str, storage=None) -> List[Dict[str, Any]]:
+    """将存储响应转换为用于模板渲染的条目列表（storage 默认为同步存储实例）。"""
     entries: List[Dict[str, Any]] = []
 
     for obj in response.get("Contents", []):
-        entry = build_file_entry(obj, prefix)
+        entry = build_file_entry(obj, prefix, storage)
         if entry:
             entries.append(entry)
 
     for pref in response.get("CommonPrefixes", []):
-        directory_entry = build_directory_entry(pref.get("Prefix"), prefix)
+        directory_entry = build_directory_entry(pref.get("Prefix"), prefix, pref.get("Size"), pref.get("Count"))
         if directory_entry:
             entries.append(directory_entry)
 
@@ -106,16 +334,22 @@ def index():
         prefix = request.args.get("prefix", "") or ""
 
         response = storage.list_objects(prefix)
-        entries = build_entries(response, prefix)
+        with span("entries"):
+            entries = build_entries(response, prefix)
         crumbs = build_crumbs(prefix)
 
-        return render_template(
-            "index.html",
-            entries=entries,
-            current_prefix=prefix,
-            crumbs=crumbs,
-            current_year=datetime.now().year,
-        )
+        with span("render"):
+            return render_template(
+                "index.html",
+                entries=entries,
+                current_prefix=prefix,
+                crumbs=crumbs,
+                current_year=datetime.now().year,
+                index_enabled=Config.METADATA_INDEX_ENABLED,
+            )
+    except CircuitOpenError:
+        # 后端熔断且没有可用的缓存数据
+        abort(503)
     except Exception:
         abort(500)
 
@@ -130,16 +364,22 @@ def browse(prefix_path):
             prefix = prefix + "/"
 
         response = storage.list_objects(prefix)
-        entries = build_entries(response, prefix)
+        with span("entries"):
+            entries = build_entries(response, prefix)
         crumbs = build_crumbs(prefix)
 
-        return render_template(
-            "index.html",
-            entries=entries,
-            current_prefix=prefix,
-            crumbs=crumbs,
-            current_year=datetime.now().year,
-        )
+        with span("render"):
+            return render_template(
+                "index.html",
+                entries=entries,
+                current_prefix=prefix,
+                crumbs=crumbs,
+                current_year=datetime.now().year,
+                index_enabled=Config.METADATA_INDEX_ENABLED,
+            )
+    except CircuitOpenError:
+        # 后端熔断且没有可用的缓存数据
+        abort(503)
     except Exception:
         abort(500)
 
@@ -149,25 +389,41 @@ def serve_file(file_path):
     """重定向到原始存储 URL，节省服务器资源"""
     try:
         storage = get_storage()
-        # 验证文件存在
+        # 验证文件存在（优先命中列表阶段填充的元数据缓存，未命中时才访问后端）
         try:
-            storage.get_object_info(file_path)
-        except Exception:
+            info = storage.get_object_info(file_path)
+        except ObjectNotFoundError:
             abort(404)
 
         # 尝试获取预签名 URL（用于私有存储或需要时间限制的 URL）
         presigned = storage.generate_presigned_url(file_path)
         if presigned:
-            return redirect(presigned)
+            response = redirect(presigned)
+            # 同一时间桶内预签名 URL 保持不变，允许浏览器和 CDN 缓存该重定向
+            max_age = storage.get_presigned_url_max_age()
+            if max_age > 0:
+                response.headers["Cache-Control"] = f"public, max-age={max_age}, s-maxage={max_age}"
+            return response
 
         # 如果没有预签名 URL，尝试获取公共 URL
         public_url = storage.get_public_url(file_path)
         if public_url:
             return redirect(public_url)
 
+        # 本地存储没有 URL，由服务器直接发送或转发文件
+        download_response = storage.generate_download_response(file_path)
+        if download_response and download_response["type"] == "file":
+            return send_storage_file(download_response, as_attachment=False)
+        if download_response and download_response["type"] == "stream":
+            return stream_storage_object(storage, file_path, download_response, info, as_attachment=False)
+
         # 如果都没有可用的 URL，返回错误
         abort(403)
 
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        abort(503)
     except Exception:
         abort(500)
 
@@ -177,10 +433,10 @@ def download_file(file_path):
     """下载文件，支持所有存储类型"""
     try:
         storage = get_storage()
-        # 验证文件存在
+        # 验证文件存在（优先命中列表阶段填充的元数据缓存，未命中时才访问后端）
         try:
-            storage.get_object_info(file_path)
-        except Exception:
+            info = storage.get_object_info(file_path)
+        except ObjectNotFoundError:
             abort(404)
 
         # 使用存储后端的统一接口生成下载响应
@@ -198,14 +454,228 @@ def download_file(file_path):
                 headers=download_response["headers"],
                 mimetype=download_response["mimetype"],
             )
+        elif download_response["type"] == "file":
+            return send_storage_file(download_response, as_attachment=True)
+        elif download_response["type"] == "stream":
+            return stream_storage_object(storage, file_path, download_response, info, as_attachment=True)
         else:
             abort(500)
 
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        abort(503)
     except Exception as e:
         print(f"Download error: {e}")
         abort(500)
 
 
+def zip_response(storage, entries, filename: str) -> Response:
+    """以 ZIP 数据流返回一组条目，边读取边发送"""
+    streamer = ZipStreamer(storage, entries)
+    return Response(
+        stream_with_context(iter(streamer)),
+        mimetype="application/zip",
+        headers={"Content-Disposition": content_disposition(filename, True), "Cache-Control": "no-store"},
+        direct_passthrough=True,
+    )
+
+
+@main_route.route("/search")
+def search():
+    """
+    按文件名搜索整个存储中的文件
+
+    参数 q 为子串，glob 为通配符模式，ext 为逗号分隔的扩展名，prefix 限定文件夹，limit 为返回数量；
+    结果按匹配程度排序（文件名完全匹配、以关键字开头、单词开头匹配、包含关键字、仅路径匹配）。
+    """
+    query = SearchQuery.create(
+        text=request.args.get("q", ""),
+        glob=request.args.get("glob", ""),
+        extensions=request.args.get("ext", ""),
+        prefix=request.args.get("prefix", "").lstrip("/"),
+        limit=min(max(request.args.get("limit", 50, type=int), 1), SEARCH_MAX_LIMIT),
+    )
+    if query.is_empty():
+        return jsonify({"success": False, "error": "No search criteria provided"}), 400
+    try:
+        storage = get_storage()
+        found = storage.search_objects(query)
+        results = []
+        for obj in found["Contents"]:
+            entry = build_file_entry(obj, "", storage)
+            entry["name"] = obj["Key"].rsplit("/", 1)[-1]
+            entry["folder"] = obj["Key"].rsplit("/", 1)[0] + "/" if "/" in obj["Key"] else ""
+            results.append(entry)
+        return jsonify(
+            {"success": True, "results": results, "total": found["Total"], "truncated": found["Total"] > len(results)}
+        )
+    except IndexUnavailableError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except CircuitOpenError:
+        return jsonify({"success": False, "error": "Storage backend unavailable"}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def usage_to_json(usage: Dict[str, Any]) -> Dict[str, Any]:
+    """将 get_folder_usage 的统计结果转换为接口返回的格式"""
+    return {
+        "prefix": usage["Prefix"],
+        "size": usage["Size"],
+        "count": usage["Count"],
+        "folders": [usage_to_json(folder) for folder in usage["Folders"]],
+    }
+
+
+@main_route.route("/du", defaults={"prefix": ""})
+@main_route.route("/du/<path:prefix>")
+def folder_usage(prefix):
+    """
+    统计文件夹（递归）的总大小和文件数
+
+    参数 depth 为同时返回的子文件夹层数（默认 1，0 表示只统计文件夹本身）。
+    """
+    folder = prefix.strip("/")
+    depth = min(max(request.args.get("depth", 1, type=int), 0), DU_MAX_DEPTH)
+    try:
+        usage = get_storage().get_folder_usage(folder + "/" if folder else "", depth)
+        return jsonify({"success": True, **usage_to_json(usage)})
+    except IndexUnavailableError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except CircuitOpenError:
+        return jsonify({"success": False, "error": "Storage backend unavailable"}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def usage_to_tree(usage: Dict[str, Any], depth: int) -> Dict[str, Any]:
+    """将 get_folder_usage 的统计结果转换为紧凑的目录树，只保留文件夹名；depth 层以下的节点不含 children"""
+    node = {"name": usage["Prefix"].rstrip("/").rsplit("/", 1)[-1], "size": usage["Size"], "count": usage["Count"]}
+    if depth > 0:
+        node["children"] = [usage_to_tree(folder, depth - 1) for folder in usage["Folders"]]
+    return node
+
+
+def tree_file_entry(obj: Dict[str, Any], prefix: str, storage) -> Dict[str, Any] | None:
+    """目录树中的文件条目：列表页面渲染一行所需的字段，另加图标类名"""
+    entry = build_file_entry(obj, prefix, storage)
+    if entry:
+        del entry["is_dir"]
+        entry["icon"] = get_file_icon(entry["name"])
+    return entry
+
+
+@main_route.route("/tree", defaults={"prefix": ""})
+@main_route.route("/tree/<path:prefix>")
+def folder_tree(prefix):
+    """
+    返回文件夹的目录树（文件夹附带递归的总大小和文件数），由元数据索引直接生成
+
+    参数 depth 限制返回的层数，省略时返回整棵子树；files=1 时根节点附带其直接子文件，
+    前端切换文件夹时据此渲染列表。ETag 为索引的版本号，在读取任何数据之前比较，
+    索引未变化时直接返回 304。索引未启用或已过期时返回 503，不在请求中遍历后端。
+    """
+    folder = prefix.strip("/")
+    folder_prefix = folder + "/" if folder else ""
+    depth = min(max(request.args.get("depth", TREE_MAX_DEPTH, type=int), 0), TREE_MAX_DEPTH)
+    with_files = request.args.get("files") == "1"
+    storage = get_storage()
+
+    version = storage.get_index_version()
+    if version is None:
+        error = "Metadata index is not ready" if Config.METADATA_INDEX_ENABLED else "Metadata index is not enabled"
+        return jsonify({"success": False, "error": error}), 503
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    if request.if_none_match.contains(version):
+        return Response(status=304, headers=headers)
+
+    try:
+        usage = storage.get_folder_usage(folder_prefix, depth)
+        tree = usage_to_tree(usage, depth)
+        if with_files:
+            contents = storage.list_objects(folder_prefix).get("Contents", [])
+            tree["files"] = [tree_file_entry(obj, folder_prefix, storage) for obj in contents]
+            tree["files"] = [entry for entry in tree["files"] if entry]
+    except IndexUnavailableError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except CircuitOpenError:
+        return jsonify({"success": False, "error": "Storage backend unavailable"}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    body = json.dumps(
+        {"success": True, "prefix": usage["Prefix"], "tree": tree}, ensure_ascii=False, separators=(",", ":")
+    )
+    return Response(body, mimetype="application/json", headers=headers)
+
+
+@main_route.route("/zip/<path:prefix>")
+def download_folder(prefix):
+    """将文件夹（含子文件夹）打包为 ZIP 下载"""
+    folder = prefix.strip("/")
+    if not folder:
+        abort(404)
+    try:
+        storage = get_storage()
+        # 先列举一次（结果进入目录列表缓存，打包时不再重复请求），不存在的文件夹返回 404
+        listing = storage.list_objects(folder + "/")
+        if not listing.get("Contents") and not listing.get("CommonPrefixes"):
+            abort(404)
+        parent = folder.rsplit("/", 1)[0] + "/" if "/" in folder else ""
+        entries = walk_folder(storage, folder + "/", parent)
+        return zip_response(storage, entries, folder.rsplit("/", 1)[-1] + ".zip")
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        abort(503)
+    except Exception as e:
+        print(f"Zip error: {e}")
+        abort(500)
+
+
+@main_route.route("/zip", methods=["POST"])
+def download_selection():
+    """
+    将选中的文件和文件夹打包为 ZIP 下载
+
+    接受 JSON {"keys": [...], "base": "a/", "name": "files.zip"}，或表单字段 key（可重复）、base、name。
+    压缩包中的路径相对于 base（通常为当前目录）。
+    """
+    data = request.get_json(silent=True) if request.is_json else None
+    if isinstance(data, dict):
+        keys = data.get("keys") or []
+        base = data.get("base") or ""
+        name = data.get("name") or ""
+    else:
+        keys = request.form.getlist("key")
+        base = request.form.get("base", "")
+        name = request.form.get("name", "")
+    keys = [key.lstrip("/") for key in keys if isinstance(key, str) and key.strip("/")]
+    if not keys:
+        return jsonify({"success": False, "error": "No files selected"}), 400
+
+    base = base.strip("/") + "/" if base.strip("/") else ""
+    if not name:
+        name = (base.rstrip("/").rsplit("/", 1)[-1] or "files") + ".zip"
+    try:
+        storage = get_storage()
+        keys = list(dict.fromkeys(keys))
+        entries = iter(collect_entries(storage, keys, base))
+        # 选中的项目都不存在（或只有空文件夹）时与 /zip/<prefix> 一致返回 404，而不是空的压缩包
+        first = next(entries, None)
+        if first is None:
+            return jsonify({"success": False, "error": "Selected files not found"}), 404
+        return zip_response(storage, itertools.chain([first], entries), name)
+    except SelectionNotFoundError as e:
+        # 全部不存在时返回 404；部分不存在时返回 400，而不是生成缺少内容的压缩包
+        return jsonify({"success": False, "error": str(e)}), 404 if len(e.keys) == len(keys) else 400
+    except CircuitOpenError:
+        return jsonify({"success": False, "error": "Storage backend temporarily unavailable"}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @main_route.route("/thumb/<path:file_path>")
 def thumb(file_path):
     """返回图片的缩略图，使用 Vercel Cache Headers 避免重复从 R2 拉取"""
@@ -226,7 +696,7 @@ def thumb(file_path):
         # 对于较大的源文件，避免在函数内读取并处理，优先使用预签名 URL
         try:
             info = storage.get_object_info(file_path)
-        except Exception:
+        except ObjectNotFoundError:
             abort(404)
 
         size = int(info.get("ContentLength", 0) or 0)
@@ -241,6 +711,8 @@ def thumb(file_path):
         response = Response(thumb_bytes, mimetype="image/jpeg")
         response.headers.update(cache_headers)
         return response
+    except CircuitOpenError:
+        abort(503)
     except Exception:
         abort(404)
 
@@ -265,6 +737,10 @@ def upload():
         if prefix and not prefix.endswith("/"):
             prefix = prefix + "/"
 
+        # 解压模式：将压缩包中的文件分批写入当前目录
+        if request.form.get("extract") in ("1", "true"):
+            return upload_archive(storage, file, prefix)
+
         # 构建完整的文件路径
         file_path = prefix + file.filename
 
@@ -292,6 +768,27 @@ def upload():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def upload_archive(storage, file, prefix: str):
+    """解压上传的压缩包，返回逐项统计"""
+    if not is_archive(file.filename):
+        return jsonify({"success": False, "error": "Unsupported archive format"}), 400
+    try:
+        result = extract_archive(storage, file.stream, file.filename, prefix)
+    except ArchiveError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if not result["uploaded"] and not result["failed"]:
+        return jsonify({"success": False, "error": "Archive contains no files"}), 400
+    return jsonify(
+        {
+            "success": not result["failed"],
+            "uploaded": result["uploaded"],
+            "failed": result["failed"],
+            "bytes": result["bytes"],
+            "path": prefix,
+        }
+    )
+
+
 @main_route.route("/delete/<path:file_path>", methods=["DELETE", "POST"])
 def delete(file_path):
     """删除存储中的文件"""
@@ -486,3 +983,315 @@ def create_folder_route():
             return jsonify({"success": False, "error": "Folder creation failed"}), 500
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+
+
+BATCH_OPERATIONS = ("head", "delete", "copy", "move")
+
+
+def parse_batch_operations(data: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    校验并规范化 /batch 的操作列表
+
+    Returns:
+        (规范化后的操作列表, 错误信息)
+    """
+    operations = data.get("operations") if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return [], "Operations not provided"
+    if len(operations) > Config.BATCH_MAX_OPERATIONS:
+        return [], f"Too many operations (max {Config.BATCH_MAX_OPERATIONS})"
+
+    parsed: List[Dict[str, Any]] = []
+    for index, item in enumerate(operations):
+        if not isinstance(item, dict) or item.get("op") not in BATCH_OPERATIONS:
+            return [], f"Invalid operation at index {index}"
+
+        op = item["op"]
+        # head 只查询文件，不区分文件夹
+        is_folder = op != "head" and bool(item.get("is_folder", False))
+        if op in ("head", "delete"):
+            key = item.get("key")
+            if not key:
+                return [], f"Key not provided at index {index}"
+            if is_folder and not key.endswith("/"):
+                key += "/"
+            parsed.append({"index": index, "op": op, "key": key, "is_folder": is_folder})
+        else:
+            source = item.get("source")
+            destination = item.get("destination")
+            if not source or not destination:
+                return [], f"Source or destination not provided at index {index}"
+            if is_folder:
+                source = source if source.endswith("/") else source + "/"
+                destination = destination if destination.endswith("/") else destination + "/"
+            parsed.append(
+                {"index": index, "op": op, "source": source, "destination": destination, "is_folder": is_folder}
+            )
+    return parsed, None
+
+
+def serialize_object_info(storage, info: Dict[str, Any]) -> Dict[str, Any]:
+    """将对象元数据转换为可序列化的字典"""
+    return {
+        "size": info.get("ContentLength", info.get("Size")),
+        "last_modified": storage.format_timestamp(info["LastModified"]) if info.get("LastModified") else None,
+        "etag": info.get("ETag"),
+        "content_type": info.get("ContentType"),
+    }
+
+
+class BatchResults:
+    """按操作序号收集批量操作的逐项结果"""
+
+    def __init__(self):
+        self.items: Dict[int, Dict[str, Any]] = {}
+
+    def add(self, op: Dict[str, Any], success: bool, **extra) -> None:
+        key = op.get("key") or op.get("destination")
+        self.items[op["index"]] = {"index": op["index"], "op": op["op"], "key": key, "success": success, **extra}
+
+    def ordered(self) -> List[Dict[str, Any]]:
+        return [self.items[i] for i in sorted(self.items)]
+
+
+def split_batch(operations: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """按可合并的批量调用对操作分组，文件夹操作单独一组"""
+    files = [op for op in operations if not op["is_folder"]]
+    return {
+        "head": [op for op in files if op["op"] == "head"],
+        "transfer": [op for op in files if op["op"] in ("copy", "move")],
+        "delete": [op for op in files if op["op"] == "delete"],
+        "folder": [op for op in operations if op["is_folder"]],
+    }
+
+
+def record_heads(storage, ops: List[Dict[str, Any]], infos: Dict[str, Any], results: BatchResults) -> None:
+    """记录批量查询的结果"""
+    for op in ops:
+        info = infos.get(op["key"])
+        if info is None:
+            results.add(op, False, error="Not found")
+        else:
+            results.add(op, True, info=serialize_object_info(storage, info))
+
+
+def record_transfers(ops: List[Dict[str, Any]], copied: Dict[str, bool], results: BatchResults) -> List[Dict[str, Any]]:
+    """
+    记录批量复制的结果
+
+    Returns:
+        复制成功、仍需删除源文件的移动操作
+    """
+    moved = []
+    for op in ops:
+        if not copied.get(op["destination"]):
+            results.add(op, False, error="Copy failed" if op["op"] == "copy" else "Move failed")
+        elif op["op"] == "copy":
+            results.add(op, True)
+        else:
+            moved.append(op)
+    return moved
+
+
+def record_deletes(
+    ops: List[Dict[str, Any]], deleted: Dict[str, bool], results: BatchResults, key: str = "key", error: str = ""
+) -> None:
+    """记录批量删除的结果（移动操作按源文件记录）"""
+    for op in ops:
+        if deleted.get(op[key]):
+            results.add(op, True)
+        else:
+            results.add(op, False, error=error or "Delete failed")
+
+
+def _folder_operation(storage, op: Dict[str, Any]) -> bool:
+    """执行单个文件夹操作"""
+    if op["op"] == "delete":
+        return storage.delete_folder(op["key"])
+    if op["op"] == "copy":
+        return storage.copy_folder(op["source"], op["destination"])
+    return storage.rename_folder(op["source"], op["destination"])
+
+
+def execute_batch(storage, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    执行批量操作，同类的文件操作合并为一次批量调用
+
+    文件夹操作仍逐个执行；移动文件通过批量复制加批量删除源文件完成。
+
+    Returns:
+        按原始顺序排列的逐项结果
+    """
+    results = BatchResults()
+    groups = split_batch(operations)
+
+    if groups["head"]:
+        record_heads(storage, groups["head"], storage.head_many([op["key"] for op in groups["head"]]), results)
+
+    if groups["transfer"]:
+        copied = storage.copy_many([(op["source"], op["destination"]) for op in groups["transfer"]])
+        moved = record_transfers(groups["transfer"], copied, results)
+        if moved:
+            deleted = storage.delete_many([op["source"] for op in moved])
+            record_deletes(moved, deleted, results, key="source", error="Copied but failed to delete source")
+
+    if groups["delete"]:
+        record_deletes(groups["delete"], storage.delete_many([op["key"] for op in groups["delete"]]), results)
+
+    for op in groups["folder"]:
+        try:
+            success = bool(_folder_operation(storage, op))
+            results.add(op, success, **({} if success else {"error": "Folder operation failed"}))
+        except Exception as e:
+            results.add(op, False, error=str(e))
+
+    return results.ordered()
+
+
+@main_route.route("/batch", methods=["POST"])
+def batch():
+    """在一个请求中执行多个文件操作，并返回逐项结果"""
+    try:
+        storage = get_storage()
+        operations, error = parse_batch_operations(request.get_json(silent=True))
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        results = execute_batch(storage, operations)
+        failed = sum(1 for result in results if not result["success"])
+        return jsonify(
+            {
+                "success": failed == 0,
+                "succeeded": len(results) - failed,
+                "failed": failed,
+                "results": results,
+            }
+        )
+    except CircuitOpenError:
+        return jsonify({"success": False, "error": "Storage backend temporarily unavailable"}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def parse_job_request(data: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    校验并规范化 /jobs 的任务参数
+
+    Returns:
+        (规范化后的任务参数, 错误信息)
+    """
+    if not isinstance(data, dict) or data.get("op") not in JOB_OPERATIONS:
+        return None, f"Invalid operation, supported: {', '.join(JOB_OPERATIONS)}"
+
+    op = data["op"]
+    source = (data.get("source") or "").strip("/")
+    if not source:
+        return None, "Source not provided"
+    source += "/"
+
+    destination = None
+    if op != "delete":
+        destination = (data.get("destination") or "").strip("/")
+        if not destination:
+            return None, "Destination not provided"
+        destination += "/"
+        if destination.startswith(source):
+            return None, "Destination cannot be inside the source folder"
+
+    return {"op": op, "source": source, "destination": destination}, None
+
+
+@main_route.route("/jobs", methods=["POST"])
+def create_job():
+    """提交文件夹复制/移动/删除的后台任务"""
+    try:
+        params, error = parse_job_request(request.get_json(silent=True))
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        job = JobRunner.get_runner().submit(params["op"], params["source"], params["destination"])
+        return jsonify({"success": True, "job": job}), 202
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@main_route.route("/jobs/<job_id>")
+def get_job(job_id):
+    """查询后台任务的状态和进度"""
+    job = JobRunner.get_runner().get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, "job": job})
+
+
+@main_route.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    """以 Server-Sent Events 推送后台任务的进度，任务结束后关闭连接"""
+    runner = JobRunner.get_runner()
+    if runner.get(job_id) is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+
+    def _stream():
+        last_update = None
+        idle = 0.0
+        while True:
+            job = runner.get(job_id)
+            if job["updated_at"] != last_update:
+                last_update = job["updated_at"]
+                idle = 0.0
+                yield f"data: {json.dumps(job)}\n\n"
+                if job["status"] in FINISHED_STATUSES:
+                    return
+            elif idle >= JOB_EVENTS_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keepalive\n\n"
+            time.sleep(JOB_EVENTS_POLL_SECONDS)
+            idle += JOB_EVENTS_POLL_SECONDS
+
+    return Response(
+        stream_with_context(_stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@main_route.route("/metrics")
+def metrics():
+    """以 Prometheus 文本格式输出进程内的指标（需要指标令牌或管理员令牌）"""
+    if not Config.METRICS_ENABLED:
+        return jsonify({"success": False, "error": "Metrics are disabled"}), 404
+    if not can_read_metrics(request.headers):
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@main_route.route("/admin/profiles")
+def admin_profiles():
+    """列出已保存的请求性能分析结果（需要管理员令牌）"""
+    if not is_admin(request.headers):
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+    return jsonify({"success": True, "profiles": list_profiles()})
+
+
+@main_route.route("/admin/profiles/<name>")
+def admin_profile(name):
+    """下载 pstats 分析结果，format=text 时返回按 sort 排序的文本摘要（需要管理员令牌）"""
+    if not is_admin(request.headers):
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+    path = get_profile_path(name)
+    if path is None:
+        return jsonify({"success": False, "error": "Profile not found"}), 404
+
+    if request.args.get("format") == "text":
+        try:
+            text = format_profile(path, request.args.get("sort", "cumulative"))
+        except KeyError:
+            return jsonify({"success": False, "error": "Invalid sort key"}), 400
+        return Response(text, mimetype="text/plain")
+    with open(path, "rb") as f:
+        data = f.read()
+    return Response(
+        data,
+        mimetype="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{name}"'},
+    )
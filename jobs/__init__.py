@@ -0,0 +1,4 @@
+from .runner import JOB_OPERATIONS, JobRunner
+from .store import FINISHED_STATUSES, JobStore
+
+__all__ = ["FINISHED_STATUSES", "JOB_OPERATIONS", "JobRunner", "JobStore"]
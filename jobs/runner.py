@@ -0,0 +1,230 @@
+"""
+后台任务执行模块
+将文件夹的复制、移动、删除拆分为按批次提交的对象级操作，在后台线程中执行
+"""
+
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from storages.base import BaseStorage
+from storages.factory import StorageFactory
+
+from .store import COMPLETED, FAILED, FINALIZING, PLANNING, JobStore, LeaseLostError
+
+# 支持的任务类型
+JOB_OPERATIONS = ("copy", "move", "delete")
+
+
+class JobRunner:
+    """后台任务执行器
+
+    任务的执行分为三个阶段：
+    - planning: 递归列出源文件夹下的所有对象，写入任务存储
+    - transferring: 按批次调用 copy_many / delete_many，每批完成后写入检查点
+    - finalizing: 移动和删除任务最后清理源文件夹本身
+
+    执行者持有带过期时间的租约并在每个检查点续约；进程退出后租约过期，
+    任务会在下次启动或被查询时从最后一个检查点继续。
+    """
+
+    _instance: Optional["JobRunner"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        store: JobStore,
+        storage_getter: Callable[[], BaseStorage] = StorageFactory.get_storage,
+        workers: int = None,
+        chunk_size: int = None,
+        lease_seconds: float = None,
+    ):
+        """
+        初始化任务执行器
+
+        Args:
+            store: 任务存储
+            storage_getter: 返回存储实例的函数
+            workers: 同时执行的任务数
+            chunk_size: 每个检查点处理的对象数
+            lease_seconds: 租约时长（秒）
+        """
+        self.store = store
+        self.storage_getter = storage_getter
+        self.chunk_size = max(1, chunk_size or Config.JOB_CHUNK_SIZE)
+        self.lease_seconds = lease_seconds or Config.JOB_LEASE_SECONDS
+        self.owner = uuid.uuid4().hex
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers or Config.JOB_WORKERS), thread_name_prefix="job")
+        self._active: set = set()
+        self._active_lock = threading.Lock()
+
+    @classmethod
+    def get_runner(cls) -> "JobRunner":
+        """
+        获取任务执行器（单例模式），首次创建时恢复未完成的任务
+
+        Returns:
+            JobRunner: 任务执行器
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    path = Config.JOBS_DB_PATH or os.path.join(tempfile.gettempdir(), "cloud-index-jobs.sqlite3")
+                    runner = cls(JobStore(path))
+                    runner.resume()
+                    cls._instance = runner
+        return cls._instance
+
+    def submit(self, op: str, source: str, destination: Optional[str] = None) -> Dict[str, Any]:
+        """
+        提交一个任务并在后台开始执行
+
+        Args:
+            op: 任务类型（copy / move / delete）
+            source: 源文件夹前缀
+            destination: 目标文件夹前缀（删除任务为 None）
+
+        Returns:
+            任务信息字典
+        """
+        job = self.store.create(op, source, destination)
+        self._schedule(job["id"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取任务信息；若任务未结束且已无执行者，则重新调度
+
+        Returns:
+            任务信息字典，不存在时返回 None
+        """
+        if self.store.lease_expired(job_id):
+            self._schedule(job_id)
+        job = self.store.get(job_id)
+        if job and job["failed"]:
+            job["failed_keys"] = self.store.failed_keys(job_id)
+        return job
+
+    def resume(self) -> None:
+        """重新调度所有没有执行者的未完成任务"""
+        for job_id in self.store.unfinished():
+            self._schedule(job_id)
+
+    def _schedule(self, job_id: str) -> None:
+        with self._active_lock:
+            if job_id in self._active:
+                return
+            self._active.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str) -> None:
+        """执行任务，异常时释放租约并按指数退避稍后重试，超过最大尝试次数后标记为失败"""
+        try:
+            if not self.store.claim(job_id, self.owner, self.lease_seconds):
+                return
+            job = self.store.get(job_id)
+            # 之前的执行已写入规划检查点时，其中的对象可能已被处理过；规划阶段失败后的重试没有检查点
+            job["resumed"] = job["phase"] != PLANNING
+            try:
+                storage = self.storage_getter()
+                if job["phase"] == PLANNING:
+                    self._plan(storage, job)
+                if job["phase"] != FINALIZING:
+                    self._transfer(storage, job)
+                self._finalize(storage, job)
+            except LeaseLostError:
+                # 任务已由其他执行者继续，放弃本次执行
+                pass
+            except Exception as e:
+                print(f"Job {job_id} interrupted: {str(e)}")
+                if job["attempts"] >= Config.JOB_MAX_ATTEMPTS:
+                    self.store.finish(job_id, self.owner, FAILED, str(e))
+                else:
+                    delay = self._retry_delay(job["attempts"])
+                    self.store.release(job_id, self.owner, delay)
+                    self._schedule_later(job_id, delay)
+        finally:
+            with self._active_lock:
+                self._active.discard(job_id)
+
+    @staticmethod
+    def _retry_delay(attempts: int) -> float:
+        """第 attempts 次尝试失败后的重试间隔，按指数增长直到 JOB_RETRY_MAX_DELAY"""
+        return min(Config.JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1), Config.JOB_RETRY_MAX_DELAY)
+
+    def _schedule_later(self, job_id: str, delay: float) -> None:
+        """重试时间到达后重新调度（查询任务或进程重启同样会调度）"""
+        timer = threading.Timer(delay, self._schedule, (job_id,))
+        timer.daemon = True
+        timer.start()
+
+    def _plan(self, storage: BaseStorage, job: Dict[str, Any]) -> None:
+        """列出源文件夹下的所有对象并写入检查点"""
+        keys = list(storage.iter_keys(job["source"]))
+        self.store.save_plan(job["id"], keys, self.owner, self.lease_seconds)
+
+    def _transfer(self, storage: BaseStorage, job: Dict[str, Any]) -> None:
+        """按批次处理未完成的对象，每批写入一次检查点"""
+        while True:
+            items = self.store.pending_items(job["id"], self.chunk_size)
+            if not items:
+                break
+            results = self._process_chunk(storage, job, [key for _, key in items])
+            self.store.checkpoint(
+                job["id"],
+                self.owner,
+                {seq: results.get(key, False) for seq, key in items},
+                self.lease_seconds,
+            )
+        self.store.set_phase(job["id"], self.owner, FINALIZING)
+
+    def _process_chunk(self, storage: BaseStorage, job: Dict[str, Any], keys: List[str]) -> Dict[str, bool]:
+        """
+        处理一批对象
+
+        Returns:
+            源键名到是否处理成功的映射
+        """
+        results = dict.fromkeys(keys, True)
+        resumed = job["resumed"]
+
+        if job["op"] in ("copy", "move"):
+            destinations = {key: job["destination"] + key[len(job["source"]) :] for key in keys}
+            copied = storage.copy_many([(key, destinations[key]) for key in keys])
+            failed = [key for key in keys if not copied.get(destinations[key])]
+            if failed and resumed:
+                # 续跑时上一次执行可能已完成复制（移动任务甚至已删除源文件），以目标是否存在为准
+                infos = storage.head_many([destinations[key] for key in failed])
+                failed = [key for key in failed if infos.get(destinations[key]) is None]
+            for key in failed:
+                results[key] = False
+
+        if job["op"] in ("move", "delete"):
+            to_delete = [key for key in keys if results[key]]
+            deleted = storage.delete_many(to_delete) if to_delete else {}
+            failed = [key for key in to_delete if not deleted.get(key)]
+            if failed and resumed:
+                # 续跑时对象可能已在上一次执行中删除
+                infos = storage.head_many(failed)
+                failed = [key for key in failed if infos.get(key) is not None]
+            for key in failed:
+                results[key] = False
+
+        return results
+
+    def _finalize(self, storage: BaseStorage, job: Dict[str, Any]) -> None:
+        """清理源文件夹并结束任务"""
+        job = self.store.get(job["id"])
+        if job["failed"]:
+            self.store.finish(job["id"], self.owner, FAILED, f"{job['failed']} of {job['total']} items failed")
+            return
+
+        # 对象已逐个处理完毕，这里只清理文件夹本身（如 OneDrive 的文件夹项、R2 的目录占位对象）
+        if job["op"] in ("move", "delete") and not storage.delete_folder(job["source"]):
+            self.store.finish(job["id"], self.owner, FAILED, "Failed to remove source folder")
+            return
+        self.store.finish(job["id"], self.owner, COMPLETED)
@@ -0,0 +1,292 @@
+"""
+任务存储模块
+使用 SQLite 持久化后台任务及其逐项进度，作为任务断点续跑的检查点
+"""
+
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATUSES = (COMPLETED, FAILED)
+
+# 任务阶段
+PLANNING = "planning"
+TRANSFERRING = "transferring"
+FINALIZING = "finalizing"
+
+# 任务条目状态
+ITEM_PENDING = "pending"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    op TEXT NOT NULL,
+    source TEXT NOT NULL,
+    destination TEXT,
+    status TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0,
+    retry_at REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE INDEX IF NOT EXISTS job_items_state ON job_items (job_id, state, seq);
+"""
+
+
+class LeaseLostError(RuntimeError):
+    """执行者的租约已过期并被其他执行者接管时抛出的异常"""
+
+    pass
+
+
+JOB_FIELDS = (
+    "id",
+    "op",
+    "source",
+    "destination",
+    "status",
+    "phase",
+    "total",
+    "done",
+    "failed",
+    "error",
+    "attempts",
+    "retry_at",
+    "created_at",
+    "updated_at",
+)
+
+
+class JobStore:
+    """基于 SQLite 的任务存储
+
+    每个任务在规划阶段展开为逐个对象的条目，执行过程中按批次在同一事务内
+    更新条目状态和任务计数，进程重启后从未完成的条目继续执行。
+    通过租约（owner + lease_until）保证同一任务同时只有一个执行者；
+    执行失败的任务在 retry_at 之前不会被重新获取。
+    """
+
+    def __init__(self, path: str):
+        """
+        初始化任务存储
+
+        Args:
+            path: SQLite 数据库文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            # 旧版本创建的数据库没有 retry_at 列
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "retry_at" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN retry_at REAL NOT NULL DEFAULT 0")
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _owned_transaction(self, job_id: str, owner: str, guard: tuple, statements: List[tuple]) -> None:
+        """
+        在一个事务中先更新任务行再执行其他语句，任务已被其他执行者接管时回滚
+
+        Args:
+            job_id: 任务 ID
+            owner: 当前执行者
+            guard: 更新任务行的 (sql, 参数)，sql 须以 "WHERE id = ? AND owner = ?" 结尾
+            statements: 其余的 (sql, 参数列表)，以 executemany 执行
+
+        Raises:
+            LeaseLostError: 当前执行者已不再持有该任务
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute(guard[0], (*guard[1], job_id, owner)).rowcount != 1:
+                    raise LeaseLostError(f"Lease lost for job {job_id}")
+                for sql, rows in statements:
+                    self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        return {field: row[field] for field in JOB_FIELDS}
+
+    def create(self, op: str, source: str, destination: Optional[str]) -> Dict[str, Any]:
+        """
+        创建一个排队中的任务
+
+        Returns:
+            任务信息字典
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, op, source, destination, status, phase, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, op, source, destination, QUEUED, PLANNING, now, now),
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务信息，不存在时返回 None"""
+        row = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def lease_expired(self, job_id: str) -> bool:
+        """任务未结束、没有有效租约（执行者已退出或从未开始）且已到重试时间"""
+        now = time.time()
+        row = self._execute(
+            "SELECT 1 FROM jobs WHERE id = ? AND status NOT IN (?, ?) AND lease_until < ? AND retry_at <= ?",
+            (job_id, *FINISHED_STATUSES, now, now),
+        ).fetchone()
+        return row is not None
+
+    def unfinished(self) -> List[str]:
+        """返回所有没有有效租约且已到重试时间的未结束任务 ID，按创建时间排序"""
+        now = time.time()
+        rows = self._execute(
+            "SELECT id FROM jobs WHERE status NOT IN (?, ?) AND lease_until < ? AND retry_at <= ? ORDER BY created_at",
+            (*FINISHED_STATUSES, now, now),
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        尝试获取任务的执行租约
+
+        Returns:
+            获取成功返回 True；任务已结束、正被其他执行者持有或未到重试时间时返回 False
+        """
+        now = time.time()
+        cursor = self._execute(
+            "UPDATE jobs SET owner = ?, lease_until = ?, status = ?, attempts = attempts + 1, updated_at = ? "
+            "WHERE id = ? AND status NOT IN (?, ?) AND ((lease_until < ? AND retry_at <= ?) OR owner = ?)",
+            (owner, now + lease_seconds, RUNNING, now, job_id, *FINISHED_STATUSES, now, now, owner),
+        )
+        return cursor.rowcount == 1
+
+    def save_plan(self, job_id: str, keys: List[str], owner: str, lease_seconds: float) -> None:
+        """写入规划结果（替换之前未完成的规划），并进入执行阶段"""
+        now = time.time()
+        self._owned_transaction(
+            job_id,
+            owner,
+            (
+                "UPDATE jobs SET phase = ?, total = ?, done = 0, failed = 0, lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND owner = ?",
+                (TRANSFERRING, len(keys), now + lease_seconds, now),
+            ),
+            [
+                ("DELETE FROM job_items WHERE job_id = ?", [(job_id,)]),
+                (
+                    "INSERT INTO job_items (job_id, seq, key, state) VALUES (?, ?, ?, ?)",
+                    [(job_id, seq, key, ITEM_PENDING) for seq, key in enumerate(keys)],
+                ),
+            ],
+        )
+
+    def pending_items(self, job_id: str, limit: int) -> List[tuple]:
+        """按顺序返回尚未处理的条目 [(seq, key), ...]"""
+        rows = self._execute(
+            "SELECT seq, key FROM job_items WHERE job_id = ? AND state = ? ORDER BY seq LIMIT ?",
+            (job_id, ITEM_PENDING, limit),
+        ).fetchall()
+        return [(row["seq"], row["key"]) for row in rows]
+
+    def checkpoint(self, job_id: str, owner: str, results: Dict[int, bool], lease_seconds: float) -> None:
+        """
+        记录一批条目的处理结果并续约
+
+        Args:
+            job_id: 任务 ID
+            owner: 当前执行者
+            results: 条目序号到是否成功的映射
+            lease_seconds: 续约时长
+        """
+        now = time.time()
+        done = sum(1 for success in results.values() if success)
+        self._owned_transaction(
+            job_id,
+            owner,
+            (
+                "UPDATE jobs SET done = done + ?, failed = failed + ?, lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND owner = ?",
+                (done, len(results) - done, now + lease_seconds, now),
+            ),
+            [
+                (
+                    "UPDATE job_items SET state = ? WHERE job_id = ? AND seq = ?",
+                    [(ITEM_DONE if success else ITEM_FAILED, job_id, seq) for seq, success in results.items()],
+                )
+            ],
+        )
+
+    def set_phase(self, job_id: str, owner: str, phase: str) -> None:
+        """切换任务阶段"""
+        self._execute(
+            "UPDATE jobs SET phase = ?, updated_at = ? WHERE id = ? AND owner = ?",
+            (phase, time.time(), job_id, owner),
+        )
+
+    def finish(self, job_id: str, owner: str, status: str, error: Optional[str] = None) -> None:
+        """结束任务并释放租约"""
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, owner = NULL, lease_until = 0, updated_at = ? "
+            "WHERE id = ? AND owner = ?",
+            (status, error, time.time(), job_id, owner),
+        )
+
+    def release(self, job_id: str, owner: str, retry_delay: float = 0) -> None:
+        """
+        放弃租约但保留任务状态，等待其他执行者（或重启后的本进程）继续
+
+        Args:
+            job_id: 任务 ID
+            owner: 当前执行者
+            retry_delay: 至少等待多少秒后才允许重新获取
+        """
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET owner = NULL, lease_until = 0, retry_at = ?, updated_at = ? WHERE id = ? AND owner = ?",
+            (now + retry_delay, now, job_id, owner),
+        )
+
+    def failed_keys(self, job_id: str, limit: int = 20) -> List[str]:
+        """返回处理失败的条目键名"""
+        rows = self._execute(
+            "SELECT key FROM job_items WHERE job_id = ? AND state = ? ORDER BY seq LIMIT ?",
+            (job_id, ITEM_FAILED, limit),
+        ).fetchall()
+        return [row["key"] for row in rows]
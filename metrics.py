@@ -0,0 +1,187 @@
+"""
+指标模块
+进程内的计数器、直方图和采集函数注册表，以 Prometheus 文本格式输出
+"""
+
+import threading
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 默认的延迟直方图分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 当前请求的路由名称，由请求钩子设置；后台线程中的调用记为 "background"
+current_route: ContextVar[str] = ContextVar("current_route", default="background")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+Sample = Tuple[Dict[str, str], float]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Histogram:
+    """单组标签的直方图数据"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """线程安全的指标注册表
+
+    计数器和直方图按名称 + 标签累加；仪表类指标（如连接池占用）通过采集函数
+    在输出时读取当前值，避免在业务代码中维护状态。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._collectors: Dict[Tuple[str, str], Tuple[str, str, Callable[[], Iterable[Sample]]]] = {}
+
+    def describe(self, name: str, metric_type: str, help_text: str, buckets: Optional[Tuple[float, ...]] = None):
+        """
+        声明指标的类型和说明
+
+        Args:
+            name: 指标名称
+            metric_type: counter / histogram / gauge
+            help_text: 指标说明
+            buckets: 直方图分桶上界（秒），默认使用 DEFAULT_BUCKETS
+        """
+        with self._lock:
+            self._meta[name] = (metric_type, help_text)
+            if metric_type == "histogram":
+                self._buckets[name] = tuple(sorted(buckets or DEFAULT_BUCKETS))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """计数器累加"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """向直方图记录一次观测值"""
+        key = _label_key(labels)
+        with self._lock:
+            buckets = self._buckets.setdefault(name, DEFAULT_BUCKETS)
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram.counts[i] += 1
+                    break
+            histogram.total += value
+            histogram.count += 1
+
+    def register_collector(
+        self,
+        name: str,
+        metric_type: str,
+        help_text: str,
+        collect: Callable[[], Iterable[Sample]],
+        source: str = "",
+    ) -> None:
+        """
+        注册在输出时读取当前值的指标
+
+        Args:
+            name: 指标名称
+            metric_type: gauge / counter
+            help_text: 指标说明
+            collect: 返回 [(标签字典, 值), ...] 的函数
+            source: 采集来源标识，同一指标和来源重复注册时替换之前的采集函数
+        """
+        with self._lock:
+            self._collectors[(name, source)] = (metric_type, help_text, collect)
+
+    def _render_header(self, lines: List[str], name: str, metric_type: str) -> None:
+        help_text = self._meta.get(name, (metric_type, ""))[1]
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    def render(self) -> str:
+        """以 Prometheus 文本格式输出所有指标"""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._render_header(lines, name, "counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+            for name, series in sorted(self._histograms.items()):
+                self._render_header(lines, name, "histogram")
+                buckets = self._buckets[name]
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(buckets, histogram.counts, strict=True):
+                        cumulative += count
+                        labels = _format_labels(key + (("le", _format_value(bound)),))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+            collectors = [(name, *entry) for (name, _), entry in self._collectors.items()]
+
+        # 采集函数可能访问其他锁，在注册表锁之外调用
+        grouped: Dict[str, Tuple[str, str, List[Sample]]] = {}
+        for name, metric_type, help_text, collect in collectors:
+            try:
+                samples = list(collect())
+            except Exception as e:
+                print(f"Metrics collector {name} failed: {str(e)}")
+                continue
+            grouped.setdefault(name, (metric_type, help_text, []))[2].extend(samples)
+
+        for name, (metric_type, help_text, samples) in sorted(grouped.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REGISTRY.describe("cloudindex_http_requests_total", "counter", "HTTP requests by route, method and status.")
+REGISTRY.describe("cloudindex_http_request_duration_seconds", "histogram", "HTTP request latency by route.")
+REGISTRY.describe("cloudindex_storage_calls_total", "counter", "Storage method calls by backend, operation and route.")
+REGISTRY.describe("cloudindex_storage_errors_total", "counter", "Storage method calls that raised or reported failure.")
+REGISTRY.describe(
+    "cloudindex_storage_call_duration_seconds", "histogram", "Storage method latency by backend, operation and route."
+)
+REGISTRY.describe("cloudindex_storage_bytes_total", "counter", "Bytes sent to or received from the storage backend.")
+REGISTRY.describe("cloudindex_cache_requests_total", "counter", "Metadata cache lookups by cache and result.")
+REGISTRY.describe("cloudindex_upload_dedup_total", "counter", "Uploaded files by backend and dedup result.")
+REGISTRY.describe("cloudindex_backend_http_requests_total", "counter", "Backend HTTP requests issued by the scheduler.")
+REGISTRY.describe(
+    "cloudindex_backend_http_request_duration_seconds", "histogram", "Backend HTTP request latency per attempt."
+)
@@ -0,0 +1,164 @@
+"""
+请求性能分析模块
+按管理员请求头或采样率对单个请求启用 cProfile，将结果保存为 pstats 文件
+"""
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Mapping, Optional
+
+from config import Config
+
+# 触发分析和访问分析结果的请求头
+PROFILE_HEADER = "X-Profile"
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+# 分析结果文件名只允许这些字符，防止通过文件名访问其他路径
+PROFILE_NAME_PATTERN = re.compile(r"^[\w.-]+\.prof$")
+
+# cProfile 在 Python 3.12 起同一时间只能有一个实例启用，这里同样限制为一个
+_active_lock = threading.Lock()
+
+
+def get_profile_dir() -> str:
+    """返回分析结果目录（不存在时创建）"""
+    path = Config.PROFILE_DIR or os.path.join(tempfile.gettempdir(), "cloud-index-profiles")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def is_admin(headers: Mapping[str, str]) -> bool:
+    """请求是否携带正确的管理员令牌（未配置 ADMIN_TOKEN 时始终为 False）"""
+    token = headers.get(ADMIN_TOKEN_HEADER)
+    if not Config.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode())
+
+
+def can_read_metrics(headers: Mapping[str, str]) -> bool:
+    """请求是否携带正确的指标令牌（Authorization: Bearer）或管理员令牌"""
+    scheme, _, token = headers.get("Authorization", "").partition(" ")
+    if Config.METRICS_TOKEN and scheme.lower() == "bearer" and token:
+        if hmac.compare_digest(token.encode(), Config.METRICS_TOKEN.encode()):
+            return True
+    return is_admin(headers)
+
+
+def should_profile(headers: Mapping[str, str]) -> bool:
+    """管理员请求带有 X-Profile 请求头，或按 PROFILE_SAMPLE_RATE 采样命中时分析该请求"""
+    if headers.get(PROFILE_HEADER) and is_admin(headers):
+        return True
+    return Config.PROFILE_SAMPLE_RATE > 0 and random.random() < Config.PROFILE_SAMPLE_RATE
+
+
+class RequestProfiler:
+    """单个请求的 cProfile 分析
+
+    只分析启用分析的线程；ASGI 模式下同一事件循环中其他请求的协程也会被计入。
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    @classmethod
+    def start(cls) -> Optional["RequestProfiler"]:
+        """
+        开始分析
+
+        Returns:
+            分析器；已有其他请求正在分析时返回 None
+        """
+        if not _active_lock.acquire(blocking=False):
+            return None
+        profiler = cls()
+        try:
+            profiler.profile.enable()
+        except Exception as e:
+            _active_lock.release()
+            print(f"Failed to start profiler: {str(e)}")
+            return None
+        return profiler
+
+    def stop(self, route: Optional[str] = None) -> Optional[str]:
+        """
+        停止分析；指定路由名称时保存结果
+
+        Args:
+            route: 请求的路由名称，为 None 时丢弃结果
+
+        Returns:
+            保存的分析结果文件名，未保存时返回 None
+        """
+        try:
+            self.profile.disable()
+        finally:
+            _active_lock.release()
+        if route is None:
+            return None
+
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{uuid.uuid4().hex[:8]}.prof"
+        try:
+            self.profile.dump_stats(os.path.join(get_profile_dir(), name))
+            prune_profiles()
+        except OSError as e:
+            print(f"Failed to save profile {name}: {str(e)}")
+            return None
+        return name
+
+
+def list_profiles() -> List[Dict[str, object]]:
+    """按时间倒序列出已保存的分析结果"""
+    directory = get_profile_dir()
+    profiles = []
+    for name in os.listdir(directory):
+        if not PROFILE_NAME_PATTERN.match(name):
+            continue
+        stat = os.stat(os.path.join(directory, name))
+        profiles.append({"name": name, "size": stat.st_size, "created_at": stat.st_mtime})
+    profiles.sort(key=lambda item: item["created_at"], reverse=True)
+    return profiles
+
+
+def prune_profiles() -> None:
+    """只保留最新的 PROFILE_MAX_FILES 个分析结果"""
+    directory = get_profile_dir()
+    for profile in list_profiles()[max(1, Config.PROFILE_MAX_FILES) :]:
+        try:
+            os.remove(os.path.join(directory, profile["name"]))
+        except OSError:
+            pass
+
+
+def get_profile_path(name: str) -> Optional[str]:
+    """返回分析结果文件路径，名称无效或文件不存在时返回 None"""
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = os.path.join(get_profile_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+def format_profile(path: str, sort: str = "cumulative", limit: int = 50) -> str:
+    """
+    将分析结果格式化为文本摘要
+
+    Args:
+        path: 分析结果文件路径
+        sort: 排序字段（cumulative、tottime、calls 等）
+        limit: 输出的函数数量
+
+    Returns:
+        pstats 文本输出
+    """
+    output = io.StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.sort_stats(sort).print_stats(limit)
+    return output.getvalue()
@@ -0,0 +1,489 @@
+"""
+后端流量录制与回放模块
+录制模式下把每个请求期间各存储后端发出的上游 HTTP/S3 调用（顺序、耗时、状态和响应）
+脱敏后保存为 JSON 录像；回放模式下由录像在本地应答这些调用，无需访问真实服务
+"""
+
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from config import Config
+
+CASSETTE_VERSION = 1
+
+# 录像文件名只允许这些字符，防止通过文件名访问其他路径
+CASSETTE_NAME_PATTERN = re.compile(r"^[\w.-]+\.json$")
+
+# 出现在上游 URL 中的部署相关配置，录制时替换为 {配置名} 占位符，回放时还原为当前配置值
+PLACEHOLDER_SETTINGS = [
+    "R2_ENDPOINT_URL",
+    "GITHUB_API_URL",
+    "GITHUB_RAW_URL",
+    "ONEDRIVE_GRAPH_URL",
+    "ONEDRIVE_TOKEN_URL",
+    "R2_BUCKET_NAME",
+    "R2_ACCOUNT_ID",
+    "GITHUB_REPO",
+    "ONEDRIVE_FOLDER_ID",
+]
+
+# 保留的请求头和响应头，其余（认证、Cookie、请求 ID 等）一律丢弃
+REQUEST_HEADERS = {"content-type", "range", "if-none-match"}
+RESPONSE_HEADERS = {
+    "content-type",
+    "content-length",
+    "content-range",
+    "etag",
+    "last-modified",
+    "location",
+    "retry-after",
+    "x-ratelimit-remaining",
+    "x-ratelimit-reset",
+}
+
+# 从 URL 中去掉的签名和凭据参数（这些参数每次请求都不同，也不应写入录像）
+SENSITIVE_QUERY = re.compile(
+    r"^(x-amz-(signature|credential|security-token|date|expires|signedheaders|algorithm)|"
+    r"signature|sig|token|access_token|tempauth|code)$",
+    re.IGNORECASE,
+)
+
+# JSON 响应中替换为 "redacted" 的字段：令牌和文件内容
+REDACTED_KEYS = {"access_token", "refresh_token", "id_token", "content"}
+
+# 保存响应体的内容类型；其他响应（文件内容、图片）只记录大小，回放时以零字节（图片为同格式的占位图片）填充
+TEXT_BODY_TYPES = ("json", "xml")
+
+# 回放图片响应时生成的占位图片边长（像素）
+REPLAY_IMAGE_SIZE = 1024
+
+current_cassette: ContextVar[Optional["Cassette"]] = ContextVar("current_cassette", default=None)
+
+
+def _placeholders() -> List[Tuple[str, str]]:
+    """返回 (当前配置值, 占位符) 列表，较长的值优先替换；多个配置值相同时使用靠前的配置名"""
+    pairs: Dict[str, str] = {}
+    for name in PLACEHOLDER_SETTINGS:
+        value = getattr(Config, name, None)
+        if value and value not in pairs:
+            pairs[value] = "{" + name + "}"
+    return sorted(pairs.items(), key=lambda p: -len(p[0]))
+
+
+def normalize_url(url: str) -> str:
+    """去掉签名参数、排序查询参数，并把部署相关的配置值替换为占位符"""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not SENSITIVE_QUERY.match(k))
+    url = urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+    for value, placeholder in _placeholders():
+        url = url.replace(value, placeholder)
+    return url
+
+
+def restore_placeholders(text: str) -> str:
+    """把录像中的占位符还原为当前配置值"""
+    for value, placeholder in _placeholders():
+        text = text.replace(placeholder, value)
+    return text
+
+
+def _redact(value: Any) -> Any:
+    """递归脱敏 JSON：替换令牌和文件内容，规范化其中的 URL"""
+    if isinstance(value, dict):
+        return {
+            key: "redacted" if key in REDACTED_KEYS and value[key] else _redact(item) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    if isinstance(value, str) and value.startswith(("http://", "https://")):
+        return normalize_url(value)
+    return value
+
+
+def _sanitize_body(body: Optional[bytes], content_type: str) -> Optional[str]:
+    """返回可保存的响应体文本，非 JSON/XML 响应返回 None（只记录大小）"""
+    if not body or not any(kind in content_type.lower() for kind in TEXT_BODY_TYPES):
+        return None
+    text = body.decode("utf-8", "replace")
+    if "json" in content_type.lower():
+        try:
+            return json.dumps(_redact(json.loads(text)), ensure_ascii=False)
+        except ValueError:
+            pass
+    return text
+
+
+def _filter_headers(headers: Any, allowed: set) -> Dict[str, str]:
+    kept = {name.lower(): str(value) for name, value in dict(headers or {}).items() if name.lower() in allowed}
+    if "location" in kept:
+        kept["location"] = normalize_url(kept["location"])
+    return kept
+
+
+class Cassette:
+    """单个请求期间的上游调用录像"""
+
+    def __init__(self, method: str, path: str, body: Any = None):
+        self.method = method
+        self.path = path
+        self.body = body
+        self.recorded_at = time.time()
+        self.started = time.perf_counter()
+        self.interactions: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        request_headers: Any,
+        status: int,
+        headers: Any,
+        body: Optional[bytes],
+        body_size: int,
+        started: float,
+    ) -> None:
+        """
+        记录一次上游调用（脱敏后）
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            request_headers: 请求头
+            status: 响应状态码
+            headers: 响应头
+            body: 响应体，未读取时为 None
+            body_size: 响应体大小（字节）
+            started: 调用开始时间（time.perf_counter()）
+        """
+        response_headers = _filter_headers(headers, RESPONSE_HEADERS)
+        interaction = {
+            "method": method.upper(),
+            "url": normalize_url(url),
+            "request_headers": _filter_headers(request_headers, REQUEST_HEADERS),
+            "status": status,
+            "headers": response_headers,
+            "body": _sanitize_body(body, response_headers.get("content-type", "")),
+            "body_size": body_size,
+            "start_ms": round((started - self.started) * 1000, 2),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "thread": threading.current_thread().name,
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def to_dict(self, status: Optional[int] = None) -> Dict[str, Any]:
+        with self._lock:
+            interactions = sorted(self.interactions, key=lambda item: item["start_ms"])
+        return {
+            "version": CASSETTE_VERSION,
+            "backend": Config.STORAGE_TYPE,
+            "placeholders": [placeholder.strip("{}") for _, placeholder in _placeholders()],
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.recorded_at)),
+            "request": {"method": self.method, "path": self.path, "body": self.body, "status": status},
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "call_count": len(interactions),
+            "interactions": interactions,
+        }
+
+
+def get_cassette_dir() -> str:
+    """返回录像目录（不存在时创建）"""
+    path = Config.CASSETTE_DIR or os.path.join(tempfile.gettempdir(), "cloud-index-cassettes")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def start_recording(method: str, path: str, body: Any = None) -> Optional[Cassette]:
+    """录制模式下为当前请求开始录制，否则返回 None"""
+    if Config.RECORD_MODE != "record":
+        current_cassette.set(None)
+        return None
+    cassette = Cassette(method, path, body)
+    current_cassette.set(cassette)
+    return cassette
+
+
+def save_cassette(cassette: Cassette, route: str, status: Optional[int] = None) -> Optional[str]:
+    """
+    保存录像并清理旧录像；请求期间没有上游调用时不保存
+
+    Returns:
+        保存的录像文件名，未保存时返回 None
+    """
+    if not cassette.interactions:
+        return None
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{uuid.uuid4().hex[:8]}.json"
+    directory = get_cassette_dir()
+    try:
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            json.dump(cassette.to_dict(status), f, ensure_ascii=False, indent=1)
+        prune_cassettes(directory)
+    except OSError as e:
+        print(f"Failed to save cassette {name}: {str(e)}")
+        return None
+    return name
+
+
+def prune_cassettes(directory: str) -> None:
+    """只保留最新的 CASSETTE_MAX_FILES 个录像"""
+    names = [name for name in os.listdir(directory) if CASSETTE_NAME_PATTERN.match(name)]
+    names.sort(key=lambda name: os.path.getmtime(os.path.join(directory, name)), reverse=True)
+    for name in names[max(1, Config.CASSETTE_MAX_FILES) :]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def load_cassette(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+_replay_images: Dict[str, bytes] = {}
+
+
+def _replay_image(content_type: str) -> Optional[bytes]:
+    """
+    生成与内容类型格式一致的占位图片（按格式缓存）
+
+    录像不保存文件内容，但缩略图等路由需要能解码的图片才会走完与录制时相同的处理流程
+    """
+    image_format = content_type.split(";")[0].split("/")[-1].strip().upper()
+    image_format = "JPEG" if image_format == "JPG" else image_format
+    if image_format not in _replay_images:
+        buf = io.BytesIO()
+        try:
+            Image.new("RGB", (REPLAY_IMAGE_SIZE, REPLAY_IMAGE_SIZE), (128, 128, 128)).save(buf, image_format)
+        except (KeyError, OSError, ValueError):
+            return None
+        _replay_images[image_format] = buf.getvalue()
+    return _replay_images[image_format]
+
+
+def load_cassettes(path: str) -> List[Dict[str, Any]]:
+    """从录像文件或录像目录（按文件名即录制时间排序）加载录像"""
+    if os.path.isdir(path):
+        names = sorted(name for name in os.listdir(path) if CASSETTE_NAME_PATTERN.match(name))
+        return [load_cassette(os.path.join(path, name)) for name in names]
+    return [load_cassette(path)]
+
+
+class ReplaySource:
+    """按 (方法, 规范化 URL) 依次应答录像中的调用
+
+    同一地址的多次调用按录制顺序返回；录像中没有的调用返回 404 并记入 misses。
+    每次应答前按录制的耗时乘以 time_scale 等待，以复现真实的调用耗时。
+
+    录制时命中了缓存的调用不会出现在录像中，而回放从空缓存开始。context 中的录像
+    （通常是同一目录下的其他录像）为这类调用提供应答：不按顺序消耗，取最近一次录制的响应，记入 borrowed。
+    """
+
+    def __init__(
+        self,
+        cassettes: Iterable[Dict[str, Any]],
+        time_scale: float = 1.0,
+        context: Iterable[Dict[str, Any]] = (),
+    ):
+        self.time_scale = time_scale
+        self.served = 0
+        self.borrowed: List[str] = []
+        self.misses: List[str] = []
+        self._lock = threading.Lock()
+        self._queues: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._context: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for cassette in cassettes:
+            for interaction in cassette.get("interactions", []):
+                self._queues[(interaction["method"], interaction["url"])].append(interaction)
+        for cassette in context:
+            for interaction in cassette.get("interactions", []):
+                self._context[(interaction["method"], interaction["url"])] = interaction
+
+    @classmethod
+    def from_path(cls, path: str, time_scale: float = 1.0) -> "ReplaySource":
+        """从录像文件或录像目录加载"""
+        return cls(load_cassettes(path), time_scale)
+
+    def unused(self) -> int:
+        """录像中尚未被应答的调用数"""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def _fallback(self, method: str, url: str) -> Optional[Dict[str, Any]]:
+        """录像之外的固定应答：OneDrive 的令牌刷新发生在启动时，不在任何请求的录像中"""
+        if method == "POST" and Config.ONEDRIVE_TOKEN_URL and url == normalize_url(Config.ONEDRIVE_TOKEN_URL):
+            token = {"access_token": "replay", "refresh_token": "replay", "expires_in": 3600}
+            return {"status": 200, "headers": {"content-type": "application/json"}, "body": json.dumps(token)}
+        return None
+
+    def respond(self, method: str, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        应答一次调用
+
+        Returns:
+            (状态码, 响应头, 响应体)
+        """
+        method, normalized = method.upper(), normalize_url(url)
+        key = (method, normalized)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                interaction = queue.popleft()
+                self.served += 1
+            elif key in self._context:
+                interaction = self._context[key]
+                self.borrowed.append(f"{method} {normalized}")
+            else:
+                interaction = self._fallback(method, normalized)
+            if interaction is None:
+                self.misses.append(f"{method} {normalized}")
+                return 404, {"content-type": "text/plain", "x-replay-miss": "1"}, b"No recorded response"
+
+        if self.time_scale > 0 and interaction.get("duration_ms"):
+            time.sleep(interaction["duration_ms"] / 1000 * self.time_scale)
+
+        headers = {name: restore_placeholders(value) for name, value in interaction["headers"].items()}
+        if interaction.get("body") is not None:
+            body = restore_placeholders(interaction["body"]).encode("utf-8")
+            headers["content-length"] = str(len(body))
+        elif interaction.get("body_size") and headers.get("content-type", "").startswith("image/"):
+            body = _replay_image(headers["content-type"]) or b"\0" * interaction["body_size"]
+            headers["content-length"] = str(len(body))
+        else:
+            body = b"\0" * interaction.get("body_size", 0)
+        return interaction["status"], headers, body
+
+
+_replay_source: Optional[ReplaySource] = None
+_replay_lock = threading.Lock()
+
+
+def set_replay_source(source: Optional[ReplaySource]) -> None:
+    global _replay_source
+    _replay_source = source
+
+
+def get_replay_source() -> ReplaySource:
+    """返回回放数据源，未设置时从 REPLAY_CASSETTES（默认录像目录）加载"""
+    global _replay_source
+    if _replay_source is None:
+        with _replay_lock:
+            if _replay_source is None:
+                _replay_source = ReplaySource.from_path(
+                    Config.REPLAY_CASSETTES or get_cassette_dir(), Config.REPLAY_TIME_SCALE
+                )
+    return _replay_source
+
+
+class RecordingAdapter(HTTPAdapter):
+    """requests 传输适配器：录制模式下记录调用，回放模式下由录像应答"""
+
+    def send(self, request, **kwargs):
+        if Config.RECORD_MODE == "replay":
+            return self._replay(request)
+
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        cassette = current_cassette.get()
+        if cassette is not None:
+            body = response.content if not kwargs.get("stream") else None
+            size = len(body) if body is not None else int(response.headers.get("Content-Length") or 0)
+            cassette.record(
+                request.method,
+                request.url,
+                request.headers,
+                response.status_code,
+                response.headers,
+                body,
+                size,
+                started,
+            )
+        return response
+
+    def _replay(self, request) -> requests.Response:
+        status, headers, body = get_replay_source().respond(request.method, request.url)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        response.raw = io.BytesIO(body)
+        return response
+
+
+def instrument_session(session: requests.Session) -> requests.Session:
+    """按 RECORD_MODE 为 requests 会话安装录制/回放适配器"""
+    if Config.RECORD_MODE in ("record", "replay"):
+        adapter = RecordingAdapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return session
+
+
+class _ReplayBody(io.BytesIO):
+    """botocore 期望的原始响应体（需要 stream 方法）"""
+
+    def stream(self, amt: int = 1024 * 64, decode_content: Any = None):
+        while True:
+            chunk = self.read(amt)
+            if not chunk:
+                break
+            yield chunk
+
+
+# botocore 在同一线程中依次触发 before-send 和 before-parse，用线程局部变量衔接
+_boto_pending = threading.local()
+
+
+def _boto_before_send(request, **kwargs):
+    _boto_pending.call = (request.method, request.url, dict(request.headers), time.perf_counter())
+
+
+def _boto_before_parse(response_dict, **kwargs):
+    call = getattr(_boto_pending, "call", None)
+    _boto_pending.call = None
+    cassette = current_cassette.get()
+    if call is None or cassette is None:
+        return
+    method, url, request_headers, started = call
+    headers = response_dict.get("headers") or {}
+    body = response_dict.get("body")
+    body = body if isinstance(body, bytes) else None
+    size = len(body) if body is not None else 0
+    if body is None and method != "HEAD":
+        size = int(headers.get("content-length") or 0)
+    cassette.record(method, url, request_headers, response_dict.get("status_code", 0), headers, body, size, started)
+
+
+def _boto_replay(request, **kwargs):
+    from botocore.awsrequest import AWSResponse
+
+    status, headers, body = get_replay_source().respond(request.method, request.url)
+    return AWSResponse(request.url, status, headers, _ReplayBody(body))
+
+
+def instrument_boto_client(client) -> None:
+    """按 RECORD_MODE 为 boto3 客户端注册录制/回放事件处理器"""
+    if Config.RECORD_MODE == "record":
+        client.meta.events.register("before-send", _boto_before_send)
+        client.meta.events.register("before-parse", _boto_before_parse)
+    elif Config.RECORD_MODE == "replay":
+        client.meta.events.register("before-send", _boto_replay)
@@ -14,10 +14,13 @@ function attachDownloadButtonListeners() {
                 const name = button.dataset.downloadName;
                 // 对路径分段编码，保留路径分隔符，避免 # ? 等字符破坏 URL
                 const encoded = key
+                    .replace(/\/$/, "")
                     .split("/")
                     .map((seg) => encodeURIComponent(seg))
                     .join("/");
-                downloadFile(`/download/${encoded}`, name);
+                // 文件夹的键以 / 结尾，打包为 ZIP 下载
+                const route = key.endsWith("/") ? "zip" : "download";
+                downloadFile(`/${route}/${encoded}`, name);
             });
             button.dataset.listenerAttached = "true";
         }
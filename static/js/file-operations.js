@@ -41,6 +41,54 @@ async function uploadFiles(files) {
     }
 }
 
+/**
+ * 上传压缩包并在服务器端解压到当前目录
+ * @param {FileList} files - 压缩包列表（ZIP 或 tar）
+ */
+async function uploadArchives(files) {
+    const currentPrefix = document.body.dataset.currentPrefix || "";
+    let uploaded = 0;
+
+    for (const file of files) {
+        const formData = new FormData();
+        formData.append("file", file);
+        formData.append("prefix", currentPrefix);
+        formData.append("extract", "1");
+
+        try {
+            updateStatus(`正在上传并解压: ${file.name}...`, null);
+
+            const response = await fetch("/upload", {
+                method: "POST",
+                body: formData,
+            });
+
+            const result = await response.json();
+            uploaded += result.uploaded || 0;
+
+            if (result.success) {
+                const statusDiv = updateStatus(`✓ ${file.name} 已解压 ${result.uploaded} 个文件`, "success");
+                hideStatusLater(statusDiv);
+            } else if (result.failed && result.failed.length > 0) {
+                updateStatus(
+                    `✗ ${file.name} 已解压 ${result.uploaded} 个文件，${result.failed.length} 个失败: ${result.failed.join(", ")}`,
+                    "error"
+                );
+            } else {
+                updateStatus(`✗ ${file.name} 解压失败: ${result.error}`, "error");
+            }
+        } catch (error) {
+            updateStatus(`✗ ${file.name} 解压失败: ${error.message}`, "error");
+        }
+    }
+
+    if (uploaded > 0) {
+        setTimeout(() => {
+            window.location.reload();
+        }, 2000);
+    }
+}
+
 /**
  * 新建文件夹（弹出输入框并调用后端创建）
  */
@@ -119,29 +167,10 @@ async function deleteFolder(prefix) {
         return;
     }
 
-    updateStatus(`正在删除文件夹: ${prefix}...`, null);
-
-    try {
-        const response = await fetch(`/delete_folder/${prefix}`, {
-            method: "DELETE",
-        });
-
-        const result = await response.json();
-
-        if (result.success) {
-            const statusDiv = updateStatus("✓ 文件夹删除成功！", "success");
-            hideStatusLater(statusDiv);
-
-            setTimeout(() => {
-                const parentPath = prefix.split("/").slice(0, -2).join("/");
-                window.location.href = parentPath ? `/${parentPath}` : "/";
-            }, 1500);
-        } else {
-            updateStatus(`✗ 删除失败: ${result.error}`, "error");
-        }
-    } catch (error) {
-        updateStatus(`✗ 删除失败: ${error.message}`, "error");
-    }
+    await runFolderJob({ op: "delete", source: prefix }, "删除文件夹", () => {
+        const parentPath = prefix.split("/").slice(0, -2).join("/");
+        window.location.href = parentPath ? `/${parentPath}` : "/";
+    });
 }
 
 /**
@@ -213,7 +242,7 @@ function downloadFile(url, filename) {
         return;
     }
 
-    if (url.startsWith("/download/") || url.startsWith("/file/")) {
+    if (url.startsWith("/download/") || url.startsWith("/file/") || url.startsWith("/zip/")) {
         // 让浏览器原生跟随服务器重定向（OneDrive 直链/共享链接），避免 fetch 对 3xx 的处理差异
         const link = document.createElement("a");
         link.href = url;
@@ -282,32 +311,13 @@ async function renameFile(oldKey, newName) {
  * @param {string} newName - 新名称
  */
 async function renameFolder(oldPrefix, newName) {
-    updateStatus(`正在重命名文件夹: ${oldPrefix}...`, null);
+    const prefixParts = oldPrefix.replace(/\/+$/, "").split("/");
+    prefixParts[prefixParts.length - 1] = newName;
+    const newPrefix = `${prefixParts.join("/")}/`;
 
-    try {
-        const response = await fetch(`/rename_folder/${oldPrefix}`, {
-            method: "POST",
-            headers: {
-                "Content-Type": "application/json",
-            },
-            body: JSON.stringify({ newName: newName }),
-        });
-
-        const result = await response.json();
-
-        if (result.success) {
-            const statusDiv = updateStatus("✓ 文件夹重命名成功！", "success");
-            hideStatusLater(statusDiv);
-
-            setTimeout(() => {
-                window.location.reload();
-            }, 1500);
-        } else {
-            updateStatus(`✗ 重命名失败: ${result.error}`, "error");
-        }
-    } catch (error) {
-        updateStatus(`✗ 重命名失败: ${error.message}`, "error");
-    }
+    await runFolderJob({ op: "move", source: oldPrefix, destination: newPrefix }, "重命名文件夹", () => {
+        window.location.reload();
+    });
 }
 
 /**
@@ -340,6 +350,10 @@ async function promptRename(oldKey, oldName, isFolder = false) {
  * @param {boolean} isFolder - 是否是文件夹
  */
 async function copyItem(source, destination, isFolder) {
+    if (isFolder) {
+        await runFolderJob({ op: "copy", source, destination }, "复制", () => window.location.reload());
+        return;
+    }
     updateStatus(`正在复制...`, null);
     await performOperation("/copy", "复制", { source, destination, is_folder: isFolder });
 }
@@ -351,6 +365,10 @@ async function copyItem(source, destination, isFolder) {
  * @param {boolean} isFolder - 是否是文件夹
  */
 async function moveItem(source, destination, isFolder) {
+    if (isFolder) {
+        await runFolderJob({ op: "move", source, destination }, "移动", () => window.location.reload());
+        return;
+    }
     updateStatus(`正在移动...`, null);
     await performOperation("/move", "移动", { source, destination, is_folder: isFolder });
 }
@@ -424,11 +442,141 @@ async function performOperation(endpoint, opText, body) {
     }
 }
 
+/**
+ * 任务结束时的状态
+ */
+const JOB_FINISHED_STATUSES = ["completed", "failed"];
+
+/**
+ * 格式化后台任务进度
+ * @param {object} job - 任务信息
+ * @param {string} opText - 操作文本
+ * @returns {string}
+ */
+function formatJobProgress(job, opText) {
+    if (job.phase === "planning") {
+        return `正在${opText}：正在统计文件...`;
+    }
+    const processed = job.done + job.failed;
+    const percent = job.total > 0 ? Math.floor((processed / job.total) * 100) : 100;
+    return `正在${opText}：${processed}/${job.total} (${percent}%)`;
+}
+
+/**
+ * 等待后台任务结束，优先通过 SSE 接收进度，不支持或连接中断时改为轮询
+ * @param {string} jobId - 任务 ID
+ * @param {Function} onProgress - 收到进度时的回调
+ * @returns {Promise<object>} 结束时的任务信息
+ */
+function watchJob(jobId, onProgress) {
+    return new Promise((resolve, reject) => {
+        const poll = async () => {
+            try {
+                const response = await fetch(`/jobs/${jobId}`);
+                const result = await response.json();
+                if (!result.success) {
+                    reject(new Error(result.error));
+                    return;
+                }
+
+                onProgress(result.job);
+                if (JOB_FINISHED_STATUSES.includes(result.job.status)) {
+                    resolve(result.job);
+                } else {
+                    setTimeout(poll, 1000);
+                }
+            } catch (error) {
+                reject(error);
+            }
+        };
+
+        if (!window.EventSource) {
+            poll();
+            return;
+        }
+
+        const events = new EventSource(`/jobs/${jobId}/events`);
+        events.onmessage = (event) => {
+            const job = JSON.parse(event.data);
+            onProgress(job);
+            if (JOB_FINISHED_STATUSES.includes(job.status)) {
+                events.close();
+                resolve(job);
+            }
+        };
+        events.onerror = () => {
+            events.close();
+            poll();
+        };
+    });
+}
+
+/**
+ * 以后台任务执行文件夹操作并显示进度
+ * @param {object} params - 任务参数 {op, source, destination}
+ * @param {string} opText - 操作文本
+ * @param {Function} onComplete - 任务成功后的回调
+ */
+async function runFolderJob(params, opText, onComplete) {
+    updateStatus(`正在${opText}...`, null);
+
+    try {
+        const response = await fetch("/jobs", {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json",
+            },
+            body: JSON.stringify(params),
+        });
+
+        const result = await response.json();
+        if (!result.success) {
+            updateStatus(`✗ ${opText}失败: ${result.error}`, "error");
+            return;
+        }
+
+        const job = await watchJob(result.job.id, (progress) => {
+            updateStatus(formatJobProgress(progress, opText), null);
+        });
+
+        if (job.status === "completed") {
+            updateStatus(`✓ ${opText}成功！`, "success");
+            onComplete();
+        } else {
+            updateStatus(`✗ ${opText}失败: ${job.error || "未知错误"}`, "error");
+        }
+    } catch (error) {
+        updateStatus(`✗ ${opText}失败: ${error.message}`, "error");
+    }
+}
+
+/**
+ * 在一个请求中执行多个文件操作
+ * @param {Array<object>} operations - 操作列表，如 {op: "delete", key, is_folder}
+ * @returns {Promise<object>} 后端返回的结果，results 为逐项结果
+ */
+async function runBatch(operations) {
+    const response = await fetch("/batch", {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ operations }),
+    });
+
+    const result = await response.json();
+    if (!Array.isArray(result.results)) {
+        throw new Error(result.error || "批量操作失败");
+    }
+    return result;
+}
+
 /**
  * 导出到全局作用域
  */
 window.FileOps = {
     uploadFiles,
+    uploadArchives,
     promptDelete,
     deleteFolder,
     deleteFile,
@@ -441,4 +589,7 @@ window.FileOps = {
     moveItem,
     promptCopyOrMove,
     performOperation,
+    runBatch,
+    runFolderJob,
+    watchJob,
 };
@@ -0,0 +1,481 @@
+/**
+ * 客户端文件夹导航
+ * 启用元数据索引时，切换文件夹只请求 /tree/<文件夹>?depth=1&files=1 的 JSON 并在页面内渲染列表，
+ * 通过 History API 更新地址；鼠标悬停在文件夹链接上时预先请求目标文件夹的目录树。
+ * 目录树响应带有索引版本号作为 ETag，浏览器重新验证时索引未变化则返回 304
+ */
+
+const NAVIGATION_CACHE_TTL_MS = 30000;
+const NAVIGATION_PREFETCH_DELAY_MS = 80;
+
+// 文件夹前缀 -> { time, promise }
+const treeCache = new Map();
+let prefetchTimer = null;
+let navigationSeq = 0;
+
+/**
+ * 页面地址对应的文件夹前缀
+ * @param {string} url - 文件夹页面地址（/a/b）
+ * @returns {string} 文件夹前缀（a/b/，根目录为空字符串）
+ */
+function prefixFromUrl(url) {
+    const path = decodeURIComponent(new URL(url, window.location.href).pathname).replace(/^\/+|\/+$/g, "");
+    return path ? path + "/" : "";
+}
+
+/**
+ * 文件夹前缀对应的页面路径，逐段编码
+ * @param {string} prefix - 文件夹前缀
+ * @returns {string} 以 / 开头的路径
+ */
+function encodePrefix(prefix) {
+    return (
+        "/" +
+        prefix
+            .replace(/\/$/, "")
+            .split("/")
+            .filter(Boolean)
+            .map((seg) => encodeURIComponent(seg))
+            .join("/")
+    );
+}
+
+/**
+ * 请求文件夹的目录树，短时间内的重复请求复用同一个结果
+ * @param {string} prefix - 文件夹前缀
+ * @returns {Promise<Object>} /tree 的响应
+ */
+function fetchTree(prefix) {
+    const cached = treeCache.get(prefix);
+    if (cached && Date.now() - cached.time < NAVIGATION_CACHE_TTL_MS) {
+        return cached.promise;
+    }
+
+    const path = prefix ? encodePrefix(prefix) : "";
+    // no-cache：使用浏览器缓存前以 ETag 重新验证，索引未变化时服务器返回 304
+    const promise = fetch(`/tree${path}?depth=1&files=1`, { cache: "no-cache" }).then((response) => {
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return response.json();
+    });
+    treeCache.set(prefix, { time: Date.now(), promise });
+    promise.catch(() => treeCache.delete(prefix));
+    return promise;
+}
+
+/**
+ * 预先请求文件夹的目录树
+ * @param {string} url - 文件夹页面地址
+ */
+function prefetchListing(url) {
+    fetchTree(prefixFromUrl(url)).catch(() => {});
+}
+
+/**
+ * 格式化文件大小，与服务器端的 filesizeformat 一致
+ * @param {number} size - 字节数
+ * @returns {string} 可读的大小
+ */
+function formatFileSize(size) {
+    if (size === null || size === undefined) return "-";
+    let num = Number(size);
+    for (const unit of ["B", "KB", "MB", "GB", "TB"]) {
+        if (num < 1024) {
+            return unit === "B" ? `${Math.trunc(num)}${unit}` : `${num.toFixed(2)}${unit}`;
+        }
+        num /= 1024;
+    }
+    return `${num.toFixed(2)}PB`;
+}
+
+/**
+ * 创建元素
+ * @param {string} tag - 标签名
+ * @param {Object} props - 属性：data 写入 dataset，onclick 绑定点击事件，aria 开头的写入对应的 aria- 属性，其余直接赋值
+ * @param {Array<Node|string>} children - 子节点
+ * @returns {HTMLElement}
+ */
+function createElement(tag, props = {}, children = []) {
+    const element = document.createElement(tag);
+    Object.entries(props).forEach(([name, value]) => {
+        if (name === "data") {
+            Object.assign(element.dataset, value);
+        } else if (name === "onclick") {
+            element.addEventListener("click", value);
+        } else if (name.startsWith("aria")) {
+            element.setAttribute(`aria-${name.slice(4).toLowerCase()}`, value);
+        } else {
+            element[name] = value;
+        }
+    });
+    element.append(...children);
+    return element;
+}
+
+function icon(className, style) {
+    const element = createElement("i", { className });
+    if (style) element.style.cssText = style;
+    return element;
+}
+
+/**
+ * 列表操作按钮（表格中带文字，网格中只有图标）
+ * @param {string} className - 按钮类名
+ * @param {string} iconClass - 图标类名
+ * @param {string} label - 文字
+ * @param {boolean} grid - 是否为网格视图
+ * @param {Object} props - 其他属性
+ */
+function actionButton(className, iconClass, label, grid, props = {}) {
+    if (grid) {
+        return createElement("button", { className: `grid-action-btn ${className}`, title: label, ...props }, [
+            icon(iconClass),
+        ]);
+    }
+    return createElement("button", { className: `action-link ${className}-btn`, ...props }, [
+        icon(iconClass),
+        createElement("span", { className: "action-text", textContent: ` ${label}` }),
+    ]);
+}
+
+function folderActions(entry, grid) {
+    return [
+        actionButton("rename", "fas fa-edit", "重命名", grid, {
+            onclick: () => promptRename(entry.key, entry.name, true),
+        }),
+        actionButton("download", "fas fa-file-archive", grid ? "打包下载" : "下载", grid, {
+            data: { downloadKey: entry.key, downloadName: `${entry.name}.zip` },
+        }),
+        actionButton("delete", "fas fa-trash", "删除", grid, { onclick: () => deleteFolder(entry.key) }),
+        actionButton("copy", "fas fa-copy", "复制", grid, {
+            onclick: () => promptCopyOrMove(entry.key, true, "copy"),
+        }),
+        actionButton("move", "fas fa-arrows-alt-h", "移动", grid, {
+            onclick: () => promptCopyOrMove(entry.key, true, "move"),
+        }),
+    ];
+}
+
+function fileActions(entry, grid) {
+    return [
+        actionButton("preview", "fas fa-eye", "预览", grid, {
+            onclick: () => openPreview(entry.file_url, entry.name),
+        }),
+        actionButton("download", "fas fa-download", "下载", grid, {
+            data: { downloadKey: entry.key, downloadName: entry.name },
+        }),
+        actionButton("delete", "fas fa-trash", "删除", grid, { onclick: () => deleteFile(entry.key) }),
+        actionButton("rename", "fas fa-edit", "重命名", grid, {
+            onclick: () => promptRename(entry.key, entry.name),
+        }),
+        actionButton("copy", "fas fa-copy", "复制", grid, {
+            onclick: () => promptCopyOrMove(entry.key, false, "copy"),
+        }),
+        actionButton("move", "fas fa-arrows-alt-h", "移动", grid, {
+            onclick: () => promptCopyOrMove(entry.key, false, "move"),
+        }),
+    ];
+}
+
+function entryCheckbox(entry) {
+    return createElement("input", {
+        type: "checkbox",
+        className: "entry-checkbox",
+        value: entry.key,
+        ariaLabel: `选择 ${entry.name}`,
+        data: { type: entry.isDir ? "dir" : "file" },
+    });
+}
+
+function folderLink(entry, className) {
+    const props = { href: encodePrefix(entry.key), textContent: entry.name, data: { nav: "" } };
+    if (className) props.className = className;
+    return createElement("a", props);
+}
+
+function folderSizeTitle(entry) {
+    return entry.count === null || entry.count === undefined ? "" : `${entry.count} 个文件`;
+}
+
+/**
+ * 表格中的一行，与 index.html 的服务器端渲染一致
+ */
+function renderRow(entry) {
+    const nameCell = createElement("td", { className: "file-name-col" });
+    nameCell.style.cursor = "pointer";
+    if (entry.isDir) {
+        const link = folderLink(entry);
+        link.addEventListener("click", (event) => event.stopPropagation());
+        nameCell.append(icon("file-icon folder fas fa-folder"), link);
+        nameCell.addEventListener("click", () => navigateTo(encodePrefix(entry.key)));
+    } else {
+        const link = createElement("a", { href: entry.file_url, target: "_blank", textContent: entry.name });
+        link.addEventListener("click", (event) => event.stopPropagation());
+        nameCell.append(icon(`file-icon file ${entry.icon}`), link);
+        nameCell.addEventListener("click", () => window.open(entry.file_url, "_blank"));
+    }
+
+    return createElement("tr", {}, [
+        createElement("td", { className: "checkbox-col" }, [entryCheckbox(entry)]),
+        nameCell,
+        createElement("td", {
+            className: "file-size-col file-size",
+            textContent: formatFileSize(entry.size),
+            title: entry.isDir ? folderSizeTitle(entry) : "",
+        }),
+        createElement("td", {
+            className: "last-modified-col last-modified",
+            textContent: entry.isDir ? "-" : entry.last_modified,
+        }),
+        createElement(
+            "td",
+            { className: "actions-col" },
+            entry.isDir ? folderActions(entry, false) : fileActions(entry, false)
+        ),
+    ]);
+}
+
+/**
+ * 网格中的一张卡片，与 index.html 的服务器端渲染一致
+ */
+function renderCard(entry) {
+    const card = createElement(
+        "div",
+        { className: "grid-card", data: { key: entry.key, type: entry.isDir ? "dir" : "file" } },
+        [createElement("div", { className: "grid-checkbox" }, [entryCheckbox(entry)])]
+    );
+
+    if (entry.isDir) {
+        card.append(
+            createElement("div", { className: "grid-icon", onclick: () => navigateTo(encodePrefix(entry.key)) }, [
+                icon("fas fa-folder", "color: var(--folder-color)"),
+            ]),
+            folderLink(entry, "grid-name")
+        );
+        if (entry.size !== null && entry.size !== undefined) {
+            card.append(
+                createElement("div", {
+                    className: "file-size",
+                    title: folderSizeTitle(entry),
+                    textContent: formatFileSize(entry.size),
+                })
+            );
+        }
+        card.append(createElement("div", { className: "grid-actions" }, folderActions(entry, true)));
+        return card;
+    }
+
+    const preview = () => openPreview(entry.file_url, entry.name);
+    if (entry.icon === "fas fa-image") {
+        const img = createElement("img", {
+            src: `/thumb/${entry.key}`,
+            loading: "lazy",
+            decoding: "async",
+            alt: entry.name,
+        });
+        img.setAttribute("fetchpriority", "low");
+        img.style.cssText = "width: 100%; height: 100%; object-fit: cover; border-radius: 6px";
+        card.append(createElement("div", { className: "grid-thumb", onclick: preview }, [img]));
+    } else {
+        card.append(
+            createElement("div", { className: "grid-icon", onclick: preview }, [
+                icon(entry.icon, "color: var(--file-color)"),
+            ])
+        );
+    }
+    card.append(
+        createElement("a", {
+            className: "grid-name",
+            href: "javascript:void(0)",
+            title: entry.name,
+            textContent: entry.name,
+            onclick: preview,
+        }),
+        createElement("div", { className: "file-size", textContent: formatFileSize(entry.size) }),
+        createElement("div", { className: "grid-actions" }, fileActions(entry, true))
+    );
+    return card;
+}
+
+/**
+ * 由目录树渲染文件列表（文件夹在前，各自按名称排序）
+ * @param {Object} data - /tree 的响应
+ * @returns {HTMLElement} 新的 #listing 元素
+ */
+function renderListing(data) {
+    const prefix = data.prefix;
+    const folders = (data.tree.children || []).map((child) => ({
+        ...child,
+        key: `${prefix}${child.name}/`,
+        isDir: true,
+    }));
+    const files = (data.tree.files || []).map((file) => ({ ...file, isDir: false }));
+    const byName = (a, b) => (a.name < b.name ? -1 : a.name > b.name ? 1 : 0);
+    const entries = [...folders.sort(byName), ...files.sort(byName)];
+
+    const listing = createElement("div", { id: "listing" });
+    if (!entries.length) {
+        listing.append(
+            createElement("div", { className: "empty-message" }, [
+                createElement("p", { textContent: "源存储为空或未找到任何文件" }),
+            ])
+        );
+        return listing;
+    }
+
+    const headers = [
+        createElement("th", { className: "checkbox-col" }, [
+            createElement("input", { type: "checkbox", id: "selectAll", ariaLabel: "全选" }),
+        ]),
+        createElement("th", { className: "file-name-col", textContent: "名称" }),
+        createElement("th", { className: "file-size-col", textContent: "大小" }),
+        createElement("th", { className: "last-modified-col", textContent: "最后修改时间" }),
+        createElement("th", { className: "actions-col", textContent: "操作" }),
+    ];
+    listing.append(
+        createElement("table", { className: "files-table" }, [
+            createElement("thead", {}, [createElement("tr", {}, headers)]),
+            createElement("tbody", {}, entries.map(renderRow)),
+        ]),
+        createElement("div", { className: "grid-container", id: "gridContainer" }, entries.map(renderCard))
+    );
+    return listing;
+}
+
+/**
+ * 渲染导航栏
+ * @param {string} prefix - 当前文件夹前缀
+ * @returns {HTMLElement} 新的 .breadcrumb 元素
+ */
+function renderBreadcrumb(prefix) {
+    const crumbs = createElement("div", { className: "breadcrumb" }, [
+        createElement("a", { href: "/", textContent: "Home", data: { nav: "" } }),
+    ]);
+    const segments = prefix.split("/").filter(Boolean);
+    if (segments.length) {
+        crumbs.append(" / ");
+    }
+    segments.forEach((name, index) => {
+        const key = segments.slice(0, index + 1).join("/") + "/";
+        crumbs.append(folderLink({ key, name }));
+        if (index < segments.length - 1) {
+            crumbs.append(" / ");
+        }
+    });
+    return crumbs;
+}
+
+/**
+ * 用目录树替换导航栏和文件列表
+ * @param {Object} data - /tree 的响应
+ */
+function showTree(data) {
+    document.querySelector(".breadcrumb").replaceWith(renderBreadcrumb(data.prefix));
+    document.getElementById("listing").replaceWith(renderListing(data));
+    document.body.dataset.currentPrefix = data.prefix;
+
+    window.SearchUtils.clearSearchResults();
+    window.SelectionUtils.attachEntryCheckboxListeners();
+    window.DownloadUtils.attachDownloadButtonListeners();
+    document.dispatchEvent(new CustomEvent("listing:updated"));
+}
+
+/**
+ * 切换到文件夹；未启用元数据索引或目录树不可用时整页加载
+ * @param {string} url - 文件夹页面地址
+ * @param {boolean} push - 是否新增历史记录（浏览器前进/后退时为 false）
+ */
+async function navigateTo(url, push = true) {
+    if (!navigationEnabled()) {
+        window.location.href = url;
+        return;
+    }
+
+    const seq = ++navigationSeq;
+    document.body.classList.add("navigating");
+    try {
+        const data = await fetchTree(prefixFromUrl(url));
+        // 等待期间又切换到了其他文件夹
+        if (seq !== navigationSeq) {
+            return;
+        }
+        showTree(data);
+        if (push) {
+            history.pushState({ url }, "", url);
+        }
+        window.scrollTo(0, 0);
+    } catch (error) {
+        window.location.href = url;
+    } finally {
+        if (seq === navigationSeq) {
+            document.body.classList.remove("navigating");
+        }
+    }
+}
+
+function navigationEnabled() {
+    return "indexEnabled" in document.body.dataset && Boolean(document.getElementById("listing"));
+}
+
+/**
+ * 判断点击是否应由客户端导航处理（新标签页等交给浏览器）
+ * @param {MouseEvent} event - 点击事件
+ * @returns {HTMLAnchorElement|null} 文件夹链接
+ */
+function navigationLink(event) {
+    if (event.button !== 0 || event.metaKey || event.ctrlKey || event.shiftKey || event.altKey) {
+        return null;
+    }
+    const link = event.target.closest("a[data-nav]");
+    return link && link.origin === window.location.origin ? link : null;
+}
+
+/**
+ * 绑定文件夹链接的点击、悬停预取和浏览器前进/后退
+ */
+function attachNavigation() {
+    if (!navigationEnabled() || !window.history.pushState) {
+        return;
+    }
+
+    history.replaceState({ url: window.location.href }, "");
+
+    // 捕获阶段处理，文件名链接上的 stopPropagation 不影响导航
+    document.addEventListener(
+        "click",
+        (event) => {
+            const link = navigationLink(event);
+            if (link) {
+                event.preventDefault();
+                navigateTo(link.href);
+            }
+        },
+        true
+    );
+
+    document.addEventListener("mouseover", (event) => {
+        const link = event.target.closest("a[data-nav]");
+        if (!link || link.origin !== window.location.origin) {
+            return;
+        }
+        clearTimeout(prefetchTimer);
+        prefetchTimer = setTimeout(() => prefetchListing(link.href), NAVIGATION_PREFETCH_DELAY_MS);
+    });
+    document.addEventListener("mouseout", () => clearTimeout(prefetchTimer));
+
+    window.addEventListener("popstate", (event) => {
+        if (event.state && event.state.url) {
+            navigateTo(event.state.url, false);
+        }
+    });
+}
+
+/**
+ * 导出到全局作用域
+ */
+window.NavigationUtils = {
+    attachNavigation,
+    navigateTo,
+    prefetchListing,
+};
@@ -0,0 +1,171 @@
+/**
+ * 文件名搜索
+ */
+
+const SEARCH_DEBOUNCE_MS = 250;
+
+let searchTimer = null;
+let searchController = null;
+
+/**
+ * 将输入拆分为搜索参数：".jpg" 形式的词为扩展名，含 * ? [ 的词为通配符，其余为关键字
+ * @param {string} input - 搜索框内容
+ * @returns {URLSearchParams} 查询参数
+ */
+function parseSearchInput(input) {
+    const words = [];
+    const globs = [];
+    const extensions = [];
+    input
+        .trim()
+        .split(/\s+/)
+        .filter(Boolean)
+        .forEach((word) => {
+            if (/^\.[^.\s*?[\]]+$/.test(word)) {
+                extensions.push(word.slice(1));
+            } else if (/[*?[]/.test(word)) {
+                globs.push(word);
+            } else {
+                words.push(word);
+            }
+        });
+
+    const params = new URLSearchParams();
+    if (words.length) params.set("q", words.join(" "));
+    if (globs.length) params.set("glob", globs[0]);
+    if (extensions.length) params.set("ext", extensions.join(","));
+    return params;
+}
+
+/**
+ * 格式化文件大小
+ * @param {number} size - 字节数
+ * @returns {string} 可读的大小
+ */
+function formatSearchSize(size) {
+    if (size === null || size === undefined) return "";
+    const units = ["B", "KB", "MB", "GB", "TB"];
+    let value = size;
+    let unit = 0;
+    while (value >= 1024 && unit < units.length - 1) {
+        value /= 1024;
+        unit++;
+    }
+    return `${unit ? value.toFixed(1) : value} ${units[unit]}`;
+}
+
+/**
+ * 隐藏搜索结果
+ */
+function clearSearchResults() {
+    const panel = document.getElementById("searchResults");
+    if (panel) {
+        panel.hidden = true;
+        panel.replaceChildren();
+    }
+}
+
+/**
+ * 渲染搜索结果
+ * @param {HTMLElement} panel - 结果容器
+ * @param {Object} data - /search 的响应
+ */
+function renderSearchResults(panel, data) {
+    panel.replaceChildren();
+
+    const summary = document.createElement("div");
+    summary.className = "search-summary";
+    summary.textContent = data.total
+        ? `共 ${data.total} 个结果` + (data.truncated ? `，显示前 ${data.results.length} 个` : "")
+        : "没有找到匹配的文件";
+    panel.appendChild(summary);
+
+    data.results.forEach((item) => {
+        const row = document.createElement("div");
+        row.className = "search-result";
+
+        const link = document.createElement("a");
+        link.href = item.file_url;
+        link.target = "_blank";
+        link.textContent = item.name;
+
+        const folder = document.createElement("a");
+        folder.className = "search-result-folder";
+        folder.dataset.nav = "";
+        folder.href = "/" + item.folder.replace(/\/$/, "");
+        folder.textContent = "/" + item.folder;
+
+        const size = document.createElement("span");
+        size.className = "search-result-size";
+        size.textContent = formatSearchSize(item.size);
+
+        row.append(link, folder, size);
+        panel.appendChild(row);
+    });
+    panel.hidden = false;
+}
+
+/**
+ * 执行搜索，新的搜索开始时取消尚未完成的请求
+ * @param {string} input - 搜索框内容
+ */
+async function runSearch(input) {
+    const panel = document.getElementById("searchResults");
+    const params = parseSearchInput(input);
+    if (!panel || ![...params.keys()].length) {
+        clearSearchResults();
+        return;
+    }
+
+    if (searchController) searchController.abort();
+    searchController = new AbortController();
+    try {
+        const response = await fetch(`/search?${params}`, { signal: searchController.signal });
+        const data = await response.json();
+        if (!data.success) {
+            throw new Error(data.error || "搜索失败");
+        }
+        renderSearchResults(panel, data);
+    } catch (error) {
+        if (error.name === "AbortError") return;
+        panel.replaceChildren();
+        const summary = document.createElement("div");
+        summary.className = "search-summary";
+        summary.textContent = `搜索失败：${error.message}`;
+        panel.appendChild(summary);
+        panel.hidden = false;
+    }
+}
+
+/**
+ * 绑定搜索框：输入停顿后搜索，Esc 清空
+ */
+function attachSearchBox() {
+    const input = document.getElementById("searchInput");
+    if (!input) {
+        return;
+    }
+
+    input.addEventListener("input", () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => runSearch(input.value), SEARCH_DEBOUNCE_MS);
+    });
+    input.addEventListener("keydown", (event) => {
+        if (event.key === "Enter") {
+            clearTimeout(searchTimer);
+            runSearch(input.value);
+        } else if (event.key === "Escape") {
+            input.value = "";
+            clearSearchResults();
+        }
+    });
+}
+
+/**
+ * 导出到全局作用域
+ */
+window.SearchUtils = {
+    attachSearchBox,
+    clearSearchResults,
+    runSearch,
+};
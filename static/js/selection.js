@@ -88,16 +88,15 @@ async function deleteSelectedEntries() {
         return;
     }
 
-    const directories = selected.filter((checkbox) => checkbox.dataset.type === "dir");
-    if (directories.length > 0) {
-        const statusDiv = updateStatus("✗ 暂不支持批量删除文件夹，请仅选择文件", "error");
-        hideStatusLater(statusDiv);
-        return;
-    }
-
-    const files = selected.map((checkbox) => checkbox.value);
+    const operations = selected.map((checkbox) => ({
+        op: "delete",
+        key: checkbox.value,
+        is_folder: checkbox.dataset.type === "dir",
+    }));
     const confirmMessage =
-        files.length === 1 ? `确定要删除 "${files[0]}" 吗？` : `确定要删除选中的 ${files.length} 个文件吗？`;
+        operations.length === 1
+            ? `确定要删除 "${operations[0].key}" 吗？`
+            : `确定要删除选中的 ${operations.length} 个项目吗？`;
 
     const confirmed = await showConfirm(confirmMessage, {
         title: "批量删除",
@@ -114,23 +113,17 @@ async function deleteSelectedEntries() {
         deleteButton.classList.add("is-disabled");
     }
 
-    const inProgressStatus = updateStatus(`正在删除 ${files.length} 个文件...`, null);
+    const inProgressStatus = updateStatus(`正在删除 ${operations.length} 个项目...`, null);
 
-    const failures = [];
+    let failures = operations.map((operation) => operation.key);
     let successCount = 0;
 
-    for (const filePath of files) {
-        const result = await deleteFile(filePath, {
-            skipConfirm: true,
-            suppressReload: true,
-            suppressStatus: true,
-        });
-
-        if (result) {
-            successCount += 1;
-        } else {
-            failures.push(filePath);
-        }
+    try {
+        const result = await runBatch(operations);
+        failures = result.results.filter((item) => !item.success).map((item) => item.key);
+        successCount = result.succeeded;
+    } catch (error) {
+        console.error("Batch delete failed:", error);
     }
 
     if (deleteButton) {
@@ -143,7 +136,7 @@ async function deleteSelectedEntries() {
     }
 
     if (failures.length === 0 && successCount > 0) {
-        const statusDiv = updateStatus(`✓ 已删除 ${successCount} 个文件`, "success");
+        const statusDiv = updateStatus(`✓ 已删除 ${successCount} 个项目`, "success");
         hideStatusLater(statusDiv, 3000);
 
         setTimeout(() => {
@@ -154,7 +147,9 @@ async function deleteSelectedEntries() {
 
     if (failures.length > 0) {
         const message =
-            failures.length === files.length ? "✗ 删除失败，请稍后重试" : `删除部分文件失败：${failures.join(", ")}`;
+            failures.length === operations.length
+                ? "✗ 删除失败，请稍后重试"
+                : `删除部分项目失败：${failures.join(", ")}`;
         const statusDiv = updateStatus(message, "error");
         hideStatusLater(statusDiv, 4000);
 
@@ -166,6 +161,53 @@ async function deleteSelectedEntries() {
     }
 }
 
+/**
+ * 将选定的条目打包为 ZIP 下载，未选择时打包当前文件夹
+ */
+function downloadSelectedEntries() {
+    const selected = Array.from(getEntryCheckboxes()).filter((checkbox) => checkbox.checked);
+    const currentPrefix = document.body.dataset.currentPrefix || "";
+
+    if (selected.length === 0) {
+        if (!currentPrefix) {
+            const statusDiv = updateStatus("✗ 请先选择要下载的项目", "error");
+            hideStatusLater(statusDiv);
+            return;
+        }
+        const encoded = currentPrefix
+            .replace(/\/$/, "")
+            .split("/")
+            .map((seg) => encodeURIComponent(seg))
+            .join("/");
+        downloadFile(`/zip/${encoded}`, currentPrefix);
+        return;
+    }
+
+    // 使用表单提交，由浏览器直接接收流式响应并保存，无需在页面中缓冲整个压缩包
+    const form = document.createElement("form");
+    form.method = "POST";
+    form.action = "/zip";
+    form.style.display = "none";
+
+    const addField = (name, value) => {
+        const input = document.createElement("input");
+        input.type = "hidden";
+        input.name = name;
+        input.value = value;
+        form.appendChild(input);
+    };
+    // 列表和网格视图各有一组复选框，按键名去重
+    new Set(selected.map((checkbox) => checkbox.value)).forEach((key) => addField("key", key));
+    addField("base", currentPrefix);
+
+    document.body.appendChild(form);
+    form.submit();
+    document.body.removeChild(form);
+
+    const statusDiv = updateStatus(`✓ 开始打包下载 ${selected.length} 个项目`, "success");
+    hideStatusLater(statusDiv);
+}
+
 /**
  * 导出到全局作用域
  */
@@ -175,4 +217,5 @@ window.SelectionUtils = {
     toggleSelectAll,
     attachEntryCheckboxListeners,
     deleteSelectedEntries,
+    downloadSelectedEntries,
 };
@@ -1,6 +1,7 @@
-from .base import BaseStorage
+from .async_base import AsyncBaseStorage
+from .base import BaseStorage, ObjectNotFoundError
 from .factory import StorageFactory
 from .github import GitHubStorage
 from .r2 import R2Storage
 
-__all__ = ["BaseStorage", "R2Storage", "GitHubStorage", "StorageFactory"]
+__all__ = ["AsyncBaseStorage", "BaseStorage", "ObjectNotFoundError", "R2Storage", "GitHubStorage", "StorageFactory"]
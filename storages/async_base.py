@@ -0,0 +1,283 @@
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class AsyncBaseStorage(ABC):
+    """异步存储后端的基类，接口与 BaseStorage 一一对应
+
+    所有网络操作均为协程，供 ASGI 模式下的路由使用，
+    大量慢速的后端请求可以在同一个事件循环中并发等待，而不必各占一个线程。
+    """
+
+    @abstractmethod
+    async def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        """
+        列出存储桶中的对象
+
+        Args:
+            prefix: 对象前缀（用于目录浏览）
+
+        Returns:
+            包含对象列表的字典
+        """
+        pass
+
+    @abstractmethod
+    async def get_object_info(self, key: str) -> Dict[str, Any]:
+        """
+        获取对象基本信息
+
+        Args:
+            key: 对象键名
+
+        Returns:
+            对象元数据
+
+        Raises:
+            ObjectNotFoundError: 对象不存在时
+        """
+        pass
+
+    @abstractmethod
+    async def get_object(self, key: str) -> Dict[str, Any]:
+        """
+        获取对象内容
+
+        Args:
+            key: 对象键名
+
+        Returns:
+            包含对象内容的字典，Body 为完整的字节数据
+        """
+        pass
+
+    @abstractmethod
+    async def generate_presigned_url(self, key: str, expires: int = None) -> str:
+        """
+        为指定对象生成预签名 URL
+
+        Args:
+            key: 对象键名
+            expires: 过期时间（秒）
+
+        Returns:
+            预签名 URL，失败返回 None
+        """
+        pass
+
+    def get_presigned_url_max_age(self) -> int:
+        """
+        返回当前生成的预签名 URL 可被浏览器和 CDN 缓存的秒数
+
+        Returns:
+            可缓存秒数，0 表示不缓存
+        """
+        return 0
+
+    @abstractmethod
+    async def get_public_url(self, key: str) -> str:
+        """
+        生成对象的公共访问 URL
+
+        Args:
+            key: 对象键名
+
+        Returns:
+            公共 URL，未配置返回 None
+        """
+        pass
+
+    def format_timestamp(self, timestamp) -> str:
+        """
+        格式化时间戳为人类可读的格式
+
+        Args:
+            timestamp: 时间戳对象
+
+        Returns:
+            格式化后的时间字符串
+        """
+        if isinstance(timestamp, datetime):
+            return timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        return str(timestamp)
+
+    @abstractmethod
+    async def generate_thumbnail(self, file_path: str) -> bytes:
+        """
+        生成图片缩略图
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            缩略图字节数据
+        """
+        pass
+
+    @abstractmethod
+    async def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        """
+        上传文件到存储
+
+        Args:
+            key: 对象键名（文件路径）
+            file_data: 文件二进制数据
+            content_type: 文件类型（MIME type）
+
+        Returns:
+            上传成功返回 True，失败返回 False
+        """
+        pass
+
+    @abstractmethod
+    async def delete_file(self, key: str) -> bool:
+        """
+        删除存储中的文件
+
+        Args:
+            key: 对象键名（文件路径）
+
+        Returns:
+            删除成功返回 True，失败返回 False
+        """
+        pass
+
+    @abstractmethod
+    async def rename_file(self, old_key: str, new_key: str) -> bool:
+        """
+        重命名存储中的文件
+
+        Args:
+            old_key: 旧的对象键名
+            new_key: 新的对象键名
+
+        Returns:
+            重命名成功返回 True，失败返回 False
+        """
+        pass
+
+    @abstractmethod
+    async def delete_folder(self, prefix: str) -> bool:
+        """
+        删除存储中的文件夹（前缀）
+
+        Args:
+            prefix: 要删除的文件夹前缀
+
+        Returns:
+            删除成功返回 True，失败返回 False
+        """
+        pass
+
+    @abstractmethod
+    async def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        """
+        重命名存储中的文件夹（前缀）
+
+        Args:
+            old_prefix: 旧的文件夹前缀
+            new_prefix: 新的文件夹前缀
+
+        Returns:
+            重命名成功返回 True，失败返回 False
+        """
+        pass
+
+    @abstractmethod
+    async def copy_file(self, source_key: str, dest_key: str) -> bool:
+        """
+        复制存储中的文件
+
+        Args:
+            source_key: 源对象键名
+            dest_key: 目标对象键名
+
+        Returns:
+            复制成功返回 True，失败返回 False
+        """
+        pass
+
+    @abstractmethod
+    async def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        """
+        复制存储中的文件夹（前缀）
+
+        Args:
+            source_prefix: 源文件夹前缀
+            dest_prefix: 目标文件夹前缀
+
+        Returns:
+            复制成功返回 True，失败返回 False
+        """
+        pass
+
+    @abstractmethod
+    async def create_folder(self, key: str) -> bool:
+        """
+        创建文件夹
+
+        Args:
+            key: 文件夹路径（以 / 结尾）
+
+        Returns:
+            创建成功返回 True，失败返回 False
+        """
+        pass
+
+    async def head_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        批量获取对象基本信息，默认并发调用 get_object_info
+
+        Returns:
+            键名到对象元数据的映射，对象不存在或查询失败时为 None
+        """
+        keys = list(dict.fromkeys(keys))
+        infos = await asyncio.gather(*(self.get_object_info(key) for key in keys), return_exceptions=True)
+        return {key: None if isinstance(info, BaseException) else info for key, info in zip(keys, infos, strict=True)}
+
+    async def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        """
+        批量删除文件，默认并发调用 delete_file
+
+        Returns:
+            键名到是否删除成功的映射
+        """
+        keys = list(dict.fromkeys(keys))
+        outcomes = await asyncio.gather(*(self.delete_file(key) for key in keys), return_exceptions=True)
+        return {key: ok is True for key, ok in zip(keys, outcomes, strict=True)}
+
+    async def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """
+        批量复制文件，默认并发调用 copy_file
+
+        Returns:
+            目标键名到是否复制成功的映射
+        """
+        outcomes = await asyncio.gather(*(self.copy_file(src, dst) for src, dst in pairs), return_exceptions=True)
+        return {dst: ok is True for (_, dst), ok in zip(pairs, outcomes, strict=True)}
+
+    async def generate_download_response(self, key: str) -> Dict[str, Any]:
+        """
+        生成文件下载响应，返回格式与 BaseStorage.generate_download_response 相同
+
+        Args:
+            key: 对象键名（文件路径）
+
+        Returns:
+            包含下载信息的字典
+        """
+        presigned = await self.generate_presigned_url(key)
+        if presigned:
+            return {"type": "redirect", "url": presigned}
+
+        public_url = await self.get_public_url(key)
+        if public_url:
+            return {"type": "redirect", "url": public_url}
+
+        return None
+
+    async def aclose(self) -> None:
+        """释放客户端和连接池等资源，默认无需处理"""
+        return None
@@ -0,0 +1,69 @@
+from typing import Optional
+
+from config import Config
+
+from .async_base import AsyncBaseStorage
+
+
+class AsyncStorageFactory:
+    """异步存储工厂类，根据配置创建对应的异步存储实例
+
+    各后端依赖的异步客户端（aioboto3、httpx）只在创建对应后端时导入，
+    未安装 ASGI 相关依赖时不影响同步模式。
+
+    返回的是未经包装的后端：StorageFactory 叠加的元数据缓存、内容缓存、熔断、
+    合并并发请求、指标和元数据索引只在同步模式中生效。
+    """
+
+    _instance: Optional[AsyncBaseStorage] = None
+
+    @classmethod
+    def get_storage(cls) -> AsyncBaseStorage:
+        """
+        获取异步存储实例（单例模式）
+
+        Returns:
+            AsyncBaseStorage: 异步存储实例
+
+        Raises:
+            RuntimeError: 当存储类型未配置或不支持时
+        """
+        if cls._instance is not None:
+            return cls._instance
+
+        storage_type = Config.STORAGE_TYPE
+
+        if not storage_type:
+            raise RuntimeError(
+                "STORAGE_TYPE environment variable is not set. Supported types: r2, github, onedrive, local"
+            )
+
+        if storage_type == "r2":
+            from .async_r2 import AsyncR2Storage
+
+            cls._instance = AsyncR2Storage()
+        elif storage_type == "github":
+            from .async_github import AsyncGitHubStorage
+
+            cls._instance = AsyncGitHubStorage()
+        elif storage_type == "onedrive":
+            from .async_onedrive import AsyncOnedriveStorage
+
+            cls._instance = AsyncOnedriveStorage()
+        elif storage_type == "local":
+            from .async_local import AsyncLocalStorage
+
+            cls._instance = AsyncLocalStorage()
+        else:
+            raise RuntimeError(
+                f"Unsupported storage type: {storage_type}. Supported types: r2, github, onedrive, local"
+            )
+
+        return cls._instance
+
+    @classmethod
+    async def close(cls):
+        """关闭并重置单例实例"""
+        if cls._instance is not None:
+            await cls._instance.aclose()
+            cls._instance = None
@@ -0,0 +1,300 @@
+import asyncio
+import base64
+from datetime import datetime
+from typing import Any, Dict, Optional
+from urllib.parse import quote
+
+import httpx
+
+from config import Config
+
+from .async_base import AsyncBaseStorage
+from .async_scheduler import AsyncRequestScheduler
+from .base import ObjectNotFoundError
+from .github import GitHubStorage
+
+
+class AsyncGitHubStorage(AsyncBaseStorage):
+    """基于 GitHub 仓库的异步存储实现（基于 httpx）"""
+
+    _render_thumbnail = staticmethod(GitHubStorage._render_thumbnail)
+
+    def __init__(self):
+        """初始化 GitHub 异步存储客户端"""
+        self.token = Config.GITHUB_TOKEN
+        repo_full = Config.GITHUB_REPO
+        self.branch = Config.GITHUB_BRANCH
+
+        if not self.token or not repo_full:
+            raise RuntimeError("GITHUB_TOKEN and GITHUB_REPO must be set")
+
+        repo_parts = repo_full.split("/")
+        if len(repo_parts) != 2:
+            raise RuntimeError(f"GITHUB_REPO must be in format 'owner/repo', got: {repo_full}")
+
+        self.repo_owner = repo_parts[0]
+        self.repo_name = repo_parts[1]
+        self.repo = repo_full
+
+        api_url = Config.GITHUB_API_URL.rstrip("/")
+        raw_url = Config.GITHUB_RAW_URL.rstrip("/")
+        self.api_base_url = f"{api_url}/repos/{self.repo_owner}/{self.repo_name}"
+        self.raw_content_url = f"{raw_url}/{self.repo_owner}/{self.repo_name}/{self.branch}"
+
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=Config.BACKEND_MAX_CONCURRENCY),
+            follow_redirects=True,
+        )
+        self.scheduler = AsyncRequestScheduler(
+            "github",
+            initial_limit=Config.BACKEND_INITIAL_CONCURRENCY,
+            max_limit=Config.BACKEND_MAX_CONCURRENCY,
+            max_retries=Config.BACKEND_MAX_RETRIES,
+            max_delay=Config.BACKEND_RETRY_MAX_DELAY,
+            timeout=Config.BACKEND_REQUEST_TIMEOUT,
+        )
+
+    def _headers(self) -> Dict[str, str]:
+        """返回 API 请求的公共头部信息"""
+        return {
+            "Authorization": f"token {self.token}",
+            "Accept": "application/vnd.github.v3+json",
+        }
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """通过调度器向 GitHub 发起请求，默认携带 API 认证头"""
+        kwargs.setdefault("headers", self._headers())
+        return await self.scheduler.request(self.client, method, url, **kwargs)
+
+    async def aclose(self) -> None:
+        """关闭 HTTP 客户端"""
+        await self.client.aclose()
+
+    async def _get_file_sha(self, file_path: str) -> Optional[str]:
+        """获取文件的 SHA 值用于更新或删除"""
+        try:
+            response = await self._request("GET", f"{self.api_base_url}/contents/{file_path}")
+            if response.status_code == 200:
+                return response.json().get("sha")
+        except Exception:
+            pass
+        return None
+
+    async def _get_last_commit_time(self, file_path: str) -> datetime:
+        """获取文件的最后提交时间"""
+        try:
+            params = {"path": file_path, "per_page": 1}
+            response = await self._request("GET", f"{self.api_base_url}/commits", params=params)
+            if response.status_code == 200:
+                commits = response.json()
+                if commits:
+                    time_str = commits[0]["commit"]["author"]["date"]
+                    return datetime.fromisoformat(time_str.replace("Z", "+00:00"))
+        except Exception:
+            pass
+        return datetime.now()
+
+    async def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        try:
+            prefix = prefix.rstrip("/") if prefix else ""
+            url = f"{self.api_base_url}/contents/{prefix}" if prefix else f"{self.api_base_url}/contents"
+            response = await self._request("GET", url)
+            response.raise_for_status()
+
+            contents = response.json()
+            if not isinstance(contents, list):
+                contents = [contents]
+
+            file_items = [item for item in contents if item["type"] == "file" and item["name"] != ".gitkeep"]
+            folders = [{"Prefix": item["path"] + "/"} for item in contents if item["type"] == "dir"]
+
+            # 各文件的最后提交时间并发查询，整体并发由调度器控制
+            times = await asyncio.gather(*(self._get_last_commit_time(item["path"]) for item in file_items))
+            files = [
+                {
+                    "Key": item["path"],
+                    "Size": item["size"],
+                    "LastModified": last_modified,
+                    "ETag": item["sha"],
+                }
+                for item, last_modified in zip(file_items, times, strict=True)
+            ]
+
+            return {
+                "Contents": files,
+                "CommonPrefixes": folders,
+                "IsTruncated": False,
+            }
+        except Exception as e:
+            return {"Contents": [], "CommonPrefixes": [], "Error": str(e)}
+
+    async def get_object_info(self, key: str) -> Dict[str, Any]:
+        try:
+            response = await self._request("GET", f"{self.api_base_url}/contents/{key}")
+            if response.status_code == 404:
+                raise ObjectNotFoundError(f"Object not found: {key}")
+            response.raise_for_status()
+
+            data = response.json()
+            last_modified = await self._get_last_commit_time(key)
+
+            return {
+                "Key": data["path"],
+                "Size": data["size"],
+                "ContentLength": data["size"],
+                "LastModified": last_modified,
+                "ETag": data["sha"],
+                "ContentType": "application/octet-stream",
+            }
+        except ObjectNotFoundError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to get object info: {str(e)}") from e
+
+    async def get_object(self, key: str) -> Dict[str, Any]:
+        try:
+            response = await self._request("GET", f"{self.raw_content_url}/{key}", headers={})
+            response.raise_for_status()
+
+            content = response.content
+            return {
+                "Body": content,
+                "ContentLength": len(content),
+                "ContentType": response.headers.get("Content-Type", "application/octet-stream"),
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to get object: {str(e)}") from e
+
+    async def generate_presigned_url(self, key: str, expires: int = None) -> str:
+        return f"{self.raw_content_url}/{key}"
+
+    async def get_public_url(self, key: str) -> str:
+        return f"{self.raw_content_url}/{key}"
+
+    async def generate_thumbnail(self, file_path: str) -> bytes:
+        try:
+            obj = await self.get_object(file_path)
+            return await asyncio.to_thread(self._render_thumbnail, obj["Body"])
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate thumbnail: {str(e)}") from e
+
+    async def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        try:
+            data = {
+                "message": f"Upload {key}",
+                "content": base64.b64encode(file_data).decode("utf-8"),
+                "branch": self.branch,
+            }
+            sha = await self._get_file_sha(key)
+            if sha:
+                data["sha"] = sha
+
+            response = await self._request("PUT", f"{self.api_base_url}/contents/{key}", json=data)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"Upload failed: {str(e)}")
+            return False
+
+    async def delete_file(self, key: str) -> bool:
+        try:
+            sha = await self._get_file_sha(key)
+            if not sha:
+                return False
+
+            data = {"message": f"Delete {key}", "sha": sha, "branch": self.branch}
+            response = await self._request("DELETE", f"{self.api_base_url}/contents/{key}", json=data)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"Delete failed: {str(e)}")
+            return False
+
+    async def rename_file(self, old_key: str, new_key: str) -> bool:
+        try:
+            obj = await self.get_object(old_key)
+            if not await self.upload_file(new_key, obj["Body"]):
+                return False
+            return await self.delete_file(old_key)
+        except Exception as e:
+            print(f"Rename failed: {str(e)}")
+            return False
+
+    async def delete_folder(self, prefix: str) -> bool:
+        try:
+            if prefix and not prefix.endswith("/"):
+                prefix = prefix + "/"
+
+            contents = await self.list_objects(prefix)
+            # Contents API 的每次写入都会产生一个提交，需按顺序执行以免 SHA 冲突
+            for file_info in contents.get("Contents", []):
+                if not await self.delete_file(file_info["Key"]):
+                    return False
+
+            for folder in contents.get("CommonPrefixes", []):
+                if not await self.delete_folder(folder["Prefix"]):
+                    return False
+
+            return True
+        except Exception as e:
+            print(f"Delete folder failed: {str(e)}")
+            return False
+
+    async def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        try:
+            contents = await self.list_objects(old_prefix)
+            for file_info in contents.get("Contents", []):
+                old_key = file_info["Key"]
+                if not await self.rename_file(old_key, old_key.replace(old_prefix, new_prefix, 1)):
+                    return False
+            return True
+        except Exception as e:
+            print(f"Rename folder failed: {str(e)}")
+            return False
+
+    async def copy_file(self, source_key: str, dest_key: str) -> bool:
+        try:
+            obj = await self.get_object(source_key)
+            return await self.upload_file(dest_key, obj["Body"])
+        except Exception as e:
+            print(f"Copy failed: {str(e)}")
+            return False
+
+    async def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        try:
+            contents = await self.list_objects(source_prefix)
+            for file_info in contents.get("Contents", []):
+                source_key = file_info["Key"]
+                if not await self.copy_file(source_key, source_key.replace(source_prefix, dest_prefix, 1)):
+                    return False
+            return True
+        except Exception as e:
+            print(f"Copy folder failed: {str(e)}")
+            return False
+
+    async def create_folder(self, key: str) -> bool:
+        # GitHub 不需要显式创建文件夹，上传文件时会自动创建
+        return True
+
+    async def generate_download_response(self, key: str) -> Dict[str, Any]:
+        try:
+            file_obj = await self.get_object(key)
+            file_name = key.split("/")[-1] if "/" in key else key
+            encoded_filename = quote(file_name.encode("utf-8"), safe="")
+            content_type = file_obj.get("ContentType", "application/octet-stream")
+
+            headers = {
+                "Content-Type": content_type,
+                "Content-Disposition": f"attachment; filename=\"{file_name}\"; filename*=UTF-8''{encoded_filename}",
+                "Cache-Control": "public, max-age=86400",
+            }
+
+            return {
+                "type": "content",
+                "content": file_obj["Body"],
+                "headers": headers,
+                "mimetype": content_type,
+            }
+        except Exception as e:
+            print(f"GitHub download response generation failed: {str(e)}")
+            return None
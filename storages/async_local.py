@@ -0,0 +1,74 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+from .async_base import AsyncBaseStorage
+from .local import LocalStorage
+
+
+class AsyncLocalStorage(AsyncBaseStorage):
+    """本地文件系统的异步存储实现
+
+    文件系统没有可用的异步接口，各操作在线程池中调用 LocalStorage，
+    事件循环不会被磁盘读写阻塞；下载仍返回 "file" 类型，由路由直接发送文件。
+    """
+
+    def __init__(self):
+        """初始化本地存储"""
+        self.storage = LocalStorage()
+
+    async def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        return await asyncio.to_thread(self.storage.list_objects, prefix)
+
+    async def get_object_info(self, key: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.storage.get_object_info, key)
+
+    async def get_object(self, key: str) -> Dict[str, Any]:
+        def _read():
+            obj = self.storage.get_object(key)
+            body = obj["Body"]
+            try:
+                obj["Body"] = body.read()
+            finally:
+                body.close()
+            return obj
+
+        return await asyncio.to_thread(_read)
+
+    async def generate_presigned_url(self, key: str, expires: int = None) -> str:
+        """本地存储没有可直接访问的 URL，文件由服务器发送"""
+        return None
+
+    async def get_public_url(self, key: str) -> str:
+        """本地存储没有公共 URL"""
+        return None
+
+    async def generate_thumbnail(self, file_path: str) -> bytes:
+        return await asyncio.to_thread(self.storage.generate_thumbnail, file_path)
+
+    async def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        return await asyncio.to_thread(self.storage.upload_file, key, file_data, content_type)
+
+    async def delete_file(self, key: str) -> bool:
+        return await asyncio.to_thread(self.storage.delete_file, key)
+
+    async def rename_file(self, old_key: str, new_key: str) -> bool:
+        return await asyncio.to_thread(self.storage.rename_file, old_key, new_key)
+
+    async def delete_folder(self, prefix: str) -> bool:
+        return await asyncio.to_thread(self.storage.delete_folder, prefix)
+
+    async def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        return await asyncio.to_thread(self.storage.rename_folder, old_prefix, new_prefix)
+
+    async def copy_file(self, source_key: str, dest_key: str) -> bool:
+        return await asyncio.to_thread(self.storage.copy_file, source_key, dest_key)
+
+    async def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        return await asyncio.to_thread(self.storage.copy_folder, source_prefix, dest_prefix)
+
+    async def create_folder(self, key: str) -> bool:
+        return await asyncio.to_thread(self.storage.create_folder, key)
+
+    async def generate_download_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """返回 "file" 类型的下载响应，格式与 LocalStorage.generate_download_response 相同"""
+        return await asyncio.to_thread(self.storage.generate_download_response, key)
@@ -0,0 +1,341 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import httpx
+
+from config import Config
+
+from .async_base import AsyncBaseStorage
+from .async_scheduler import AsyncRequestScheduler
+from .base import ObjectNotFoundError
+from .onedrive import OnedriveStorage, _InvalidGrant
+
+
+class AsyncOnedriveStorage(AsyncBaseStorage):
+    """基于 OneDrive 的异步存储实现（基于 httpx），支持自动令牌刷新"""
+
+    # 与同步实现共用的 URL 构造和响应解析逻辑
+    _item_path_url = OnedriveStorage._item_path_url
+    _children_url = OnedriveStorage._children_url
+    _build_listing = staticmethod(OnedriveStorage._build_listing)
+    _token_payload = OnedriveStorage._token_payload
+    _parse_token_response = staticmethod(OnedriveStorage._parse_token_response)
+    _refresh_scopes = OnedriveStorage._refresh_scopes
+    _apply_token = OnedriveStorage._apply_token
+    _headers = OnedriveStorage._headers
+    _render_thumbnail = staticmethod(OnedriveStorage._render_thumbnail)
+
+    def __init__(self):
+        """初始化 OneDrive 异步存储客户端，访问令牌在首次请求时获取"""
+        self.client_id = Config.ONEDRIVE_CLIENT_ID
+        self.client_secret = Config.ONEDRIVE_CLIENT_SECRET
+        self.refresh_token = Config.ONEDRIVE_REFRESH_TOKEN
+        self.folder_id = Config.ONEDRIVE_FOLDER_ID
+        self.graph_api_url = Config.ONEDRIVE_GRAPH_URL.rstrip("/")
+        self.token_url = Config.ONEDRIVE_TOKEN_URL
+
+        if not (self.client_id and self.client_secret and self.refresh_token):
+            raise RuntimeError("ONEDRIVE_CLIENT_ID, ONEDRIVE_CLIENT_SECRET, and ONEDRIVE_REFRESH_TOKEN must be set")
+
+        self.folder_item_id = self.folder_id or "root"
+
+        self.client = httpx.AsyncClient(limits=httpx.Limits(max_connections=Config.BACKEND_MAX_CONCURRENCY))
+        self.scheduler = AsyncRequestScheduler(
+            "onedrive",
+            initial_limit=Config.BACKEND_INITIAL_CONCURRENCY,
+            max_limit=Config.BACKEND_MAX_CONCURRENCY,
+            max_retries=Config.BACKEND_MAX_RETRIES,
+            max_delay=Config.BACKEND_RETRY_MAX_DELAY,
+            timeout=Config.BACKEND_REQUEST_TIMEOUT,
+        )
+
+        self.access_token = None
+        self._token_lock = asyncio.Lock()
+
+    async def aclose(self) -> None:
+        """关闭 HTTP 客户端"""
+        await self.client.aclose()
+
+    async def _refresh_token(self, stale_token: Optional[str] = None) -> None:
+        """
+        刷新访问令牌，并发请求只触发一次刷新
+
+        Args:
+            stale_token: 调用方认为已失效的令牌，若已被其他请求刷新则直接返回
+        """
+        async with self._token_lock:
+            if self.access_token and self.access_token != stale_token:
+                return
+
+            errors: list[str] = []
+            for idx, scope in enumerate(self._refresh_scopes(), start=1):
+                resp = await self.client.post(
+                    self.token_url,
+                    data=self._token_payload(scope),
+                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                    timeout=20,
+                )
+                try:
+                    detail = resp.json()
+                except Exception:
+                    detail = resp.text
+                try:
+                    self._apply_token(self._parse_token_response(resp.status_code, detail))
+                    return
+                except _InvalidGrant as e:
+                    errors.append(f"Attempt {idx} invalid_grant: {str(e)}")
+
+            raise RuntimeError("Failed to refresh OneDrive token: " + " | ".join(errors))
+
+    async def _api_request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None, **kwargs):
+        """
+        执行 API 请求，自动处理令牌过期、限流和重试
+
+        Args:
+            method: HTTP 方法
+            url: API URL
+            headers: 额外的请求头（覆盖默认头部）
+            **kwargs: 其他请求参数
+
+        Returns:
+            响应对象
+        """
+        if not self.access_token:
+            await self._refresh_token()
+
+        for attempt in range(2):
+            token = self.access_token
+            request_headers = {**self._headers(), **(headers or {})}
+            response = await self.scheduler.request(self.client, method, url, headers=request_headers, **kwargs)
+            if response.status_code != 401 or attempt:
+                return response
+            # 令牌过期，刷新后重试一次
+            await self._refresh_token(stale_token=token)
+        return response
+
+    async def _get_item(self, key: str) -> Optional[Dict[str, Any]]:
+        """获取 DriveItem 元数据，不存在或失败时返回 None"""
+        try:
+            response = await self._api_request("GET", self._item_path_url(key))
+            if response.status_code == 200:
+                return response.json() or {}
+        except Exception:
+            pass
+        return None
+
+    async def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        try:
+            prefix = prefix.rstrip("/") if prefix else ""
+            response = await self._api_request("GET", self._children_url(prefix))
+            response.raise_for_status()
+            return self._build_listing(response.json().get("value", []), prefix)
+        except Exception as e:
+            raise RuntimeError(f"Failed to list OneDrive objects: {str(e)}") from None
+
+    async def get_object_info(self, key: str) -> Dict[str, Any]:
+        try:
+            response = await self._api_request("GET", self._item_path_url(key))
+            if response.status_code == 404:
+                raise ObjectNotFoundError(f"Object not found: {key}")
+            response.raise_for_status()
+
+            item = response.json()
+            return {
+                "Key": key,
+                "Size": item.get("size", 0),
+                "LastModified": item.get("lastModifiedDateTime", datetime.now().isoformat()),
+                "ETag": item.get("id", ""),
+            }
+        except ObjectNotFoundError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to get OneDrive object info: {str(e)}") from None
+
+    async def get_object(self, key: str) -> Dict[str, Any]:
+        try:
+            response = await self._api_request("GET", self._item_path_url(key, "content"), follow_redirects=True)
+            response.raise_for_status()
+            return {
+                "Body": response.content,
+                "ContentType": response.headers.get("Content-Type", "application/octet-stream"),
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to get OneDrive object: {str(e)}") from None
+
+    async def generate_presigned_url(self, key: str, expires: int = None) -> str:
+        try:
+            expires = expires or Config.PRESIGNED_URL_EXPIRES
+            body = {
+                "type": "view",
+                "scope": "anonymous",
+                "expirationDateTime": (datetime.utcnow() + timedelta(seconds=expires)).isoformat() + "Z",
+            }
+            response = await self._api_request("POST", self._item_path_url(key, "createLink"), json=body, timeout=15)
+
+            if response.status_code in (200, 201):
+                web = ((response.json() or {}).get("link") or {}).get("webUrl")
+                if web:
+                    sep = "&" if "?" in web else "?"
+                    return f"{web}{sep}download=1"
+            return None
+        except Exception:
+            return None
+
+    async def get_public_url(self, key: str) -> str:
+        item = await self._get_item(key)
+        return item.get("webUrl") if item else None
+
+    async def generate_download_response(self, key: str) -> Dict[str, Any]:
+        """优先返回 OneDrive 的临时直链，其次是匿名分享链接和 webUrl"""
+        item = await self._get_item(key)
+        if item:
+            direct = item.get("@microsoft.graph.downloadUrl") or item.get("@microsoft.graph.downloadurl")
+            if direct:
+                return {"type": "redirect", "url": direct}
+
+        presigned = await self.generate_presigned_url(key)
+        if presigned:
+            return {"type": "redirect", "url": presigned}
+
+        if item and item.get("webUrl"):
+            return {"type": "redirect", "url": item["webUrl"]}
+
+        return None
+
+    async def generate_thumbnail(self, file_path: str) -> bytes:
+        try:
+            response = await self._api_request("GET", self._item_path_url(file_path, "thumbnails"), timeout=15)
+            response.raise_for_status()
+
+            thumbnails = response.json().get("value", [])
+            if thumbnails:
+                thumb_set = thumbnails[0]
+                thumb_url = thumb_set.get("c", {}).get("url") or thumb_set.get("m", {}).get("url")
+                if thumb_url:
+                    thumb_response = await self.scheduler.request(self.client, "GET", thumb_url)
+                    if thumb_response.status_code == 200:
+                        return thumb_response.content
+
+            # 没有缩略图时自行生成
+            file_obj = await self.get_object(file_path)
+            return await asyncio.to_thread(self._render_thumbnail, file_obj["Body"])
+        except Exception:
+            return None
+
+    async def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        try:
+            headers = {"Content-Type": content_type or "application/octet-stream"}
+            response = await self._api_request(
+                "PUT", self._item_path_url(key, "content"), headers=headers, content=file_data
+            )
+            response.raise_for_status()
+            return response.status_code in (200, 201)
+        except Exception as e:
+            raise RuntimeError(f"Failed to upload file to OneDrive: {str(e)}") from None
+
+    async def delete_file(self, key: str) -> bool:
+        try:
+            response = await self._api_request("DELETE", self._item_path_url(key))
+            return response.status_code == 204
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete file from OneDrive: {str(e)}") from None
+
+    async def _item_id(self, path: str) -> str:
+        """获取相对于根文件夹的路径对应的 DriveItem ID"""
+        url = f"{self.graph_api_url}/me/drive/items/{self.folder_item_id}:/{path.strip('/')}:"
+        response = await self._api_request("GET", url)
+        response.raise_for_status()
+        return response.json().get("id")
+
+    async def _rename_item(self, path: str, new_name: str) -> bool:
+        """通过 PATCH 修改 DriveItem 名称"""
+        item_id = await self._item_id(path)
+        response = await self._api_request(
+            "PATCH", f"{self.graph_api_url}/me/drive/items/{item_id}", json={"name": new_name}
+        )
+        response.raise_for_status()
+        return response.status_code == 200
+
+    async def copy_file(self, source_key: str, dest_key: str) -> bool:
+        try:
+            source_id = await self._item_id(source_key)
+            copy_body = {
+                "parentReference": {"id": self.folder_item_id},
+                "name": dest_key.strip("/").split("/")[-1],
+            }
+            response = await self._api_request(
+                "POST", f"{self.graph_api_url}/me/drive/items/{source_id}/copy", json=copy_body
+            )
+            response.raise_for_status()
+            return response.status_code in (200, 202)
+        except Exception as e:
+            raise RuntimeError(f"Failed to copy file in OneDrive: {str(e)}") from None
+
+    async def rename_file(self, old_key: str, new_key: str) -> bool:
+        try:
+            return await self._rename_item(old_key, new_key.strip("/").split("/")[-1])
+        except Exception as e:
+            raise RuntimeError(f"Failed to rename file in OneDrive: {str(e)}") from None
+
+    async def delete_folder(self, prefix: str) -> bool:
+        try:
+            prefix = prefix.rstrip("/")
+            # 删除文件夹本身即可递归删除其中的所有内容
+            url = f"{self.graph_api_url}/me/drive/items/{self.folder_item_id}:/{prefix}:"
+            response = await self._api_request("DELETE", url)
+            return response.status_code == 204
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete folder from OneDrive: {str(e)}") from None
+
+    async def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        try:
+            return await self._rename_item(old_prefix, new_prefix.rstrip("/").split("/")[-1])
+        except Exception as e:
+            raise RuntimeError(f"Failed to rename folder in OneDrive: {str(e)}") from None
+
+    async def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        try:
+            source_prefix = source_prefix.rstrip("/")
+            dest_prefix = dest_prefix.rstrip("/")
+
+            await self.create_folder(dest_prefix + "/")
+            items = await self.list_objects(source_prefix)
+
+            # 同一层级的文件和子文件夹并发复制，整体并发由调度器控制
+            tasks = []
+            for file in items.get("Contents", []):
+                relative_path = file["Key"][len(source_prefix) + 1 :]
+                tasks.append(self.copy_file(file["Key"], f"{dest_prefix}/{relative_path}"))
+            for folder in items.get("CommonPrefixes", []):
+                source_folder = folder["Prefix"].rstrip("/")
+                relative_folder = source_folder[len(source_prefix) + 1 :]
+                tasks.append(self.copy_folder(source_folder, f"{dest_prefix}/{relative_folder}"))
+            await asyncio.gather(*tasks)
+
+            return True
+        except Exception as e:
+            raise RuntimeError(f"Failed to copy folder in OneDrive: {str(e)}") from None
+
+    async def create_folder(self, key: str) -> bool:
+        try:
+            parent_id = self.folder_item_id
+            for folder_name in key.rstrip("/").split("/"):
+                existing = await self._api_request(
+                    "GET", f"{self.graph_api_url}/me/drive/items/{parent_id}:/{folder_name}:"
+                )
+                if existing.status_code == 200:
+                    parent_id = existing.json().get("id")
+                    continue
+
+                create_response = await self._api_request(
+                    "POST",
+                    f"{self.graph_api_url}/me/drive/items/{parent_id}/children",
+                    json={"name": folder_name, "folder": {}},
+                )
+                create_response.raise_for_status()
+                parent_id = create_response.json().get("id")
+
+            return True
+        except Exception as e:
+            raise RuntimeError(f"Failed to create folder in OneDrive: {str(e)}") from None
@@ -0,0 +1,286 @@
+import asyncio
+import os
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Dict
+from urllib.parse import quote
+
+import aioboto3
+from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import ClientError
+
+from config import Config
+
+from .async_base import AsyncBaseStorage
+from .base import ObjectNotFoundError
+from .cache import TTLCache, time_bucket
+from .r2 import R2Storage
+
+
+class AsyncR2Storage(AsyncBaseStorage):
+    """Cloudflare R2 异步存储后端实现（基于 aioboto3）"""
+
+    # 与同步实现共用的纯函数
+    _guess_content_type = R2Storage._guess_content_type
+    _render_thumbnail = staticmethod(R2Storage._render_thumbnail)
+
+    def __init__(self):
+        """初始化 R2 异步存储客户端"""
+        account_id = Config.R2_ACCOUNT_ID
+        if not account_id:
+            raise RuntimeError("R2_ACCOUNT_ID environment variable is not set")
+
+        self.endpoint = Config.R2_ENDPOINT_URL or f"https://{account_id}.r2.cloudflarestorage.com"
+        self.access_key = Config.R2_ACCESS_KEY_ID
+        self.secret_key = Config.R2_SECRET_ACCESS_KEY
+
+        if not self.access_key or not self.secret_key:
+            raise RuntimeError("R2_ACCESS_KEY_ID and R2_SECRET_ACCESS_KEY must be set")
+
+        self.region_name = "auto"
+        self.bucket_name = Config.R2_BUCKET_NAME
+        self.public_domain = Config.R2_PUBLIC_DOMAIN
+
+        self._session = aioboto3.Session()
+        self._s3_client = None
+        self._exit_stack = AsyncExitStack()
+        self._client_lock = asyncio.Lock()
+
+        self.presign_bucket_seconds = Config.PRESIGNED_URL_BUCKET_SECONDS
+        self._presigned_cache = TTLCache(maxsize=Config.PRESIGNED_URL_CACHE_MAX_ENTRIES)
+
+    async def get_s3_client(self):
+        """
+        返回共享的异步 S3 客户端，首次调用时创建并保持打开以复用连接池
+        """
+        if self._s3_client is None:
+            async with self._client_lock:
+                if self._s3_client is None:
+                    self._s3_client = await self._exit_stack.enter_async_context(
+                        self._session.client(
+                            "s3",
+                            endpoint_url=self.endpoint,
+                            aws_access_key_id=self.access_key,
+                            aws_secret_access_key=self.secret_key,
+                            config=BotocoreConfig(
+                                signature_version="s3v4",
+                                retries={"mode": "adaptive", "max_attempts": Config.BACKEND_MAX_RETRIES + 1},
+                                max_pool_connections=Config.BACKEND_MAX_CONCURRENCY,
+                                read_timeout=Config.BACKEND_REQUEST_TIMEOUT,
+                            ),
+                            region_name=self.region_name,
+                        )
+                    )
+        return self._s3_client
+
+    async def aclose(self) -> None:
+        """关闭 S3 客户端"""
+        await self._exit_stack.aclose()
+        self._s3_client = None
+
+    async def _iter_keys(self, prefix: str):
+        """分页遍历前缀下的所有对象键"""
+        s3_client = await self.get_s3_client()
+        paginator = s3_client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+    async def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        s3_client = await self.get_s3_client()
+
+        if prefix and not prefix.endswith("/"):
+            prefix = prefix + "/"
+
+        list_kwargs = {"Bucket": self.bucket_name, "Delimiter": "/"}
+        if prefix:
+            list_kwargs["Prefix"] = prefix
+
+        return await s3_client.list_objects_v2(**list_kwargs)
+
+    async def get_object_info(self, key: str) -> Dict[str, Any]:
+        s3_client = await self.get_s3_client()
+        try:
+            return await s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            code = str(e.response.get("Error", {}).get("Code", ""))
+            if code in ("404", "NoSuchKey", "NotFound"):
+                raise ObjectNotFoundError(f"Object not found: {key}") from e
+            raise
+
+    async def get_object(self, key: str) -> Dict[str, Any]:
+        s3_client = await self.get_s3_client()
+        obj = await s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        async with obj["Body"] as stream:
+            obj["Body"] = await stream.read()
+        return obj
+
+    async def _presign_get_object(self, key: str, expires: int, **extra_params) -> str:
+        """生成 GET 预签名 URL，时间桶策略与 R2Storage._presign_get_object 相同"""
+        params = {"Bucket": self.bucket_name, "Key": key, **extra_params}
+        s3_client = await self.get_s3_client()
+
+        if self.presign_bucket_seconds <= 0:
+            return await s3_client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires)
+
+        now = time.time()
+        bucket_start, bucket_end = time_bucket(self.presign_bucket_seconds, now)
+        cache_key = (key, expires, tuple(sorted(extra_params.items())), bucket_start)
+        cached = self._presigned_cache.get(cache_key)
+        if cached:
+            return cached
+
+        url = await s3_client.generate_presigned_url(
+            "get_object",
+            Params=params,
+            ExpiresIn=int(bucket_end - now) + expires,
+        )
+        if url:
+            self._presigned_cache.set(cache_key, url, ttl=bucket_end - now)
+        return url
+
+    async def generate_presigned_url(self, key: str, expires: int = None) -> str:
+        if expires is None:
+            try:
+                expires = int(os.getenv("R2_PRESIGN_EXPIRES", "3600"))
+            except Exception:
+                expires = 3600
+
+        try:
+            return await self._presign_get_object(key, expires)
+        except Exception:
+            return None
+
+    def get_presigned_url_max_age(self) -> int:
+        if self.presign_bucket_seconds <= 0:
+            return 0
+        now = time.time()
+        _, bucket_end = time_bucket(self.presign_bucket_seconds, now)
+        return max(0, int(bucket_end - now))
+
+    async def get_public_url(self, key: str) -> str:
+        if not self.public_domain:
+            return None
+        return f"{self.public_domain.rstrip('/')}/{key}"
+
+    async def generate_thumbnail(self, file_path: str) -> bytes:
+        obj = await self.get_object(file_path)
+        # 图片缩放是 CPU 密集操作，放到线程池中执行以免阻塞事件循环
+        return await asyncio.to_thread(self._render_thumbnail, obj["Body"])
+
+    async def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        try:
+            s3_client = await self.get_s3_client()
+            if not content_type:
+                content_type = self._guess_content_type(key)
+            await s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=file_data, ContentType=content_type)
+            return True
+        except Exception as e:
+            print(f"Upload failed: {str(e)}")
+            return False
+
+    async def delete_file(self, key: str) -> bool:
+        try:
+            s3_client = await self.get_s3_client()
+            await s3_client.delete_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except Exception as e:
+            print(f"Delete failed: {str(e)}")
+            return False
+
+    async def _copy(self, source_key: str, dest_key: str) -> None:
+        """服务端复制单个对象"""
+        s3_client = await self.get_s3_client()
+        copy_source = {"Bucket": self.bucket_name, "Key": source_key}
+        await s3_client.copy_object(CopySource=copy_source, Bucket=self.bucket_name, Key=dest_key)
+
+    async def _copy_prefix(self, source_prefix: str, dest_prefix: str) -> None:
+        """并发复制前缀下的所有对象，并发数受连接池大小限制"""
+        semaphore = asyncio.Semaphore(Config.BACKEND_MAX_CONCURRENCY)
+
+        async def _copy_one(old_key: str):
+            async with semaphore:
+                await self._copy(old_key, old_key.replace(source_prefix, dest_prefix, 1))
+
+        keys = [key async for key in self._iter_keys(source_prefix)]
+        await asyncio.gather(*(_copy_one(key) for key in keys))
+
+    async def rename_file(self, old_key: str, new_key: str) -> bool:
+        try:
+            await self._copy(old_key, new_key)
+            s3_client = await self.get_s3_client()
+            await s3_client.delete_object(Bucket=self.bucket_name, Key=old_key)
+            return True
+        except Exception as e:
+            print(f"Rename failed: {str(e)}")
+            return False
+
+    async def delete_folder(self, prefix: str) -> bool:
+        try:
+            s3_client = await self.get_s3_client()
+            objects_to_delete = [{"Key": key} async for key in self._iter_keys(prefix)]
+
+            # 分批次删除，S3/R2 一次最多删除 1000 个
+            for i in range(0, len(objects_to_delete), 1000):
+                chunk = objects_to_delete[i : i + 1000]
+                await s3_client.delete_objects(Bucket=self.bucket_name, Delete={"Objects": chunk})
+            return True
+        except Exception as e:
+            print(f"Folder delete failed: {str(e)}")
+            return False
+
+    async def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        try:
+            await self._copy_prefix(old_prefix, new_prefix)
+            return await self.delete_folder(old_prefix)
+        except Exception as e:
+            print(f"Folder rename failed: {str(e)}")
+            return False
+
+    async def copy_file(self, source_key: str, dest_key: str) -> bool:
+        try:
+            await self._copy(source_key, dest_key)
+            return True
+        except Exception as e:
+            print(f"File copy failed: {str(e)}")
+            return False
+
+    async def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        try:
+            await self._copy_prefix(source_prefix, dest_prefix)
+            return True
+        except Exception as e:
+            print(f"Folder copy failed: {str(e)}")
+            return False
+
+    async def create_folder(self, key: str) -> bool:
+        try:
+            s3_client = await self.get_s3_client()
+            await s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=b"")
+            return True
+        except Exception as e:
+            print(f"Folder creation failed: {str(e)}")
+            return False
+
+    async def generate_download_response(self, key: str) -> Dict[str, Any]:
+        try:
+            file_name = key.split("/")[-1] if "/" in key else key
+            encoded_filename = quote(file_name.encode("utf-8"), safe="")
+            expires = int(os.getenv("R2_PRESIGN_EXPIRES", "3600"))
+
+            url = await self._presign_get_object(
+                key,
+                expires,
+                ResponseContentDisposition=f"attachment; filename=\"{file_name}\"; filename*=UTF-8''{encoded_filename}",
+            )
+            if url:
+                return {"type": "redirect", "url": url}
+
+            public_url = await self.get_public_url(key)
+            if public_url:
+                return {"type": "redirect", "url": public_url}
+
+            return None
+        except Exception as e:
+            print(f"R2 download response generation failed: {str(e)}")
+            return None
@@ -0,0 +1,109 @@
+"""
+异步请求调度模块
+RequestScheduler 的协程版本，供基于 httpx 的异步后端使用
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+
+from .scheduler import IDEMPOTENT_METHODS, RETRYABLE_STATUS, RequestScheduler
+
+
+class AsyncRequestScheduler(RequestScheduler):
+    """在事件循环中使用的自适应请求调度器
+
+    并发上限、限流暂停和重试策略与 RequestScheduler 相同，
+    等待名额和退避时让出事件循环而不是阻塞线程。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._slot_freed: Optional[asyncio.Event] = None
+
+    async def _acquire_async(self) -> None:
+        """等待直到有空闲的并发名额且不在限流暂停期"""
+        if self._slot_freed is None:
+            self._slot_freed = asyncio.Event()
+        while True:
+            with self._cond:
+                pause = self._paused_until - time.time()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._slot_freed.clear()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            try:
+                await asyncio.wait_for(self._slot_freed.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    def _release(self, latency: float, throttled: bool) -> None:
+        super()._release(latency, throttled)
+        if self._slot_freed is not None:
+            self._slot_freed.set()
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        通过调度器发起异步 HTTP 请求
+
+        Args:
+            client: 用于发起请求的 httpx 异步客户端
+            method: HTTP 方法
+            url: 请求 URL
+            idempotent: 是否允许在网络错误和 5xx 时重试，默认按 HTTP 方法判断
+            **kwargs: 传给 client.request 的其他参数
+
+        Returns:
+            最终的响应对象（重试耗尽时返回最后一次响应）
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault("timeout", self.timeout)
+
+        attempt = 0
+        while True:
+            await self._acquire_async()
+            start = time.monotonic()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                self._release(time.monotonic() - start, throttled=True)
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            throttled = self._is_throttled(response)
+            self._release(time.monotonic() - start, throttled=throttled)
+
+            wait = self._retry_after(response)
+            reset_wait = self._rate_limit_reset(response)
+            if reset_wait is not None:
+                self._pause(reset_wait)
+
+            retryable = throttled or (idempotent and response.status_code in RETRYABLE_STATUS)
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            server_wait = wait if wait is not None else reset_wait
+            if server_wait is not None:
+                if server_wait > self.max_delay:
+                    return response
+                self._pause(server_wait)
+            else:
+                await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
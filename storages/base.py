@@ -1,6 +1,59 @@
+import re
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .search import SearchQuery
+
+# 内容哈希形式的 ETag：R2 的 MD5、GitHub 的 blob SHA-1、SHA-256
+CONTENT_HASH_PATTERN = re.compile(r"[0-9a-f]{32}|[0-9a-f]{40}|[0-9a-f]{64}")
+
+
+class ObjectNotFoundError(RuntimeError):
+    """对象不存在时由 get_object_info 抛出的异常"""
+
+    pass
+
+
+class IndexUnavailableError(RuntimeError):
+    """只能由元数据索引回答的查询（如搜索），在索引未启用或尚未完成遍历时抛出的异常"""
+
+    pass
+
+
+def _timestamp(value: Any) -> Optional[int]:
+    """将 datetime 或 ISO 格式的修改时间统一为整数秒，列表和对象信息中的格式可能不同"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return None
+
+
+def object_version(info: Dict[str, Any]) -> Optional[str]:
+    """
+    由对象信息计算内容版本，内容变化时版本一定变化
+
+    ETag 为内容哈希时直接使用；OneDrive 的 ETag 是条目 ID，内容变化时不变，
+    此时结合大小和修改时间。
+
+    Args:
+        info: get_object_info 或列表返回的对象信息
+
+    Returns:
+        版本字符串，对象信息不足以判断内容是否变化时返回 None
+    """
+    etag = str(info.get("ETag") or "").strip('"').lower()
+    if CONTENT_HASH_PATTERN.fullmatch(etag):
+        return etag
+    modified = _timestamp(info.get("LastModified"))
+    if not etag and modified is None:
+        return None
+    size = info.get("ContentLength", info.get("Size"))
+    return f"{etag}|{size}|{modified if modified is not None else ''}"
 
 
 class BaseStorage(ABC):
@@ -29,6 +82,9 @@ class BaseStorage(ABC):
 
         Returns:
             对象元数据
+
+        Raises:
+            ObjectNotFoundError: 对象不存在时
         """
         pass
 
@@ -59,6 +115,15 @@ class BaseStorage(ABC):
         """
         pass
 
+    def get_presigned_url_max_age(self) -> int:
+        """
+        返回当前生成的预签名 URL 可被浏览器和 CDN 缓存的秒数
+
+        Returns:
+            可缓存秒数，0 表示不缓存
+        """
+        return 0
+
     @abstractmethod
     def get_public_url(self, key: str) -> str:
         """
@@ -209,6 +274,199 @@ class BaseStorage(ABC):
         """
         pass
 
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        """
+        递归遍历前缀下的所有对象键名
+
+        默认实现逐层调用 list_objects，后端可重写为扁平的分页列举。
+
+        Args:
+            prefix: 文件夹前缀
+
+        Yields:
+            对象键名
+        """
+        pending = [prefix]
+        while pending:
+            response = self.list_objects(pending.pop())
+            for obj in response.get("Contents", []):
+                yield obj["Key"]
+            for folder in response.get("CommonPrefixes", []):
+                pending.append(folder["Prefix"])
+
+    def iter_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """
+        递归遍历前缀下的所有对象及其元数据
+
+        默认实现逐层调用 list_objects，后端可重写为扁平的分页列举。
+        每个子文件夹额外产生一个以 / 结尾的文件夹条目，使空文件夹也能被记录。
+
+        Args:
+            prefix: 文件夹前缀
+
+        Yields:
+            列表格式的对象信息（Key、Size、LastModified、ETag）
+        """
+        pending = [prefix]
+        while pending:
+            response = self.list_objects(pending.pop())
+            for obj in response.get("Contents", []):
+                yield obj
+            for folder in response.get("CommonPrefixes", []):
+                yield {"Key": folder["Prefix"], "Size": 0}
+                pending.append(folder["Prefix"])
+
+    def search_objects(self, query: SearchQuery) -> Dict[str, Any]:
+        """
+        按文件名搜索前缀下的对象
+
+        只由元数据索引回答：逐个匹配需要遍历整个后端，不适合在请求中执行。
+
+        Args:
+            query: 搜索条件
+
+        Returns:
+            {"Contents": 排名前 limit 的对象信息, "Total": 满足条件的总数}
+
+        Raises:
+            IndexUnavailableError: 未启用元数据索引
+        """
+        raise IndexUnavailableError("Search requires the metadata index (METADATA_INDEX_ENABLED=true)")
+
+    def get_index_version(self) -> Optional[str]:
+        """
+        元数据索引的内容版本，用作由索引生成的响应的 ETag
+
+        Returns:
+            版本字符串；未启用元数据索引或索引已过期时为 None
+        """
+        return None
+
+    def get_folder_usage(self, prefix: str = "", depth: int = 1) -> Dict[str, Any]:
+        """
+        统计文件夹下所有文件（递归）的总大小和文件数
+
+        只由元数据索引中随写操作增量维护的汇总回答：逐个累加需要遍历整个后端，不适合在请求中执行。
+
+        Args:
+            prefix: 文件夹前缀
+            depth: 同时统计的子文件夹层数，0 表示只统计文件夹本身
+
+        Returns:
+            {"Prefix", "Size", "Count", "Folders": 按名称排序的子文件夹统计（同样格式）}
+
+        Raises:
+            IndexUnavailableError: 未启用元数据索引
+        """
+        raise IndexUnavailableError("Folder usage requires the metadata index (METADATA_INDEX_ENABLED=true)")
+
+    def head_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        批量获取对象基本信息
+
+        默认实现逐个调用 get_object_info，后端可重写为批量请求。
+
+        Args:
+            keys: 对象键名列表
+
+        Returns:
+            键名到对象元数据的映射，对象不存在或查询失败时为 None
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for key in keys:
+            try:
+                results[key] = self.get_object_info(key)
+            except Exception:
+                results[key] = None
+        return results
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        """
+        批量删除文件
+
+        默认实现逐个调用 delete_file，后端可重写为批量请求。
+
+        Args:
+            keys: 对象键名列表
+
+        Returns:
+            键名到是否删除成功的映射
+        """
+        results: Dict[str, bool] = {}
+        for key in keys:
+            try:
+                results[key] = bool(self.delete_file(key))
+            except Exception as e:
+                print(f"Delete failed for {key}: {str(e)}")
+                results[key] = False
+        return results
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """
+        批量复制文件
+
+        默认实现逐个调用 copy_file，后端可重写为批量请求。
+
+        Args:
+            pairs: (源对象键名, 目标对象键名) 列表
+
+        Returns:
+            目标键名到是否复制成功的映射
+        """
+        results: Dict[str, bool] = {}
+        for source_key, dest_key in pairs:
+            try:
+                results[dest_key] = bool(self.copy_file(source_key, dest_key))
+            except Exception as e:
+                print(f"Copy failed for {source_key}: {str(e)}")
+                results[dest_key] = False
+        return results
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        """
+        批量上传文件
+
+        默认实现逐个调用 upload_file，后端可重写为并发或批量请求。
+
+        Args:
+            files: (对象键名, 文件内容, 文件类型) 列表，同一键名出现多次时以最后一次为准
+
+        Returns:
+            键名到是否上传成功的映射
+        """
+        results: Dict[str, bool] = {}
+        for key, file_data, content_type in {item[0]: item for item in files}.values():
+            try:
+                results[key] = bool(self.upload_file(key, file_data, content_type))
+            except Exception as e:
+                print(f"Upload failed for {key}: {str(e)}")
+                results[key] = False
+        return results
+
+    def get_object_range(self, key: str, start: int, end: int) -> Dict[str, Any]:
+        """
+        获取对象的一段字节范围
+
+        默认实现读取完整对象并截取所需范围（范围之前的数据不保留在内存中），
+        支持范围请求的后端应重写此方法。
+
+        Args:
+            key: 对象键名
+            start: 起始字节位置
+            end: 结束字节位置（包含）
+
+        Returns:
+            与 get_object 格式相同的字典，Body 只包含指定范围的内容
+        """
+        from .streaming import SlicedBody
+
+        obj = self.get_object(key)
+        return {
+            "Body": SlicedBody(obj["Body"], start, end),
+            "ContentLength": end - start + 1,
+            "ContentType": obj.get("ContentType", "application/octet-stream"),
+        }
+
     def generate_download_response(self, key: str) -> Dict[str, Any]:
         """
         生成文件下载响应
@@ -218,9 +476,11 @@ class BaseStorage(ABC):
 
         Returns:
             包含下载信息的字典，包括:
-            - type: "redirect" 或 "content"
+            - type: "redirect"、"content"、"stream" 或 "file"
             - url: 重定向URL（当type为redirect时）
             - content: 文件内容（当type为content时）
+            - filename: 下载文件名（当type为stream或file时），stream 类型由路由通过 get_object_range 逐块转发
+            - path: 本地文件路径（当type为file时）
             - headers: HTTP响应头
             - mimetype: MIME类型
         """
@@ -0,0 +1,202 @@
+"""
+缓存工具模块
+提供存储层使用的进程内缓存实现
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """线程安全的有界 LRU 缓存，条目在 ttl 秒后过期
+
+    设置 stale_ttl 后，过期条目会在额外的 stale_ttl 秒内保留为“陈旧”状态，
+    可通过 get_stale 读取，用于 stale-while-revalidate。
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, stale_ttl: float = 0.0):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最大条目数，超出时淘汰最久未使用的条目
+            ttl: 默认过期时间（秒）
+            stale_ttl: 过期后仍可作为陈旧数据读取的时间（秒）
+        """
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self.stale_ttl = max(0.0, float(stale_ttl))
+        self._data: "OrderedDict[Hashable, tuple[float, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: Hashable, allow_stale: bool):
+        """在持有锁的情况下查找条目，返回 (值, 是否新鲜) 或 None"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, stale_until, value = item
+        now = time.monotonic()
+        if stale_until <= now:
+            del self._data[key]
+            return None
+        fresh = expires_at > now
+        if not fresh and not allow_stale:
+            return None
+        self._data.move_to_end(key)
+        return value, fresh
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        读取缓存条目
+
+        Args:
+            key: 缓存键
+            default: 未命中或已过期时返回的默认值
+
+        Returns:
+            缓存值或默认值
+        """
+        with self._lock:
+            found = self._lookup(key, allow_stale=False)
+        return default if found is None else found[0]
+
+    def get_stale(self, key: Hashable) -> Optional[tuple[Any, bool]]:
+        """
+        读取缓存条目，允许返回已过期但仍在陈旧窗口内的数据
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            (缓存值, 是否新鲜)，未命中时返回 None
+        """
+        with self._lock:
+            return self._lookup(key, allow_stale=True)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        写入缓存条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 过期时间（秒），为空时使用默认值
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, expires_at + self.stale_ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """移除并返回缓存条目"""
+        with self._lock:
+            item = self._data.pop(key, None)
+        if item is None or item[0] <= time.monotonic():
+            return default
+        return item[2]
+
+    def pop_prefix(self, prefix: str) -> int:
+        """
+        移除所有以指定前缀开头的字符串键
+
+        Args:
+            prefix: 键前缀
+
+        Returns:
+            被移除的条目数
+        """
+        with self._lock:
+            keys = [k for k in self._data if isinstance(k, str) and k.startswith(prefix)]
+            for k in keys:
+                del self._data[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+_MISSING = object()
+
+
+class BloomFilter:
+    """线程安全的布隆过滤器，用于快速判断键是否一定不存在"""
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.01):
+        """
+        初始化布隆过滤器
+
+        Args:
+            capacity: 预期容纳的元素数量
+            error_rate: 期望的误判率
+        """
+        self.capacity = max(1, int(capacity))
+        self.error_rate = min(max(float(error_rate), 1e-6), 0.5)
+        self.num_bits = max(8, int(-self.capacity * math.log(self.error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str):
+        """使用双重哈希计算元素对应的比特位"""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        """添加元素"""
+        with self._lock:
+            for pos in self._positions(item):
+                self._bits[pos >> 3] |= 1 << (pos & 7)
+            self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        with self._lock:
+            return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def is_saturated(self) -> bool:
+        """写入次数超过容量后误判率会明显上升，需要重建"""
+        return self._count >= self.capacity
+
+    def clear(self) -> None:
+        """清空过滤器"""
+        with self._lock:
+            self._bits = bytearray(len(self._bits))
+            self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def time_bucket(bucket_seconds: int, now: Optional[float] = None) -> tuple[int, int]:
+    """
+    计算当前时间所在的对齐时间桶
+
+    Args:
+        bucket_seconds: 时间桶长度（秒）
+        now: 当前 Unix 时间戳，默认取系统时间
+
+    Returns:
+        (桶起始时间戳, 桶结束时间戳)
+    """
+    now = time.time() if now is None else now
+    bucket_seconds = max(1, int(bucket_seconds))
+    start = int(now // bucket_seconds) * bucket_seconds
+    return start, start + bucket_seconds
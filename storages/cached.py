@@ -0,0 +1,413 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from config import Config
+from metrics import REGISTRY
+from tracing import record_span
+
+from .base import BaseStorage, ObjectNotFoundError
+from .cache import BloomFilter, TTLCache
+from .resilience import CircuitBreaker, CircuitOpenError
+from .wrapper import StorageWrapper
+
+# 缓存命中情况的指标名称
+CACHE_REQUESTS = "cloudindex_cache_requests_total"
+
+
+def _count_cache(cache: str, result: str, count: int = 1) -> None:
+    """记录缓存查询结果的指标，并计入当前请求的耗时明细"""
+    REGISTRY.inc(CACHE_REQUESTS, count, cache=cache, result=result)
+    record_span(f"cache.{cache}.{result}", count=count)
+
+
+def _parent_prefix(key: str) -> str:
+    """返回对象所在目录的前缀（根目录为空字符串）"""
+    key = key.rstrip("/")
+    return key.rsplit("/", 1)[0] + "/" if "/" in key else ""
+
+
+def _normalize_prefix(prefix: str) -> str:
+    """目录前缀统一以 / 结尾（根目录为空字符串）"""
+    if prefix and not prefix.endswith("/"):
+        return prefix + "/"
+    return prefix or ""
+
+
+class ExistenceFilter:
+    """基于列表结果构建的对象存在性索引
+
+    只有当某个目录的完整列表在有效期内被加载过时，才能断言该目录下的键不存在；
+    其余情况返回“未知”，交由后端查询。
+    """
+
+    def __init__(self, capacity: int, error_rate: float, ttl: int):
+        """
+        初始化存在性索引
+
+        Args:
+            capacity: 布隆过滤器容量
+            error_rate: 布隆过滤器误判率
+            ttl: 目录列表被视为完整的有效期（秒）
+        """
+        self.bloom = BloomFilter(capacity=capacity, error_rate=error_rate)
+        self.listed_prefixes = TTLCache(maxsize=max(1, capacity // 10), ttl=ttl)
+
+    def record_listing(self, prefix: str, keys) -> None:
+        """记录某个目录的完整列表"""
+        if self.bloom.is_saturated():
+            # 布隆过滤器无法删除元素，写满后整体重建
+            self.bloom.clear()
+            self.listed_prefixes.clear()
+        for key in keys:
+            self.bloom.add(key)
+        self.listed_prefixes.set(prefix, True)
+
+    def add(self, key: str) -> None:
+        """记录新写入的对象"""
+        self.bloom.add(key)
+
+    def forget_prefix(self, prefix: str) -> None:
+        """批量写入某个前缀后，其下目录不再被视为完整"""
+        self.listed_prefixes.pop_prefix(prefix)
+
+    def might_exist(self, key: str) -> Optional[bool]:
+        """
+        判断对象是否可能存在
+
+        Returns:
+            False 表示一定不存在，True 表示可能存在，None 表示未知
+        """
+        if _parent_prefix(key) not in self.listed_prefixes:
+            return None
+        return key in self.bloom
+
+
+class MetadataCachedStorage(StorageWrapper):
+    """带目录列表和对象元数据缓存的存储包装器
+
+    list_objects 的结果和写操作会顺带填充元数据缓存，
+    get_object_info 优先读取缓存，仅在未命中或过期时访问后端。
+    不存在的键会进入短期的负缓存，可选的存在性索引可在本地直接判定缺失。
+
+    缓存过期后的一段时间内仍会立即返回旧数据，并在后台刷新（stale-while-revalidate）；
+    对后端的读取经过熔断器，熔断期间只提供缓存中的旧数据。
+    """
+
+    def __init__(self, storage: BaseStorage, maxsize: int = None, ttl: int = None):
+        """
+        初始化元数据缓存包装器
+
+        Args:
+            storage: 被包装的存储实例
+            maxsize: 缓存的最大对象数
+            ttl: 缓存过期时间（秒）
+        """
+        super().__init__(storage)
+        maxsize = maxsize or Config.METADATA_CACHE_MAX_ENTRIES
+        ttl = ttl if ttl is not None else Config.METADATA_CACHE_TTL_SECONDS
+        stale_ttl = Config.STALE_CACHE_TTL_SECONDS
+        self.metadata_cache = TTLCache(maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
+        self.listing_cache = TTLCache(
+            maxsize=Config.LISTING_CACHE_MAX_ENTRIES,
+            ttl=Config.LISTING_CACHE_TTL_SECONDS,
+            stale_ttl=stale_ttl,
+        )
+        self.negative_cache = TTLCache(maxsize=maxsize, ttl=Config.NEGATIVE_CACHE_TTL_SECONDS)
+        self.existence_filter: Optional[ExistenceFilter] = None
+        if Config.EXISTENCE_FILTER_ENABLED:
+            self.existence_filter = ExistenceFilter(
+                capacity=Config.EXISTENCE_FILTER_CAPACITY,
+                error_rate=Config.EXISTENCE_FILTER_ERROR_RATE,
+                ttl=ttl,
+            )
+
+        self.breaker = CircuitBreaker(
+            name=Config.STORAGE_TYPE or type(storage).__name__,
+            window_size=Config.CIRCUIT_BREAKER_WINDOW,
+            min_calls=Config.CIRCUIT_BREAKER_MIN_CALLS,
+            error_threshold=Config.CIRCUIT_BREAKER_ERROR_THRESHOLD,
+            slow_call_seconds=Config.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_threshold=Config.CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD,
+            cooldown=Config.CIRCUIT_BREAKER_COOLDOWN_SECONDS,
+            ignored_exceptions=(ObjectNotFoundError,),
+        )
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=max(1, Config.SWR_REFRESH_WORKERS), thread_name_prefix="cache-refresh"
+        )
+        self._refreshing: set = set()
+        self._refresh_lock = threading.Lock()
+
+    def _refresh_in_background(self, task_key: Hashable, func: Callable[[], Any]) -> None:
+        """在后台刷新缓存条目，同一条目同时只有一个刷新任务"""
+        with self._refresh_lock:
+            if task_key in self._refreshing:
+                return
+            self._refreshing.add(task_key)
+
+        def _run():
+            try:
+                func()
+            except CircuitOpenError:
+                # 熔断期间继续提供旧数据，等待熔断器恢复
+                pass
+            except Exception as e:
+                print(f"Background cache refresh failed for {task_key}: {str(e)}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(task_key)
+
+        self._refresh_executor.submit(_run)
+
+    @staticmethod
+    def _info_from_listing(obj: Dict[str, Any]) -> Dict[str, Any]:
+        """将列表中的对象条目转换为 get_object_info 兼容的格式"""
+        info = dict(obj)
+        if "ContentLength" not in info and "Size" in info:
+            info["ContentLength"] = info["Size"]
+        return info
+
+    def _remember(self, key: str, info: Dict[str, Any]) -> None:
+        """写入单个对象的元数据"""
+        if key and not key.endswith("/"):
+            self.metadata_cache.set(key, info)
+            self.negative_cache.pop(key)
+            if self.existence_filter:
+                self.existence_filter.add(key)
+
+    def _forget(self, key: str) -> Optional[Dict[str, Any]]:
+        """移除单个对象的元数据及其所在目录的列表缓存"""
+        self.negative_cache.pop(key)
+        self.listing_cache.pop(_parent_prefix(key))
+        return self.metadata_cache.pop(key)
+
+    def _forget_ancestors(self, keys: Iterable[str]) -> None:
+        """移除对象所有上级目录（含根目录）的列表缓存，写入可能一次创建或清空多层文件夹"""
+        prefixes = {""}
+        for key in keys:
+            parent = _parent_prefix(key)
+            while parent and parent not in prefixes:
+                prefixes.add(parent)
+                parent = _parent_prefix(parent)
+        for prefix in prefixes:
+            self.listing_cache.pop(prefix)
+
+    def _forget_prefix(self, prefix: str) -> None:
+        """移除某个前缀下所有对象的元数据"""
+        prefix = _normalize_prefix(prefix)
+        self.metadata_cache.pop_prefix(prefix)
+        self.negative_cache.pop_prefix(prefix)
+        self.listing_cache.pop_prefix(prefix)
+        self._forget_ancestors([prefix])
+        if self.existence_filter:
+            self.existence_filter.forget_prefix(prefix)
+
+    def _load_listing(self, prefix: str) -> Dict[str, Any]:
+        """从后端加载目录列表并写入缓存"""
+        response = self.breaker.call(
+            lambda: self.storage.list_objects(prefix),
+            is_failure=lambda r: bool(r.get("Error")),
+        )
+        # 列表失败（如 GitHub 返回 Error 字段）时不写入缓存
+        if response.get("Error"):
+            return response
+
+        normalized = _normalize_prefix(prefix)
+        self.listing_cache.set(normalized, response)
+
+        contents = response.get("Contents", []) or []
+        for obj in contents:
+            self._remember(obj.get("Key", ""), self._info_from_listing(obj))
+
+        # 被截断的列表不能作为完整目录
+        if self.existence_filter and not response.get("IsTruncated"):
+            self.existence_filter.record_listing(normalized, (obj.get("Key", "") for obj in contents))
+        return response
+
+    def _load_info(self, key: str) -> Dict[str, Any]:
+        """从后端加载对象元数据并写入缓存"""
+        try:
+            info = self.breaker.call(lambda: self.storage.get_object_info(key))
+        except ObjectNotFoundError:
+            self.metadata_cache.pop(key)
+            self.negative_cache.set(key, True)
+            raise
+        self._remember(key, info)
+        return info
+
+    def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        normalized = _normalize_prefix(prefix)
+        found = self.listing_cache.get_stale(normalized)
+        if found is not None:
+            response, fresh = found
+            _count_cache("listing", "hit" if fresh else "stale")
+            if not fresh:
+                self._refresh_in_background(("list", normalized), lambda: self._load_listing(prefix))
+            return response
+
+        _count_cache("listing", "miss")
+        return self._load_listing(prefix)
+
+    def get_object_info(self, key: str) -> Dict[str, Any]:
+        found = self.metadata_cache.get_stale(key)
+        if found is not None:
+            info, fresh = found
+            _count_cache("metadata", "hit" if fresh else "stale")
+            if not fresh:
+                self._refresh_in_background(("info", key), lambda: self._load_info(key))
+            return info
+
+        if self.negative_cache.get(key) is not None:
+            _count_cache("metadata", "negative")
+            raise ObjectNotFoundError(f"Object not found: {key}")
+
+        if self.existence_filter and self.existence_filter.might_exist(key) is False:
+            _count_cache("metadata", "filtered")
+            self.negative_cache.set(key, True)
+            raise ObjectNotFoundError(f"Object not found: {key}")
+
+        _count_cache("metadata", "miss")
+        return self._load_info(key)
+
+    def head_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        misses = []
+        for key in dict.fromkeys(keys):
+            info = self.metadata_cache.get(key)
+            if info is not None:
+                results[key] = info
+            elif self.negative_cache.get(key) is not None:
+                results[key] = None
+            else:
+                misses.append(key)
+
+        negatives = sum(1 for info in results.values() if info is None)
+        _count_cache("metadata", "hit", len(results) - negatives)
+        _count_cache("metadata", "negative", negatives)
+        _count_cache("metadata", "miss", len(misses))
+        if misses:
+            fetched = self.breaker.call(lambda: self.storage.head_many(misses))
+            for key, info in fetched.items():
+                if info is None:
+                    self.negative_cache.set(key, True)
+                else:
+                    self._remember(key, info)
+            results.update(fetched)
+        return results
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        for key in keys:
+            self._forget(key)
+        results = self.storage.delete_many(keys)
+        self._forget_ancestors(keys)
+        for key, success in results.items():
+            self._forget(key)
+            if success:
+                self.negative_cache.set(key, True)
+        return results
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        for _, dest_key in pairs:
+            self._forget(dest_key)
+        results = self.storage.copy_many(pairs)
+        self._forget_ancestors(dest_key for _, dest_key in pairs)
+        for source_key, dest_key in pairs:
+            self._forget(dest_key)
+            if results.get(dest_key):
+                info = self.metadata_cache.get(source_key)
+                if info is not None:
+                    self._remember(dest_key, {**info, "Key": dest_key})
+                elif self.existence_filter:
+                    self.existence_filter.add(dest_key)
+        return results
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        for key, _, _ in files:
+            self._forget(key)
+        results = self.storage.upload_many(files)
+        self._forget_ancestors(key for key, _, _ in files)
+        for key, file_data, content_type in files:
+            self._forget(key)
+            if results.get(key):
+                size = len(file_data) if file_data is not None else 0
+                self._remember(key, {"Key": key, "Size": size, "ContentLength": size, "ContentType": content_type})
+        return results
+
+    def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        # 先移除旧条目，避免上传失败时残留过期信息
+        self._forget(key)
+        success = self.storage.upload_file(key, file_data, content_type)
+        # 写操作完成后再次失效目录列表，防止期间的后台刷新写回旧列表；
+        # 上传可能创建多层新文件夹，所有上级目录的列表都需要失效
+        self._forget(key)
+        self._forget_ancestors([key])
+        if success:
+            size = len(file_data) if file_data is not None else 0
+            self._remember(key, {"Key": key, "Size": size, "ContentLength": size, "ContentType": content_type})
+        return success
+
+    def delete_file(self, key: str) -> bool:
+        self._forget(key)
+        success = self.storage.delete_file(key)
+        self._forget(key)
+        self._forget_ancestors([key])
+        if success:
+            self.negative_cache.set(key, True)
+        return success
+
+    def rename_file(self, old_key: str, new_key: str) -> bool:
+        info = self._forget(old_key)
+        self._forget(new_key)
+        success = self.storage.rename_file(old_key, new_key)
+        self._forget(old_key)
+        self._forget(new_key)
+        self._forget_ancestors([old_key, new_key])
+        if success:
+            self.negative_cache.set(old_key, True)
+            if info is not None:
+                self._remember(new_key, {**info, "Key": new_key})
+            elif self.existence_filter:
+                self.existence_filter.add(new_key)
+        return success
+
+    def delete_folder(self, prefix: str) -> bool:
+        self._forget_prefix(prefix)
+        try:
+            return self.storage.delete_folder(prefix)
+        finally:
+            self._forget_prefix(prefix)
+
+    def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        self._forget_prefix(old_prefix)
+        self._forget_prefix(new_prefix)
+        try:
+            return self.storage.rename_folder(old_prefix, new_prefix)
+        finally:
+            self._forget_prefix(old_prefix)
+            self._forget_prefix(new_prefix)
+
+    def copy_file(self, source_key: str, dest_key: str) -> bool:
+        self._forget(dest_key)
+        success = self.storage.copy_file(source_key, dest_key)
+        self._forget(dest_key)
+        self._forget_ancestors([dest_key])
+        if success:
+            info = self.metadata_cache.get(source_key)
+            if info is not None:
+                self._remember(dest_key, {**info, "Key": dest_key})
+            elif self.existence_filter:
+                self.existence_filter.add(dest_key)
+        return success
+
+    def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        self._forget_prefix(dest_prefix)
+        try:
+            return self.storage.copy_folder(source_prefix, dest_prefix)
+        finally:
+            self._forget_prefix(dest_prefix)
+
+    def create_folder(self, key: str) -> bool:
+        try:
+            return self.storage.create_folder(key)
+        finally:
+            self._forget_prefix(key)
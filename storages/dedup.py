@@ -0,0 +1,186 @@
+"""
+按内容哈希去重上传
+
+将待上传的内容与后端已有对象的内容哈希（R2 的 MD5 ETag、GitHub 的 blob SHA-1、
+OneDrive 的 quickXorHash / SHA-1 / SHA-256）比较，内容未变化时跳过写入；
+同一批中内容相同的文件只上传一次，其余在服务端复制。
+"""
+
+import base64
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from metrics import REGISTRY
+
+from .base import CONTENT_HASH_PATTERN
+
+UPLOAD_DEDUP = "cloudindex_upload_dedup_total"
+
+UploadItem = Tuple[str, bytes, Optional[str]]
+
+
+def count_uploads(backend: str, result: str, count: int = 1) -> None:
+    """记录上传去重结果：uploaded（实际上传）、unchanged（内容未变化，跳过）、copied（服务端复制）"""
+    if count:
+        REGISTRY.inc(UPLOAD_DEDUP, count, backend=backend, result=result)
+
+
+def git_blob_sha(data: bytes) -> str:
+    """计算 git blob 的 SHA-1（GitHub 树条目中的 sha）"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def quick_xor_hash(data: bytes) -> str:
+    """
+    计算 OneDrive 的 quickXorHash
+
+    第 i 个字节循环左移 11 * i 位后异或进 160 位的寄存器，最后将长度异或进末尾 8 个字节。
+    位置相差 160 的字节移位相同，因此先按 160 字节分块整体异或，再对 160 个字节分别移位。
+    """
+    folded = 0
+    for offset in range(0, len(data), 160):
+        folded ^= int.from_bytes(data[offset : offset + 160], "little")
+    lanes = folded.to_bytes(160, "little")
+
+    mask = (1 << 160) - 1
+    value = 0
+    for i, byte in enumerate(lanes):
+        if byte:
+            shift = (11 * i) % 160
+            value ^= ((byte << shift) | (byte >> (160 - shift))) & mask
+    digest = bytearray(value.to_bytes(20, "little"))
+    for i, byte in enumerate(len(data).to_bytes(8, "little")):
+        digest[12 + i] ^= byte
+    return base64.b64encode(bytes(digest)).decode("ascii")
+
+
+def content_matches(version: str, data: bytes) -> bool:
+    """
+    判断数据是否与内容哈希形式的版本一致
+
+    Args:
+        version: MD5、git blob SHA-1 或 SHA-256 的十六进制字符串
+        data: 文件内容
+
+    Returns:
+        一致时返回 True；版本不是可识别的内容哈希时返回 False
+    """
+    version = (version or "").strip('"').lower()
+    if not CONTENT_HASH_PATTERN.fullmatch(version):
+        return False
+    if len(version) == 32:
+        return hashlib.md5(data).hexdigest() == version
+    if len(version) == 40:
+        return git_blob_sha(data) == version
+    return hashlib.sha256(data).hexdigest() == version
+
+
+def info_matches(info: Optional[Dict[str, Any]], data: bytes) -> bool:
+    """
+    判断已有对象的内容是否与待上传的数据相同
+
+    依次使用对象信息中的 Hashes（OneDrive 的 file.hashes）和内容哈希形式的 ETag，
+    大小不同时直接判定为不同。
+    """
+    if not info:
+        return False
+    size = info.get("ContentLength", info.get("Size"))
+    if size is not None and size != len(data):
+        return False
+    hashes = info.get("Hashes") or {}
+    if hashes.get("sha256Hash"):
+        return hashes["sha256Hash"].lower() == hashlib.sha256(data).hexdigest()
+    if hashes.get("sha1Hash"):
+        return hashes["sha1Hash"].lower() == hashlib.sha1(data).hexdigest()
+    if hashes.get("quickXorHash"):
+        return hashes["quickXorHash"] == quick_xor_hash(data)
+    return content_matches(str(info.get("ETag") or ""), data)
+
+
+def is_unchanged(get_object_info: Callable[[str], Dict[str, Any]], key: str, data: bytes) -> bool:
+    """查询已有对象并判断内容是否与待上传的数据相同，对象不存在或查询失败时返回 False"""
+    try:
+        return info_matches(get_object_info(key), data)
+    except Exception:
+        return False
+
+
+def plan_uploads(
+    files: List[UploadItem], existing: Dict[str, Optional[Dict[str, Any]]]
+) -> Tuple[List[UploadItem], List[Tuple[str, str]], List[str]]:
+    """
+    规划一批上传
+
+    Args:
+        files: (对象键名, 文件内容, 文件类型) 列表，同一键名以最后一次为准
+        existing: 键名到已有对象信息的映射（head_many 的结果）
+
+    Returns:
+        (需要上传的文件, 上传后在服务端复制的 (源键名, 目标键名), 内容未变化而跳过的键名)
+    """
+    uploads: List[UploadItem] = []
+    copies: List[Tuple[str, str]] = []
+    unchanged: List[str] = []
+    first_by_digest: Dict[str, str] = {}
+    for key, data, content_type in {item[0]: item for item in files}.values():
+        if info_matches(existing.get(key), data):
+            unchanged.append(key)
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        source = first_by_digest.get(digest)
+        if source is None or not data:
+            first_by_digest[digest] = key
+            uploads.append((key, data, content_type))
+        else:
+            copies.append((source, key))
+    return uploads, copies, unchanged
+
+
+def upload_deduplicated(
+    backend: str,
+    files: List[UploadItem],
+    head_many: Callable[[List[str]], Dict[str, Optional[Dict[str, Any]]]],
+    upload_many: Callable[[List[UploadItem]], Dict[str, bool]],
+    copy_many: Callable[[List[Tuple[str, str]]], Dict[str, bool]],
+) -> Dict[str, bool]:
+    """
+    去重后执行一批上传：查询已有对象，跳过未变化的文件，相同内容只上传一次并在服务端复制
+
+    Args:
+        backend: 后端名称（用于指标）
+        files: (对象键名, 文件内容, 文件类型) 列表
+        head_many: 批量查询已有对象信息
+        upload_many: 实际上传一批文件
+        copy_many: 批量服务端复制
+
+    Returns:
+        键名到是否成功（含跳过）的映射
+    """
+    keys = list(dict.fromkeys(key for key, _, _ in files))
+    try:
+        existing = head_many(keys)
+    except Exception as e:
+        print(f"Dedup lookup failed, uploading all: {str(e)}")
+        existing = {}
+    uploads, copies, unchanged = plan_uploads(files, existing)
+
+    results = dict.fromkeys(unchanged, True)
+    if uploads:
+        results.update(upload_many(uploads))
+    # 源文件上传失败时，复制改为直接上传
+    data_by_key = {key: (data, content_type) for key, data, content_type in files}
+    copies_ready = [(source, dest) for source, dest in copies if results.get(source)]
+    fallback = [(dest, *data_by_key[dest]) for source, dest in copies if not results.get(source)]
+    copied = copy_many(copies_ready) if copies_ready else {}
+    for _, dest in copies_ready:
+        if copied.get(dest):
+            results[dest] = True
+        else:
+            fallback.append((dest, *data_by_key[dest]))
+    if fallback:
+        results.update(upload_many(fallback))
+
+    count_uploads(backend, "unchanged", len(unchanged))
+    count_uploads(backend, "copied", len(copies) - len(fallback))
+    count_uploads(backend, "uploaded", len(uploads) + len(fallback))
+    return {key: bool(results.get(key)) for key in keys}
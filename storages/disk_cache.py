@@ -0,0 +1,425 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+from metrics import REGISTRY
+
+from .base import CONTENT_HASH_PATTERN, BaseStorage, object_version
+from .cached import _count_cache, _normalize_prefix
+from .dedup import content_matches
+from .local import FileBody
+from .singleflight import SingleFlight
+from .streaming import StreamWrapper
+from .wrapper import StorageWrapper
+
+# 写入过程中的临时文件前缀，启动时清理残留
+TEMP_PREFIX = ".tmp-"
+
+
+def _read_body(body: Any) -> bytes:
+    """读取 get_object 返回的 Body（bytes、带 read() 的流或带 data 属性的对象）"""
+    if hasattr(body, "read"):
+        return body.read()
+    if hasattr(body, "data"):
+        return body.data
+    return body or b""
+
+
+class CachingStorage(StorageWrapper):
+    """带本地磁盘对象内容缓存的存储包装器
+
+    经由服务器中继的小文件（如 GitHub 的下载响应）在首次读取后写入缓存目录，
+    之后的请求以 "file" 类型的下载响应直接从磁盘发送，支持 Range 和条件请求。
+
+    每次命中前用对象信息（优先命中元数据缓存）校验版本：ETag 为内容哈希时只比较 ETag，
+    否则比较 ETag、大小和修改时间；写入时按内容哈希校验下载到的数据。
+    缓存总大小超过预算时按最近使用时间淘汰，重启后从磁盘上的索引文件恢复。
+    """
+
+    def __init__(
+        self,
+        storage: BaseStorage,
+        directory: str = None,
+        max_bytes: int = None,
+        max_object_bytes: int = None,
+    ):
+        """
+        初始化内容缓存包装器
+
+        Args:
+            storage: 被包装的存储实例
+            directory: 缓存目录，默认使用系统临时目录
+            max_bytes: 缓存总大小上限（字节）
+            max_object_bytes: 单个可缓存对象的大小上限（字节）
+        """
+        super().__init__(storage)
+        self.directory = (
+            directory or Config.BODY_CACHE_DIR or os.path.join(tempfile.gettempdir(), "cloud-index-body-cache")
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else Config.BODY_CACHE_MAX_BYTES
+        self.max_object_bytes = max_object_bytes if max_object_bytes is not None else Config.BODY_CACHE_MAX_OBJECT_BYTES
+        os.makedirs(self.directory, exist_ok=True)
+
+        # 键名 -> {"version", "size", "content_type"}，按最近使用排序
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # 并发读取同一个未缓存对象时只下载一次
+        self.flights = SingleFlight()
+        self._load_index()
+
+        REGISTRY.register_collector(
+            "cloudindex_body_cache_bytes",
+            "gauge",
+            "Bytes of object bodies held in the on-disk cache.",
+            lambda: [({}, self._bytes)],
+        )
+        REGISTRY.register_collector(
+            "cloudindex_body_cache_entries",
+            "gauge",
+            "Objects held in the on-disk cache.",
+            lambda: [({}, len(self._entries))],
+        )
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        """返回对象的内容文件和索引文件路径"""
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name + ".bin"), os.path.join(self.directory, name + ".json")
+
+    def _load_index(self) -> None:
+        """从磁盘上的索引文件恢复缓存条目，按内容文件的访问时间（最近使用时间）排序"""
+        loaded = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(TEMP_PREFIX):
+                self._remove(path)
+                continue
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                body_path, _ = self._paths(meta["key"])
+                stat = os.stat(body_path)
+                if stat.st_size != meta["size"]:
+                    raise ValueError("size mismatch")
+            except (OSError, ValueError, KeyError):
+                self._remove(path)
+                continue
+            loaded.append((stat.st_atime, meta))
+
+        for _, meta in sorted(loaded, key=lambda item: item[0]):
+            self._entries[meta["key"]] = {
+                "version": meta["version"],
+                "size": meta["size"],
+                "content_type": meta["content_type"],
+            }
+            self._bytes += meta["size"]
+
+        # 删除没有索引文件的内容文件
+        for name in os.listdir(self.directory):
+            if name.endswith(".bin") and not os.path.exists(os.path.join(self.directory, name[:-4] + ".json")):
+                self._remove(os.path.join(self.directory, name))
+        self._evict()
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _matches(version: str, content: bytes) -> bool:
+        """版本为内容哈希时校验下载到的数据，防止对象在读取信息和下载之间被修改"""
+        # 非内容哈希的版本（OneDrive 的 ID|大小|修改时间）无法校验
+        return not CONTENT_HASH_PATTERN.fullmatch(version) or content_matches(version, content)
+
+    @staticmethod
+    def _size(info: Dict[str, Any]) -> int:
+        return info.get("ContentLength", info.get("Size")) or 0
+
+    def _lookup(self, key: str, version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        查找与当前版本一致的缓存条目，命中时更新最近使用时间
+
+        Returns:
+            包含 path、size 和 content_type 的字典，未命中返回 None
+        """
+        if version is None:
+            return None
+        body_path, _ = self._paths(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                _count_cache("body", "miss")
+                return None
+            if entry["version"] != version:
+                _count_cache("body", "stale")
+                self._drop_locked(key)
+                return None
+            try:
+                # 只更新访问时间：修改时间决定发送文件时的 ETag 和 Last-Modified，需保持不变
+                stat = os.stat(body_path)
+                os.utime(body_path, ns=(time.time_ns(), stat.st_mtime_ns))
+            except OSError:
+                # 内容文件被外部删除
+                _count_cache("body", "miss")
+                self._drop_locked(key)
+                return None
+            self._entries.move_to_end(key)
+            _count_cache("body", "hit")
+            return {"path": body_path, "size": entry["size"], "content_type": entry["content_type"]}
+
+    def _write_file(self, path: str, data: bytes) -> None:
+        """写入临时文件后原子替换目标文件"""
+        temp_path = os.path.join(self.directory, f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            self._remove(temp_path)
+            raise
+
+    def _store(self, key: str, version: str, content: bytes, content_type: str) -> Optional[str]:
+        """
+        写入缓存条目
+
+        Returns:
+            内容文件路径，对象过大、内容与版本不符或写入失败时返回 None
+        """
+        if len(content) > self.max_object_bytes or len(content) > self.max_bytes:
+            return None
+        if not self._matches(version, content):
+            return None
+
+        body_path, meta_path = self._paths(key)
+        meta = {"key": key, "version": version, "size": len(content), "content_type": content_type}
+        try:
+            self._write_file(body_path, content)
+            self._write_file(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        except OSError as e:
+            print(f"Body cache write failed: {str(e)}")
+            self._drop(key)
+            return None
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous["size"]
+            self._entries[key] = {"version": version, "size": len(content), "content_type": content_type}
+            self._bytes += len(content)
+            self._evict_locked(keep=key)
+        return body_path
+
+    def _evict(self) -> None:
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self, keep: str = None) -> None:
+        """按最近使用顺序淘汰条目，直到总大小不超过预算"""
+        while self._bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            self._drop_locked(key)
+
+    def _drop_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+        for path in self._paths(key):
+            self._remove(path)
+
+    def _drop(self, key: str) -> None:
+        """移除单个对象的缓存"""
+        with self._lock:
+            self._drop_locked(key)
+
+    def _drop_prefix(self, prefix: str) -> None:
+        """移除某个前缀下所有对象的缓存"""
+        prefix = _normalize_prefix(prefix)
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._drop_locked(key)
+
+    @staticmethod
+    def _file_response(key: str, path: str, content_type: str) -> Dict[str, Any]:
+        return {
+            "type": "file",
+            "path": path,
+            "mimetype": content_type or "application/octet-stream",
+            "filename": key.rsplit("/", 1)[-1],
+        }
+
+    def _fetch_download(self, key: str, version: str, size: int) -> Optional[Dict[str, Any]]:
+        """
+        从下层获取下载响应，中继的小文件写入缓存后以文件形式返回
+
+        "content" 类型直接缓存其内容；"stream" 类型在大小不超过单个对象上限时读取完整内容后缓存，
+        更大的文件仍由路由逐块转发。重定向和本地文件无需缓存。
+        """
+        response = self.storage.generate_download_response(key)
+        if not response:
+            return response
+        mimetype = response.get("mimetype")
+        if response.get("type") == "content" and isinstance(response.get("content"), bytes):
+            path = self._store(key, version, response["content"], mimetype)
+        elif response.get("type") == "stream" and size <= self.max_object_bytes:
+            path = self._fetch_object(key, version, mimetype).get("path")
+        else:
+            return response
+        if path is None:
+            return response
+        return self._file_response(key, path, mimetype)
+
+    def generate_download_response(self, key: str) -> Dict[str, Any]:
+        try:
+            info = self.storage.get_object_info(key)
+        except Exception:
+            return self.storage.generate_download_response(key)
+        version = object_version(info)
+        entry = self._lookup(key, version)
+        if entry is not None:
+            return self._file_response(key, entry["path"], entry["content_type"])
+        if version is None:
+            return self.storage.generate_download_response(key)
+        size = self._size(info)
+        return self.flights.do(("download", key, version), lambda: self._fetch_download(key, version, size))
+
+    def _open(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            body = FileBody(entry["path"])
+        except OSError:
+            # 已被并发的淘汰删除
+            return None
+        return {"Body": body, "ContentLength": entry["size"], "ContentType": entry["content_type"]}
+
+    def _fetch_object(self, key: str, version: str, content_type: str = None) -> Dict[str, Any]:
+        """
+        从下层读取对象内容并写入缓存，返回缓存条目或内存中的内容
+
+        Args:
+            key: 对象键名
+            version: 对象版本
+            content_type: 缓存条目的内容类型，默认使用下层返回的类型
+        """
+        obj = self.storage.get_object(key)
+        content = _read_body(obj.get("Body"))
+        content_type = content_type or obj.get("ContentType", "application/octet-stream")
+        path = self._store(key, version, content, content_type)
+        if path is not None:
+            return {"path": path, "size": len(content), "content_type": content_type}
+        return {"content": content, "content_type": content_type}
+
+    def get_object(self, key: str) -> Dict[str, Any]:
+        try:
+            info = self.storage.get_object_info(key)
+        except Exception:
+            return self.storage.get_object(key)
+        version = object_version(info)
+        if version is None or self._size(info) > self.max_object_bytes:
+            # 大文件保持流式读取
+            return self.storage.get_object(key)
+
+        entry = self._lookup(key, version)
+        obj = self._open(entry) if entry is not None else None
+        if obj is not None:
+            return obj
+
+        fetched = self.flights.do(("get_object", key, version), lambda: self._fetch_object(key, version))
+        if "path" in fetched:
+            obj = self._open(fetched)
+            if obj is not None:
+                return obj
+            return self.storage.get_object(key)
+        content = fetched["content"]
+        return {"Body": StreamWrapper(content), "ContentLength": len(content), "ContentType": fetched["content_type"]}
+
+    def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        self._drop(key)
+        try:
+            return self.storage.upload_file(key, file_data, content_type)
+        finally:
+            self._drop(key)
+
+    def delete_file(self, key: str) -> bool:
+        self._drop(key)
+        try:
+            return self.storage.delete_file(key)
+        finally:
+            self._drop(key)
+
+    def rename_file(self, old_key: str, new_key: str) -> bool:
+        self._drop(old_key)
+        self._drop(new_key)
+        try:
+            return self.storage.rename_file(old_key, new_key)
+        finally:
+            self._drop(old_key)
+            self._drop(new_key)
+
+    def copy_file(self, source_key: str, dest_key: str) -> bool:
+        self._drop(dest_key)
+        try:
+            return self.storage.copy_file(source_key, dest_key)
+        finally:
+            self._drop(dest_key)
+
+    def delete_folder(self, prefix: str) -> bool:
+        self._drop_prefix(prefix)
+        try:
+            return self.storage.delete_folder(prefix)
+        finally:
+            self._drop_prefix(prefix)
+
+    def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        self._drop_prefix(old_prefix)
+        self._drop_prefix(new_prefix)
+        try:
+            return self.storage.rename_folder(old_prefix, new_prefix)
+        finally:
+            self._drop_prefix(old_prefix)
+            self._drop_prefix(new_prefix)
+
+    def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        self._drop_prefix(dest_prefix)
+        try:
+            return self.storage.copy_folder(source_prefix, dest_prefix)
+        finally:
+            self._drop_prefix(dest_prefix)
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        for key in keys:
+            self._drop(key)
+        try:
+            return self.storage.delete_many(keys)
+        finally:
+            for key in keys:
+                self._drop(key)
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        for _, dest_key in pairs:
+            self._drop(dest_key)
+        try:
+            return self.storage.copy_many(pairs)
+        finally:
+            for _, dest_key in pairs:
+                self._drop(dest_key)
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        for key, _, _ in files:
+            self._drop(key)
+        try:
+            return self.storage.upload_many(files)
+        finally:
+            for key, _, _ in files:
+                self._drop(key)
@@ -3,9 +3,15 @@ from typing import Optional
 from config import Config
 
 from .base import BaseStorage
+from .cached import MetadataCachedStorage
+from .disk_cache import CachingStorage
 from .github import GitHubStorage
+from .index import IndexedStorage
+from .instrumented import InstrumentedStorage
+from .local import LocalStorage
 from .onedrive import OnedriveStorage
 from .r2 import R2Storage
+from .singleflight import SingleFlightStorage
 
 
 class StorageFactory:
@@ -30,7 +36,9 @@ class StorageFactory:
         storage_type = Config.STORAGE_TYPE
 
         if not storage_type:
-            raise RuntimeError("STORAGE_TYPE environment variable is not set. Supported types: r2, github, onedrive")
+            raise RuntimeError(
+                "STORAGE_TYPE environment variable is not set. Supported types: r2, github, onedrive, local"
+            )
 
         if storage_type == "r2":
             cls._instance = R2Storage()
@@ -38,11 +46,40 @@ class StorageFactory:
             cls._instance = GitHubStorage()
         elif storage_type == "onedrive":
             cls._instance = OnedriveStorage()
+        elif storage_type == "local":
+            cls._instance = LocalStorage()
         else:
-            raise RuntimeError(f"Unsupported storage type: {storage_type}. Supported types: r2, github, onedrive")
+            raise RuntimeError(
+                f"Unsupported storage type: {storage_type}. Supported types: r2, github, onedrive, local"
+            )
 
+        cls._instance = cls._wrap(cls._instance)
         return cls._instance
 
+    @classmethod
+    def _wrap(cls, storage: BaseStorage) -> BaseStorage:
+        """
+        按配置为存储实例叠加缓存等包装层
+
+        Args:
+            storage: 原始存储后端实例
+
+        Returns:
+            BaseStorage: 包装后的存储实例
+        """
+        if Config.METRICS_ENABLED or Config.TRACING_ENABLED:
+            storage = InstrumentedStorage(storage, Config.STORAGE_TYPE or type(storage).__name__)
+        if Config.METADATA_CACHE_ENABLED:
+            storage = MetadataCachedStorage(storage)
+        if Config.BODY_CACHE_ENABLED:
+            storage = CachingStorage(storage)
+        if Config.SINGLE_FLIGHT_ENABLED:
+            storage = SingleFlightStorage(storage)
+        # 索引位于最外层，由索引回答的查询不再经过其他包装层
+        if Config.METADATA_INDEX_ENABLED:
+            storage = IndexedStorage(storage)
+        return storage
+
     @classmethod
     def reset(cls):
         """重置单例实例（主要用于测试）"""
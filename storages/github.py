@@ -1,47 +1,21 @@
 import base64
+import contextvars
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
 from PIL import Image
 
 from config import Config
+from recording import instrument_session
 
-from .base import BaseStorage
-
-
-class StreamWrapper:
-    """为 BytesIO 包装器，使其支持 iter_chunks() 方法以兼容 R2 的流式响应"""
-
-    def __init__(self, data: bytes, chunk_size: int = 8192):
-        self.data = data
-        self.chunk_size = chunk_size
-        self.position = 0
-
-    def iter_chunks(self, chunk_size: int = None):
-        """迭代返回数据块"""
-        chunk_size = chunk_size or self.chunk_size
-        offset = 0
-        while offset < len(self.data):
-            yield self.data[offset : offset + chunk_size]
-            offset += chunk_size
-
-    def read(self, size: int = -1):
-        """为了兼容性支持 read() 方法"""
-        if size == -1:
-            return self.data
-        result = self.data[self.position : self.position + size]
-        self.position += len(result)
-        return result
-
-    def seek(self, offset: int):
-        """为了兼容性支持 seek() 方法"""
-        self.position = offset
-
-    def tell(self):
-        """为了兼容性支持 tell() 方法"""
-        return self.position
+from .base import BaseStorage, ObjectNotFoundError
+from .dedup import count_uploads, git_blob_sha
+from .scheduler import RequestScheduler
+from .streaming import ResponseBody, SlicedBody
 
 
 class GitHubStorage(BaseStorage):
@@ -65,8 +39,21 @@ class GitHubStorage(BaseStorage):
         self.repo_name = repo_parts[1]
         self.repo = repo_full
 
-        self.api_base_url = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}"
-        self.raw_content_url = f"https://raw.githubusercontent.com/{self.repo_owner}/{self.repo_name}/{self.branch}"
+        api_url = Config.GITHUB_API_URL.rstrip("/")
+        raw_url = Config.GITHUB_RAW_URL.rstrip("/")
+        self.api_base_url = f"{api_url}/repos/{self.repo_owner}/{self.repo_name}"
+        self.raw_content_url = f"{raw_url}/{self.repo_owner}/{self.repo_name}/{self.branch}"
+
+        # 复用连接池，并通过调度器控制并发、处理限流和重试
+        self.session = instrument_session(requests.Session())
+        self.scheduler = RequestScheduler(
+            "github",
+            initial_limit=Config.BACKEND_INITIAL_CONCURRENCY,
+            max_limit=Config.BACKEND_MAX_CONCURRENCY,
+            max_retries=Config.BACKEND_MAX_RETRIES,
+            max_delay=Config.BACKEND_RETRY_MAX_DELAY,
+            timeout=Config.BACKEND_REQUEST_TIMEOUT,
+        )
 
     def _headers(self) -> Dict[str, str]:
         """返回 API 请求的公共头部信息"""
@@ -75,11 +62,26 @@ class GitHubStorage(BaseStorage):
             "Accept": "application/vnd.github.v3+json",
         }
 
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        通过调度器向 GitHub 发起请求，默认携带 API 认证头
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            **kwargs: 其他请求参数
+
+        Returns:
+            响应对象
+        """
+        kwargs.setdefault("headers", self._headers())
+        return self.scheduler.request(self.session, method, url, **kwargs)
+
     def _get_file_sha(self, file_path: str) -> str:
         """获取文件的 SHA 值用于更新或删除"""
         try:
             url = f"{self.api_base_url}/contents/{file_path}"
-            response = requests.get(url, headers=self._headers())
+            response = self._request("GET", url)
             if response.status_code == 200:
                 return response.json().get("sha")
         except Exception:
@@ -91,7 +93,7 @@ class GitHubStorage(BaseStorage):
         try:
             url = f"{self.api_base_url}/commits"
             params = {"path": file_path, "per_page": 1}
-            response = requests.get(url, headers=self._headers(), params=params)
+            response = self._request("GET", url, params=params)
             if response.status_code == 200:
                 commits = response.json()
                 if commits and len(commits) > 0:
@@ -117,7 +119,7 @@ class GitHubStorage(BaseStorage):
             # 移除末尾的 / 以保持 GitHub API 的一致性
             prefix = prefix.rstrip("/") if prefix else ""
             url = f"{self.api_base_url}/contents/{prefix}" if prefix else f"{self.api_base_url}/contents"
-            response = requests.get(url, headers=self._headers())
+            response = self._request("GET", url)
             response.raise_for_status()
 
             contents = response.json()
@@ -167,7 +169,9 @@ class GitHubStorage(BaseStorage):
         """
         try:
             url = f"{self.api_base_url}/contents/{key}"
-            response = requests.get(url, headers=self._headers())
+            response = self._request("GET", url)
+            if response.status_code == 404:
+                raise ObjectNotFoundError(f"Object not found: {key}")
             response.raise_for_status()
 
             data = response.json()
@@ -181,6 +185,8 @@ class GitHubStorage(BaseStorage):
                 "ETag": data["sha"],
                 "ContentType": "application/octet-stream",
             }
+        except ObjectNotFoundError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to get object info: {str(e)}") from e
 
@@ -192,21 +198,56 @@ class GitHubStorage(BaseStorage):
             key: 对象键名
 
         Returns:
-            包含对象内容的字典，Body 支持 iter_chunks() 方法
+            包含对象内容的字典，Body 为流式响应体，支持 read() 和 iter_chunks() 方法
         """
         try:
-            url = f"{self.raw_content_url}/{key}"
-            response = requests.get(url)
+            response = self._open_raw(key)
+            length = response.headers.get("Content-Length")
+            return {
+                "Body": ResponseBody(response),
+                "ContentLength": int(length) if length is not None else None,
+                "ContentType": response.headers.get("Content-Type", "application/octet-stream"),
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to get object: {str(e)}") from e
+
+    def _open_raw(self, key: str, headers: Dict[str, str] = None) -> requests.Response:
+        """以流式请求打开文件的原始内容，请求失败时关闭连接并抛出异常"""
+        url = f"{self.raw_content_url}/{key}"
+        # 要求不压缩传输，Content-Length 和 Range 均按原始字节计算
+        response = self._request("GET", url, headers={"Accept-Encoding": "identity", **(headers or {})}, stream=True)
+        try:
             response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return response
+
+    def get_object_range(self, key: str, start: int, end: int) -> Dict[str, Any]:
+        """
+        获取对象的一段字节范围
 
-            content = response.content
+        Args:
+            key: 对象键名
+            start: 起始字节位置
+            end: 结束字节位置（包含）
+
+        Returns:
+            包含指定范围内容的字典，Body 为流式响应体
+        """
+        try:
+            response = self._open_raw(key, {"Range": f"bytes={start}-{end}"})
+            body = ResponseBody(response)
+            if response.status_code != 206:
+                # 上游忽略了 Range，从完整内容中截取
+                body = SlicedBody(body, start, end)
             return {
-                "Body": StreamWrapper(content),
-                "ContentLength": len(content),
+                "Body": body,
+                "ContentLength": end - start + 1,
                 "ContentType": response.headers.get("Content-Type", "application/octet-stream"),
             }
         except Exception as e:
-            raise RuntimeError(f"Failed to get object: {str(e)}") from e
+            raise RuntimeError(f"Failed to get object range: {str(e)}") from e
 
     def generate_presigned_url(self, key: str, expires: int = None) -> str:
         """
@@ -250,24 +291,29 @@ class GitHubStorage(BaseStorage):
         """
         try:
             obj = self.get_object(file_path)
-            # StreamWrapper 需要转换为 BytesIO 以兼容 PIL
-            body = obj["Body"]
-            if isinstance(body, StreamWrapper):
-                image_data = body.read()
-                image_bytes = BytesIO(image_data)
-            else:
-                image_bytes = body
-
-            img = Image.open(image_bytes)
-            img.thumbnail((200, 200))
-
-            thumbnail_io = BytesIO()
-            img.save(thumbnail_io, format="JPEG")
-            thumbnail_io.seek(0)
-            return thumbnail_io.read()
+            return self._render_thumbnail(obj["Body"].read())
         except Exception as e:
             raise RuntimeError(f"Failed to generate thumbnail: {str(e)}") from e
 
+    @staticmethod
+    def _render_thumbnail(data: bytes) -> bytes:
+        """
+        将图片数据缩放为 JPEG 缩略图
+
+        Args:
+            data: 原始图片字节数据
+
+        Returns:
+            缩略图字节数据
+        """
+        img = Image.open(BytesIO(data))
+        img.thumbnail((200, 200))
+
+        thumbnail_io = BytesIO()
+        img.save(thumbnail_io, format="JPEG")
+        thumbnail_io.seek(0)
+        return thumbnail_io.read()
+
     def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
         """
         上传文件到存储
@@ -284,8 +330,12 @@ class GitHubStorage(BaseStorage):
             url = f"{self.api_base_url}/contents/{key}"
             encoded_content = base64.b64encode(file_data).decode("utf-8")
 
-            # 检查文件是否已存在
+            # 检查文件是否已存在，内容未变化时跳过上传（不产生提交）
             sha = self._get_file_sha(key)
+            if Config.UPLOAD_DEDUP and sha == git_blob_sha(file_data):
+                count_uploads("github", "unchanged")
+                return True
+            count_uploads("github", "uploaded")
 
             data = {
                 "message": f"Upload {key}",
@@ -296,7 +346,7 @@ class GitHubStorage(BaseStorage):
             if sha:
                 data["sha"] = sha
 
-            response = requests.put(url, json=data, headers=self._headers())
+            response = self._request("PUT", url, json=data)
             response.raise_for_status()
             return True
         except Exception as e:
@@ -325,7 +375,7 @@ class GitHubStorage(BaseStorage):
                 "branch": self.branch,
             }
 
-            response = requests.delete(url, json=data, headers=self._headers())
+            response = self._request("DELETE", url, json=data)
             response.raise_for_status()
             return True
         except Exception as e:
@@ -468,6 +518,272 @@ class GitHubStorage(BaseStorage):
             print(f"Copy folder failed: {str(e)}")
             return False
 
+    def _get_head(self) -> Tuple[str, str]:
+        """
+        获取分支最新提交及其根树的 SHA
+
+        Returns:
+            (提交 SHA, 树 SHA)
+        """
+        response = self._request("GET", f"{self.api_base_url}/git/ref/heads/{self.branch}")
+        response.raise_for_status()
+        commit_sha = response.json()["object"]["sha"]
+
+        response = self._request("GET", f"{self.api_base_url}/git/commits/{commit_sha}")
+        response.raise_for_status()
+        return commit_sha, response.json()["tree"]["sha"]
+
+    def _get_tree_index(self, tree_sha: str) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """
+        一次请求获取整棵树的文件索引
+
+        Returns:
+            (路径到树条目的映射, 结果是否被截断)
+        """
+        response = self._request("GET", f"{self.api_base_url}/git/trees/{tree_sha}", params={"recursive": "1"})
+        response.raise_for_status()
+        data = response.json()
+        index = {item["path"]: item for item in data.get("tree", []) if item.get("type") == "blob"}
+        return index, bool(data.get("truncated"))
+
+    def _commit_tree(self, build_entries, message: str, attempts: int = 3) -> bool:
+        """
+        基于分支最新提交创建一个包含多处改动的提交
+
+        Args:
+            build_entries: 接收文件索引、返回树条目列表的函数；
+                sha 为 None 的条目表示删除该路径
+            message: 提交信息
+            attempts: 分支被并发更新时的最大尝试次数
+
+        Returns:
+            提交成功返回 True，没有改动或失败返回 False
+        """
+        for _ in range(attempts):
+            commit_sha, tree_sha = self._get_head()
+            index, _ = self._get_tree_index(tree_sha)
+            entries = build_entries(index)
+            if not entries:
+                return False
+
+            response = self._request(
+                "POST", f"{self.api_base_url}/git/trees", json={"base_tree": tree_sha, "tree": entries}
+            )
+            response.raise_for_status()
+            new_tree = response.json()["sha"]
+
+            response = self._request(
+                "POST",
+                f"{self.api_base_url}/git/commits",
+                json={"message": message, "tree": new_tree, "parents": [commit_sha]},
+            )
+            response.raise_for_status()
+            new_commit = response.json()["sha"]
+
+            response = self._request(
+                "PATCH", f"{self.api_base_url}/git/refs/heads/{self.branch}", json={"sha": new_commit}
+            )
+            if response.status_code == 422:
+                # 分支在此期间被其他提交更新（非快进），基于新的提交重试
+                continue
+            response.raise_for_status()
+            return True
+        return False
+
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        """
+        通过一次递归树查询列举前缀下的所有文件，树过大被截断时回退为逐层列举
+        """
+        _, tree_sha = self._get_head()
+        index, truncated = self._get_tree_index(tree_sha)
+        if truncated:
+            yield from super().iter_keys(prefix)
+            return
+        for path in sorted(index):
+            if path.startswith(prefix):
+                yield path
+
+    def iter_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """
+        通过一次递归树查询列举前缀下的所有文件，树过大被截断时回退为逐层列举
+
+        树条目不包含最后提交时间，结果中没有 LastModified；
+        .gitkeep 占位文件转换为其所在文件夹的条目。
+        """
+        _, tree_sha = self._get_head()
+        index, truncated = self._get_tree_index(tree_sha)
+        if truncated:
+            yield from super().iter_objects(prefix)
+            return
+        for path in sorted(index):
+            if not path.startswith(prefix):
+                continue
+            item = index[path]
+            if path.rsplit("/", 1)[-1] == ".gitkeep":
+                if "/" in path:
+                    yield {"Key": path.rsplit("/", 1)[0] + "/", "Size": 0}
+                continue
+            yield {"Key": path, "Size": item.get("size", 0), "ETag": item["sha"]}
+
+    def head_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        批量获取对象信息，通过一次递归树查询完成
+
+        批量结果不包含最后提交时间（逐个查询提交记录代价过高），
+        树过大被截断时，未命中的键回退为逐个查询。
+        """
+        try:
+            _, tree_sha = self._get_head()
+            index, truncated = self._get_tree_index(tree_sha)
+        except Exception as e:
+            print(f"Batch head failed, falling back: {str(e)}")
+            return super().head_many(keys)
+
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing = []
+        for key in keys:
+            item = index.get(key)
+            if item is not None:
+                results[key] = {
+                    "Key": key,
+                    "Size": item.get("size", 0),
+                    "ContentLength": item.get("size", 0),
+                    "ETag": item["sha"],
+                    "ContentType": "application/octet-stream",
+                }
+            elif truncated:
+                missing.append(key)
+            else:
+                results[key] = None
+
+        if missing:
+            results.update(super().head_many(missing))
+        return results
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        """
+        批量删除文件，所有删除合并为一个提交
+        """
+        keys = list(dict.fromkeys(keys))
+        results = dict.fromkeys(keys, False)
+
+        def _entries(index):
+            entries = []
+            for key in keys:
+                results[key] = key in index
+                if key in index:
+                    entries.append({"path": key, "mode": index[key]["mode"], "type": "blob", "sha": None})
+            return entries
+
+        try:
+            if not self._commit_tree(_entries, f"Delete {len(keys)} files"):
+                return dict.fromkeys(keys, False)
+        except Exception as e:
+            print(f"Batch delete failed: {str(e)}")
+            return dict.fromkeys(keys, False)
+        return results
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """
+        批量复制文件，直接引用源文件的 blob，所有复制合并为一个提交
+        """
+        results = {dest_key: False for _, dest_key in pairs}
+
+        def _entries(index):
+            entries = []
+            for source_key, dest_key in pairs:
+                item = index.get(source_key)
+                results[dest_key] = item is not None
+                if item is not None:
+                    entries.append({"path": dest_key, "mode": item["mode"], "type": "blob", "sha": item["sha"]})
+            return entries
+
+        try:
+            if not self._commit_tree(_entries, f"Copy {len(pairs)} files"):
+                return dict.fromkeys(results, False)
+        except Exception as e:
+            print(f"Batch copy failed: {str(e)}")
+            return dict.fromkeys(results, False)
+        return results
+
+    def _create_blob(self, file_data: bytes) -> str:
+        """创建 blob 并返回其 SHA"""
+        response = self._request(
+            "POST",
+            f"{self.api_base_url}/git/blobs",
+            json={"content": base64.b64encode(file_data).decode("utf-8"), "encoding": "base64"},
+        )
+        response.raise_for_status()
+        return response.json()["sha"]
+
+    def _create_blobs(self, contents: Dict[str, bytes]) -> Dict[str, bool]:
+        """并发创建 blob，返回 SHA 到是否创建成功的映射"""
+
+        def _blob(sha: str) -> bool:
+            try:
+                return self._create_blob(contents[sha]) == sha
+            except Exception as e:
+                print(f"Blob creation failed for {sha}: {str(e)}")
+                return False
+
+        shas = list(contents)
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, min(len(shas), Config.BACKEND_MAX_CONCURRENCY))) as executor:
+            outcomes = list(executor.map(lambda sha: context.copy().run(_blob, sha), shas))
+        return dict(zip(shas, outcomes, strict=True))
+
+    def _tree_shas(self) -> Dict[str, str]:
+        """分支最新提交中各文件的 blob SHA，查询失败时返回空映射"""
+        try:
+            _, tree_sha = self._get_head()
+            index, _ = self._get_tree_index(tree_sha)
+        except Exception as e:
+            print(f"Tree lookup failed, uploading all: {str(e)}")
+            return {}
+        return {path: item["sha"] for path, item in index.items()}
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        """
+        批量上传文件：并发创建 blob，再将所有文件合并为一个提交
+
+        逐个上传时每个文件都是一次 contents 接口调用和一个提交，且同一分支上的提交只能串行进行。
+        blob SHA 在本地计算：同批中内容相同的文件共享一个 blob；启用 UPLOAD_DEDUP 时
+        先查询一次树，跳过内容未变化的文件，全部未变化时不创建提交。
+        """
+        local = {key: git_blob_sha(data) for key, data, _ in files}
+        if not local:
+            return {}
+        existing = self._tree_shas() if Config.UPLOAD_DEDUP else {}
+        unchanged = [key for key, sha in local.items() if existing.get(key) == sha]
+        contents = {local[key]: data for key, data, _ in files if existing.get(key) != local[key]}
+        created = self._create_blobs(contents) if contents else {}
+        pending = {key: sha for key, sha in local.items() if key not in unchanged and created.get(sha)}
+        results = {key: key in pending or key in unchanged for key in local}
+        written = []
+
+        def _entries(index):
+            # 已存在的文件沿用原有的文件模式，内容相同的条目不写入
+            written[:] = [
+                {"path": key, "mode": index.get(key, {}).get("mode", "100644"), "type": "blob", "sha": sha}
+                for key, sha in pending.items()
+                if index.get(key, {}).get("sha") != sha
+            ]
+            return written
+
+        try:
+            # 没有需要写入的条目时不创建提交，同样视为成功
+            if pending and not self._commit_tree(_entries, f"Upload {len(pending)} files") and written:
+                results.update(dict.fromkeys(pending, False))
+        except Exception as e:
+            print(f"Batch upload failed: {str(e)}")
+            results.update(dict.fromkeys(pending, False))
+
+        blobs = sum(1 for ok in created.values() if ok)
+        count_uploads("github", "unchanged", len(unchanged))
+        count_uploads("github", "uploaded", blobs)
+        count_uploads("github", "copied", max(0, len(pending) - blobs))
+        return results
+
     def create_folder(self, key: str) -> bool:
         """
         创建文件夹
@@ -492,7 +808,8 @@ class GitHubStorage(BaseStorage):
         """
         生成文件下载响应（GitHub 特有实现）
 
-        GitHub 存储需要通过服务器中继以添加 Content-Disposition 头
+        GitHub 存储需要通过服务器中继以添加 Content-Disposition 头。
+        返回 "stream" 类型，由路由通过 get_object / get_object_range 逐块转发，支持 Range 请求。
 
         Args:
             key: 对象键名（文件路径）
@@ -500,36 +817,10 @@ class GitHubStorage(BaseStorage):
         Returns:
             包含下载信息的字典
         """
-        try:
-            file_obj = self.get_object(key)
-            file_name = key.split("/")[-1] if "/" in key else key
-
-            # 获取完整内容
-            body = file_obj.get("Body")
-            if hasattr(body, "read"):
-                content = body.read()
-            elif hasattr(body, "data"):
-                content = body.data
-            else:
-                content = body
-
-            # 使用 RFC 5987 编码处理文件名中的特殊字符
-            from urllib.parse import quote
-
-            encoded_filename = quote(file_name.encode("utf-8"), safe="")
-
-            headers = {
-                "Content-Type": file_obj.get("ContentType", "application/octet-stream"),
-                "Content-Disposition": f"attachment; filename=\"{file_name}\"; filename*=UTF-8''{encoded_filename}",
-                "Cache-Control": "public, max-age=86400",
-            }
-
-            return {
-                "type": "content",
-                "content": content,
-                "headers": headers,
-                "mimetype": file_obj.get("ContentType", "application/octet-stream"),
-            }
-        except Exception as e:
-            print(f"GitHub download response generation failed: {str(e)}")
-            return None
+        return {
+            "type": "stream",
+            "filename": key.rsplit("/", 1)[-1],
+            # raw 内容统一以 text/plain 返回，按扩展名推断类型以便浏览器播放媒体文件
+            "mimetype": mimetypes.guess_type(key)[0] or "application/octet-stream",
+            "headers": {"Cache-Control": "public, max-age=86400"},
+        }
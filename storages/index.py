@@ -0,0 +1,819 @@
+"""
+对象元数据索引
+
+将整个存储桶所有对象的键名、大小、修改时间和 ETag 持久化到本地 SQLite，
+并在内存中按路径分段构建前缀树，任意目录的列表和存在性查询都可以在本地直接完成。
+索引由后台全量遍历填充，之后由各个写操作在成功后同步更新。
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from config import Config
+from metrics import REGISTRY
+
+from .base import BaseStorage, IndexUnavailableError, ObjectNotFoundError
+from .cached import _count_cache, _normalize_prefix
+from .dedup import git_blob_sha
+from .search import NameIndex, SearchQuery, select
+from .wrapper import StorageWrapper
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL DEFAULT 0,
+    modified TEXT NOT NULL DEFAULT '',
+    etag TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS journal (
+    generation INTEGER PRIMARY KEY,
+    ops TEXT NOT NULL
+);
+"""
+
+# 保留的写操作日志条数，落后更多的进程从数据库完整重新加载
+JOURNAL_LIMIT = 1000
+
+
+class IndexEntry(NamedTuple):
+    """索引中的一个对象，键名以 / 结尾的条目表示文件夹（R2 的文件夹对象、GitHub 的 .gitkeep）"""
+
+    key: str
+    size: int
+    modified: str
+    etag: str
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def entry_from_object(obj: Dict[str, Any]) -> IndexEntry:
+    """将列表或 get_object_info 返回的对象信息转换为索引条目"""
+    modified = obj.get("LastModified")
+    if isinstance(modified, datetime):
+        modified = modified.isoformat()
+    size = obj.get("Size", obj.get("ContentLength"))
+    return IndexEntry(obj["Key"], int(size or 0), str(modified or ""), str(obj.get("ETag") or ""))
+
+
+def object_from_entry(entry: IndexEntry) -> Dict[str, Any]:
+    """将索引条目转换为 list_objects 中 Contents 的格式"""
+    modified: Any = entry.modified
+    try:
+        modified = datetime.fromisoformat(modified.replace("Z", "+00:00")) if modified else ""
+    except ValueError:
+        pass
+    return {"Key": entry.key, "Size": entry.size, "LastModified": modified, "ETag": entry.etag}
+
+
+def _info_from_entry(entry: IndexEntry) -> Dict[str, Any]:
+    """将索引条目转换为 get_object_info 兼容的格式"""
+    info = object_from_entry(entry)
+    info["ContentLength"] = entry.size
+    info["ContentType"] = mimetypes.guess_type(entry.key)[0] or "application/octet-stream"
+    return info
+
+
+def _uploaded_entry(key: str, file_data: bytes) -> IndexEntry:
+    """
+    上传成功后的索引条目
+
+    ETag 按后端的规则由内容计算（R2 为带引号的 MD5，GitHub 为 blob SHA），
+    其余后端的 ETag 无法在本地得到，留空直到下一次全量遍历。
+    """
+    file_data = file_data or b""
+    etag = ""
+    if Config.STORAGE_TYPE == "r2":
+        etag = f'"{hashlib.md5(file_data).hexdigest()}"'
+    elif Config.STORAGE_TYPE == "github":
+        etag = git_blob_sha(file_data)
+    return IndexEntry(key, len(file_data), _now(), etag)
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """返回以 prefix 开头的键名的上界（不含），用于 SQLite 的范围查询"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class FolderEntry(NamedTuple):
+    """文件夹及其下所有文件（递归）的总大小和文件数"""
+
+    prefix: str
+    size: int
+    count: int
+
+
+class _Node:
+    __slots__ = ("dirs", "files", "marker", "size", "count")
+
+    def __init__(self):
+        self.dirs: Dict[str, "_Node"] = {}
+        self.files: Dict[str, IndexEntry] = {}
+        # 是否存在文件夹对象，没有文件夹对象的空节点会被移除
+        self.marker = False
+        # 子树中所有文件的总大小和文件数，随写操作沿路径增量更新
+        self.size = 0
+        self.count = 0
+
+
+def _node_usage(prefix: str, node: _Node, depth: int) -> Dict[str, Any]:
+    folders = sorted(node.dirs.items()) if depth > 0 else []
+    return {
+        "Prefix": prefix,
+        "Size": node.size,
+        "Count": node.count,
+        "Folders": [_node_usage(prefix + name + "/", child, depth - 1) for name, child in folders],
+    }
+
+
+class PrefixTrie:
+    """按路径分段组织的前缀树，每个节点保存直接子文件夹、直接子文件和整棵子树的大小与文件数"""
+
+    def __init__(self):
+        self.root = _Node()
+
+    @property
+    def count(self) -> int:
+        return self.root.count
+
+    @staticmethod
+    def _split(key: str) -> Tuple[List[str], str]:
+        """拆分为上级文件夹的各段和文件名，文件夹条目的文件名为空字符串"""
+        parts = key.split("/")
+        return parts[:-1], parts[-1]
+
+    def _path(self, parts: List[str], create: bool = False) -> Optional[List[_Node]]:
+        """返回从根节点到目标节点路径上的所有节点，节点不存在且不创建时返回 None"""
+        path = [self.root]
+        for part in parts:
+            child = path[-1].dirs.get(part)
+            if child is None:
+                if not create:
+                    return None
+                child = path[-1].dirs[part] = _Node()
+            path.append(child)
+        return path
+
+    def _node(self, prefix: str) -> Optional[_Node]:
+        path = self._path(prefix.rstrip("/").split("/") if prefix else [])
+        return path[-1] if path else None
+
+    @staticmethod
+    def _add(path: List[_Node], size: int, count: int) -> None:
+        for node in path:
+            node.size += size
+            node.count += count
+
+    @staticmethod
+    def _prune(parts: List[str], path: List[_Node]) -> None:
+        """从最深处向上移除既没有内容、也没有文件夹对象的节点"""
+        for depth in range(len(parts), 0, -1):
+            node = path[depth]
+            if node.files or node.dirs or node.marker:
+                break
+            del path[depth - 1].dirs[parts[depth - 1]]
+
+    def put(self, entry: IndexEntry) -> None:
+        parts, name = self._split(entry.key)
+        path = self._path(parts, create=True)
+        node = path[-1]
+        if not name:
+            node.marker = bool(parts)
+            return
+        old = node.files.get(name)
+        node.files[name] = entry
+        self._add(path, entry.size - (old.size if old else 0), 0 if old else 1)
+
+    def get(self, key: str) -> Optional[IndexEntry]:
+        parts, name = self._split(key)
+        path = self._path(parts)
+        return path[-1].files.get(name) if path and name else None
+
+    def remove(self, key: str) -> None:
+        parts, name = self._split(key)
+        path = self._path(parts)
+        if path is None:
+            return
+        if not name:
+            path[-1].marker = False
+        else:
+            old = path[-1].files.pop(name, None)
+            if old is not None:
+                self._add(path, -old.size, -1)
+        self._prune(parts, path)
+
+    def remove_prefix(self, prefix: str) -> None:
+        """移除文件夹及其下的所有条目"""
+        if not prefix:
+            self.root = _Node()
+            return
+        parts = prefix.rstrip("/").split("/")
+        path = self._path(parts)
+        if path is None:
+            return
+        self._add(path[:-1], -path[-1].size, -path[-1].count)
+        del path[-2].dirs[parts[-1]]
+        self._prune(parts[:-1], path[:-1])
+
+    def list(self, prefix: str) -> Tuple[List[IndexEntry], List[FolderEntry]]:
+        """
+        列出文件夹的直接子项
+
+        Returns:
+            (按名称排序的文件条目, 按名称排序的子文件夹及其总大小和文件数)，文件夹不存在时均为空
+        """
+        node = self._node(prefix)
+        if node is None:
+            return [], []
+        folders = [(prefix + name + "/", node.dirs[name]) for name in sorted(node.dirs)]
+        return (
+            [node.files[name] for name in sorted(node.files)],
+            [FolderEntry(folder, child.size, child.count) for folder, child in folders],
+        )
+
+    def usage(self, prefix: str, depth: int = 1) -> Dict[str, Any]:
+        """
+        文件夹的总大小和文件数，以及 depth 层以内各子文件夹的统计
+
+        Returns:
+            usage 格式的统计信息，文件夹不存在时大小和文件数为 0
+        """
+        return _node_usage(prefix, self._node(prefix) or _Node(), depth)
+
+    def walk(self, prefix: str) -> Iterator[IndexEntry]:
+        """深度优先遍历文件夹下的所有条目（含文件夹条目），同一文件夹内先文件后子文件夹，各自按名称排序"""
+        node = self._node(prefix)
+        if node is None:
+            return
+        pending = [(prefix, node)]
+        while pending:
+            path, node = pending.pop()
+            if node.marker:
+                yield IndexEntry(path, 0, "", "")
+            for name in sorted(node.files):
+                yield node.files[name]
+            for name in sorted(node.dirs, reverse=True):
+                pending.append((path + name + "/", node.dirs[name]))
+
+
+class MetadataIndex:
+    """基于 SQLite 持久化、在内存中以前缀树提供查询的对象元数据索引
+
+    前缀树之外还维护文件名的三元组索引，用于搜索。
+    启动时从数据库加载前缀树；每次查询前检查数据库是否被其他进程修改过
+    （PRAGMA data_version），修改过则按写操作日志增量应用其他进程的修改，
+    日志不连续（全量遍历替换了索引或落后太多）时才完整重新加载，多个工作进程可以共享同一个索引文件。
+    全量遍历期间发生的写操作会被记录下来，在新的遍历结果替换索引后重新应用。
+    每次修改递增保存在数据库中的版本号，各进程得到相同的版本，可用作 HTTP 缓存的 ETag。
+    """
+
+    def __init__(self, path: str):
+        """
+        初始化元数据索引
+
+        Args:
+            path: SQLite 数据库文件路径
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.trie = PrefixTrie()
+        self.names = NameIndex()
+        self.crawled_at = 0.0
+        self.generation = 0
+        self._data_version = None
+        # 全量遍历期间的写操作，遍历未进行时为 None
+        self._journal: Optional[List[tuple]] = None
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            # 实例 ID 区分重新创建的索引文件，避免版本号从 0 重新计数后与旧的 ETag 相同
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (name, value) VALUES ('instance', ?), ('generation', '0')",
+                (uuid.uuid4().hex[:12],),
+            )
+            self.instance = self._conn.execute("SELECT value FROM meta WHERE name = 'instance'").fetchone()[0]
+            self._load()
+
+    def _reset(self) -> None:
+        self.trie = PrefixTrie()
+        self.names = NameIndex()
+
+    def _put(self, entry: IndexEntry) -> None:
+        self.trie.put(entry)
+        self.names.add(entry.key)
+
+    def _remove(self, key: str) -> None:
+        self.trie.remove(key)
+        self.names.remove(key)
+
+    def _remove_prefix(self, prefix: str) -> None:
+        if not prefix:
+            self._reset()
+            return
+        for entry in self.trie.walk(prefix):
+            self.names.remove(entry.key)
+        self.trie.remove_prefix(prefix)
+
+    def _load(self) -> None:
+        """从数据库重建前缀树和文件名索引"""
+        self._reset()
+        for row in self._conn.execute("SELECT key, size, modified, etag FROM objects"):
+            self._put(IndexEntry(*row))
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'crawled_at'").fetchone()
+        self.crawled_at = float(row[0]) if row else 0.0
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()
+        self.generation = int(row[0]) if row else 0
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync(self) -> None:
+        """其他进程修改过数据库时应用其写操作日志，无法增量应用时重新加载"""
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        # 在同一个读事务中读取版本号和日志，得到一致的快照
+        self._conn.execute("BEGIN")
+        try:
+            if not self._replay():
+                self._load()
+                return
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'crawled_at'").fetchone()
+            self.crawled_at = float(row[0]) if row else 0.0
+            self._data_version = data_version
+        finally:
+            self._conn.execute("COMMIT")
+
+    def _replay(self) -> bool:
+        """
+        按顺序应用本进程版本号之后的写操作日志
+
+        Returns:
+            日志连续并已应用返回 True；缺少日志时返回 False，需要重新加载
+        """
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()
+        generation = int(row[0]) if row else 0
+        if generation == self.generation:
+            return True
+        rows = self._conn.execute(
+            "SELECT generation, ops FROM journal WHERE generation > ? ORDER BY generation", (self.generation,)
+        ).fetchall()
+        if generation < self.generation or [row[0] for row in rows] != list(range(self.generation + 1, generation + 1)):
+            return False
+        for _, ops in rows:
+            puts, removes, prefixes = json.loads(ops)
+            self._apply_trie([IndexEntry(*entry) for entry in puts], removes, prefixes)
+        self.generation = generation
+        return True
+
+    def _transaction(self, func) -> None:
+        """在一个事务中执行数据库和前缀树的修改，失败时回滚并从数据库重新加载前缀树"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            func()
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            self._load()
+            raise
+
+    def _apply_trie(self, puts: List[IndexEntry], removes: List[str], prefixes: List[str]) -> None:
+        for prefix in prefixes:
+            self._remove_prefix(prefix)
+        for key in removes:
+            self._remove(key)
+        for entry in puts:
+            self._put(entry)
+
+    def _apply(self, puts: List[IndexEntry], removes: List[str], prefixes: List[str], journal: bool = True) -> None:
+        for prefix in prefixes:
+            if prefix:
+                self._conn.execute(
+                    "DELETE FROM objects WHERE key >= ? AND key < ?", (prefix, _prefix_upper_bound(prefix))
+                )
+            else:
+                self._conn.execute("DELETE FROM objects")
+        if removes:
+            self._conn.executemany("DELETE FROM objects WHERE key = ?", [(key,) for key in removes])
+        if puts:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO objects (key, size, modified, etag) VALUES (?, ?, ?, ?)", puts
+            )
+        self._apply_trie(puts, removes, prefixes)
+        # 在数据库中递增，其他进程在本进程同步之前的修改也不会得到相同的版本号
+        self._conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = 'generation'")
+        self.generation = int(self._conn.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()[0])
+        if journal:
+            # 记录写操作，其他进程据此增量更新各自的前缀树
+            self._conn.execute(
+                "INSERT INTO journal (generation, ops) VALUES (?, ?)",
+                (self.generation, json.dumps([puts, removes, prefixes])),
+            )
+            self._conn.execute("DELETE FROM journal WHERE generation <= ?", (self.generation - JOURNAL_LIMIT,))
+
+    def apply(self, puts: Iterable[IndexEntry] = (), removes: Iterable[str] = (), prefixes: Iterable[str] = ()) -> None:
+        """
+        在一个事务中更新索引：先移除文件夹，再移除单个对象，最后写入新条目
+
+        Args:
+            puts: 新增或更新的条目
+            removes: 移除的键名
+            prefixes: 移除的文件夹前缀（以 / 结尾，空字符串表示全部）
+        """
+        op = (list(puts), list(removes), list(prefixes))
+        with self._lock:
+            self._sync()
+            if self._journal is not None:
+                self._journal.append(op)
+            self._transaction(lambda: self._apply(*op))
+
+    def begin_crawl(self) -> None:
+        """开始记录写操作，用于在遍历结果替换索引后重新应用"""
+        with self._lock:
+            self._journal = []
+
+    def abort_crawl(self) -> None:
+        with self._lock:
+            self._journal = None
+
+    def finish_crawl(self, entries: List[IndexEntry]) -> int:
+        """
+        用全量遍历的结果替换索引，并重新应用遍历期间的写操作
+
+        后端不提供修改时间时（GitHub 的树），沿用内容未变化的旧条目中的时间。
+
+        Returns:
+            索引中的文件数
+        """
+        with self._lock:
+            self._sync()
+            journal, self._journal = self._journal or [], None
+            previous = self.trie
+            entries = [self._keep_modified(previous, entry) for entry in entries]
+
+            def _swap():
+                now = time.time()
+                self._reset()
+                self._conn.execute("DELETE FROM objects")
+                # 替换整个索引不写入日志：其他进程发现日志不连续后完整重新加载
+                self._conn.execute("DELETE FROM journal")
+                self._apply(entries, [], [], journal=False)
+                for op in journal:
+                    self._apply(*op, journal=False)
+                self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('crawled_at', ?)", (str(now),))
+                self.crawled_at = now
+
+            self._transaction(_swap)
+            return self.trie.count
+
+    @staticmethod
+    def _keep_modified(previous: PrefixTrie, entry: IndexEntry) -> IndexEntry:
+        if entry.modified:
+            return entry
+        old = previous.get(entry.key)
+        if old is not None and old.etag == entry.etag:
+            return entry._replace(modified=old.modified)
+        return entry
+
+    def invalidate(self) -> None:
+        """将索引标记为过期，查询回退到后端直到下一次全量遍历完成"""
+        with self._lock:
+            self._conn.execute("DELETE FROM meta WHERE name = 'crawled_at'")
+            self.crawled_at = 0.0
+
+    def age(self) -> float:
+        """距上一次全量遍历完成的秒数，从未完成时为无穷大"""
+        with self._lock:
+            self._sync()
+            return time.time() - self.crawled_at if self.crawled_at else float("inf")
+
+    def list(self, prefix: str) -> Tuple[List[IndexEntry], List[FolderEntry]]:
+        with self._lock:
+            self._sync()
+            return self.trie.list(prefix)
+
+    def usage(self, prefix: str, depth: int = 1) -> Dict[str, Any]:
+        with self._lock:
+            self._sync()
+            return self.trie.usage(prefix, depth)
+
+    def get(self, key: str) -> Optional[IndexEntry]:
+        with self._lock:
+            self._sync()
+            return self.trie.get(key)
+
+    def walk(self, prefix: str) -> List[IndexEntry]:
+        with self._lock:
+            self._sync()
+            return list(self.trie.walk(prefix))
+
+    def search(self, query: SearchQuery) -> Dict[str, Any]:
+        """
+        按文件名搜索
+
+        Returns:
+            {"Contents": 排名前 limit 的对象信息, "Total": 满足条件的总数}
+        """
+        with self._lock:
+            self._sync()
+            keys, total = select(query, self.names.candidates(query))
+            return {"Contents": [object_from_entry(self.trie.get(key)) for key in keys], "Total": total}
+
+    def version(self) -> str:
+        """索引内容的版本，任何修改（包括其他进程的修改）后都会变化"""
+        with self._lock:
+            self._sync()
+            return f"{self.instance}.{self.generation}"
+
+    def __len__(self) -> int:
+        return self.trie.count
+
+
+class IndexedStorage(StorageWrapper):
+    """由元数据索引提供目录列表和存在性查询的存储包装器
+
+    后台线程每隔 METADATA_INDEX_REFRESH_SECONDS 全量遍历一次后端（iter_objects）并替换索引；
+    距上一次遍历完成不超过 METADATA_INDEX_MAX_AGE 秒时，list_objects、get_object_info 和
+    head_many 直接由索引回答（包括断言对象不存在），否则转发给后端。
+    search_objects 和 get_folder_usage 只由索引回答，索引过期时抛出 IndexUnavailableError，不在请求中遍历后端。
+    由索引回答的目录列表中，每个子文件夹附带其下所有文件的总大小（Size）和文件数（Count）。
+
+    所有写操作在成功后同步更新索引；文件夹操作失败（可能只完成了一部分）时，
+    重新列举受影响的文件夹。索引更新失败时将索引标记为过期，等待下一次遍历。
+    """
+
+    def __init__(self, storage: BaseStorage, index: MetadataIndex = None):
+        """
+        初始化索引包装器并启动后台遍历线程
+
+        Args:
+            storage: 被包装的存储实例
+            index: 元数据索引，默认使用 METADATA_INDEX_PATH
+        """
+        super().__init__(storage)
+        self.index = index or MetadataIndex(
+            Config.METADATA_INDEX_PATH
+            or os.path.join(tempfile.gettempdir(), f"cloud-index-metadata-{Config.STORAGE_TYPE or 'default'}.sqlite3")
+        )
+        self.refresh_seconds = Config.METADATA_INDEX_REFRESH_SECONDS
+        self.max_age = Config.METADATA_INDEX_MAX_AGE
+        self._crawl_lock = threading.Lock()
+        self._wake = threading.Event()
+
+        REGISTRY.register_collector(
+            "cloudindex_metadata_index_entries",
+            "gauge",
+            "Objects held in the metadata index.",
+            lambda: [({}, len(self.index))],
+        )
+        REGISTRY.register_collector(
+            "cloudindex_metadata_index_age_seconds",
+            "gauge",
+            "Seconds since the last completed metadata index crawl.",
+            lambda: [({}, min(self.index.age(), 1e12))],
+        )
+        threading.Thread(target=self._crawl_loop, daemon=True, name="metadata-index-crawler").start()
+
+    def crawl(self) -> int:
+        """
+        全量遍历后端并替换索引
+
+        Returns:
+            索引中的文件数
+        """
+        with self._crawl_lock:
+            self.index.begin_crawl()
+            try:
+                entries = [entry_from_object(obj) for obj in self.storage.iter_objects("")]
+            except Exception:
+                self.index.abort_crawl()
+                raise
+            return self.index.finish_crawl(entries)
+
+    def _crawl_loop(self) -> None:
+        while True:
+            # 其他进程刚完成遍历时不重复遍历
+            if self.index.age() >= self.refresh_seconds:
+                try:
+                    count = self.crawl()
+                    print(f"Metadata index refreshed: {count} objects")
+                except Exception as e:
+                    print(f"Metadata index crawl failed: {str(e)}")
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+
+    def is_fresh(self) -> bool:
+        return self.index.age() <= self.max_age
+
+    def _invalidate(self) -> None:
+        self.index.invalidate()
+        self._wake.set()
+
+    def _update(self, puts: Iterable[IndexEntry] = (), removes: Iterable[str] = (), prefixes: Iterable[str] = ()):
+        try:
+            self.index.apply(puts, removes, prefixes)
+        except Exception as e:
+            print(f"Metadata index update failed: {str(e)}")
+            self._invalidate()
+
+    def _resync(self, *prefixes: str) -> None:
+        """从后端重新列举文件夹并替换索引中对应的部分"""
+        prefixes = tuple(_normalize_prefix(prefix) for prefix in prefixes)
+        try:
+            entries = [entry_from_object(obj) for prefix in prefixes for obj in self.storage.iter_objects(prefix)]
+            self.index.apply(entries, (), prefixes)
+        except Exception as e:
+            print(f"Metadata index resync failed: {str(e)}")
+            self._invalidate()
+
+    def _lookup(self, key: str) -> Optional[IndexEntry]:
+        """查找对象的索引条目，索引中没有时查询后端"""
+        entry = self.index.get(key)
+        if entry is not None:
+            return entry
+        try:
+            return entry_from_object({**self.storage.get_object_info(key), "Key": key})
+        except Exception:
+            return None
+
+    def _copied(self, pairs: List[Tuple[str, str]], results: Dict[str, bool]) -> None:
+        """记录复制成功的对象，索引中没有的源对象批量查询后端，仍无法得到时将索引标记为过期"""
+        copied = [(source_key, dest_key) for source_key, dest_key in pairs if results.get(dest_key)]
+        entries = {source_key: self.index.get(source_key) for source_key, _ in copied}
+        missing = [key for key, entry in entries.items() if entry is None]
+        if missing:
+            try:
+                infos = self.storage.head_many(missing)
+            except Exception:
+                infos = {}
+            for key in missing:
+                info = infos.get(key)
+                entries[key] = entry_from_object({**info, "Key": key}) if info else None
+        if any(entry is None for entry in entries.values()):
+            self._invalidate()
+            return
+        now = _now()
+        self._update(puts=[entries[source_key]._replace(key=dest_key, modified=now) for source_key, dest_key in copied])
+
+    def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        if not self.is_fresh():
+            _count_cache("index", "miss")
+            return self.storage.list_objects(prefix)
+        _count_cache("index", "hit")
+        files, folders = self.index.list(_normalize_prefix(prefix))
+        return {
+            "Contents": [object_from_entry(entry) for entry in files],
+            "CommonPrefixes": [
+                {"Prefix": folder.prefix, "Size": folder.size, "Count": folder.count} for folder in folders
+            ],
+        }
+
+    def get_object_info(self, key: str) -> Dict[str, Any]:
+        if key.endswith("/") or not self.is_fresh():
+            _count_cache("index", "miss")
+            return self.storage.get_object_info(key)
+        entry = self.index.get(key)
+        if entry is None:
+            _count_cache("index", "negative")
+            raise ObjectNotFoundError(f"Object not found: {key}")
+        _count_cache("index", "hit")
+        return _info_from_entry(entry)
+
+    def head_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        if not self.is_fresh():
+            _count_cache("index", "miss", len(keys))
+            return self.storage.head_many(keys)
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for key in dict.fromkeys(keys):
+            entry = self.index.get(key)
+            results[key] = _info_from_entry(entry) if entry is not None else None
+        negatives = sum(1 for info in results.values() if info is None)
+        _count_cache("index", "hit", len(results) - negatives)
+        _count_cache("index", "negative", negatives)
+        return results
+
+    def search_objects(self, query: SearchQuery) -> Dict[str, Any]:
+        if not self.is_fresh():
+            _count_cache("index", "miss")
+            raise IndexUnavailableError("Metadata index is not ready")
+        _count_cache("index", "hit")
+        return self.index.search(query)
+
+    def get_folder_usage(self, prefix: str = "", depth: int = 1) -> Dict[str, Any]:
+        if not self.is_fresh():
+            _count_cache("index", "miss")
+            raise IndexUnavailableError("Metadata index is not ready")
+        _count_cache("index", "hit")
+        return self.index.usage(_normalize_prefix(prefix), depth)
+
+    def get_index_version(self) -> Optional[str]:
+        return self.index.version() if self.is_fresh() else None
+
+    def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        success = self.storage.upload_file(key, file_data, content_type)
+        if success:
+            self._update(puts=[_uploaded_entry(key, file_data)])
+        return success
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        results = self.storage.upload_many(files)
+        self._update(puts=[_uploaded_entry(key, file_data) for key, file_data, _ in files if results.get(key)])
+        return results
+
+    def delete_file(self, key: str) -> bool:
+        success = self.storage.delete_file(key)
+        if success:
+            self._update(removes=[key])
+        return success
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        results = self.storage.delete_many(keys)
+        self._update(removes=[key for key, success in results.items() if success])
+        return results
+
+    def rename_file(self, old_key: str, new_key: str) -> bool:
+        entry = self._lookup(old_key)
+        success = self.storage.rename_file(old_key, new_key)
+        if success and entry is not None:
+            self._update(puts=[entry._replace(key=new_key)], removes=[old_key])
+        elif success:
+            self._invalidate()
+        return success
+
+    def copy_file(self, source_key: str, dest_key: str) -> bool:
+        success = self.storage.copy_file(source_key, dest_key)
+        self._copied([(source_key, dest_key)], {dest_key: success})
+        return success
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        results = self.storage.copy_many(pairs)
+        self._copied(pairs, results)
+        return results
+
+    def create_folder(self, key: str) -> bool:
+        success = self.storage.create_folder(key)
+        if success:
+            self._update(puts=[IndexEntry(_normalize_prefix(key), 0, _now(), "")])
+        return success
+
+    def delete_folder(self, prefix: str) -> bool:
+        success = False
+        try:
+            success = self.storage.delete_folder(prefix)
+            return success
+        finally:
+            if success:
+                self._update(prefixes=[_normalize_prefix(prefix)])
+            else:
+                self._resync(prefix)
+
+    def _moved(self, source_prefix: str, dest_prefix: str, modified: str = None) -> Optional[List[IndexEntry]]:
+        """
+        由索引推算文件夹移动或复制后的目标条目
+
+        索引未完成遍历时其中的内容可能不完整，此时返回 None，由调用方重新列举目标文件夹。
+        """
+        if not self.is_fresh():
+            return None
+        source_prefix, dest_prefix = _normalize_prefix(source_prefix), _normalize_prefix(dest_prefix)
+        return [
+            entry._replace(key=dest_prefix + entry.key[len(source_prefix) :], modified=modified or entry.modified)
+            for entry in self.index.walk(source_prefix)
+        ]
+
+    def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        moved = self._moved(old_prefix, new_prefix)
+        success = False
+        try:
+            success = self.storage.rename_folder(old_prefix, new_prefix)
+            return success
+        finally:
+            if success and moved is not None:
+                self._update(puts=moved, prefixes=[_normalize_prefix(old_prefix)])
+            else:
+                self._resync(old_prefix, new_prefix)
+
+    def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        copied = self._moved(source_prefix, dest_prefix, _now())
+        success = False
+        try:
+            success = self.storage.copy_folder(source_prefix, dest_prefix)
+            return success
+        finally:
+            if success and copied is not None:
+                self._update(puts=copied)
+            else:
+                self._resync(dest_prefix)
@@ -0,0 +1,163 @@
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from metrics import REGISTRY, current_route
+from tracing import record_span
+
+from .base import BaseStorage
+from .search import SearchQuery
+from .wrapper import StorageWrapper
+
+STORAGE_CALLS = "cloudindex_storage_calls_total"
+STORAGE_ERRORS = "cloudindex_storage_errors_total"
+STORAGE_DURATION = "cloudindex_storage_call_duration_seconds"
+STORAGE_BYTES = "cloudindex_storage_bytes_total"
+
+
+def _received_bytes(result: Any) -> int:
+    """估算读取类调用从后端收到的字节数"""
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    if isinstance(result, dict):
+        if isinstance(result.get("content"), (bytes, bytearray)):
+            return len(result["content"])
+        try:
+            return int(result.get("ContentLength") or 0)
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+class InstrumentedStorage(StorageWrapper):
+    """记录每次存储调用指标的包装器
+
+    直接包装存储后端，按后端、操作和发起调用的路由记录调用次数、错误次数、
+    延迟直方图和传输字节数，并将每次调用的耗时计入当前请求的 Server-Timing；
+    后端带有请求调度器时，同时暴露其并发占用情况。
+    返回 False 的写操作和抛出的异常都计为错误。
+    """
+
+    def __init__(self, storage: BaseStorage, backend: str):
+        """
+        初始化指标包装器
+
+        Args:
+            storage: 被包装的存储后端
+            backend: 指标中使用的后端名称
+        """
+        super().__init__(storage)
+        self.backend = backend
+
+        scheduler = getattr(storage, "scheduler", None)
+        if scheduler is not None:
+            help_texts = {
+                "in_flight": "Backend HTTP requests currently in flight.",
+                "limit": "Current adaptive concurrency limit of the backend scheduler.",
+                "paused_for": "Seconds the backend scheduler stays paused for rate limiting.",
+            }
+            for field, help_text in help_texts.items():
+                REGISTRY.register_collector(
+                    f"cloudindex_backend_scheduler_{field}",
+                    "gauge",
+                    help_text,
+                    lambda field=field: [({"backend": backend}, scheduler.stats()[field])],
+                    source=backend,
+                )
+
+    def _call(self, operation: str, func: Callable[..., Any], *args, sent: int = 0) -> Any:
+        """调用下层方法，记录指标并计入当前请求的耗时明细"""
+        labels = {"backend": self.backend, "operation": operation, "route": current_route.get()}
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            REGISTRY.inc(STORAGE_ERRORS, error=type(e).__name__, **labels)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            REGISTRY.inc(STORAGE_CALLS, **labels)
+            REGISTRY.observe(STORAGE_DURATION, elapsed, **labels)
+            record_span(f"storage.{operation}", elapsed)
+
+        if result is False:
+            REGISTRY.inc(STORAGE_ERRORS, error="failed", **labels)
+        if sent:
+            REGISTRY.inc(STORAGE_BYTES, sent, direction="sent", **labels)
+        received = _received_bytes(result)
+        if received:
+            REGISTRY.inc(STORAGE_BYTES, received, direction="received", **labels)
+        return result
+
+    def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        return self._call("list_objects", self.storage.list_objects, prefix)
+
+    def get_object_info(self, key: str) -> Dict[str, Any]:
+        return self._call("get_object_info", self.storage.get_object_info, key)
+
+    def get_object(self, key: str) -> Dict[str, Any]:
+        return self._call("get_object", self.storage.get_object, key)
+
+    def get_object_range(self, key: str, start: int, end: int) -> Dict[str, Any]:
+        return self._call("get_object_range", self.storage.get_object_range, key, start, end)
+
+    def generate_presigned_url(self, key: str, expires: int = None) -> str:
+        return self._call("generate_presigned_url", self.storage.generate_presigned_url, key, expires)
+
+    def get_public_url(self, key: str) -> str:
+        return self._call("get_public_url", self.storage.get_public_url, key)
+
+    def generate_thumbnail(self, file_path: str) -> bytes:
+        return self._call("generate_thumbnail", self.storage.generate_thumbnail, file_path)
+
+    def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        sent = len(file_data) if file_data is not None else 0
+        return self._call("upload_file", self.storage.upload_file, key, file_data, content_type, sent=sent)
+
+    def delete_file(self, key: str) -> bool:
+        return self._call("delete_file", self.storage.delete_file, key)
+
+    def rename_file(self, old_key: str, new_key: str) -> bool:
+        return self._call("rename_file", self.storage.rename_file, old_key, new_key)
+
+    def delete_folder(self, prefix: str) -> bool:
+        return self._call("delete_folder", self.storage.delete_folder, prefix)
+
+    def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        return self._call("rename_folder", self.storage.rename_folder, old_prefix, new_prefix)
+
+    def copy_file(self, source_key: str, dest_key: str) -> bool:
+        return self._call("copy_file", self.storage.copy_file, source_key, dest_key)
+
+    def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        return self._call("copy_folder", self.storage.copy_folder, source_prefix, dest_prefix)
+
+    def create_folder(self, key: str) -> bool:
+        return self._call("create_folder", self.storage.create_folder, key)
+
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        # 生成器在遍历结束时才完成，延迟按整个遍历过程统计
+        return iter(self._call("iter_keys", lambda p: list(self.storage.iter_keys(p)), prefix))
+
+    def iter_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        return iter(self._call("iter_objects", lambda p: list(self.storage.iter_objects(p)), prefix))
+
+    def search_objects(self, query: SearchQuery) -> Dict[str, Any]:
+        return self._call("search_objects", self.storage.search_objects, query)
+
+    def get_folder_usage(self, prefix: str = "", depth: int = 1) -> Dict[str, Any]:
+        return self._call("get_folder_usage", self.storage.get_folder_usage, prefix, depth)
+
+    def head_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return self._call("head_many", self.storage.head_many, keys)
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        return self._call("delete_many", self.storage.delete_many, keys)
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        return self._call("copy_many", self.storage.copy_many, pairs)
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        return self._call("upload_many", self.storage.upload_many, files)
+
+    def generate_download_response(self, key: str) -> Dict[str, Any]:
+        return self._call("generate_download_response", self.storage.generate_download_response, key)
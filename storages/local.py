@@ -0,0 +1,489 @@
+import mimetypes
+import os
+import shutil
+import sys
+import uuid
+from datetime import datetime, timezone
+from io import BytesIO
+from stat import S_ISREG
+from typing import Any, Dict, Iterator, Optional
+
+from PIL import Image
+
+from config import Config
+
+from .base import BaseStorage, ObjectNotFoundError
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Linux 的 FICLONE ioctl：在支持写时复制的文件系统（Btrfs、XFS）上共享数据块，复制不读写文件内容
+FICLONE = 0x40049409 if sys.platform.startswith("linux") else None
+
+# 上传和复制过程中的临时文件前缀，列举时跳过
+TEMP_PREFIX = ".cloud-index-tmp-"
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def copy_file_data(source: str, dest: str) -> None:
+    """
+    复制文件内容
+
+    依次尝试 reflink（写时复制，不复制数据）、copy_file_range（在内核中复制，不经过用户态），
+    都不可用时回退到普通的分块复制。
+
+    Args:
+        source: 源文件路径
+        dest: 目标文件路径（会被覆盖）
+    """
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        if fcntl is not None and FICLONE is not None:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass
+
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except OSError:
+                # 跨文件系统等不支持的情况，从头改用普通复制
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+
+
+class FileBody:
+    """本地文件的响应体，与 R2 的流式响应一样支持 read() 和 iter_chunks()"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def iter_chunks(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """迭代返回数据块，读完后关闭文件"""
+        try:
+            while chunk := self._file.read(chunk_size):
+                yield chunk
+        finally:
+            self._file.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class LocalStorage(BaseStorage):
+    """基于本地目录树的存储实现
+
+    对象键名对应 LOCAL_STORAGE_ROOT 下的相对路径，文件夹就是目录。
+    文件通过 "file" 类型的下载响应由 WSGI 服务器直接发送（支持 Range 和 sendfile），不经过内存。
+    """
+
+    def __init__(self):
+        """初始化本地存储"""
+        root = Config.LOCAL_STORAGE_ROOT
+        if not root:
+            raise RuntimeError("LOCAL_STORAGE_ROOT must be set")
+
+        self.root = os.path.realpath(root)
+        if not os.path.isdir(self.root):
+            raise RuntimeError(f"LOCAL_STORAGE_ROOT is not a directory: {root}")
+
+    def _path(self, key: str) -> str:
+        """
+        将对象键名转换为文件系统路径
+
+        Raises:
+            ValueError: 路径（包括经由符号链接）位于存储根目录之外时
+        """
+        path = os.path.realpath(os.path.join(self.root, key.lstrip("/")))
+        if not self._contains(path):
+            raise ValueError(f"Key is outside the storage root: {key}")
+        return path
+
+    def _contains(self, path: str) -> bool:
+        """解析符号链接后的路径是否位于存储根目录之内"""
+        path = os.path.realpath(path)
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def _visible(self, entry: os.DirEntry) -> bool:
+        """列举时是否显示该目录项：跳过临时文件和指向根目录之外的符号链接"""
+        if entry.name.startswith(TEMP_PREFIX):
+            return False
+        return not entry.is_symlink() or self._contains(entry.path)
+
+    def _key(self, path: str) -> str:
+        """将文件系统路径转换为对象键名"""
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    @staticmethod
+    def _object_entry(key: str, stat: os.stat_result) -> Dict[str, Any]:
+        return {
+            "Key": key,
+            "Size": stat.st_size,
+            "LastModified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            # 修改时间和大小不变即视为内容不变
+            "ETag": f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+        }
+
+    @staticmethod
+    def _guess_content_type(key: str) -> str:
+        return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+    def _temp_path(self, path: str) -> str:
+        """与目标文件位于同一目录的临时文件路径，写完后通过 os.replace 原子替换"""
+        return os.path.join(os.path.dirname(path), f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+
+    def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        """
+        列出目录中的文件和子目录
+
+        Args:
+            prefix: 对象前缀（用于目录浏览）
+
+        Returns:
+            包含对象列表的字典
+        """
+        prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        files = []
+        folders = []
+        try:
+            with os.scandir(self._path(prefix)) as entries:
+                for entry in entries:
+                    if not self._visible(entry):
+                        continue
+                    if entry.is_dir():
+                        folders.append({"Prefix": f"{prefix}{entry.name}/"})
+                    elif entry.is_file():
+                        files.append(self._object_entry(prefix + entry.name, entry.stat()))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            return {"Contents": [], "CommonPrefixes": [], "Error": str(e)}
+
+        files.sort(key=lambda obj: obj["Key"])
+        folders.sort(key=lambda folder: folder["Prefix"])
+        return {"Contents": files, "CommonPrefixes": folders, "IsTruncated": False}
+
+    def get_object_info(self, key: str) -> Dict[str, Any]:
+        """
+        获取对象基本信息
+
+        Args:
+            key: 对象键名
+
+        Returns:
+            对象元数据
+        """
+        try:
+            stat = os.stat(self._path(key))
+        except (FileNotFoundError, NotADirectoryError, ValueError):
+            raise ObjectNotFoundError(f"Object not found: {key}") from None
+        if not S_ISREG(stat.st_mode):
+            raise ObjectNotFoundError(f"Object not found: {key}")
+
+        info = self._object_entry(key, stat)
+        info["ContentLength"] = stat.st_size
+        info["ContentType"] = self._guess_content_type(key)
+        return info
+
+    def get_object(self, key: str) -> Dict[str, Any]:
+        """
+        获取对象内容
+
+        Args:
+            key: 对象键名
+
+        Returns:
+            包含对象内容的字典，Body 支持 read() 和 iter_chunks() 方法
+        """
+        try:
+            path = self._path(key)
+            return {
+                "Body": FileBody(path),
+                "ContentLength": os.path.getsize(path),
+                "ContentType": self._guess_content_type(key),
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to get object: {str(e)}") from e
+
+    def generate_presigned_url(self, key: str, expires: int = None) -> str:
+        """本地存储没有可直接访问的 URL，文件由服务器发送"""
+        return None
+
+    def get_public_url(self, key: str) -> str:
+        """本地存储没有公共 URL"""
+        return None
+
+    def generate_thumbnail(self, file_path: str) -> bytes:
+        """
+        生成图片缩略图（直接从文件解码，JPEG 按目标尺寸缩小解码）
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            缩略图字节数据
+        """
+        try:
+            with Image.open(self._path(file_path)) as img:
+                img.draft("RGB", (320, 320))
+                img = img.convert("RGB")
+                img.thumbnail((320, 320))
+                buf = BytesIO()
+                img.save(buf, "JPEG", quality=80, optimize=True)
+                return buf.getvalue()
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate thumbnail: {str(e)}") from e
+
+    def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        """
+        写入文件（先写临时文件再原子替换，读者不会看到写了一半的文件）
+
+        Args:
+            key: 对象键名（文件路径）
+            file_data: 文件二进制数据
+            content_type: 文件类型（本地存储按扩展名推断，忽略此参数）
+
+        Returns:
+            上传成功返回 True，失败返回 False
+        """
+        temp = None
+        try:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = self._temp_path(path)
+            with open(temp, "wb") as f:
+                f.write(file_data)
+            os.replace(temp, path)
+            return True
+        except Exception as e:
+            print(f"Upload failed: {str(e)}")
+            if temp and os.path.exists(temp):
+                os.remove(temp)
+            return False
+
+    def delete_file(self, key: str) -> bool:
+        """
+        删除文件，文件不存在时同样视为成功
+
+        Args:
+            key: 对象键名（文件路径）
+
+        Returns:
+            删除成功返回 True，失败返回 False
+        """
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return True
+        except Exception as e:
+            print(f"Delete failed: {str(e)}")
+            return False
+
+    def rename_file(self, old_key: str, new_key: str) -> bool:
+        """
+        重命名文件（同一文件系统内为原子操作）
+
+        Args:
+            old_key: 旧的对象键名
+            new_key: 新的对象键名
+
+        Returns:
+            重命名成功返回 True，失败返回 False
+        """
+        try:
+            source, dest = self._path(old_key), self._path(new_key)
+            if not os.path.isfile(source):
+                raise FileNotFoundError(f"Object not found: {old_key}")
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(source, dest)
+            return True
+        except Exception as e:
+            print(f"Rename failed: {str(e)}")
+            return False
+
+    def delete_folder(self, prefix: str) -> bool:
+        """
+        删除目录及其全部内容
+
+        Args:
+            prefix: 要删除的文件夹前缀
+
+        Returns:
+            删除成功返回 True，失败返回 False
+        """
+        try:
+            if not prefix.strip("/"):
+                raise ValueError("Refusing to delete the storage root")
+            shutil.rmtree(self._path(prefix))
+            return True
+        except FileNotFoundError:
+            return True
+        except Exception as e:
+            print(f"Folder delete failed: {str(e)}")
+            return False
+
+    def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        """
+        重命名目录；目标不存在时一次 rename 完成，否则逐个移动文件合并到目标目录
+
+        Args:
+            old_prefix: 旧的文件夹前缀
+            new_prefix: 新的文件夹前缀
+
+        Returns:
+            重命名成功返回 True，失败返回 False
+        """
+        try:
+            source, dest = self._path(old_prefix), self._path(new_prefix)
+            if not os.path.isdir(source) or source == self.root:
+                raise FileNotFoundError(f"Folder not found: {old_prefix}")
+            if not os.path.exists(dest):
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.rename(source, dest)
+                return True
+
+            for directory, _, names in os.walk(source):
+                target_dir = os.path.join(dest, os.path.relpath(directory, source))
+                os.makedirs(target_dir, exist_ok=True)
+                for name in names:
+                    os.replace(os.path.join(directory, name), os.path.join(target_dir, name))
+            shutil.rmtree(source)
+            return True
+        except Exception as e:
+            print(f"Folder rename failed: {str(e)}")
+            return False
+
+    def copy_file(self, source_key: str, dest_key: str) -> bool:
+        """
+        复制文件（优先 reflink / copy_file_range，写完后原子替换目标）
+
+        Args:
+            source_key: 源对象键名
+            dest_key: 目标对象键名
+
+        Returns:
+            复制成功返回 True，失败返回 False
+        """
+        temp = None
+        try:
+            source, dest = self._path(source_key), self._path(dest_key)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            temp = self._temp_path(dest)
+            copy_file_data(source, temp)
+            os.replace(temp, dest)
+            return True
+        except Exception as e:
+            print(f"File copy failed: {str(e)}")
+            if temp and os.path.exists(temp):
+                os.remove(temp)
+            return False
+
+    def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        """
+        复制目录（包括空的子目录）
+
+        Args:
+            source_prefix: 源文件夹前缀
+            dest_prefix: 目标文件夹前缀
+
+        Returns:
+            复制成功返回 True，失败返回 False
+        """
+        try:
+            source, dest = self._path(source_prefix), self._path(dest_prefix)
+            if not os.path.isdir(source):
+                raise FileNotFoundError(f"Folder not found: {source_prefix}")
+            if dest == source or dest.startswith(source + os.sep):
+                raise ValueError("Cannot copy a folder into itself")
+
+            for directory, _, names in os.walk(source):
+                target_dir = os.path.join(dest, os.path.relpath(directory, source))
+                os.makedirs(target_dir, exist_ok=True)
+                for name in names:
+                    if name.startswith(TEMP_PREFIX):
+                        continue
+                    target = os.path.join(target_dir, name)
+                    temp = self._temp_path(target)
+                    copy_file_data(os.path.join(directory, name), temp)
+                    os.replace(temp, target)
+            return True
+        except Exception as e:
+            print(f"Folder copy failed: {str(e)}")
+            return False
+
+    def create_folder(self, key: str) -> bool:
+        """
+        创建目录
+
+        Args:
+            key: 文件夹路径（以 / 结尾）
+
+        Returns:
+            创建成功返回 True，失败返回 False
+        """
+        try:
+            os.makedirs(self._path(key), exist_ok=True)
+            return True
+        except Exception as e:
+            print(f"Create folder failed: {str(e)}")
+            return False
+
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        """递归遍历目录下的所有文件"""
+        pending = [self._path(prefix)]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if not self._visible(entry):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            yield self._key(entry.path)
+            except FileNotFoundError:
+                continue
+
+    def generate_download_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        生成文件下载响应（本地存储特有实现）
+
+        返回 "file" 类型，由路由交给 WSGI 服务器发送文件：支持 Range 和条件请求，
+        服务器提供 wsgi.file_wrapper 时（如 gunicorn）使用 sendfile 零拷贝发送。
+
+        Args:
+            key: 对象键名（文件路径）
+
+        Returns:
+            包含下载信息的字典
+        """
+        try:
+            path = self._path(key)
+            if not os.path.isfile(path):
+                return None
+            return {
+                "type": "file",
+                "path": path,
+                "mimetype": self._guess_content_type(key),
+                "filename": key.rsplit("/", 1)[-1],
+            }
+        except Exception as e:
+            print(f"Local download response generation failed: {str(e)}")
+            return None
@@ -1,14 +1,22 @@
+import contextvars
+import mimetypes
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from io import BytesIO
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import quote
 
 import requests
 from PIL import Image
 
 from config import Config
+from recording import instrument_session
 
-from .base import BaseStorage
+from .base import BaseStorage, ObjectNotFoundError
+from .dedup import count_uploads, is_unchanged, upload_deduplicated
+from .scheduler import RequestScheduler
+from .streaming import ResponseBody, SlicedBody
 
 
 class _InvalidGrant(Exception):
@@ -20,13 +28,17 @@ class _InvalidGrant(Exception):
 class OnedriveStorage(BaseStorage):
     """基于 OneDrive 的存储实现，支持自动令牌刷新"""
 
+    # Graph JSON 批量请求每批最多包含的请求数
+    BATCH_SIZE = 20
+
     def __init__(self):
         """初始化 OneDrive 存储客户端"""
         self.client_id = Config.ONEDRIVE_CLIENT_ID
         self.client_secret = Config.ONEDRIVE_CLIENT_SECRET
         self.refresh_token = Config.ONEDRIVE_REFRESH_TOKEN
         self.folder_id = Config.ONEDRIVE_FOLDER_ID
-        self.graph_api_url = "https://graph.microsoft.com/v1.0"
+        self.graph_api_url = Config.ONEDRIVE_GRAPH_URL.rstrip("/")
+        self.token_url = Config.ONEDRIVE_TOKEN_URL
 
         if not (self.client_id and self.client_secret and self.refresh_token):
             raise RuntimeError("ONEDRIVE_CLIENT_ID, ONEDRIVE_CLIENT_SECRET, and ONEDRIVE_REFRESH_TOKEN must be set")
@@ -34,6 +46,17 @@ class OnedriveStorage(BaseStorage):
         # 如果没有指定 folder_id，使用 /me/drive/root
         self.folder_item_id = self.folder_id or "root"
 
+        # 复用连接池，并通过调度器控制并发、处理限流和重试
+        self.session = instrument_session(requests.Session())
+        self.scheduler = RequestScheduler(
+            "onedrive",
+            initial_limit=Config.BACKEND_INITIAL_CONCURRENCY,
+            max_limit=Config.BACKEND_MAX_CONCURRENCY,
+            max_retries=Config.BACKEND_MAX_RETRIES,
+            max_delay=Config.BACKEND_RETRY_MAX_DELAY,
+            timeout=Config.BACKEND_REQUEST_TIMEOUT,
+        )
+
         # 初始化 access_token 并刷新
         self.access_token = None
         self._refresh_token()
@@ -61,14 +84,7 @@ class OnedriveStorage(BaseStorage):
 
     def _refresh_token(self) -> None:
         """刷新 OneDrive 访问令牌"""
-        configured_scopes = getattr(Config, "ONEDRIVE_SCOPES", None)
-        attempts = [None] + ([configured_scopes] if configured_scopes else []) + ["Files.ReadWrite.All offline_access"]
-        token_json = self._perform_refresh_attempts(attempts)
-        self.access_token = token_json["access_token"]
-        new_refresh = token_json.get("refresh_token")
-        if new_refresh:
-            self.refresh_token = new_refresh
-        self._access_token_expires_in = token_json.get("expires_in")
+        self._apply_token(self._perform_refresh_attempts(self._refresh_scopes()))
 
     def _perform_refresh_attempts(self, attempts: list) -> dict:
         errors: list[str] = []
@@ -84,9 +100,20 @@ class OnedriveStorage(BaseStorage):
         raise RuntimeError("Failed to refresh OneDrive token: " + " | ".join(errors))
 
     def _do_refresh_attempt(self, scope: str | None) -> dict:
-        url = "https://login.microsoftonline.com/common/oauth2/v2.0/token"
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        resp = self.session.post(
+            self.token_url,
+            data=self._token_payload(scope),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=20,
+        )
+        try:
+            detail = resp.json()
+        except Exception:
+            detail = resp.text
+        return self._parse_token_response(resp.status_code, detail)
 
+    def _token_payload(self, scope: str | None) -> dict:
+        """构造刷新令牌请求的表单参数"""
         payload = {
             "client_id": self.client_id,
             "grant_type": "refresh_token",
@@ -99,18 +126,16 @@ class OnedriveStorage(BaseStorage):
         redirect_uri = getattr(Config, "ONEDRIVE_REDIRECT_URI", None)
         if redirect_uri:
             payload["redirect_uri"] = redirect_uri
+        return payload
 
-        resp = requests.post(url, data=payload, headers=headers, timeout=20)
-        try:
-            detail = resp.json()
-        except Exception:
-            detail = resp.text
-
-        if resp.status_code != 200:
+    @staticmethod
+    def _parse_token_response(status_code: int, detail) -> dict:
+        """校验令牌端点的响应，invalid_grant 时抛出内部异常以触发下一次尝试"""
+        if status_code != 200:
             # 如果是 invalid_grant，抛出内部异常以触发下一次尝试
             if isinstance(detail, dict) and detail.get("error") == "invalid_grant":
                 raise _InvalidGrant(detail)
-            raise RuntimeError(f"Token endpoint error {resp.status_code}: {detail}")
+            raise RuntimeError(f"Token endpoint error {status_code}: {detail}")
 
         if isinstance(detail, dict) and detail.get("error"):
             if detail.get("error") == "invalid_grant":
@@ -124,6 +149,19 @@ class OnedriveStorage(BaseStorage):
             raise _InvalidGrant({"error": "missing_access_token", "detail": detail})
         return token_json
 
+    def _refresh_scopes(self) -> list:
+        """依次尝试的 scope 列表（None 表示不指定）"""
+        configured_scopes = getattr(Config, "ONEDRIVE_SCOPES", None)
+        return [None] + ([configured_scopes] if configured_scopes else []) + ["Files.ReadWrite.All offline_access"]
+
+    def _apply_token(self, token_json: dict) -> None:
+        """保存刷新得到的令牌"""
+        self.access_token = token_json["access_token"]
+        new_refresh = token_json.get("refresh_token")
+        if new_refresh:
+            self.refresh_token = new_refresh
+        self._access_token_expires_in = token_json.get("expires_in")
+
     def _try_refresh(self, func):
         """尝试执行函数，如果失败则刷新令牌后重试（处理令牌过期）"""
         try:
@@ -135,13 +173,14 @@ class OnedriveStorage(BaseStorage):
                 return func()
             raise
 
-    def _api_request(self, method: str, url: str, **kwargs):
+    def _api_request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None, **kwargs):
         """
-        执行 API 请求，自动处理令牌过期
+        执行 API 请求，自动处理令牌过期、限流和重试
 
         Args:
             method: HTTP 方法 (GET, POST, PUT, DELETE, PATCH)
             url: API URL
+            headers: 额外的请求头（覆盖默认头部）
             **kwargs: 其他请求参数
 
         Returns:
@@ -149,8 +188,11 @@ class OnedriveStorage(BaseStorage):
         """
 
         def _do_request():
-            response = requests.request(method, url, headers=self._headers(), **kwargs)
+            # 每次尝试都重新生成认证头，以便使用刷新后的令牌
+            request_headers = {**self._headers(), **(headers or {})}
+            response = self.scheduler.request(self.session, method, url, headers=request_headers, **kwargs)
             if response.status_code == 401:
+                response.close()
                 raise RuntimeError("Unauthorized - OneDrive access token expired")
             return response
 
@@ -167,7 +209,7 @@ class OnedriveStorage(BaseStorage):
         """验证 OneDrive 连接是否有效"""
         try:
             url = f"{self.graph_api_url}/me/drive"
-            response = requests.get(url, headers=self._headers(), timeout=10)
+            response = self._api_request("GET", url, timeout=10)
             if response.status_code != 200:
                 raise RuntimeError(f"OneDrive connection failed: {response.text}")
         except Exception as e:
@@ -185,7 +227,7 @@ class OnedriveStorage(BaseStorage):
                 url = f"{self.graph_api_url}/me/drive/root:/{path}:"
             else:
                 url = f"{self.graph_api_url}/me/drive/items/{self.folder_item_id}:/{path}:"
-            response = requests.get(url, headers=self._headers(), timeout=10)
+            response = self._api_request("GET", url, timeout=10)
 
             if response.status_code == 200:
                 item = response.json()
@@ -196,6 +238,61 @@ class OnedriveStorage(BaseStorage):
 
         return None
 
+    def _children_url(self, prefix: str) -> str:
+        """构造列出目录子项的 URL，直接基于路径列出，避免先查 ID 再列出造成的额外往返"""
+        select = "$select=name,size,lastModifiedDateTime,id,folder,file"
+        if prefix:
+            # 对前缀进行 URL 编码，保留路径分隔符
+            quoted_prefix = quote(prefix.strip("/"), safe="/")
+            if self.folder_item_id == "root":
+                return f"{self.graph_api_url}/me/drive/root:/{quoted_prefix}:/children?{select}"
+            return f"{self.graph_api_url}/me/drive/items/{self.folder_item_id}:/{quoted_prefix}:/children?{select}"
+        if self.folder_item_id == "root":
+            return f"{self.graph_api_url}/me/drive/root/children?{select}"
+        return f"{self.graph_api_url}/me/drive/items/{self.folder_item_id}/children?{select}"
+
+    @staticmethod
+    def _build_listing(items: list, prefix: str) -> Dict[str, Any]:
+        """将 Graph 返回的子项列表转换为 list_objects 的返回格式"""
+        files = []
+        folders = []
+
+        for item in items:
+            # 跳过特殊文件
+            if item.get("name", "").startswith("."):
+                continue
+
+            item_path = f"{prefix}/{item.get('name')}" if prefix else item.get("name")
+
+            if "folder" in item:
+                # 这是一个文件夹
+                folders.append({"Prefix": f"{item_path}/"})
+            else:
+                # 这是一个文件
+                size = item.get("size", 0)
+                modified_time = item.get("lastModifiedDateTime", datetime.now().isoformat())
+
+                # 解析 ISO 格式时间
+                try:
+                    if isinstance(modified_time, str):
+                        modified_time = datetime.fromisoformat(modified_time.replace("Z", "+00:00"))
+                except Exception:
+                    modified_time = datetime.now()
+
+                files.append(
+                    {
+                        "Key": item_path,
+                        "Size": size,
+                        "LastModified": modified_time,
+                        "ETag": item.get("id", ""),
+                    }
+                )
+
+        return {
+            "Contents": sorted(files, key=lambda x: x["Key"]),
+            "CommonPrefixes": sorted(folders, key=lambda x: x["Prefix"]),
+        }
+
     def list_objects(self, prefix: str = "") -> Dict[str, Any]:
         """
         列出存储桶中的对象
@@ -208,67 +305,9 @@ class OnedriveStorage(BaseStorage):
         """
         try:
             prefix = prefix.rstrip("/") if prefix else ""
-
-            # 直接基于路径列出，避免先查 ID 再列出造成的额外往返
-            select = "$select=name,size,lastModifiedDateTime,id,folder,file"
-            if prefix:
-                # 对前缀进行 URL 编码，保留路径分隔符
-                from urllib.parse import quote as _quote
-
-                quoted_prefix = _quote(prefix.strip("/"), safe="/")
-                if self.folder_item_id == "root":
-                    url = f"{self.graph_api_url}/me/drive/root:/{quoted_prefix}:/children?{select}"
-                else:
-                    url = (
-                        f"{self.graph_api_url}/me/drive/items/{self.folder_item_id}:/{quoted_prefix}:/children?{select}"
-                    )
-            else:
-                if self.folder_item_id == "root":
-                    url = f"{self.graph_api_url}/me/drive/root/children?{select}"
-                else:
-                    url = f"{self.graph_api_url}/me/drive/items/{self.folder_item_id}/children?{select}"
-            response = self._api_request("GET", url)
+            response = self._api_request("GET", self._children_url(prefix))
             response.raise_for_status()
-
-            items = response.json().get("value", [])
-            files = []
-            folders = []
-
-            for item in items:
-                # 跳过特殊文件
-                if item.get("name", "").startswith("."):
-                    continue
-
-                item_path = f"{prefix}/{item.get('name')}" if prefix else item.get("name")
-
-                if "folder" in item:
-                    # 这是一个文件夹
-                    folders.append({"Prefix": f"{item_path}/"})
-                else:
-                    # 这是一个文件
-                    size = item.get("size", 0)
-                    modified_time = item.get("lastModifiedDateTime", datetime.now().isoformat())
-
-                    # 解析 ISO 格式时间
-                    try:
-                        if isinstance(modified_time, str):
-                            modified_time = datetime.fromisoformat(modified_time.replace("Z", "+00:00"))
-                    except Exception:
-                        modified_time = datetime.now()
-
-                    files.append(
-                        {
-                            "Key": item_path,
-                            "Size": size,
-                            "LastModified": modified_time,
-                            "ETag": item.get("id", ""),
-                        }
-                    )
-
-            return {
-                "Contents": sorted(files, key=lambda x: x["Key"]),
-                "CommonPrefixes": sorted(folders, key=lambda x: x["Prefix"]),
-            }
+            return self._build_listing(response.json().get("value", []), prefix)
         except Exception as e:
             import traceback
 
@@ -288,6 +327,8 @@ class OnedriveStorage(BaseStorage):
         try:
             url = self._item_path_url(key)
             response = self._api_request("GET", url)
+            if response.status_code == 404:
+                raise ObjectNotFoundError(f"Object not found: {key}")
             response.raise_for_status()
 
             item = response.json()
@@ -296,7 +337,11 @@ class OnedriveStorage(BaseStorage):
                 "Size": item.get("size", 0),
                 "LastModified": item.get("lastModifiedDateTime", datetime.now().isoformat()),
                 "ETag": item.get("id", ""),
+                # 内容哈希（quickXorHash，个人版还有 sha1Hash / sha256Hash），用于上传去重
+                "Hashes": (item.get("file") or {}).get("hashes") or {},
             }
+        except ObjectNotFoundError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to get OneDrive object info: {str(e)}") from None
 
@@ -308,19 +353,57 @@ class OnedriveStorage(BaseStorage):
             key: 对象键名
 
         Returns:
-            包含对象内容的字典
+            包含对象内容的字典，Body 为流式响应体，支持 read() 和 iter_chunks() 方法
         """
         try:
-            url = self._item_path_url(key, "content")
-            response = self._api_request("GET", url)
+            response = self._open_content(key)
+            length = response.headers.get("Content-Length")
+            return {
+                "Body": ResponseBody(response),
+                "ContentLength": int(length) if length is not None else None,
+                "ContentType": response.headers.get("Content-Type", "application/octet-stream"),
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to get OneDrive object: {str(e)}") from None
+
+    def _open_content(self, key: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """以流式请求打开文件内容（跟随到预认证下载地址的重定向），请求失败时关闭连接并抛出异常"""
+        url = self._item_path_url(key, "content")
+        response = self._api_request(
+            "GET", url, headers={"Accept-Encoding": "identity", **(headers or {})}, stream=True
+        )
+        try:
             response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return response
+
+    def get_object_range(self, key: str, start: int, end: int) -> Dict[str, Any]:
+        """
+        获取对象的一段字节范围
+
+        Args:
+            key: 对象键名
+            start: 起始字节位置
+            end: 结束字节位置（包含）
 
+        Returns:
+            包含指定范围内容的字典，Body 为流式响应体
+        """
+        try:
+            response = self._open_content(key, {"Range": f"bytes={start}-{end}"})
+            body = ResponseBody(response)
+            if response.status_code != 206:
+                # 上游忽略了 Range，从完整内容中截取
+                body = SlicedBody(body, start, end)
             return {
-                "Body": response.content,
+                "Body": body,
+                "ContentLength": end - start + 1,
                 "ContentType": response.headers.get("Content-Type", "application/octet-stream"),
             }
         except Exception as e:
-            raise RuntimeError(f"Failed to get OneDrive object: {str(e)}") from None
+            raise RuntimeError(f"Failed to get OneDrive object range: {str(e)}") from None
 
     def generate_presigned_url(self, key: str, expires: int = None) -> str:
         """
@@ -343,7 +426,7 @@ class OnedriveStorage(BaseStorage):
                 "expirationDateTime": (datetime.utcnow() + timedelta(seconds=expires)).isoformat() + "Z",
             }
 
-            response = requests.post(url, headers=self._headers(), json=body, timeout=15)
+            response = self._api_request("POST", url, json=body, timeout=15)
 
             if response.status_code in (200, 201):
                 data = response.json() or {}
@@ -378,17 +461,12 @@ class OnedriveStorage(BaseStorage):
         if direct:
             return {"type": "redirect", "url": direct}
 
-        # 2) 匿名分享链接（添加 download=1 提示下载）
-        presigned = self.generate_presigned_url(key)
-        if presigned:
-            return {"type": "redirect", "url": presigned}
-
-        # 3) 回退到 webUrl（可能需要登录）
-        public_url = self.get_public_url(key)
-        if public_url:
-            return {"type": "redirect", "url": public_url}
-
-        return None
+        # 2) 经由服务器逐块转发文件内容（支持 Range），不创建分享链接，也不会跳转到需要登录的预览页
+        return {
+            "type": "stream",
+            "filename": key.rsplit("/", 1)[-1],
+            "mimetype": mimetypes.guess_type(key)[0] or "application/octet-stream",
+        }
 
     def get_public_url(self, key: str) -> str:
         """
@@ -423,16 +501,22 @@ class OnedriveStorage(BaseStorage):
         Returns:
             上传成功返回 True，失败返回 False
         """
+        # 已有文件的内容哈希与待上传内容一致时跳过上传
+        if Config.UPLOAD_DEDUP and is_unchanged(self.get_object_info, key, file_data):
+            count_uploads("onedrive", "unchanged")
+            return True
+        count_uploads("onedrive", "uploaded")
+        return self._put_content(key, file_data, content_type)
+
+    def _put_content(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        """通过简单上传接口写入文件内容"""
         try:
             url = self._item_path_url(key, "content")
 
             # 自定义头部（需要指定 Content-Type）
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": content_type or "application/octet-stream",
-            }
+            headers = {"Content-Type": content_type or "application/octet-stream"}
 
-            response = requests.put(url, headers=headers, data=file_data, timeout=30)
+            response = self._api_request("PUT", url, headers=headers, data=file_data)
             response.raise_for_status()
 
             return response.status_code == 200 or response.status_code == 201
@@ -493,6 +577,171 @@ class OnedriveStorage(BaseStorage):
         except Exception as e:
             raise RuntimeError(f"Failed to copy file in OneDrive: {str(e)}") from None
 
+    def _batch(self, batch_requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        通过 Graph 的 $batch 接口执行多个请求，每批最多 BATCH_SIZE 个
+
+        被限流（429/503）的子请求会按 Retry-After 等待后重新提交。
+
+        Args:
+            batch_requests: 子请求列表，每项包含 id、method、url（相对于 graph_api_url）及可选的 body
+
+        Returns:
+            子请求 id 到子响应（包含 status、headers、body）的映射
+        """
+        responses: Dict[str, Dict[str, Any]] = {}
+        pending = list(batch_requests)
+        attempt = 0
+
+        while pending:
+            by_id = {item["id"]: item for item in pending}
+            retry = []
+            wait = 0.0
+            for i in range(0, len(pending), self.BATCH_SIZE):
+                chunk = pending[i : i + self.BATCH_SIZE]
+                response = self._api_request("POST", f"{self.graph_api_url}/$batch", json={"requests": chunk})
+                response.raise_for_status()
+
+                for item in response.json().get("responses", []):
+                    if item.get("status") in (429, 503) and attempt < self.scheduler.max_retries:
+                        retry.append(by_id[item["id"]])
+                        try:
+                            wait = max(wait, float((item.get("headers") or {}).get("Retry-After", 0)))
+                        except ValueError:
+                            pass
+                    else:
+                        responses[item["id"]] = item
+
+            if retry:
+                time.sleep(min(wait or self.scheduler._backoff(attempt), self.scheduler.max_delay))
+                attempt += 1
+            pending = retry
+
+        return responses
+
+    def _relative_url(self, url: str) -> str:
+        """将完整的 Graph URL 转换为批量请求使用的相对 URL"""
+        return url[len(self.graph_api_url) :]
+
+    def head_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        批量获取对象信息，通过 $batch 每 20 个键一次请求
+        """
+        keys = list(dict.fromkeys(keys))
+        responses = self._batch(
+            [
+                {"id": str(i), "method": "GET", "url": self._relative_url(self._item_path_url(key))}
+                for i, key in enumerate(keys)
+            ]
+        )
+
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for i, key in enumerate(keys):
+            item = responses.get(str(i)) or {}
+            body = item.get("body") or {}
+            if item.get("status") != 200 or body.get("folder"):
+                results[key] = None
+                continue
+            results[key] = {
+                "Key": key,
+                "Size": body.get("size", 0),
+                "LastModified": body.get("lastModifiedDateTime", datetime.now().isoformat()),
+                "ETag": body.get("id", ""),
+                "Hashes": (body.get("file") or {}).get("hashes") or {},
+            }
+        return results
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        """
+        批量删除文件，通过 $batch 每 20 个键一次请求
+        """
+        keys = list(dict.fromkeys(keys))
+        responses = self._batch(
+            [
+                {"id": str(i), "method": "DELETE", "url": self._relative_url(self._item_path_url(key))}
+                for i, key in enumerate(keys)
+            ]
+        )
+        return {key: (responses.get(str(i)) or {}).get("status") == 204 for i, key in enumerate(keys)}
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        """
+        批量上传文件
+
+        $batch 只接受 JSON 请求体，文件内容无法放入批量请求，这里在共享的连接池上并发上传
+        （请求调度器限制并发并处理限流）。按路径上传时 OneDrive 会自动创建不存在的上级文件夹。
+        启用 UPLOAD_DEDUP 时先通过 $batch 查询已有文件的内容哈希，跳过未变化的文件，
+        同批中内容相同的文件只上传一次，其余服务端复制。
+        """
+        if Config.UPLOAD_DEDUP:
+            return upload_deduplicated("onedrive", files, self.head_many, self._put_many, self.copy_many)
+        count_uploads("onedrive", "uploaded", len({item[0] for item in files}))
+        return self._put_many(files)
+
+    def _put_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        def _upload(item: Tuple[str, bytes, Optional[str]]) -> bool:
+            try:
+                return self._put_content(*item)
+            except Exception as e:
+                print(f"Upload failed for {item[0]}: {str(e)}")
+                return False
+
+        items = list({item[0]: item for item in files}.values())
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, min(len(items), Config.BACKEND_MAX_CONCURRENCY))) as executor:
+            outcomes = list(executor.map(lambda item: context.copy().run(_upload, item), items))
+        return {key: ok for (key, _, _), ok in zip(items, outcomes, strict=True)}
+
+    def _ensure_folder_id(self, path: str) -> Optional[str]:
+        """创建（如不存在）并返回指定路径的文件夹 ID，失败时返回 None"""
+        try:
+            self.create_folder(path + "/")
+        except Exception as e:
+            print(f"Folder creation failed for {path}: {str(e)}")
+            return None
+        return self._get_folder_id(path)
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """
+        批量复制文件，先批量解析目标文件夹 ID，再批量提交复制请求
+        """
+        parents = sorted({dest_key.strip("/").rpartition("/")[0] for _, dest_key in pairs})
+        lookups = self._batch(
+            [
+                {"id": str(i), "method": "GET", "url": self._relative_url(self._item_path_url(parent))}
+                for i, parent in enumerate(parents)
+                if parent
+            ]
+        )
+        parent_ids = {"": self.folder_item_id}
+        for i, parent in enumerate(parents):
+            item = lookups.get(str(i)) or {}
+            if parent and item.get("status") == 200:
+                parent_ids[parent] = (item.get("body") or {}).get("id")
+            elif parent and item.get("status") == 404:
+                # 目标文件夹不存在时先创建（逐个对象复制整个文件夹时子文件夹尚未建立）
+                parent_ids[parent] = self._ensure_folder_id(parent)
+
+        copy_requests = []
+        for i, (source_key, dest_key) in enumerate(pairs):
+            parent, _, name = dest_key.strip("/").rpartition("/")
+            if not parent_ids.get(parent):
+                continue
+            copy_requests.append(
+                {
+                    "id": str(i),
+                    "method": "POST",
+                    "url": self._relative_url(self._item_path_url(source_key, "copy")),
+                    "body": {"parentReference": {"id": parent_ids[parent]}, "name": name},
+                    "headers": {"Content-Type": "application/json"},
+                }
+            )
+
+        responses = self._batch(copy_requests)
+        return {
+            dest_key: (responses.get(str(i)) or {}).get("status") in (200, 202) for i, (_, dest_key) in enumerate(pairs)
+        }
+
     def generate_thumbnail(self, file_path: str) -> bytes:
         """
         生成图片缩略图
@@ -505,7 +754,7 @@ class OnedriveStorage(BaseStorage):
         """
         try:
             url = self._item_path_url(file_path, "thumbnails")
-            response = requests.get(url, headers=self._headers(), timeout=15)
+            response = self._api_request("GET", url, timeout=15)
             response.raise_for_status()
 
             thumbnails = response.json().get("value", [])
@@ -515,7 +764,7 @@ class OnedriveStorage(BaseStorage):
                 thumb_url = thumb_set.get("c", {}).get("url") or thumb_set.get("m", {}).get("url")
 
                 if thumb_url:
-                    thumb_response = requests.get(thumb_url)
+                    thumb_response = self.scheduler.request(self.session, "GET", thumb_url)
                     if thumb_response.status_code == 200:
                         return thumb_response.content
 
@@ -536,18 +785,31 @@ class OnedriveStorage(BaseStorage):
         """
         try:
             file_obj = self.get_object(file_path)
-            img = Image.open(BytesIO(file_obj["Body"]))
-
-            # 调整大小
-            img.thumbnail(Config.THUMB_SIZE, Image.Resampling.LANCZOS)
-
-            # 保存为 PNG
-            thumb_buffer = BytesIO()
-            img.save(thumb_buffer, format="PNG")
-            return thumb_buffer.getvalue()
+            return self._render_thumbnail(file_obj["Body"].read())
         except Exception:
             return None
 
+    @staticmethod
+    def _render_thumbnail(data: bytes) -> bytes:
+        """
+        将图片数据缩放为 PNG 缩略图
+
+        Args:
+            data: 原始图片字节数据
+
+        Returns:
+            缩略图字节数据
+        """
+        img = Image.open(BytesIO(data))
+
+        # 调整大小
+        img.thumbnail(Config.THUMB_SIZE, Image.Resampling.LANCZOS)
+
+        # 保存为 PNG
+        thumb_buffer = BytesIO()
+        img.save(thumb_buffer, format="PNG")
+        return thumb_buffer.getvalue()
+
     def rename_file(self, old_key: str, new_key: str) -> bool:
         """
         重命名文件
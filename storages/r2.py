@@ -1,14 +1,22 @@
+import contextvars
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import boto3
 from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import ClientError
 from PIL import Image
 
 from config import Config
+from recording import instrument_boto_client
 
-from .base import BaseStorage
+from .base import BaseStorage, ObjectNotFoundError
+from .cache import TTLCache, time_bucket
+from .dedup import count_uploads, is_unchanged, upload_deduplicated
 
 
 class R2Storage(BaseStorage):
@@ -21,7 +29,7 @@ class R2Storage(BaseStorage):
         if not account_id:
             raise RuntimeError("R2_ACCOUNT_ID environment variable is not set")
 
-        self.endpoint = f"https://{account_id}.r2.cloudflarestorage.com"
+        self.endpoint = Config.R2_ENDPOINT_URL or f"https://{account_id}.r2.cloudflarestorage.com"
         self.access_key = Config.R2_ACCESS_KEY_ID
         self.secret_key = Config.R2_SECRET_ACCESS_KEY
 
@@ -32,18 +40,38 @@ class R2Storage(BaseStorage):
         self.bucket_name = Config.R2_BUCKET_NAME
         self.public_domain = Config.R2_PUBLIC_DOMAIN
 
+        self._s3_client = None
+        self._s3_client_lock = threading.Lock()
+
+        # 预签名 URL 按时间桶缓存，键为 (对象键, 过期时间, 附加参数, 桶起始时间)
+        self.presign_bucket_seconds = Config.PRESIGNED_URL_BUCKET_SECONDS
+        self._presigned_cache = TTLCache(maxsize=Config.PRESIGNED_URL_CACHE_MAX_ENTRIES)
+
     def get_s3_client(self):
         """
-        创建并返回配置好的 S3 客户端，用于访问 R2 存储
-        """
-        return boto3.client(
-            "s3",
-            endpoint_url=self.endpoint,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            config=BotocoreConfig(signature_version="s3v4"),
-            region_name=self.region_name,
-        )
+        返回配置好的 S3 客户端，用于访问 R2 存储
+
+        客户端是线程安全的，创建后复用以保留连接池；
+        使用 botocore 的 adaptive 重试模式，在遇到限流时自动退避并限制请求速率。
+        """
+        if self._s3_client is None:
+            with self._s3_client_lock:
+                if self._s3_client is None:
+                    self._s3_client = boto3.client(
+                        "s3",
+                        endpoint_url=self.endpoint,
+                        aws_access_key_id=self.access_key,
+                        aws_secret_access_key=self.secret_key,
+                        config=BotocoreConfig(
+                            signature_version="s3v4",
+                            retries={"mode": "adaptive", "max_attempts": Config.BACKEND_MAX_RETRIES + 1},
+                            max_pool_connections=Config.BACKEND_MAX_CONCURRENCY,
+                            read_timeout=Config.BACKEND_REQUEST_TIMEOUT,
+                        ),
+                        region_name=self.region_name,
+                    )
+                    instrument_boto_client(self._s3_client)
+        return self._s3_client
 
     def list_objects(self, prefix: str = "") -> Dict[str, Any]:
         """
@@ -65,7 +93,13 @@ class R2Storage(BaseStorage):
         获取对象基本信息
         """
         s3_client = self.get_s3_client()
-        return s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        try:
+            return s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            code = str(e.response.get("Error", {}).get("Code", ""))
+            if code in ("404", "NoSuchKey", "NotFound"):
+                raise ObjectNotFoundError(f"Object not found: {key}") from e
+            raise
 
     def get_object(self, key: str) -> Dict[str, Any]:
         """
@@ -74,10 +108,43 @@ class R2Storage(BaseStorage):
         s3_client = self.get_s3_client()
         return s3_client.get_object(Bucket=self.bucket_name, Key=key)
 
-    def generate_presigned_url(self, key: str, expires: int = None) -> str:
-        """为指定对象生成 presigned URL（GET）。"""
+    def get_object_range(self, key: str, start: int, end: int) -> Dict[str, Any]:
+        """
+        获取对象的一段字节范围
+        """
         s3_client = self.get_s3_client()
+        return s3_client.get_object(Bucket=self.bucket_name, Key=key, Range=f"bytes={start}-{end}")
+
+    def _presign_get_object(self, key: str, expires: int, **extra_params) -> str:
+        """
+        生成 GET 预签名 URL，启用时间桶时在同一桶内复用同一个 URL
+
+        同一时间桶内签出的 URL 统一在 "桶结束时间 + expires" 时失效，
+        因此重定向目标在桶内保持不变，浏览器和 CDN 可以复用缓存。
+        """
+        params = {"Bucket": self.bucket_name, "Key": key, **extra_params}
+
+        if self.presign_bucket_seconds <= 0:
+            return self.get_s3_client().generate_presigned_url("get_object", Params=params, ExpiresIn=expires)
+
+        now = time.time()
+        bucket_start, bucket_end = time_bucket(self.presign_bucket_seconds, now)
+        cache_key = (key, expires, tuple(sorted(extra_params.items())), bucket_start)
+        cached = self._presigned_cache.get(cache_key)
+        if cached:
+            return cached
 
+        url = self.get_s3_client().generate_presigned_url(
+            "get_object",
+            Params=params,
+            ExpiresIn=int(bucket_end - now) + expires,
+        )
+        if url:
+            self._presigned_cache.set(cache_key, url, ttl=bucket_end - now)
+        return url
+
+    def generate_presigned_url(self, key: str, expires: int = None) -> str:
+        """为指定对象生成 presigned URL（GET）。"""
         if expires is None:
             try:
                 expires = int(os.getenv("R2_PRESIGN_EXPIRES", "3600"))
@@ -85,15 +152,20 @@ class R2Storage(BaseStorage):
                 expires = 3600
 
         try:
-            url = s3_client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": self.bucket_name, "Key": key},
-                ExpiresIn=expires,
-            )
-            return url
+            return self._presign_get_object(key, expires)
         except Exception:
             return None
 
+    def get_presigned_url_max_age(self) -> int:
+        """
+        返回预签名 URL 可被缓存的秒数（即当前时间桶的剩余时间）
+        """
+        if self.presign_bucket_seconds <= 0:
+            return 0
+        now = time.time()
+        _, bucket_end = time_bucket(self.presign_bucket_seconds, now)
+        return max(0, int(bucket_end - now))
+
     def get_public_url(self, key: str) -> str:
         """
         生成对象的公共访问 URL
@@ -108,22 +180,37 @@ class R2Storage(BaseStorage):
         """
         try:
             obj = self.get_object(file_path)
-            data = obj["Body"].read()
-
-            img = Image.open(BytesIO(data))
-            img = img.convert("RGB")
-            img.thumbnail((320, 320))
-            buf = BytesIO()
-            img.save(buf, "JPEG", quality=80, optimize=True)
-            buf.seek(0)
-            return buf.getvalue()
+            return self._render_thumbnail(obj["Body"].read())
         except Exception:
             raise
 
+    @staticmethod
+    def _render_thumbnail(data: bytes) -> bytes:
+        """
+        将图片数据缩放为 JPEG 缩略图
+        """
+        img = Image.open(BytesIO(data))
+        img = img.convert("RGB")
+        img.thumbnail((320, 320))
+        buf = BytesIO()
+        img.save(buf, "JPEG", quality=80, optimize=True)
+        buf.seek(0)
+        return buf.getvalue()
+
     def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
         """
         上传文件到 R2 存储
+
+        启用 UPLOAD_DEDUP 时先 HEAD 已有对象，ETag（MD5）与内容一致则跳过上传。
         """
+        if Config.UPLOAD_DEDUP and is_unchanged(self.get_object_info, key, file_data):
+            count_uploads("r2", "unchanged")
+            return True
+        count_uploads("r2", "uploaded")
+        return self._put(key, file_data, content_type)
+
+    def _put(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        """上传对象"""
         try:
             s3_client = self.get_s3_client()
 
@@ -271,6 +358,104 @@ class R2Storage(BaseStorage):
             print(f"Folder copy failed: {str(e)}")
             return False
 
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        """
+        分页列举前缀下的所有对象键名（不使用分隔符，一次遍历整棵子树）
+        """
+        s3_client = self.get_s3_client()
+        paginator = s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+    def iter_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """
+        分页列举前缀下的所有对象（不使用分隔符，一次遍历整棵子树）
+        """
+        s3_client = self.get_s3_client()
+        paginator = s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            yield from page.get("Contents", [])
+
+    def head_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        批量获取对象信息
+
+        S3 没有批量 HEAD 接口，这里在共享的连接池上并发发起请求。
+        """
+
+        def _head(key: str) -> Optional[Dict[str, Any]]:
+            try:
+                return self.get_object_info(key)
+            except Exception:
+                return None
+
+        keys = list(dict.fromkeys(keys))
+        # 工作线程沿用当前请求的上下文（路由标记、耗时明细和录像）
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, min(len(keys), Config.BACKEND_MAX_CONCURRENCY))) as executor:
+            results = executor.map(lambda key: context.copy().run(_head, key), keys)
+            return dict(zip(keys, results, strict=True))
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        """
+        批量删除对象，每 1000 个键一次 DeleteObjects 请求
+        """
+        keys = list(dict.fromkeys(keys))
+        results = dict.fromkeys(keys, True)
+        s3_client = self.get_s3_client()
+
+        for i in range(0, len(keys), 1000):
+            chunk = keys[i : i + 1000]
+            try:
+                response = s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+                )
+            except Exception as e:
+                print(f"Batch delete failed: {str(e)}")
+                for key in chunk:
+                    results[key] = False
+                continue
+
+            # Quiet 模式下只返回删除失败的键
+            for error in response.get("Errors", []):
+                print(f"Delete failed for {error.get('Key')}: {error.get('Message')}")
+                results[error.get("Key")] = False
+        return results
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """
+        批量复制对象，在共享的连接池上并发执行服务端复制
+        """
+
+        def _copy(pair: Tuple[str, str]) -> bool:
+            return self.copy_file(*pair)
+
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, min(len(pairs), Config.BACKEND_MAX_CONCURRENCY))) as executor:
+            outcomes = list(executor.map(lambda pair: context.copy().run(_copy, pair), pairs))
+        return {dest_key: ok for (_, dest_key), ok in zip(pairs, outcomes, strict=True)}
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        """
+        批量上传对象
+
+        S3 没有批量 PUT 接口，这里在共享的连接池上并发上传。启用 UPLOAD_DEDUP 时
+        先并发 HEAD 已有对象跳过内容未变化的文件，同批中内容相同的文件只上传一次，其余服务端复制。
+        """
+        if Config.UPLOAD_DEDUP:
+            return upload_deduplicated("r2", files, self.head_many, self._put_many, self.copy_many)
+        count_uploads("r2", "uploaded", len({item[0] for item in files}))
+        return self._put_many(files)
+
+    def _put_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        items = list({item[0]: item for item in files}.values())
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, min(len(items), Config.BACKEND_MAX_CONCURRENCY))) as executor:
+            outcomes = list(executor.map(lambda item: context.copy().run(self._put, *item), items))
+        return {key: ok for (key, _, _), ok in zip(items, outcomes, strict=True)}
+
     def create_folder(self, key: str) -> bool:
         """
         在 R2 中创建文件夹（通过创建一个以 / 结尾的 0 字节对象）
@@ -328,7 +513,6 @@ class R2Storage(BaseStorage):
             包含下载信息的字典
         """
         try:
-            s3_client = self.get_s3_client()
             file_name = key.split("/")[-1] if "/" in key else key
 
             # 使用 RFC 5987 编码处理文件名
@@ -339,14 +523,10 @@ class R2Storage(BaseStorage):
             # 生成带有 Content-Disposition 的预签名 URL
             expires = int(os.getenv("R2_PRESIGN_EXPIRES", "3600"))
 
-            url = s3_client.generate_presigned_url(
-                "get_object",
-                Params={
-                    "Bucket": self.bucket_name,
-                    "Key": key,
-                    "ResponseContentDisposition": f"attachment; filename=\"{file_name}\"; filename*=UTF-8''{encoded_filename}",
-                },
-                ExpiresIn=expires,
+            url = self._presign_get_object(
+                key,
+                expires,
+                ResponseContentDisposition=f"attachment; filename=\"{file_name}\"; filename*=UTF-8''{encoded_filename}",
             )
 
             if url:
@@ -0,0 +1,152 @@
+"""
+容错工具模块
+提供按后端隔离的熔断器
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器处于打开状态时拒绝调用抛出的异常"""
+
+    pass
+
+
+class CircuitBreaker:
+    """基于错误率和慢调用比例的熔断器
+
+    在最近 window_size 次调用中，若失败比例或慢调用比例超过阈值，熔断器打开，
+    在 cooldown 秒内直接拒绝调用；冷却结束后进入半开状态，仅放行一次探测调用，
+    探测成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        error_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_threshold: float = 0.8,
+        cooldown: float = 30.0,
+        ignored_exceptions: tuple = (),
+    ):
+        """
+        初始化熔断器
+
+        Args:
+            name: 熔断器名称（通常为后端名称）
+            window_size: 统计窗口内的调用次数
+            min_calls: 窗口内达到该调用次数后才会判断是否熔断
+            error_threshold: 失败比例阈值
+            slow_call_seconds: 超过该耗时（秒）的调用视为慢调用
+            slow_call_threshold: 慢调用比例阈值
+            cooldown: 打开后的冷却时间（秒）
+            ignored_exceptions: 视为正常结果的异常类型（如对象不存在）
+        """
+        self.name = name
+        self.min_calls = max(1, int(min_calls))
+        self.error_threshold = float(error_threshold)
+        self.slow_call_seconds = float(slow_call_seconds)
+        self.slow_call_threshold = float(slow_call_threshold)
+        self.cooldown = float(cooldown)
+        self.ignored_exceptions = tuple(ignored_exceptions)
+
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=max(1, int(window_size)))
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """当前状态（冷却结束后报告为半开）"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """判断当前是否允许向后端发起调用"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            # 半开状态：仅放行一个探测请求
+            if self._probe_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    def record(self, success: bool, duration: float) -> None:
+        """
+        记录一次调用结果
+
+        Args:
+            success: 调用是否成功
+            duration: 调用耗时（秒）
+        """
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if success and not slow:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip()
+                return
+
+            self._outcomes.append((success, slow))
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                total = len(self._outcomes)
+                failures = sum(1 for ok, _ in self._outcomes if not ok)
+                slow_calls = sum(1 for _, is_slow in self._outcomes if is_slow)
+                if failures / total >= self.error_threshold or slow_calls / total >= self.slow_call_threshold:
+                    self._trip()
+
+    def _trip(self) -> None:
+        """打开熔断器（调用方需持有锁）"""
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        print(f"Circuit breaker '{self.name}' opened")
+
+    def call(self, func: Callable[[], Any], is_failure: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        在熔断器保护下执行调用
+
+        Args:
+            func: 无参调用
+            is_failure: 可选的结果判定函数，返回 True 时即使未抛异常也记为失败
+
+        Returns:
+            func 的返回值
+
+        Raises:
+            CircuitOpenError: 熔断器打开时
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit breaker '{self.name}' is open")
+
+        start = time.monotonic()
+        try:
+            result = func()
+        except self.ignored_exceptions:
+            self.record(True, time.monotonic() - start)
+            raise
+        except Exception:
+            self.record(False, time.monotonic() - start)
+            raise
+        failed = bool(is_failure and is_failure(result))
+        self.record(not failed, time.monotonic() - start)
+        return result
@@ -0,0 +1,229 @@
+"""
+请求调度模块
+为 HTTP 后端提供自适应并发限制、限流感知和带抖动的重试
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+
+from metrics import REGISTRY
+from tracing import record_span
+
+# 可以安全重试的 HTTP 方法
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# 对幂等请求进行重试的状态码
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class RequestScheduler:
+    """按后端隔离的自适应请求调度器
+
+    - 限制同时进行的请求数，并按 AIMD 策略调整上限：
+      请求顺利时缓慢增加，遇到限流或延迟明显升高时成倍减少；
+    - 遵循 Retry-After 与 X-RateLimit-* 头，在限流窗口内暂停所有请求；
+    - 对幂等请求的网络错误和 5xx 进行带抖动的指数退避重试，
+      限流响应（429 等）表示请求未被处理，对任何方法都会重试。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        timeout: float = 30.0,
+        latency_tolerance: float = 3.0,
+    ):
+        """
+        初始化调度器
+
+        Args:
+            name: 调度器名称（通常为后端名称）
+            initial_limit: 初始并发上限
+            min_limit: 并发上限的最小值
+            max_limit: 并发上限的最大值
+            max_retries: 最大重试次数
+            base_delay: 退避的基础等待时间（秒）
+            max_delay: 单次等待的最长时间（秒），超过时不再等待直接返回响应
+            timeout: 默认请求超时时间（秒）
+            latency_tolerance: 延迟超过历史最佳延迟的倍数时视为拥塞
+        """
+        self.name = name
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.limit = float(min(max(int(initial_limit), self.min_limit), self.max_limit))
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.timeout = timeout
+        self.latency_tolerance = float(latency_tolerance)
+
+        self.in_flight = 0
+        self._best_latency: Optional[float] = None
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回当前的并发状态"""
+        with self._cond:
+            return {
+                "name": self.name,
+                "in_flight": self.in_flight,
+                "limit": int(self.limit),
+                "paused_for": max(0.0, self._paused_until - time.time()),
+            }
+
+    def _acquire(self) -> None:
+        """等待直到有空闲的并发名额且不在限流暂停期"""
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.time()
+                if pause > 0:
+                    self._cond.wait(timeout=pause)
+                    continue
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=1.0)
+
+    def _release(self, latency: float, throttled: bool) -> None:
+        """归还并发名额并根据本次结果调整并发上限"""
+        REGISTRY.inc("cloudindex_backend_http_requests_total", backend=self.name, throttled=str(throttled).lower())
+        REGISTRY.observe("cloudindex_backend_http_request_duration_seconds", latency, backend=self.name)
+        record_span(f"backend.{self.name}", latency)
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(float(self.min_limit), self.limit / 2)
+            else:
+                if self._best_latency is None or latency < self._best_latency:
+                    self._best_latency = latency
+                else:
+                    # 让历史最佳延迟缓慢回升，以适应后端的正常波动
+                    self._best_latency *= 1.01
+                if latency > self._best_latency * self.latency_tolerance:
+                    self.limit = max(float(self.min_limit), self.limit * 0.9)
+                else:
+                    self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def _pause(self, seconds: float) -> None:
+        """在指定时间内暂停该后端的所有新请求"""
+        seconds = min(seconds, self.max_delay)
+        if seconds <= 0:
+            return
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.time() + seconds)
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """解析 Retry-After 头（秒数或 HTTP 日期）"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return None
+
+    @staticmethod
+    def _rate_limit_reset(response: requests.Response) -> Optional[float]:
+        """配额耗尽时根据 X-RateLimit-Reset 计算需要等待的秒数"""
+        if response.headers.get("X-RateLimit-Remaining") != "0":
+            return None
+        reset = response.headers.get("X-RateLimit-Reset")
+        try:
+            return max(0.0, float(reset) - time.time()) if reset else None
+        except ValueError:
+            return None
+
+    def _is_throttled(self, response: requests.Response) -> bool:
+        """判断响应是否表示被限流（包括 GitHub 的二级限流 403）"""
+        if response.status_code == 429:
+            return True
+        if response.status_code in (403, 503):
+            return "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0"
+        return False
+
+    def _backoff(self, attempt: int) -> float:
+        """带完全抖动的指数退避时间"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+
+    def request(
+        self,
+        session: requests.Session,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        通过调度器发起 HTTP 请求
+
+        Args:
+            session: 用于发起请求的 requests 会话
+            method: HTTP 方法
+            url: 请求 URL
+            idempotent: 是否允许在网络错误和 5xx 时重试，默认按 HTTP 方法判断
+            **kwargs: 传给 session.request 的其他参数
+
+        Returns:
+            最终的响应对象（重试耗尽时返回最后一次响应）
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault("timeout", self.timeout)
+
+        attempt = 0
+        while True:
+            self._acquire()
+            start = time.monotonic()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._release(time.monotonic() - start, throttled=True)
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            throttled = self._is_throttled(response)
+            self._release(time.monotonic() - start, throttled=throttled)
+
+            wait = self._retry_after(response)
+            reset_wait = self._rate_limit_reset(response)
+            if reset_wait is not None:
+                # 配额已耗尽，后续请求等待到配额重置
+                self._pause(reset_wait)
+
+            retryable = throttled or (idempotent and response.status_code in RETRYABLE_STATUS)
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            server_wait = wait if wait is not None else reset_wait
+            if server_wait is not None:
+                if server_wait > self.max_delay:
+                    # 需要等待太久时直接返回，由调用方处理错误
+                    return response
+                # 服务端给出了等待时间，暂停已生效，下一次 _acquire 会等待到暂停结束
+                self._pause(server_wait)
+            else:
+                time.sleep(self._backoff(attempt))
+            # 丢弃本次响应，释放连接（stream=True 的请求不会自动读完响应体）
+            response.close()
+            attempt += 1
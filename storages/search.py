@@ -0,0 +1,202 @@
+"""
+文件名搜索
+
+支持子串、通配符（* ? [...]）和扩展名三种条件，条件之间为“且”的关系。
+NameIndex 为文件名建立三元组（trigram）倒排索引：查询先取各三元组对应键集合的交集作为候选，
+再逐个校验，几十万个键的查询只需检查少量候选。搜索只由元数据索引提供。
+"""
+
+import heapq
+import re
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# 文件名中的单词分隔符，紧跟其后的匹配排名更靠前
+WORD_SEPARATORS = " -_.()[]"
+
+
+class SearchQuery(NamedTuple):
+    """搜索条件，文本和通配符不区分大小写；含 / 时匹配完整路径，否则只匹配文件名"""
+
+    text: str = ""
+    glob: str = ""
+    extensions: Tuple[str, ...] = ()
+    prefix: str = ""
+    limit: int = 50
+
+    @classmethod
+    def create(
+        cls, text: str = "", glob: str = "", extensions: str = "", prefix: str = "", limit: int = 50
+    ) -> "SearchQuery":
+        """
+        由请求参数构建搜索条件
+
+        Args:
+            text: 子串
+            glob: 通配符模式
+            extensions: 以逗号分隔的扩展名（可带点，如 ".jpg,png"）
+            prefix: 只搜索该文件夹下的对象
+            limit: 最多返回的结果数
+        """
+        exts = tuple(dict.fromkeys(ext.strip().lstrip(".").lower() for ext in extensions.split(",") if ext.strip()))
+        return cls(text.strip().lower(), glob.strip().lower(), exts, prefix, limit)
+
+    def is_empty(self) -> bool:
+        return not (self.text or self.glob or self.extensions)
+
+
+def _name(key: str) -> str:
+    return key.rsplit("/", 1)[-1].lower()
+
+
+def _extension(name: str) -> str:
+    stem, dot, ext = name.rpartition(".")
+    return ext if dot and stem else ""
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _literals(query: SearchQuery) -> List[str]:
+    """取出只匹配文件名的条件中必须原样出现的片段（通配符去掉 * ? 和 [...] 后剩余的部分）"""
+    literals = []
+    if query.text and "/" not in query.text:
+        literals.append(query.text)
+    if query.glob and "/" not in query.glob:
+        literals.extend(re.split(r"\[[^\]]*\]|[*?]", query.glob))
+    return [literal for literal in literals if len(literal) >= 3]
+
+
+def matches(query: SearchQuery, key: str) -> bool:
+    """判断对象键名是否满足搜索条件（文件夹条目不参与搜索）"""
+    if key.endswith("/") or not key.startswith(query.prefix):
+        return False
+    name = _name(key)
+    if query.extensions and _extension(name) not in query.extensions:
+        return False
+    if query.text and query.text not in (key.lower() if "/" in query.text else name):
+        return False
+    if query.glob and not fnmatchcase(key.lower() if "/" in query.glob else name, query.glob):
+        return False
+    return True
+
+
+def rank(query: SearchQuery, key: str) -> tuple:
+    """
+    结果排序依据，越小越靠前
+
+    文件名与文本完全相同、以文本开头、文本出现在单词开头、文本出现在文件名中间、
+    只出现在路径中依次排后；同一档内层级浅、文件名短的优先。
+    """
+    name = _name(key)
+    text = query.text
+    if not text:
+        tier = 0
+    elif name == text or name.rpartition(".")[0] == text:
+        tier = 0
+    elif name.startswith(text):
+        tier = 1
+    elif any(name[i - 1] in WORD_SEPARATORS for i in _positions(name, text)):
+        tier = 2
+    elif text in name:
+        tier = 3
+    else:
+        tier = 4
+    return (tier, key.count("/"), len(name), key)
+
+
+def _positions(name: str, text: str) -> Iterable[int]:
+    start = name.find(text, 1)
+    while start > 0:
+        yield start
+        start = name.find(text, start + 1)
+
+
+def select(query: SearchQuery, keys: Iterable[str]) -> Tuple[List[str], int]:
+    """
+    从候选键名中筛选满足条件的对象并排序
+
+    Returns:
+        (排名前 limit 的键名, 满足条件的总数)
+    """
+    found = [key for key in keys if matches(query, key)]
+    return heapq.nsmallest(query.limit, found, key=lambda key: rank(query, key)), len(found)
+
+
+class NameIndex:
+    """文件名的三元组倒排索引和扩展名索引
+
+    键名映射为整数编号以减少倒排表的内存占用，删除后编号回收复用。
+    同时保存小写的文件名，无法使用三元组的短关键字在这张表上做一次紧凑的线性扫描。
+    """
+
+    def __init__(self):
+        self._keys: List[Optional[str]] = []
+        self._names: List[Optional[str]] = []
+        self._ids: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._grams: Dict[str, Set[int]] = defaultdict(set)
+        self._extensions: Dict[str, Set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, key: str) -> None:
+        if key in self._ids or key.endswith("/"):
+            return
+        name = _name(key)
+        if self._free:
+            key_id = self._free.pop()
+            self._keys[key_id] = key
+            self._names[key_id] = name
+        else:
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._names.append(name)
+        self._ids[key] = key_id
+        for gram in _trigrams(name):
+            self._grams[gram].add(key_id)
+        self._extensions[_extension(name)].add(key_id)
+
+    def remove(self, key: str) -> None:
+        key_id = self._ids.pop(key, None)
+        if key_id is None:
+            return
+        name = _name(key)
+        for gram in _trigrams(name):
+            self._discard(self._grams, gram, key_id)
+        self._discard(self._extensions, _extension(name), key_id)
+        self._keys[key_id] = None
+        self._names[key_id] = None
+        self._free.append(key_id)
+
+    @staticmethod
+    def _discard(postings: Dict[str, Set[int]], token: str, key_id: int) -> None:
+        ids = postings.get(token)
+        if ids is not None:
+            ids.discard(key_id)
+            if not ids:
+                del postings[token]
+
+    def candidates(self, query: SearchQuery) -> Iterable[str]:
+        """
+        返回可能满足条件的键名
+
+        文本和通配符中长度不少于 3 的片段取其所有三元组对应集合的交集，扩展名取对应集合的并集；
+        两者都没有时，短关键字直接扫描文件名表（含 / 时扫描完整路径），否则返回全部键名。
+        """
+        postings = [self._grams.get(gram, set()) for literal in _literals(query) for gram in _trigrams(literal)]
+        if query.extensions:
+            postings.append(set().union(*(self._extensions.get(ext, set()) for ext in query.extensions)))
+        if not postings:
+            text = query.text
+            if text and "/" in text:
+                return [key for key in self._ids if text in key.lower()]
+            if text:
+                return [key for key, name in zip(self._keys, self._names, strict=True) if name and text in name]
+            return list(self._ids)
+        postings.sort(key=len)
+        ids = postings[0].intersection(*postings[1:])
+        return [self._keys[key_id] for key_id in ids]
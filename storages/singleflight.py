@@ -0,0 +1,160 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from metrics import REGISTRY
+
+from .base import BaseStorage
+from .wrapper import StorageWrapper
+
+
+class _Flight:
+    """一次进行中的调用，供并发的相同调用等待并共享结果"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """合并并发的相同调用
+
+    同一个键同时只执行一次函数，期间到达的相同调用等待该次执行完成并共享其结果
+    （或异常）。调用结束后立即移除记录，不缓存结果。
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        执行函数，若相同键的调用正在进行则等待并复用其结果
+
+        Args:
+            key: 调用键，相同键的并发调用会被合并
+            func: 实际执行的函数
+
+        Returns:
+            函数的返回值
+
+        Raises:
+            函数抛出的异常（所有等待者收到同一个异常）
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                # 期间可能已被 forget 移除并由新的调用替换，只移除自己的记录
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def forget_all(self) -> None:
+        """让之后的调用不再加入当前进行中的调用（进行中的调用仍会正常完成）"""
+        with self._lock:
+            self._flights.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """返回实际执行次数和被合并的调用次数"""
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._flights)}
+
+
+class SingleFlightStorage(StorageWrapper):
+    """合并并发相同读请求的存储包装器
+
+    热门目录被大量用户同时打开时，对同一前缀的 list_objects、同一对象的
+    get_object_info 和 generate_thumbnail 只向下层发起一次调用，其余调用共享结果。
+
+    写操作完成后，之后到达的读请求不会再加入写操作之前开始的调用，避免读到写之前的数据。
+    """
+
+    def __init__(self, storage: BaseStorage):
+        """
+        初始化请求合并包装器
+
+        Args:
+            storage: 被包装的存储实例
+        """
+        super().__init__(storage)
+        self.flights = SingleFlight()
+        REGISTRY.register_collector(
+            "cloudindex_single_flight_calls_total",
+            "counter",
+            "Coalesced read calls, split into executed and shared.",
+            lambda: [({"result": result}, self.flights.stats()[result]) for result in ("executed", "shared")],
+        )
+
+    def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        return self.flights.do(("list_objects", prefix), lambda: self.storage.list_objects(prefix))
+
+    def get_object_info(self, key: str) -> Dict[str, Any]:
+        return self.flights.do(("get_object_info", key), lambda: self.storage.get_object_info(key))
+
+    def generate_thumbnail(self, file_path: str) -> bytes:
+        return self.flights.do(("generate_thumbnail", file_path), lambda: self.storage.generate_thumbnail(file_path))
+
+    def _write(self, func: Callable[..., Any], *args) -> Any:
+        """执行写操作，完成后断开与进行中读请求的合并"""
+        try:
+            return func(*args)
+        finally:
+            self.flights.forget_all()
+
+    def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        return self._write(self.storage.upload_file, key, file_data, content_type)
+
+    def delete_file(self, key: str) -> bool:
+        return self._write(self.storage.delete_file, key)
+
+    def rename_file(self, old_key: str, new_key: str) -> bool:
+        return self._write(self.storage.rename_file, old_key, new_key)
+
+    def delete_folder(self, prefix: str) -> bool:
+        return self._write(self.storage.delete_folder, prefix)
+
+    def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        return self._write(self.storage.rename_folder, old_prefix, new_prefix)
+
+    def copy_file(self, source_key: str, dest_key: str) -> bool:
+        return self._write(self.storage.copy_file, source_key, dest_key)
+
+    def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        return self._write(self.storage.copy_folder, source_prefix, dest_prefix)
+
+    def create_folder(self, key: str) -> bool:
+        return self._write(self.storage.create_folder, key)
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        return self._write(self.storage.delete_many, keys)
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        return self._write(self.storage.copy_many, pairs)
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        return self._write(self.storage.upload_many, files)
@@ -0,0 +1,187 @@
+import queue
+import threading
+from typing import Iterator, Optional
+
+import requests
+
+from config import Config
+
+
+class ResponseBody:
+    """上游 HTTP 响应的流式响应体，与 R2 的流式响应一样支持 read() 和 iter_chunks()
+
+    iter_chunks() 在后台线程中预读最多 STREAM_READ_AHEAD_CHUNKS 个数据块，
+    使上游下载与向客户端发送重叠进行，同时每个下载占用的内存保持在固定上限内。
+    """
+
+    def __init__(self, response: requests.Response, chunk_size: int = None, read_ahead: int = None):
+        """
+        初始化响应体
+
+        Args:
+            response: 以 stream=True 发起的请求返回的响应
+            chunk_size: 数据块大小（字节）
+            read_ahead: 预读的最大数据块数，0 表示不预读
+        """
+        self.response = response
+        self.chunk_size = chunk_size or Config.STREAM_CHUNK_SIZE
+        self.read_ahead = read_ahead if read_ahead is not None else Config.STREAM_READ_AHEAD_CHUNKS
+        self._chunks: Optional[Iterator[bytes]] = None
+        self._buffer = b""
+
+    def _iter_content(self) -> Iterator[bytes]:
+        if self._chunks is None:
+            self._chunks = self.response.iter_content(self.chunk_size)
+        return self._chunks
+
+    def read(self, size: int = -1) -> bytes:
+        """读取指定字节数，size 为负数时读取剩余的全部内容"""
+        if size is None or size < 0:
+            data = self._buffer + b"".join(self._iter_content())
+            self._buffer = b""
+            self.close()
+            return data
+        chunks = self._iter_content()
+        while len(self._buffer) < size:
+            chunk = next(chunks, b"")
+            if not chunk:
+                break
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def iter_chunks(self, chunk_size: int = None) -> Iterator[bytes]:
+        """
+        迭代返回数据块，读完或迭代器被关闭（如客户端断开连接）时关闭上游连接
+
+        Args:
+            chunk_size: 数据块大小，默认使用初始化时的设置
+        """
+        if chunk_size:
+            self.chunk_size = chunk_size
+        try:
+            if self._buffer:
+                data, self._buffer = self._buffer, b""
+                yield data
+            if self.read_ahead > 0:
+                yield from self._iter_read_ahead()
+            else:
+                yield from self._iter_content()
+        finally:
+            self.close()
+
+    @staticmethod
+    def _put(chunks: "queue.Queue", stopped: threading.Event, item) -> bool:
+        """放入预读队列；消费端停止后不再阻塞，让预读线程尽快退出"""
+        while not stopped.is_set():
+            try:
+                chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, chunks: "queue.Queue", stopped: threading.Event) -> None:
+        """预读线程：读取上游数据块放入队列，结束时放入 None，出错时放入异常"""
+        try:
+            for chunk in self._iter_content():
+                if chunk and not self._put(chunks, stopped, chunk):
+                    return
+            self._put(chunks, stopped, None)
+        except Exception as e:
+            self._put(chunks, stopped, e)
+
+    def _iter_read_ahead(self) -> Iterator[bytes]:
+        chunks: "queue.Queue" = queue.Queue(maxsize=self.read_ahead)
+        stopped = threading.Event()
+        thread = threading.Thread(target=self._produce, args=(chunks, stopped), daemon=True, name="stream-read-ahead")
+        thread.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+
+    def close(self) -> None:
+        self.response.close()
+
+
+def slice_chunks(chunks: Iterator[bytes], start: int, end: int) -> Iterator[bytes]:
+    """
+    从数据块流中截取 [start, end] 字节范围（闭区间），到达结束位置后停止读取
+
+    用于不支持范围请求的后端，读取范围之前的数据但不保留在内存中
+    """
+    position = 0
+    for chunk in chunks:
+        chunk_end = position + len(chunk)
+        if chunk_end > start:
+            yield chunk[max(0, start - position) : end + 1 - position]
+        position = chunk_end
+        if position > end:
+            break
+
+
+class SlicedBody:
+    """只包含原响应体中一段字节范围的响应体"""
+
+    def __init__(self, body, start: int, end: int):
+        self.body = body
+        self.start = start
+        self.end = end
+
+    def iter_chunks(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        chunks = self.body.iter_chunks(chunk_size)
+        try:
+            yield from slice_chunks(chunks, self.start, self.end)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+
+    def read(self) -> bytes:
+        """读取范围内的全部内容"""
+        return b"".join(self.iter_chunks())
+
+    def close(self) -> None:
+        close = getattr(self.body, "close", None)
+        if close:
+            close()
+
+
+class StreamWrapper:
+    """将内存中的字节数据包装为响应体，支持 iter_chunks() 方法以兼容 R2 的流式响应"""
+
+    def __init__(self, data: bytes, chunk_size: int = 8192):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.position = 0
+
+    def iter_chunks(self, chunk_size: int = None):
+        """迭代返回数据块"""
+        chunk_size = chunk_size or self.chunk_size
+        offset = 0
+        while offset < len(self.data):
+            yield self.data[offset : offset + chunk_size]
+            offset += chunk_size
+
+    def read(self, size: int = -1):
+        """为了兼容性支持 read() 方法"""
+        if size == -1:
+            return self.data
+        result = self.data[self.position : self.position + size]
+        self.position += len(result)
+        return result
+
+    def seek(self, offset: int):
+        """为了兼容性支持 seek() 方法"""
+        self.position = offset
+
+    def tell(self):
+        """为了兼容性支持 tell() 方法"""
+        return self.position
@@ -0,0 +1,105 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .base import BaseStorage
+from .search import SearchQuery
+
+
+class StorageWrapper(BaseStorage):
+    """存储装饰器基类，将所有调用转发给被包装的存储实例
+
+    子类只需重写需要增强的方法，其余方法保持原后端的行为。
+    """
+
+    def __init__(self, storage: BaseStorage):
+        """
+        初始化包装器
+
+        Args:
+            storage: 被包装的存储实例
+        """
+        self.storage = storage
+
+    def __getattr__(self, name: str) -> Any:
+        # 后端特有的属性和方法（如 R2 的 get_s3_client）直接透传
+        return getattr(self.storage, name)
+
+    def list_objects(self, prefix: str = "") -> Dict[str, Any]:
+        return self.storage.list_objects(prefix)
+
+    def get_object_info(self, key: str) -> Dict[str, Any]:
+        return self.storage.get_object_info(key)
+
+    def get_object(self, key: str) -> Dict[str, Any]:
+        return self.storage.get_object(key)
+
+    def generate_presigned_url(self, key: str, expires: int = None) -> str:
+        return self.storage.generate_presigned_url(key, expires)
+
+    def get_presigned_url_max_age(self) -> int:
+        return self.storage.get_presigned_url_max_age()
+
+    def get_public_url(self, key: str) -> str:
+        return self.storage.get_public_url(key)
+
+    def format_timestamp(self, timestamp) -> str:
+        return self.storage.format_timestamp(timestamp)
+
+    def generate_thumbnail(self, file_path: str) -> bytes:
+        return self.storage.generate_thumbnail(file_path)
+
+    def upload_file(self, key: str, file_data: bytes, content_type: str = None) -> bool:
+        return self.storage.upload_file(key, file_data, content_type)
+
+    def delete_file(self, key: str) -> bool:
+        return self.storage.delete_file(key)
+
+    def rename_file(self, old_key: str, new_key: str) -> bool:
+        return self.storage.rename_file(old_key, new_key)
+
+    def delete_folder(self, prefix: str) -> bool:
+        return self.storage.delete_folder(prefix)
+
+    def rename_folder(self, old_prefix: str, new_prefix: str) -> bool:
+        return self.storage.rename_folder(old_prefix, new_prefix)
+
+    def copy_file(self, source_key: str, dest_key: str) -> bool:
+        return self.storage.copy_file(source_key, dest_key)
+
+    def copy_folder(self, source_prefix: str, dest_prefix: str) -> bool:
+        return self.storage.copy_folder(source_prefix, dest_prefix)
+
+    def create_folder(self, key: str) -> bool:
+        return self.storage.create_folder(key)
+
+    def iter_keys(self, prefix: str) -> Iterator[str]:
+        return self.storage.iter_keys(prefix)
+
+    def iter_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        return self.storage.iter_objects(prefix)
+
+    def search_objects(self, query: SearchQuery) -> Dict[str, Any]:
+        return self.storage.search_objects(query)
+
+    def get_index_version(self) -> Optional[str]:
+        return self.storage.get_index_version()
+
+    def get_folder_usage(self, prefix: str = "", depth: int = 1) -> Dict[str, Any]:
+        return self.storage.get_folder_usage(prefix, depth)
+
+    def head_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return self.storage.head_many(keys)
+
+    def delete_many(self, keys: List[str]) -> Dict[str, bool]:
+        return self.storage.delete_many(keys)
+
+    def copy_many(self, pairs: List[Tuple[str, str]]) -> Dict[str, bool]:
+        return self.storage.copy_many(pairs)
+
+    def upload_many(self, files: List[Tuple[str, bytes, Optional[str]]]) -> Dict[str, bool]:
+        return self.storage.upload_many(files)
+
+    def get_object_range(self, key: str, start: int, end: int) -> Dict[str, Any]:
+        return self.storage.get_object_range(key, start, end)
+
+    def generate_download_response(self, key: str) -> Dict[str, Any]:
+        return self.storage.generate_download_response(key)
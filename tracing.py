@@ -0,0 +1,83 @@
+"""
+请求追踪模块
+记录单个请求内各存储调用、缓存查询和渲染阶段的耗时，输出为 Server-Timing 响应头
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class RequestTrace:
+    """单个请求的耗时记录
+
+    同名的阶段合并为一项，记录次数和总耗时；没有耗时的项（如缓存命中）
+    在 Server-Timing 中只输出次数。
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        # 阶段名称 -> [次数, 总耗时（秒），未计时的项为 None]，保持首次出现的顺序
+        self._spans: Dict[str, List[Any]] = {}
+
+    def add(self, name: str, duration: Optional[float] = None, count: int = 1) -> None:
+        """
+        记录一个阶段
+
+        Args:
+            name: 阶段名称，须为 Server-Timing 允许的 token（字母、数字和 .-_ 等）
+            duration: 耗时（秒），只计次数时为 None
+            count: 次数
+        """
+        with self._lock:
+            span = self._spans.setdefault(name, [0, None])
+            span[0] += count
+            if duration is not None:
+                span[1] = (span[1] or 0.0) + duration
+
+    def elapsed(self) -> float:
+        """从请求开始到现在的耗时（秒）"""
+        return time.perf_counter() - self.started
+
+    def spans(self) -> Dict[str, Dict[str, Any]]:
+        """返回各阶段的次数和总耗时（毫秒，未计时的项为 None）"""
+        with self._lock:
+            return {
+                name: {"count": count, "ms": None if total is None else round(total * 1000, 1)}
+                for name, (count, total) in self._spans.items()
+            }
+
+    def server_timing(self) -> str:
+        """生成 Server-Timing 响应头的值"""
+        entries = []
+        for name, span in self.spans().items():
+            entry = f'{name};desc="x{span["count"]}"'
+            if span["ms"] is not None:
+                entry += f";dur={span['ms']}"
+            entries.append(entry)
+        entries.append(f"total;dur={round(self.elapsed() * 1000, 1)}")
+        return ", ".join(entries)
+
+
+# 当前请求的耗时记录，未启用追踪或不在请求中时为 None
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+def record_span(name: str, duration: Optional[float] = None, count: int = 1) -> None:
+    """向当前请求的耗时记录添加一个阶段（不在请求中时忽略）"""
+    trace = current_trace.get()
+    if trace is not None and count:
+        trace.add(name, duration, count)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """统计代码块的耗时并记录到当前请求"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
@@ -3,10 +3,23 @@
 集中管理常用的辅助函数
 """
 
+import tomllib
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
 
+def get_version() -> str:
+    """从 pyproject.toml 读取项目版本号"""
+    try:
+        pyproject_path = Path(__file__).parent / "pyproject.toml"
+        with open(pyproject_path, "rb") as f:
+            pyproject_data = tomllib.load(f)
+        return pyproject_data.get("project", {}).get("version", "0.0.0")
+    except Exception:
+        return "0.0.0"
+
+
 def format_timestamp(timestamp) -> str:
     """
     格式化时间戳为人类可读的格式